@@ -0,0 +1,9 @@
+# CMake generated Testfile for 
+# Source directory: /root/package
+# Build directory: /root/package/build/release
+# 
+# This file includes the relevant testing commands required for 
+# testing this directory and lists subdirectories to be tested as well.
+subdirs("common")
+subdirs("cpu_micro")
+subdirs("tests")
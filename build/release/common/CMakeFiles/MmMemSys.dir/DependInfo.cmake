@@ -0,0 +1,21 @@
+
+# Consider dependencies only in project.
+set(CMAKE_DEPENDS_IN_PROJECT_ONLY OFF)
+
+# The set of languages for which implicit dependencies are needed:
+set(CMAKE_DEPENDS_LANGUAGES
+  )
+
+# The set of dependency files which are needed:
+set(CMAKE_DEPENDS_DEPENDENCY_FILES
+  "/root/package/common/mem_region.cc" "common/CMakeFiles/MmMemSys.dir/mem_region.cc.o" "gcc" "common/CMakeFiles/MmMemSys.dir/mem_region.cc.o.d"
+  "/root/package/common/numa_config.cc" "common/CMakeFiles/MmMemSys.dir/numa_config.cc.o" "gcc" "common/CMakeFiles/MmMemSys.dir/numa_config.cc.o.d"
+  )
+
+# Targets to which this target links.
+set(CMAKE_TARGET_LINKED_INFO_FILES
+  "/root/package/build/release/common/CMakeFiles/MmUtils.dir/DependInfo.cmake"
+  )
+
+# Fortran module output directory.
+set(CMAKE_Fortran_TARGET_MODULE_DIR "")
@@ -0,0 +1,13 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/MmMemSys.dir/mem_region.cc.o"
+  "CMakeFiles/MmMemSys.dir/mem_region.cc.o.d"
+  "CMakeFiles/MmMemSys.dir/numa_config.cc.o"
+  "CMakeFiles/MmMemSys.dir/numa_config.cc.o.d"
+  "libMmMemSys.a"
+  "libMmMemSys.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/MmMemSys.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
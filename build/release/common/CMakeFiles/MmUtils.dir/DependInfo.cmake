@@ -0,0 +1,23 @@
+
+# Consider dependencies only in project.
+set(CMAKE_DEPENDS_IN_PROJECT_ONLY OFF)
+
+# The set of languages for which implicit dependencies are needed:
+set(CMAKE_DEPENDS_LANGUAGES
+  )
+
+# The set of dependency files which are needed:
+set(CMAKE_DEPENDS_DEPENDENCY_FILES
+  "/root/package/common/json_record.cc" "common/CMakeFiles/MmUtils.dir/json_record.cc.o" "gcc" "common/CMakeFiles/MmUtils.dir/json_record.cc.o.d"
+  "/root/package/common/kmg_parser.cc" "common/CMakeFiles/MmUtils.dir/kmg_parser.cc.o" "gcc" "common/CMakeFiles/MmUtils.dir/kmg_parser.cc.o.d"
+  "/root/package/common/perf_counters.cc" "common/CMakeFiles/MmUtils.dir/perf_counters.cc.o" "gcc" "common/CMakeFiles/MmUtils.dir/perf_counters.cc.o.d"
+  "/root/package/common/stats.cc" "common/CMakeFiles/MmUtils.dir/stats.cc.o" "gcc" "common/CMakeFiles/MmUtils.dir/stats.cc.o.d"
+  "/root/package/common/timing.cc" "common/CMakeFiles/MmUtils.dir/timing.cc.o" "gcc" "common/CMakeFiles/MmUtils.dir/timing.cc.o.d"
+  )
+
+# Targets to which this target links.
+set(CMAKE_TARGET_LINKED_INFO_FILES
+  )
+
+# Fortran module output directory.
+set(CMAKE_Fortran_TARGET_MODULE_DIR "")
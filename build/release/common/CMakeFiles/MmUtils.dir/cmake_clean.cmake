@@ -0,0 +1,19 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/MmUtils.dir/json_record.cc.o"
+  "CMakeFiles/MmUtils.dir/json_record.cc.o.d"
+  "CMakeFiles/MmUtils.dir/kmg_parser.cc.o"
+  "CMakeFiles/MmUtils.dir/kmg_parser.cc.o.d"
+  "CMakeFiles/MmUtils.dir/perf_counters.cc.o"
+  "CMakeFiles/MmUtils.dir/perf_counters.cc.o.d"
+  "CMakeFiles/MmUtils.dir/stats.cc.o"
+  "CMakeFiles/MmUtils.dir/stats.cc.o.d"
+  "CMakeFiles/MmUtils.dir/timing.cc.o"
+  "CMakeFiles/MmUtils.dir/timing.cc.o.d"
+  "libMmUtils.a"
+  "libMmUtils.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/MmUtils.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
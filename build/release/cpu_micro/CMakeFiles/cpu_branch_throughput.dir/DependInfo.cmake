@@ -0,0 +1,23 @@
+
+# Consider dependencies only in project.
+set(CMAKE_DEPENDS_IN_PROJECT_ONLY OFF)
+
+# The set of languages for which implicit dependencies are needed:
+set(CMAKE_DEPENDS_LANGUAGES
+  )
+
+# The set of dependency files which are needed:
+set(CMAKE_DEPENDS_DEPENDENCY_FILES
+  "/root/package/cpu_micro/cpu_branch_throughput.cc" "cpu_micro/CMakeFiles/cpu_branch_throughput.dir/cpu_branch_throughput.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_branch_throughput.dir/cpu_branch_throughput.cc.o.d"
+  "/root/package/cpu_micro/lib_configuration.cc" "cpu_micro/CMakeFiles/cpu_branch_throughput.dir/lib_configuration.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_branch_throughput.dir/lib_configuration.cc.o.d"
+  "/root/package/cpu_micro/worker_common.cc" "cpu_micro/CMakeFiles/cpu_branch_throughput.dir/worker_common.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_branch_throughput.dir/worker_common.cc.o.d"
+  )
+
+# Targets to which this target links.
+set(CMAKE_TARGET_LINKED_INFO_FILES
+  "/root/package/build/release/common/CMakeFiles/MmMemSys.dir/DependInfo.cmake"
+  "/root/package/build/release/common/CMakeFiles/MmUtils.dir/DependInfo.cmake"
+  )
+
+# Fortran module output directory.
+set(CMAKE_Fortran_TARGET_MODULE_DIR "")
@@ -0,0 +1,15 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/cpu_branch_throughput.dir/cpu_branch_throughput.cc.o"
+  "CMakeFiles/cpu_branch_throughput.dir/cpu_branch_throughput.cc.o.d"
+  "CMakeFiles/cpu_branch_throughput.dir/lib_configuration.cc.o"
+  "CMakeFiles/cpu_branch_throughput.dir/lib_configuration.cc.o.d"
+  "CMakeFiles/cpu_branch_throughput.dir/worker_common.cc.o"
+  "CMakeFiles/cpu_branch_throughput.dir/worker_common.cc.o.d"
+  "cpu_branch_throughput"
+  "cpu_branch_throughput.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/cpu_branch_throughput.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
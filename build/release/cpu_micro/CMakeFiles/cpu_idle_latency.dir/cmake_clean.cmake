@@ -0,0 +1,15 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/cpu_idle_latency.dir/cpu_idle_latency.cc.o"
+  "CMakeFiles/cpu_idle_latency.dir/cpu_idle_latency.cc.o.d"
+  "CMakeFiles/cpu_idle_latency.dir/lib_configuration.cc.o"
+  "CMakeFiles/cpu_idle_latency.dir/lib_configuration.cc.o.d"
+  "CMakeFiles/cpu_idle_latency.dir/worker_common.cc.o"
+  "CMakeFiles/cpu_idle_latency.dir/worker_common.cc.o.d"
+  "cpu_idle_latency"
+  "cpu_idle_latency.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/cpu_idle_latency.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
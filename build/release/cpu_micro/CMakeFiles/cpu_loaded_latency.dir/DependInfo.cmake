@@ -0,0 +1,60 @@
+
+# Consider dependencies only in project.
+set(CMAKE_DEPENDS_IN_PROJECT_ONLY OFF)
+
+# The set of languages for which implicit dependencies are needed:
+set(CMAKE_DEPENDS_LANGUAGES
+  )
+
+# The set of dependency files which are needed:
+set(CMAKE_DEPENDS_DEPENDENCY_FILES
+  "/root/package/cpu_micro/cpu_loaded_latency.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/cpu_loaded_latency.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/cpu_loaded_latency.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_0.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_0.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_0.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_1.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_1.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_1.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_2.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_2.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_2.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_3.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_3.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_3.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_4.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_4.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_4.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_5.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_5.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_5.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_6.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_6.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_6.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_7.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_7.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_7.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_0_8.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_8.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_8.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_0.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_0.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_0.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_1.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_1.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_1.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_2.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_2.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_2.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_3.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_3.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_3.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_4.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_4.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_4.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_5.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_5.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_5.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_6.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_6.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_6.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_7.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_7.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_7.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_1_8.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_8.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_8.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_0.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_0.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_0.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_1.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_1.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_1.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_2.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_2.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_2.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_3.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_3.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_3.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_4.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_4.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_4.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_5.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_5.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_5.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_6.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_6.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_6.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_7.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_7.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_7.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_2_8.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_8.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_8.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_0.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_0.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_0.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_1.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_1.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_1.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_2.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_2.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_2.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_3.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_3.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_3.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_4.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_4.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_4.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_5.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_5.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_5.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_6.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_6.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_6.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_7.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_7.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_7.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_3_8.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_8.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_8.cc.o.d"
+  "/root/package/cpu_micro/kernels_delay_bandwidth/kernels_delay_bandwidth_utils.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_utils.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_utils.cc.o.d"
+  "/root/package/cpu_micro/lib_configuration.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/lib_configuration.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/lib_configuration.cc.o.d"
+  "/root/package/cpu_micro/worker_common.cc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/worker_common.cc.o" "gcc" "cpu_micro/CMakeFiles/cpu_loaded_latency.dir/worker_common.cc.o.d"
+  )
+
+# Targets to which this target links.
+set(CMAKE_TARGET_LINKED_INFO_FILES
+  "/root/package/build/release/common/CMakeFiles/MmMemSys.dir/DependInfo.cmake"
+  "/root/package/build/release/common/CMakeFiles/MmUtils.dir/DependInfo.cmake"
+  )
+
+# Fortran module output directory.
+set(CMAKE_Fortran_TARGET_MODULE_DIR "")
@@ -0,0 +1,89 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/cpu_loaded_latency.dir/cpu_loaded_latency.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/cpu_loaded_latency.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_0.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_0.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_1.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_1.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_2.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_2.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_3.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_3.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_4.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_4.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_5.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_5.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_6.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_6.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_7.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_7.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_8.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_0_8.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_0.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_0.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_1.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_1.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_2.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_2.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_3.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_3.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_4.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_4.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_5.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_5.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_6.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_6.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_7.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_7.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_8.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_1_8.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_0.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_0.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_1.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_1.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_2.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_2.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_3.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_3.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_4.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_4.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_5.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_5.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_6.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_6.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_7.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_7.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_8.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_2_8.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_0.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_0.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_1.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_1.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_2.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_2.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_3.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_3.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_4.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_4.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_5.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_5.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_6.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_6.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_7.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_7.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_8.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_3_8.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_utils.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/kernels_delay_bandwidth/kernels_delay_bandwidth_utils.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/lib_configuration.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/lib_configuration.cc.o.d"
+  "CMakeFiles/cpu_loaded_latency.dir/worker_common.cc.o"
+  "CMakeFiles/cpu_loaded_latency.dir/worker_common.cc.o.d"
+  "cpu_loaded_latency"
+  "cpu_loaded_latency.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/cpu_loaded_latency.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
@@ -0,0 +1,15 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/cpu_memcpy.dir/cpu_memcpy.cc.o"
+  "CMakeFiles/cpu_memcpy.dir/cpu_memcpy.cc.o.d"
+  "CMakeFiles/cpu_memcpy.dir/lib_configuration.cc.o"
+  "CMakeFiles/cpu_memcpy.dir/lib_configuration.cc.o.d"
+  "CMakeFiles/cpu_memcpy.dir/worker_common.cc.o"
+  "CMakeFiles/cpu_memcpy.dir/worker_common.cc.o.d"
+  "cpu_memcpy"
+  "cpu_memcpy.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/cpu_memcpy.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
@@ -0,0 +1,15 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/cpu_numa_info.dir/cpu_numa_info.cc.o"
+  "CMakeFiles/cpu_numa_info.dir/cpu_numa_info.cc.o.d"
+  "CMakeFiles/cpu_numa_info.dir/lib_configuration.cc.o"
+  "CMakeFiles/cpu_numa_info.dir/lib_configuration.cc.o.d"
+  "CMakeFiles/cpu_numa_info.dir/worker_common.cc.o"
+  "CMakeFiles/cpu_numa_info.dir/worker_common.cc.o.d"
+  "cpu_numa_info"
+  "cpu_numa_info.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/cpu_numa_info.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
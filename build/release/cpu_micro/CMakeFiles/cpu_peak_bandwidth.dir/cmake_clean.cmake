@@ -0,0 +1,15 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/cpu_peak_bandwidth.dir/cpu_peak_bandwidth.cc.o"
+  "CMakeFiles/cpu_peak_bandwidth.dir/cpu_peak_bandwidth.cc.o.d"
+  "CMakeFiles/cpu_peak_bandwidth.dir/lib_configuration.cc.o"
+  "CMakeFiles/cpu_peak_bandwidth.dir/lib_configuration.cc.o.d"
+  "CMakeFiles/cpu_peak_bandwidth.dir/worker_common.cc.o"
+  "CMakeFiles/cpu_peak_bandwidth.dir/worker_common.cc.o.d"
+  "cpu_peak_bandwidth"
+  "cpu_peak_bandwidth.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/cpu_peak_bandwidth.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
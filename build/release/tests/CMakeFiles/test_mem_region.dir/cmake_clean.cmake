@@ -0,0 +1,11 @@
+file(REMOVE_RECURSE
+  "CMakeFiles/test_mem_region.dir/test_mem_region.cc.o"
+  "CMakeFiles/test_mem_region.dir/test_mem_region.cc.o.d"
+  "test_mem_region"
+  "test_mem_region.pdb"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/test_mem_region.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
@@ -0,0 +1,10 @@
+# CMake generated Testfile for 
+# Source directory: /root/package/tests
+# Build directory: /root/package/build/release/tests
+# 
+# This file includes the relevant testing commands required for 
+# testing this directory and lists subdirectories to be tested as well.
+add_test(test_mem_region "/root/package/build/release/tests/test_mem_region")
+set_tests_properties(test_mem_region PROPERTIES  _BACKTRACE_TRIPLES "/root/package/tests/CMakeLists.txt;13;add_test;/root/package/tests/CMakeLists.txt;0;")
+add_test(test_perf_counters "/root/package/build/release/tests/test_perf_counters")
+set_tests_properties(test_perf_counters PROPERTIES  _BACKTRACE_TRIPLES "/root/package/tests/CMakeLists.txt;13;add_test;/root/package/tests/CMakeLists.txt;0;")
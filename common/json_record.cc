@@ -0,0 +1,111 @@
+#include <chrono>
+#include <cmath>
+#include <cstdio>
+#include <sstream>
+
+#include "common/json_record.h"
+
+namespace mm_utils {
+
+JsonRecord& JsonRecord::add(const std::string& key, const std::string& value) {
+    return addRaw_(key, quote_(value));
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, const char* value) {
+    return addRaw_(key, quote_(value));
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, bool value) {
+    return addRaw_(key, value ? "true" : "false");
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, int32_t value) {
+    return addRaw_(key, std::to_string(value));
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, uint32_t value) {
+    return addRaw_(key, std::to_string(value));
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, int64_t value) {
+    return addRaw_(key, std::to_string(value));
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, uint64_t value) {
+    return addRaw_(key, std::to_string(value));
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, double value) {
+    // NaN and inf are not valid JSON
+    if (!std::isfinite(value)) {
+        return addRaw_(key, "null");
+    }
+    std::stringstream ss;
+    ss.precision(8);
+    ss << value;
+    return addRaw_(key, ss.str());
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, const JsonRecord& value) {
+    return addRaw_(key, value.str());
+}
+
+JsonRecord& JsonRecord::add(const std::string& key, const std::vector<double>& values) {
+    std::stringstream ss;
+    ss.precision(8);
+    ss << "[";
+    for (size_t i = 0; i < values.size(); ++i) {
+        ss << (i > 0 ? ", " : "");
+        if (std::isfinite(values[i])) {
+            ss << values[i];
+        } else {
+            ss << "null";
+        }
+    }
+    ss << "]";
+    return addRaw_(key, ss.str());
+}
+
+void JsonRecord::emit(std::ostream& os) const {
+    os << str() << std::endl;
+}
+
+JsonRecord& JsonRecord::addRaw_(const std::string& key, const std::string& raw_value) {
+    if (body_.size() > 0) {
+        body_.append(", ");
+    }
+    body_.append(quote_(key));
+    body_.append(": ");
+    body_.append(raw_value);
+    return *this;
+}
+
+std::string JsonRecord::quote_(const std::string& value) {
+    std::string output = "\"";
+    for (const char& c : value) {
+        if (c == '"' || c == '\\') {
+            output.push_back('\\');
+            output.push_back(c);
+        } else if (c == '\n') {
+            output.append("\\n");
+        } else if (c == '\t') {
+            output.append("\\t");
+        } else if (static_cast<unsigned char>(c) < 0x20) {
+            // other control characters are not allowed raw in JSON strings
+            char escaped[7];
+            snprintf(escaped, sizeof(escaped), "\\u%04x", static_cast<unsigned char>(c));
+            output.append(escaped);
+        } else {
+            output.push_back(c);
+        }
+    }
+    output.push_back('"');
+    return output;
+}
+
+int64_t get_timestamp_ns() {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::system_clock::now().time_since_epoch()).count();
+}
+
+}
@@ -0,0 +1,44 @@
+#ifndef __COMMON_JSON_RECORD_H__
+#define __COMMON_JSON_RECORD_H__
+
+#include <cstdint>
+#include <ostream>
+#include <string>
+#include <vector>
+
+namespace mm_utils {
+
+// one flat-or-nested JSON object, built field by field and written as a single line
+class JsonRecord {
+  public:
+    JsonRecord() = default;
+    ~JsonRecord() = default;
+
+    JsonRecord& add(const std::string& key, const std::string& value);
+    JsonRecord& add(const std::string& key, const char* value);
+    JsonRecord& add(const std::string& key, bool value);
+    JsonRecord& add(const std::string& key, int32_t value);
+    JsonRecord& add(const std::string& key, uint32_t value);
+    JsonRecord& add(const std::string& key, int64_t value);
+    JsonRecord& add(const std::string& key, uint64_t value);
+    JsonRecord& add(const std::string& key, double value);
+    JsonRecord& add(const std::string& key, const JsonRecord& value);
+    JsonRecord& add(const std::string& key, const std::vector<double>& values);
+
+    std::string str() const { return "{" + body_ + "}"; }
+    // write as one line and flush, so consumers can stream records
+    void emit(std::ostream& os) const;
+
+  private:
+    JsonRecord& addRaw_(const std::string& key, const std::string& raw_value);
+    static std::string quote_(const std::string& value);
+
+    std::string body_;
+};
+
+// wall-clock timestamp in ns, for correlating records across processes
+int64_t get_timestamp_ns();
+
+}
+
+#endif
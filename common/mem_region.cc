@@ -1,9 +1,13 @@
+#include <algorithm>
 #include <cassert>
 #include <cstdlib>
+#include <cstring>
 #include <iostream>
 #include <iomanip>
 #include <string>
+#include <thread>
 #include <fcntl.h>      // open
+#include <sched.h>      // sched_getcpu
 #include <unistd.h>     // getpaegsize
 #include <sys/mman.h>   // mmap
 
@@ -16,19 +20,72 @@
 
 namespace mm_utils {
 
+namespace {
+
+// xoshiro256** seeded with splitmix64; one independent stream per (seed, stream)
+class FastRandom {
+  public:
+    FastRandom(uint64_t seed, uint64_t stream) {
+        uint64_t x = seed;
+        x = splitmix64_(x) + stream;
+        for (auto& s : s_) {
+            s = splitmix64_(x);
+        }
+    }
+
+    uint64_t next() {
+        const uint64_t result = rotl_(s_[1] * 5, 7) * 9;
+        const uint64_t t = s_[1] << 17;
+        s_[2] ^= s_[0];
+        s_[3] ^= s_[1];
+        s_[1] ^= s_[2];
+        s_[0] ^= s_[3];
+        s_[2] ^= t;
+        s_[3] = rotl_(s_[3], 45);
+        return result;
+    }
+
+    // in [0, n), by multiply-shift instead of a division
+    uint64_t bounded(uint64_t n) {
+        return static_cast<uint64_t>((static_cast<unsigned __int128>(next()) * n) >> 64);
+    }
+
+  private:
+    static uint64_t rotl_(uint64_t x, int k) { return (x << k) | (x >> (64 - k)); }
+    static uint64_t splitmix64_(uint64_t& x) {
+        uint64_t z = (x += 0x9e3779b97f4a7c15ULL);
+        z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+        z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+        return z ^ (z >> 31);
+    }
+
+    uint64_t s_[4];
+};
+
+// buckets of the parallel shuffle, fixed so that the permutation does not
+// depend on the number of threads; smaller sequences use one bucket
+const uint64_t SHUFFLE_BUCKETS = 64;
+const uint64_t SHUFFLE_MIN_BUCKET_SIZE = 4096;
+
+}
+
 MemRegion::MemRegion(
         uint64_t size,
         uint64_t active_size,
         uint64_t page_size,
         uint64_t line_size,
         MemType mem_type,
-        HugePageType hugepage_type) :
+        HugePageType hugepage_type,
+        uint32_t num_init_threads,
+        uint64_t seed) :
     size_ (size),
     active_size_ (active_size),
     page_size_ (page_size),
     line_size_ (line_size),
     mem_type_ (mem_type),
     hugepage_type_ (hugepage_type),
+    num_init_threads_ (std::max<uint32_t>(num_init_threads, 1)),
+    seed_ (seed),
     num_all_pages_ (size_ / page_size_),
     num_active_pages_ (active_size_ / page_size_),
     num_lines_in_page_ (page_size_ / line_size_)
@@ -42,6 +99,13 @@ MemRegion::MemRegion(
 
     os_page_size_ = getpagesize();
     // std::cout << "OS page size: " << getpagesize() << std::endl;
+#if __linux__
+    // init threads stay on the node of the calling (bound) thread
+    int cpu = sched_getcpu();
+    if (num_init_threads_ > 1 && cpu >= 0 && numa_available() >= 0) {
+        init_node_ = numa_node_of_cpu(cpu);
+    }
+#endif
 
     // allocate & init region
     if (size_ > 0) {
@@ -50,10 +114,14 @@ MemRegion::MemRegion(
         //     << " addr=0x" << std::hex << reinterpret_cast<uint64_t>(addr1_)
         //     << " end_addr=0x" << reinterpret_cast<uint64_t>(addr1_ + size_)
         //     << " size=" << std::dec << size_ << std::endl;
-        memset(addr1_, 0, size_);
+        bindNode_(addr1_, real_size_);
+        // first touch, in page-aligned slices
+        const uint64_t num_os_pages = (size_ + os_page_size_ - 1) / os_page_size_;
+        parallelFor_(num_os_pages, [this](uint64_t begin, uint64_t end) {
+            uint64_t end_offset = std::min(end * os_page_size_, size_);
+            memset(addr1_ + begin * os_page_size_, 0, end_offset - begin * os_page_size_);
+        });
     }
-    // use a fixed seed
-    srand(0);
 }
 
 MemRegion::~MemRegion() {
@@ -74,28 +142,6 @@ void MemRegion::error_(std::string message) {
 
 char* MemRegion::allocNative_(const uint64_t& size) {
     char* addr = nullptr;
-    // set mem policy for numa aware allocation
-    if (mem_type_ >= MemType::NODE0 && mem_type_ <= MemType::INTERLEAVE) {
-#if __linux__
-        int mode = MPOL_DEFAULT;
-        unsigned long nodemask = 0;
-        unsigned long maxnode = (numa_max_node() + 1) + 1;  // additional +1 ?
-        if (mem_type_ == MemType::INTERLEAVE) {
-            mode = MPOL_INTERLEAVE;
-            nodemask = ((unsigned long)1 << (numa_max_node() + 1)) - 1;
-        } else {
-            mode = MPOL_BIND;
-            int node = static_cast<int>(mem_type_) - static_cast<int>(MemType::NODE0);
-            nodemask = ((unsigned long)1 << node);
-        }
-        long ret = set_mempolicy(mode, &nodemask, maxnode);
-        if (ret < 0) {
-            error_("set_mempolicy error");
-        }
-#else
-        // TODO
-#endif
-    }
     // hugepage or regular page
     if (hugepage_type_ > HugePageType::NONE) {
         int hugepage_size_log2 = 0;
@@ -140,32 +186,103 @@ char* MemRegion::allocNative_(const uint64_t& size) {
     return addr;
 }
 
-void MemRegion::randomizeSequence_(
-    std::vector<uint64_t>& sequence, uint64_t size, uint64_t unit, bool in_order)
-{
-    // initialize to sequential pattern
-    for (uint64_t i = 0; i < size; ++i) {
-        sequence[i] = i * unit;
-    }
-    if (in_order) {
-      return;
-    }
-    // randomize by swapping
-    uint64_t r = rand() ^ ((uint64_t)(rand()) << 10);
-    for (uint64_t i = size-1; i> 0; --i) {
-        r = (r << 1) ^ rand();
-        uint64_t tmp = sequence[r % (i+1)];
-        sequence[r % (i+1)] = sequence[i];
-        sequence[i] = tmp;
-    }
-    // start should still be start
-    for (uint32_t i = 1; i < size; ++i) {
-        if (sequence[i] == 0) {
-            sequence[i] = sequence[0];
-            sequence[0] = 0;
-            break;
+// set the memory policy of the region before the first touch, so the pages
+// land on the target node(s) whichever thread touches them
+void MemRegion::bindNode_(char* addr, uint64_t size) {
+    if (mem_type_ < MemType::NODE0 || mem_type_ > MemType::INTERLEAVE) {
+        return;
+    }
+#if __linux__
+    int mode = MPOL_DEFAULT;
+    unsigned long nodemask = 0;
+    unsigned long maxnode = (numa_max_node() + 1) + 1;  // additional +1 ?
+    if (mem_type_ == MemType::INTERLEAVE) {
+        mode = MPOL_INTERLEAVE;
+        nodemask = ((unsigned long)1 << (numa_max_node() + 1)) - 1;
+    } else {
+        mode = MPOL_BIND;
+        int node = static_cast<int>(mem_type_) - static_cast<int>(MemType::NODE0);
+        nodemask = ((unsigned long)1 << node);
+    }
+    long ret = mbind(addr, size, mode, &nodemask, maxnode, MPOL_MF_MOVE);
+    if (ret < 0) {
+        error_("mbind error");
+    }
+#else
+    // TODO
+#endif
+}
+
+template <class Func>
+void MemRegion::parallelFor_(uint64_t n, Func func) const {
+    const uint32_t num_threads = static_cast<uint32_t>(std::min<uint64_t>(num_init_threads_, std::max<uint64_t>(n, 1)));
+    std::vector<std::thread> threads;
+    for (uint32_t t = 1; t < num_threads; ++t) {
+        threads.emplace_back([this, &func, n, t, num_threads]() {
+#if __linux__
+            if (init_node_ >= 0) {
+                numa_run_on_node(init_node_);
+            }
+#endif
+            func(n * t / num_threads, n * (t + 1) / num_threads);
+        });
+    }
+    func(0, n / num_threads);
+    for (auto& thread : threads) {
+        thread.join();
+    }
+}
+
+/*
+ * Rao-Sandelius shuffle: every chunk of the input scatters its elements to
+ * random buckets, then every bucket is shuffled with Fisher-Yates; chunks and
+ * buckets draw from their own streams, so they run in parallel and the result
+ * depends on the seed only.
+ */
+void MemRegion::shuffle_(std::vector<uint64_t>& sequence, uint64_t n, uint64_t unit) const {
+    const uint64_t num_buckets = (n >= SHUFFLE_BUCKETS * SHUFFLE_MIN_BUCKET_SIZE) ? SHUFFLE_BUCKETS : 1;
+    auto chunk_begin = [n, num_buckets](uint64_t c) { return n * c / num_buckets; };
+    // [chunk][bucket] number of elements, then where they go
+    std::vector<uint64_t> offsets(num_buckets * num_buckets, 0);
+    parallelFor_(num_buckets, [&](uint64_t begin, uint64_t end) {
+        for (uint64_t c = begin; c < end; ++c) {
+            FastRandom rng(seed_, c);
+            uint64_t* counts = &offsets[c * num_buckets];
+            for (uint64_t i = chunk_begin(c); i < chunk_begin(c + 1); ++i) {
+                counts[rng.bounded(num_buckets)] += 1;
+            }
+        }
+    });
+    // bucket b takes chunk 0's elements first, then chunk 1's, ...
+    std::vector<uint64_t> bucket_begin(num_buckets + 1, n);
+    uint64_t offset = 0;
+    for (uint64_t b = 0; b < num_buckets; ++b) {
+        bucket_begin[b] = offset;
+        for (uint64_t c = 0; c < num_buckets; ++c) {
+            uint64_t count = offsets[c * num_buckets + b];
+            offsets[c * num_buckets + b] = offset;
+            offset += count;
         }
     }
+    // scatter with the same draws as the counting pass
+    parallelFor_(num_buckets, [&](uint64_t begin, uint64_t end) {
+        for (uint64_t c = begin; c < end; ++c) {
+            FastRandom rng(seed_, c);
+            uint64_t* next = &offsets[c * num_buckets];
+            for (uint64_t i = chunk_begin(c); i < chunk_begin(c + 1); ++i) {
+                sequence[next[rng.bounded(num_buckets)]++] = i * unit;
+            }
+        }
+    });
+    parallelFor_(num_buckets, [&](uint64_t begin, uint64_t end) {
+        for (uint64_t b = begin; b < end; ++b) {
+            FastRandom rng(seed_, num_buckets + b);
+            uint64_t* bucket = &sequence[bucket_begin[b]];
+            for (uint64_t i = bucket_begin[b + 1] - bucket_begin[b]; i > 1; --i) {
+                std::swap(bucket[i - 1], bucket[rng.bounded(i)]);
+            }
+        }
+    });
 }
 
 char* MemRegion::getOffsetAddr_(uint64_t offset) const {
@@ -174,43 +291,50 @@ char* MemRegion::getOffsetAddr_(uint64_t offset) const {
 
 // create a circular list of pointers with sequential stride
 void MemRegion::stride_init() {
-    uint64_t i = 0;
-    for (i = line_size_; i < active_size_; i += line_size_) {
-        *(char**)getOffsetAddr_(i - line_size_) = (char*)getOffsetAddr_(i);
-    }
-    *(char**)getOffsetAddr_(i - line_size_) = (char*)getOffsetAddr_(0);
+    const uint64_t num_lines = (active_size_ + line_size_ - 1) / line_size_;
+    parallelFor_(num_lines, [this, num_lines](uint64_t begin, uint64_t end) {
+        for (uint64_t i = begin; i < end; ++i) {
+            uint64_t next = (i + 1 < num_lines) ? (i + 1) : 0;
+            *(char**)getOffsetAddr_(i * line_size_) = (char*)getOffsetAddr_(next * line_size_);
+        }
+    });
 }
 
 // create a circular list of pointers with random-in-page
 void MemRegion::page_random_init() {
-    std::vector<uint64_t> pages_(num_active_pages_, 0);
-    std::vector<uint64_t> linesInPage_(num_lines_in_page_, 0);
-    randomizeSequence_(pages_, num_active_pages_, page_size_, true);
-    randomizeSequence_(linesInPage_, num_lines_in_page_, line_size_);
-    // run through the pages
-    for (uint64_t i = 0; i < num_active_pages_; ++i) {
-        // run through the lines within a page
-        for (uint64_t j = 0; j < num_lines_in_page_ - 1; ++j) {
-            *(char**)getOffsetAddr_(pages_.at(i) + linesInPage_.at(j))
-                = (char*)getOffsetAddr_(pages_.at(i) + linesInPage_.at(j + 1));
+    // the same random line order in every page; pages in order
+    std::vector<uint64_t> lines_in_page(num_lines_in_page_, 0);
+    shuffle_(lines_in_page, num_lines_in_page_, line_size_);
+    const uint64_t* lines = lines_in_page.data();
+    const uint64_t last_line = num_lines_in_page_ - 1;
+    parallelFor_(num_active_pages_, [&](uint64_t begin, uint64_t end) {
+        for (uint64_t i = begin; i < end; ++i) {
+            const uint64_t page = i * page_size_;
+            // run through the lines within a page
+            for (uint64_t j = 0; j < last_line; ++j) {
+                *(char**)getOffsetAddr_(page + lines[j]) = (char*)getOffsetAddr_(page + lines[j + 1]);
+            }
+            // jump the next page
+            uint64_t next_page = (i == num_active_pages_ - 1) ? 0 : (page + page_size_);
+            *(char**)getOffsetAddr_(page + lines[last_line]) = (char*)getOffsetAddr_(next_page + lines[0]);
         }
-        // jump the next page
-        uint64_t next_page = (i == num_active_pages_ - 1) ? 0 : (i + 1);
-        *(char**)getOffsetAddr_(pages_.at(i) + linesInPage_.at(num_lines_in_page_ - 1))
-            = (char*)getOffsetAddr_(pages_.at(next_page) + linesInPage_.at(0));
-    }
+    });
 }
 
 // create a circular list of pointers with all-random
 void MemRegion::all_random_init() {
     const uint64_t num_lines = numActiveLines();
     std::vector<uint64_t> lines_(num_lines, 0);
-    randomizeSequence_(lines_, num_lines, line_size_);
-    // run through the lines
-    for (uint64_t i = 0; i < num_lines - 1; ++i) {
-        *(char**)getOffsetAddr_(lines_.at(i)) = (char*)getOffsetAddr_(lines_.at(i + 1));
-    }
-    *(char**)getOffsetAddr_(lines_.at(num_lines - 1)) = (char*)getOffsetAddr_(lines_.at(0));
+    shuffle_(lines_, num_lines, line_size_);
+    // linking the lines in shuffled order makes one cycle through all of them,
+    // uniform over cyclic orders like Sattolo's algorithm, with no short sub-cycles
+    const uint64_t* lines = lines_.data();
+    parallelFor_(num_lines, [&](uint64_t begin, uint64_t end) {
+        for (uint64_t i = begin; i < end; ++i) {
+            uint64_t next = (i + 1 < num_lines) ? lines[i + 1] : lines[0];
+            *(char**)getOffsetAddr_(lines[i]) = (char*)getOffsetAddr_(next);
+        }
+    });
 }
 
 void MemRegion::dump()
@@ -34,13 +34,18 @@ class MemRegion {
   public:
     using Handle = std::shared_ptr<MemRegion>;
 
+    // num_init_threads threads zero (first-touch) the region and build the
+    // pointer chains, next to the calling thread (same NUMA node); the random
+    // chains depend on the seed only, not on the number of threads
     MemRegion(
       uint64_t size,
       uint64_t active_size,
       uint64_t page_size,
       uint64_t line_size,
       MemType mem_type,
-      HugePageType hugepage_type);
+      HugePageType hugepage_type,
+      uint32_t num_init_threads = 1,
+      uint64_t seed = 0);
 
     MemRegion(
       uint64_t size,
@@ -84,7 +89,8 @@ class MemRegion {
 
     virtual ~MemRegion();
 
-    // initialize to different patterns
+    // initialize to different patterns; each is a single cycle through all
+    // active lines, starting at offset 0
     void stride_init();
     void page_random_init();
     void all_random_init();
@@ -92,7 +98,9 @@ class MemRegion {
     void dump();
     uint64_t numAllLines() const { return num_all_pages_ * num_lines_in_page_; }
     uint64_t numActiveLines() const { return num_active_pages_ * num_lines_in_page_; }
+    uint64_t size() const { return size_; }
     uint64_t activeSize() const { return active_size_; }
+    HugePageType hugePageType() const { return hugepage_type_; }
     uint64_t lineSize() const { return line_size_; }
     // entry point
     char** getStartPoint() const { return (char**)getOffsetAddr_(0); }
@@ -101,11 +109,12 @@ class MemRegion {
   private:
     void error_(std::string message);
     char* allocNative_(const uint64_t& size);
-    void randomizeSequence_(
-        std::vector<uint64_t>& sequence,
-        uint64_t size,
-        uint64_t unit,
-        bool in_order=false);
+    void bindNode_(char* addr, uint64_t size);
+    // func(begin, end) over slices of [0, n), one per init thread
+    template <class Func>
+    void parallelFor_(uint64_t n, Func func) const;
+    // random permutation of {0, unit, ..., (n - 1) * unit}
+    void shuffle_(std::vector<uint64_t>& sequence, uint64_t n, uint64_t unit) const;
     char* getOffsetAddr_(uint64_t offset) const;
 
     uint64_t size_;         // size of memory region in Bytes
@@ -115,6 +124,9 @@ class MemRegion {
     uint64_t line_size_;    // not necessarily the cacheline size; i.e. preferred spatial stride
     MemType mem_type_ = MemType::NATIVE;
     HugePageType hugepage_type_ = HugePageType::NONE;
+    uint32_t num_init_threads_ = 1;
+    uint64_t seed_ = 0;
+    int      init_node_ = -1;  // NUMA node the init threads run on; -1 for anywhere
 
     char*    addr1_ = nullptr;
     uint64_t real_size_ = 0;
@@ -0,0 +1,238 @@
+#include <cstring>
+#include <exception>
+#include <iostream>
+#include <sstream>
+
+#include "common/perf_counters.h"
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+namespace mm_utils {
+
+namespace {
+
+#ifdef __linux__
+uint64_t hw_cache_config(uint64_t cache, uint64_t op, uint64_t result) {
+    return cache | (op << 8) | (result << 16);
+}
+
+struct ReadValue {
+    uint64_t value;
+    uint64_t time_enabled;
+    uint64_t time_running;
+};
+
+bool read_counter(int fd, ReadValue& value) {
+    return read(fd, &value, sizeof(value)) == sizeof(value);
+}
+#endif
+
+const double* find_count(const CounterValues& counts, const std::string& name) {
+    for (auto& value : counts) {
+        if (value.first == name) {
+            return &value.second;
+        }
+    }
+    return nullptr;
+}
+
+}
+
+CounterValues derive_counter_metrics(
+    const CounterValues& counts,
+    uint64_t ops,
+    const std::string& op_name,
+    uint64_t bytes
+) {
+    CounterValues metrics;
+    const double* cycles = find_count(counts, "cycles");
+    const double* instructions = find_count(counts, "instructions");
+    const double* stalls = find_count(counts, "stalled_cycles_backend");
+    if (cycles && *cycles > 0) {
+        if (instructions) {
+            metrics.emplace_back("ipc", *instructions / *cycles);
+        }
+        if (stalls) {
+            metrics.emplace_back("backend_stall_ratio", *stalls / *cycles);
+        }
+    }
+    for (auto& value : counts) {
+        if (value.first == "instructions" || value.first == "stalled_cycles_backend") {
+            continue;
+        }
+        if (ops > 0) {
+            metrics.emplace_back(value.first + "_per_" + op_name, value.second / ops);
+        }
+        if (bytes > 0 && value.first != "cycles") {
+            metrics.emplace_back(value.first + "_per_kb", value.second * 1024 / bytes);
+        }
+    }
+    const double* llc_misses = find_count(counts, "llc_load_misses");
+    if (bytes > 0 && llc_misses && *llc_misses > 0) {
+        metrics.emplace_back("bytes_per_llc_miss", bytes / *llc_misses);
+    }
+    return metrics;
+}
+
+PerfCounters::~PerfCounters() {
+#ifdef __linux__
+    for (auto& counter : counters_) {
+        close(counter.fd);
+    }
+#endif
+}
+
+bool PerfCounters::open_event_(const std::string& name, uint32_t type, uint64_t config) {
+#ifdef __linux__
+    struct perf_event_attr attr;
+    memset(&attr, 0, sizeof(attr));
+    attr.size = sizeof(attr);
+    attr.type = type;
+    attr.config = config;
+    attr.disabled = 1;
+    // follow the worker threads created after opening
+    attr.inherit = 1;
+    attr.exclude_kernel = 1;
+    attr.exclude_hv = 1;
+    attr.read_format = PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING;
+    int fd = syscall(__NR_perf_event_open, &attr, 0, -1, -1, 0);
+    if (fd < 0) {
+        return false;
+    }
+    Counter counter;
+    counter.name = name;
+    counter.fd = fd;
+    counters_.push_back(counter);
+    return true;
+#else
+    return false;
+#endif
+}
+
+uint32_t PerfCounters::open(const std::string& extra_events) {
+#ifdef __linux__
+    open_event_("cycles", PERF_TYPE_HARDWARE, PERF_COUNT_HW_CPU_CYCLES);
+    open_event_("instructions", PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS);
+    open_event_("stalled_cycles_backend", PERF_TYPE_HARDWARE, PERF_COUNT_HW_STALLED_CYCLES_BACKEND);
+    open_event_("llc_loads", PERF_TYPE_HW_CACHE, hw_cache_config(
+        PERF_COUNT_HW_CACHE_LL, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_ACCESS));
+    open_event_("llc_load_misses", PERF_TYPE_HW_CACHE, hw_cache_config(
+        PERF_COUNT_HW_CACHE_LL, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_MISS));
+    open_event_("dtlb_load_misses", PERF_TYPE_HW_CACHE, hw_cache_config(
+        PERF_COUNT_HW_CACHE_DTLB, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_MISS));
+    std::stringstream ss(extra_events);
+    std::string item;
+    while (std::getline(ss, item, ',')) {
+        size_t pos = item.find('=');
+        if (pos == std::string::npos) {
+            std::cerr << "perf event must be name=0xconfig: " << item << std::endl;
+            continue;
+        }
+        std::string name = item.substr(0, pos);
+        uint64_t config = 0;
+        try {
+            config = std::stoull(item.substr(pos + 1), nullptr, 0);
+        } catch (const std::exception&) {
+            std::cerr << "invalid perf event config: " << item << std::endl;
+            continue;
+        }
+        if (!open_event_(name, PERF_TYPE_RAW, config)) {
+            std::cerr << "perf event not supported: " << item << std::endl;
+        }
+    }
+#endif
+    if (counters_.empty()) {
+        std::cerr << "no perf counters available; check perf_event_paranoid" << std::endl;
+    }
+    return counters_.size();
+}
+
+void PerfCounters::start() {
+#ifdef __linux__
+    if (running_) {
+        return;
+    }
+    for (auto& counter : counters_) {
+        ReadValue value = {0, 0, 0};
+        read_counter(counter.fd, value);
+        counter.value_begin = value.value;
+        counter.enabled_begin = value.time_enabled;
+        counter.running_begin = value.time_running;
+        ioctl(counter.fd, PERF_EVENT_IOC_ENABLE, 0);
+    }
+    running_ = !counters_.empty();
+#endif
+}
+
+void PerfCounters::stop() {
+#ifdef __linux__
+    if (!running_) {
+        return;
+    }
+    for (auto& counter : counters_) {
+        ioctl(counter.fd, PERF_EVENT_IOC_DISABLE, 0);
+    }
+    for (auto& counter : counters_) {
+        ReadValue value;
+        if (!read_counter(counter.fd, value)) {
+            continue;
+        }
+        uint64_t enabled = value.time_enabled - counter.enabled_begin;
+        uint64_t running = value.time_running - counter.running_begin;
+        if (running > 0) {
+            counter.count += static_cast<double>(value.value - counter.value_begin) * enabled / running;
+            counter.counted = true;
+        }
+    }
+    running_ = false;
+#endif
+}
+
+void PerfCounters::clear() {
+    for (auto& counter : counters_) {
+        counter.count = 0;
+        counter.counted = false;
+    }
+}
+
+double PerfCounters::get(const std::string& name) const {
+    for (auto& counter : counters_) {
+        if (counter.name == name) {
+            return counter.count;
+        }
+    }
+    return 0;
+}
+
+CounterValues PerfCounters::counts() const {
+    CounterValues values;
+    for (auto& counter : counters_) {
+        if (counter.counted) {
+            values.emplace_back(counter.name, counter.count);
+        }
+    }
+    return values;
+}
+
+JsonRecord PerfCounters::to_json() const {
+    JsonRecord record;
+    for (auto& value : counts()) {
+        record.add(value.first, static_cast<uint64_t>(value.second));
+    }
+    return record;
+}
+
+JsonRecord PerfCounters::derived_json(uint64_t ops, const std::string& op_name, uint64_t bytes) const {
+    JsonRecord record;
+    for (auto& value : derive_counter_metrics(counts(), ops, op_name, bytes)) {
+        record.add(value.first, value.second);
+    }
+    return record;
+}
+
+}
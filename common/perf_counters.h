@@ -0,0 +1,80 @@
+#ifndef __COMMON_PERF_COUNTERS_H__
+#define __COMMON_PERF_COUNTERS_H__
+
+#include <cstdint>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "common/json_record.h"
+
+namespace mm_utils {
+
+typedef std::vector<std::pair<std::string, double>> CounterValues;
+
+// ratios of accumulated event counts: ipc and backend_stall_ratio of cycles,
+// <event>_per_<op_name> over ops, <event>_per_kb and bytes_per_llc_miss over
+// bytes; ops or bytes of 0, or events missing from counts, leave out the
+// matching ratios
+CounterValues derive_counter_metrics(
+    const CounterValues& counts,
+    uint64_t ops,
+    const std::string& op_name,
+    uint64_t bytes
+);
+
+// hardware counters of this process and every thread it creates afterwards
+// (perf_event_open with inherit), counted only between start() and stop();
+// counts of all windows since the last clear() are accumulated and scaled
+// for multiplexing
+class PerfCounters {
+  public:
+    PerfCounters() = default;
+    ~PerfCounters();
+
+    PerfCounters(const PerfCounters&) = delete;
+    PerfCounters& operator=(const PerfCounters&) = delete;
+
+    // open the default memory events (cycles, instructions, backend stalls,
+    // LLC loads/misses, dTLB load misses) plus comma-separated raw events,
+    // e.g. "dtlb_walks=0x0e08,offcore_rd=0x01b7"; events the CPU or kernel
+    // does not support are skipped; returns the number of opened events
+    uint32_t open(const std::string& extra_events = "");
+    bool is_open() const { return !counters_.empty(); }
+
+    void start();
+    void stop();
+    void clear();
+
+    // accumulated count of an event; 0 if not opened
+    double get(const std::string& name) const;
+    // accumulated counts of the events that were scheduled on the PMU at
+    // least once; events starved by multiplexing are left out, not 0
+    CounterValues counts() const;
+
+    // {event: count}
+    JsonRecord to_json() const;
+    // derive_counter_metrics() of counts(), e.g. llc_load_misses_per_chase,
+    // dtlb_load_misses_per_kb, bytes_per_llc_miss, ipc
+    JsonRecord derived_json(uint64_t ops, const std::string& op_name, uint64_t bytes) const;
+
+  private:
+    struct Counter {
+        std::string name;
+        int fd = -1;
+        uint64_t value_begin = 0;
+        uint64_t enabled_begin = 0;
+        uint64_t running_begin = 0;
+        double count = 0;
+        bool counted = false;
+    };
+
+    bool open_event_(const std::string& name, uint32_t type, uint64_t config);
+
+    std::vector<Counter> counters_;
+    bool running_ = false;
+};
+
+}
+
+#endif
@@ -0,0 +1,127 @@
+#include <algorithm>
+#include <cmath>
+
+#include "common/stats.h"
+
+namespace mm_utils {
+
+void RunningStats::add(double x) {
+    n_ += 1;
+    double delta = x - mean_;
+    mean_ += delta / n_;
+    m2_ += delta * (x - mean_);
+}
+
+double RunningStats::stddev() const {
+    return (n_ > 1) ? std::sqrt(m2_ / (n_ - 1)) : 0;
+}
+
+double RunningStats::ci_half_width() const {
+    if (n_ < 2) {
+        return NAN;
+    }
+    return t_critical_95(n_ - 1) * stddev() / std::sqrt(static_cast<double>(n_));
+}
+
+bool RunningStats::converged(double rel_width, uint64_t min_n) const {
+    if (n_ < min_n || n_ < 2) {
+        return false;
+    }
+    return ci_half_width() <= rel_width * std::fabs(mean_);
+}
+
+JsonRecord RunningStats::to_json() const {
+    double half_width = ci_half_width();
+    JsonRecord record;
+    record.add("n", n_)
+        .add("mean", mean_)
+        .add("stddev", stddev())
+        .add("ci_low", mean_ - half_width)
+        .add("ci_high", mean_ + half_width);
+    return record;
+}
+
+void LatencyHistogram::merge(const LatencyHistogram& other) {
+    for (uint32_t i = 0; i < NUM_BUCKETS; ++i) {
+        counts_[i] += other.counts_[i];
+    }
+    n_ += other.n_;
+    max_ps_ = std::max(max_ps_, other.max_ps_);
+}
+
+void LatencyHistogram::clear() {
+    std::fill(counts_.begin(), counts_.end(), 0);
+    n_ = 0;
+    max_ps_ = 0;
+}
+
+double LatencyHistogram::percentile(double q) const {
+    if (n_ == 0) {
+        return NAN;
+    }
+    uint64_t rank = static_cast<uint64_t>(std::ceil(q * n_));
+    rank = std::max<uint64_t>(rank, 1);
+    uint64_t seen = 0;
+    for (uint32_t i = 0; i < NUM_BUCKETS; ++i) {
+        seen += counts_[i];
+        if (seen < rank) {
+            continue;
+        }
+        // middle of the bucket, but never beyond the largest sample
+        uint64_t low = i;
+        uint64_t width = 1;
+        if (i >= NUM_SUB) {
+            uint32_t shift = i / NUM_SUB - 1;
+            low = static_cast<uint64_t>(NUM_SUB + i % NUM_SUB) << shift;
+            width = static_cast<uint64_t>(1) << shift;
+        }
+        return std::min(low + width / 2, max_ps_) / 1e3;
+    }
+    return max();
+}
+
+JsonRecord LatencyHistogram::to_json() const {
+    JsonRecord record;
+    record.add("samples", n_)
+        .add("p50", percentile(0.5))
+        .add("p90", percentile(0.9))
+        .add("p99", percentile(0.99))
+        .add("p999", percentile(0.999))
+        .add("max", max());
+    return record;
+}
+
+double t_critical_95(uint64_t dof) {
+    static const double table[] = {
+        12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+    };
+    if (dof == 0) {
+        return NAN;
+    } else if (dof <= 30) {
+        return table[dof - 1];
+    } else if (dof <= 40) {
+        return 2.021;
+    } else if (dof <= 60) {
+        return 2.000;
+    } else if (dof <= 120) {
+        return 1.980;
+    }
+    return 1.960;
+}
+
+double jain_fairness(const std::vector<double>& values) {
+    double sum = 0;
+    double sum_sq = 0;
+    for (double x : values) {
+        sum += x;
+        sum_sq += x * x;
+    }
+    if (values.empty() || sum_sq == 0) {
+        return NAN;
+    }
+    return sum * sum / (values.size() * sum_sq);
+}
+
+}
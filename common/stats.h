@@ -0,0 +1,89 @@
+#ifndef __COMMON_STATS_H__
+#define __COMMON_STATS_H__
+
+#include <cstdint>
+#include <vector>
+
+#include "common/json_record.h"
+
+namespace mm_utils {
+
+// streaming mean/variance (Welford) of repeated trials of one data point
+class RunningStats {
+  public:
+    RunningStats() = default;
+    ~RunningStats() = default;
+
+    void add(double x);
+
+    uint64_t count() const { return n_; }
+    double mean() const { return mean_; }
+    double stddev() const;
+    // half width of the 95% confidence interval of the mean (Student's t)
+    double ci_half_width() const;
+    // true once there are min_n trials and the CI half width is within
+    // rel_width of the mean, e.g. 0.01 for +/-1%
+    bool converged(double rel_width, uint64_t min_n = 3) const;
+
+    // {"n", "mean", "stddev", "ci_low", "ci_high"}
+    JsonRecord to_json() const;
+
+  private:
+    uint64_t n_ = 0;
+    double mean_ = 0;
+    double m2_ = 0;
+};
+
+// log-linear histogram of latencies (HDR style): values in ps, every power
+// of two split into 32 equal buckets, i.e. within ~3% of the true value;
+// add() is a few instructions, so workers can record on the measurement path
+class LatencyHistogram {
+  public:
+    LatencyHistogram() : counts_(NUM_BUCKETS, 0) { }
+    ~LatencyHistogram() = default;
+
+    void add(double ns) {
+        uint64_t ps = (ns > 0) ? static_cast<uint64_t>(ns * 1e3) : 0;
+        counts_[bucket_(ps)] += 1;
+        n_ += 1;
+        max_ps_ = (ps > max_ps_) ? ps : max_ps_;
+    }
+    void merge(const LatencyHistogram& other);
+    void clear();
+
+    uint64_t count() const { return n_; }
+    double max() const { return max_ps_ / 1e3; }
+    // value (ns) below which a fraction q of the samples fall, e.g. 0.99
+    double percentile(double q) const;
+
+    // {"samples", "p50", "p90", "p99", "p999", "max"}
+    JsonRecord to_json() const;
+
+  private:
+    static constexpr uint32_t SUB_BITS = 5;
+    static constexpr uint32_t NUM_SUB = 1 << SUB_BITS;
+    static constexpr uint32_t NUM_BUCKETS = (64 - SUB_BITS + 1) * NUM_SUB;
+
+    static uint32_t bucket_(uint64_t ps) {
+        if (ps < NUM_SUB) {
+            return static_cast<uint32_t>(ps);
+        }
+        uint32_t shift = 63 - __builtin_clzll(ps) - SUB_BITS;
+        return (shift + 1) * NUM_SUB + static_cast<uint32_t>((ps >> shift) - NUM_SUB);
+    }
+
+    std::vector<uint64_t> counts_;
+    uint64_t n_ = 0;
+    uint64_t max_ps_ = 0;
+};
+
+// two-sided 95% critical value of Student's t distribution
+double t_critical_95(uint64_t dof);
+
+// Jain's fairness index (sum x)^2 / (n sum x^2): 1 when all values are equal,
+// 1/n when one takes everything
+double jain_fairness(const std::vector<double>& values);
+
+}
+
+#endif
@@ -1,9 +1,11 @@
+#include <algorithm>
 #include <iomanip>
 #include <iostream>
 #include <mutex>
 #include <sstream>
 #include <unordered_map>
 
+#include "common/json_record.h"
 #include "common/timing.h"
 
 namespace mm_utils {
@@ -36,13 +38,19 @@ void start_timer(const std::string& timer_key) {
 }
 
 void end_timer(const std::string& timer_key, std::ostream& os) {
+    end_timer(timer_key, os, false);
+}
+
+void end_timer(const std::string& timer_key, std::ostream& os, bool as_json) {
     std::string elapsed_time_str;
+    int64_t elapsed_time_ns = 0;
     {
         try {
             std::lock_guard<std::mutex> lock(g_timer_map_mu);
             const Timer::Handle& timer = g_timer_map.at(timer_key);
             timer->endTimer();
             elapsed_time_str = timer->getElapsedTimeStr();
+            elapsed_time_ns = timer->getElapsedTimeNs();
             // remove it
             g_timer_map.erase(timer_key);
         } catch (const std::out_of_range& oor) {
@@ -52,9 +60,31 @@ void end_timer(const std::string& timer_key, std::ostream& os) {
             std::cerr << "Timer error ..." << std::endl;
         }
     }
+    if (as_json) {
+        JsonRecord record;
+        record.add("type", "timer")
+            .add("name", timer_key)
+            .add("elapsed_ns", elapsed_time_ns)
+            .add("timestamp_ns", get_timestamp_ns());
+        record.emit(os);
+        return;
+    }
     std::string out_str = "timer <" + timer_key + "> elapsed: " +
         elapsed_time_str + "\n";
     os << out_str;
 }
 
+int64_t get_clock_overhead_ns() {
+    static const int64_t overhead_ns = []() {
+        int64_t min_ns = INT64_MAX;
+        for (int i = 0; i < 1000; ++i) {
+            auto begin = std::chrono::steady_clock::now();
+            auto end = std::chrono::steady_clock::now();
+            min_ns = std::min<int64_t>(min_ns, std::chrono::nanoseconds(end - begin).count());
+        }
+        return min_ns;
+    }();
+    return overhead_ns;
+}
+
 }
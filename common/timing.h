@@ -48,6 +48,12 @@ class Timer {
 
 void start_timer(const std::string& timer_key);
 void end_timer(const std::string& timer_key, std::ostream& os);
+// as_json - emit a {"type": "timer"} JSON line instead of human text
+void end_timer(const std::string& timer_key, std::ostream& os, bool as_json);
+
+// cost of reading the steady clock twice back to back (the smallest of many
+// tries), to subtract from short timed sections; measured once per process
+int64_t get_clock_overhead_ns();
 
 }
 
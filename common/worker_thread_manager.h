@@ -9,6 +9,8 @@
 #include <vector>
 #include <pthread.h>
 
+#include "common/perf_counters.h"
+
 namespace mm_utils {
 
 class BaseThreadPacket {
@@ -51,6 +53,10 @@ class WorkerThreadManager {
     template <class UnaryPredicate>
     void setRoutine(void *(*start_routine)(void *), UnaryPredicate pred);
     void setRoutine(void *(*start_routine)(void *));
+    void clearRoutines() { setRoutine(nullptr); }
+
+    // count hardware events from create() to join(); nullptr to stop counting
+    void setPerfCounters(PerfCounters* perf_counters) { perf_counters_ = perf_counters; }
 
     void create();
     void join();
@@ -73,6 +79,7 @@ class WorkerThreadManager {
     std::vector<pthread_attr_t> attrs_;
     std::vector<void *(*)(void *)> start_routines_;
     std::vector<Packet> packets_;
+    PerfCounters* perf_counters_ = nullptr;
 };
 
 
@@ -161,6 +168,9 @@ void WorkerThreadManager<Packet>::setRoutine(void *(*start_routine)(void *)) {
 
 template <class Packet>
 void WorkerThreadManager<Packet>::create() {
+    if (perf_counters_) {
+        perf_counters_->start();
+    }
     for (uint32_t i = 0; i < num_threads_; ++i) {
         if (start_routines_[i]) {
             pthread_create(
@@ -175,7 +185,12 @@ void WorkerThreadManager<Packet>::create() {
 template <class Packet>
 void WorkerThreadManager<Packet>::join() {
     for (uint32_t i = 0; i < num_threads_; ++i) {
-        pthread_join(workers_[i], nullptr);
+        if (start_routines_[i]) {
+            pthread_join(workers_[i], nullptr);
+        }
+    }
+    if (perf_counters_) {
+        perf_counters_->stop();
     }
 }
 
@@ -39,6 +39,15 @@ int main(int argc, char** argv) {
         total_exec_time += worker_manager.getPacket(i).exec_time;
     }
     double taken_br_tp = total_branches / total_exec_time / 1e9;
+    if (config.is_jsonl()) {
+        mm_utils::JsonRecord record = config.make_data_record("branch_throughput");
+        record.add("value", taken_br_tp)
+            .add("unit", "B/s")
+            .add("branches", total_branches)
+            .add("exec_time_s", total_exec_time);
+        record.emit(std::cout);
+        return 0;
+    }
     std::cout << "Branch throughput: " << std::setprecision(4) << taken_br_tp;
     std::cout << " B/s | " << total_branches << " / ";
     std::cout << std::setprecision(4) << total_exec_time;
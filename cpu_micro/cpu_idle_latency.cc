@@ -3,79 +3,178 @@
 #include <iomanip>
 #include <iostream>
 #include <string>
+#include <utility>
 #include <vector>
 
 #include "common/mem_region.h"
+#include "common/perf_counters.h"
+#include "common/stats.h"
 #include "common/timing.h"
 #include "common/worker_thread_manager.h"
 #include "cpu_micro/lib_configuration.h"
 #include "cpu_micro/kernels_latency.h"
 #include "cpu_micro/worker_latency.h"
 
+// counts every create/join of the worker managers once opened with --perf_counters
+static mm_utils::PerfCounters perf_counters;
+// regions reused by the points of a --plan
+static mm_worker::MemRegionCache region_cache;
+// with --histogram in text mode, the distribution of each measured cell,
+// printed after the table
+static std::vector<std::pair<std::string, mm_utils::LatencyHistogram>> cell_distributions;
+
 void setup_memory_regions_idle_latency(
     mm_worker::MemLatBwManager& worker_manager,
     const mm_utils::Configuration& config,
+    const std::string& cpu_scope,
     int node = -1
 ) {
     mm_worker::prepare_mem_lat_bw_thread_packet(worker_manager, config, node);
-    worker_manager.setRoutineAndRun(mm_worker::mem_region_alloc_lat);
+    region_cache.setup(
+        worker_manager, mm_worker::mem_region_alloc_lat, mm_worker::get_lat_region_layout, cpu_scope);
+}
+
+// one timed pass of all workers, whose samples go into hist; returns the
+// latency in ns
+double run_latency_trial(
+    mm_worker::MemLatBwManager& worker_manager,
+    uint32_t duration_ms,
+    uint64_t& total_chases,
+    double& total_exec_time,
+    mm_utils::LatencyHistogram& hist
+) {
+    for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
+        worker_manager.getPacket(i).target_duration_ms = duration_ms;
+    }
+    worker_manager.create();
+    worker_manager.join();
+    uint64_t trial_chases = 0;
+    double trial_exec_time = 0;
+    for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
+        trial_chases += worker_manager.getPacket(i).finished_chases;
+        trial_exec_time += worker_manager.getPacket(i).exec_time;
+        hist.merge(worker_manager.getPacket(i).latency_hist);
+    }
+    total_chases += trial_chases;
+    total_exec_time += trial_exec_time;
+    return trial_exec_time * 1e9 / trial_chases;
 }
 
 uint32_t measure_idle_latency(
     mm_worker::MemLatBwManager& worker_manager,
     const mm_utils::Configuration& config,
-    uint32_t last_measured_lat_ps
+    uint32_t last_measured_lat_ps,
+    int cpu_node = -1,
+    int mem_node = -1
 ) {
     // init the packet passed into each worker
     for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
         worker_manager.getPacket(i).kernel_lat = mm_worker::kernel_lat;
         worker_manager.getPacket(i).ref_latency_ps = last_measured_lat_ps;
-        worker_manager.getPacket(i).target_duration =
-            (last_measured_lat_ps > 0) ? config.target_duration_s : 1;
+        worker_manager.getPacket(i).sample_chases = config.histogram ? config.sample_chases : 0;
     }
     // set routines
     worker_manager.setRoutine(mm_worker::lat_ptr);
-    // start
-    worker_manager.create();
-    // done
-    worker_manager.join();
     uint64_t total_chases = 0;
     double total_exec_time = 0;
-    for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
-        total_chases += worker_manager.getPacket(i).finished_chases;
-        total_exec_time += worker_manager.getPacket(i).exec_time;
+    mm_utils::LatencyHistogram hist;
+    if (last_measured_lat_ps == 0) {
+        // calibration run for the checkpoint interval
+        uint32_t duration_ms = std::min(config.get_trial_duration_ms(), (uint32_t)1000);
+        double latency = run_latency_trial(worker_manager, duration_ms, total_chases, total_exec_time, hist);
+        return static_cast<uint32_t>(latency * 1e3);
     }
-    double latency = total_exec_time * 1e9 / total_chases;
-    if (last_measured_lat_ps > 0) {
+    // with --rel_ci, repeat trials until the mean converges or time runs out
+    perf_counters.clear();
+    mm_utils::RunningStats stats;
+    mm_utils::Timer timer_total;
+    timer_total.startTimer();
+    do {
+        stats.add(run_latency_trial(
+            worker_manager, config.get_trial_duration_ms(), total_chases, total_exec_time, hist));
+        timer_total.endTimer();
+        timer_total.resumeTimer();
+    } while (config.is_adaptive() && !stats.converged(config.rel_ci) &&
+             timer_total.getElapsedTime() < config.get_max_duration_s());
+    double latency = stats.mean();
+    if (config.is_jsonl()) {
+        mm_utils::JsonRecord record = config.make_data_record("latency");
+        record.add("cpu_node", cpu_node)
+            .add("mem_node", mem_node)
+            .add("value", latency)
+            .add("unit", "ns")
+            .add("chases", total_chases)
+            .add("exec_time_s", total_exec_time)
+            .add("stats", stats.to_json());
+        if (config.histogram) {
+            record.add("distribution", hist.to_json());
+        }
+        if (perf_counters.is_open()) {
+            record.add("counters", perf_counters.to_json())
+                .add("derived", perf_counters.derived_json(total_chases, "chase", 0));
+        }
+        record.emit(std::cout);
+    } else {
         std::cout << std::setw(10) << std::setprecision(4) << latency << std::flush;
+        if (config.histogram) {
+            std::string cell = (cpu_node >= 0) ?
+                "Node-" + std::to_string(cpu_node) + " -> Node-" + std::to_string(mem_node) : "all";
+            cell_distributions.emplace_back(cell, hist);
+        }
     }
     return static_cast<uint32_t>(latency * 1e3);
 }
 
 void run(
     mm_worker::MemLatBwManager& worker_manager,
-    const mm_utils::Configuration& config
+    const mm_utils::Configuration& config,
+    int cpu_node = -1,
+    int mem_node = -1
 ) {
+    worker_manager.setPerfCounters(perf_counters.is_open() ? &perf_counters : nullptr);
     uint32_t last_lat_ps = 0;
     last_lat_ps = measure_idle_latency(worker_manager, config, last_lat_ps);
-    measure_idle_latency(worker_manager, config, last_lat_ps);
+    measure_idle_latency(worker_manager, config, last_lat_ps, cpu_node, mem_node);
+}
+
+void print_distributions() {
+    std::cout << std::left << std::setw(40) << "Latency Distribution (ns)";
+    for (auto& name : {"p50", "p90", "p99", "p99.9", "max"}) {
+        std::cout << std::setw(10) << name;
+    }
+    std::cout << std::endl;
+    for (auto& item : cell_distributions) {
+        const mm_utils::LatencyHistogram& hist = item.second;
+        std::cout << std::setw(40) << item.first << std::setprecision(4);
+        for (double q : {0.5, 0.9, 0.99, 0.999}) {
+            std::cout << std::setw(10) << hist.percentile(q);
+        }
+        std::cout << std::setw(10) << hist.max() << std::endl;
+    }
+    std::cout << std::endl;
+    cell_distributions.clear();
 }
 
 void setup_and_run(const mm_utils::Configuration& config) {
     std::shared_ptr<mm_worker::MemLatBwManager> worker_manager;
+    const bool text = !config.is_jsonl();
     if (config.latency_matrix) {
-        std::cout << std::left << std::setw(40)
-            << ("Idle Latency (ns) - " +
-                config.get_str_access_pattern_short(config.access_pattern));
-        for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
-            std::cout << std::setw(10) << "Node-" + std::to_string(j);
+        if (text) {
+            std::cout << std::left << std::setw(40)
+                << ("Idle Latency (ns) - " +
+                    config.get_str_access_pattern_short(config.access_pattern));
+            for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
+                std::cout << std::setw(10) << "Node-" + std::to_string(j);
+            }
         }
         for (uint32_t i = 0; i < config.numa_config.num_numa_nodes; ++i) {
             if (config.numa_config.node_to_cpus.at(i).size() == 0) {
                 continue;
             }
-            std::cout << std::endl << std::setw(40) << "Node-" + std::to_string(i);
-            std::cout << std::flush;
+            if (text) {
+                std::cout << std::endl << std::setw(40) << "Node-" + std::to_string(i);
+                std::cout << std::flush;
+            }
             for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
                 if (config.numa_config.node_to_mem.at(j) < ((int64_t)1 << 30)) {
                     continue;
@@ -88,11 +187,13 @@ void setup_and_run(const mm_utils::Configuration& config) {
                     true,   // always enable binding
                     config.verbose
                 );
-                setup_memory_regions_idle_latency(*worker_manager, config, j);
-                run(*worker_manager, config);
+                setup_memory_regions_idle_latency(*worker_manager, config, "node" + std::to_string(i), j);
+                run(*worker_manager, config, i, j);
             }
         }
-        std::cout << std::endl;
+        if (text) {
+            std::cout << std::endl;
+        }
     } else {
         // setup workers
         worker_manager = std::make_shared<mm_worker::MemLatBwManager>(
@@ -102,14 +203,29 @@ void setup_and_run(const mm_utils::Configuration& config) {
             config.verbose
         );
         // setup memory regions
-        setup_memory_regions_idle_latency(*worker_manager, config);
+        setup_memory_regions_idle_latency(*worker_manager, config, config.no_binding ? "any" : "all");
         // start the show
-        std::cout << "Idle Latency - "
-            << config.get_str_access_pattern_short(config.access_pattern) << " : ";
+        if (text) {
+            std::cout << "Idle Latency - "
+                << config.get_str_access_pattern_short(config.access_pattern) << " : ";
+        }
         run(*worker_manager, config);
-        std::cout << " ns" << std::endl;
+        if (text) {
+            std::cout << " ns" << std::endl;
+        }
+    }
+    if (text) {
+        std::cout << std::endl;
+        if (config.histogram) {
+            print_distributions();
+        }
     }
-    std::cout << std::endl;
+}
+
+int run_point(mm_utils::Configuration& config) {
+    config.dump();
+    setup_and_run(config);
+    return 0;
 }
 
 int main(int argc, char** argv) {
@@ -117,7 +233,9 @@ int main(int argc, char** argv) {
     if (config.parse_options(argc, argv)) {
         return 1;
     }
-    config.dump();
-    setup_and_run(config);
-    return 0;
+    if (config.perf_counters) {
+        perf_counters.open(config.perf_events);
+    }
+    region_cache.setBudget(config.get_plan_cache_bytes());
+    return config.run_plan(argc, argv, run_point);
 }
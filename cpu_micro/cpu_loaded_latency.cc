@@ -1,11 +1,18 @@
+#include <algorithm>
+#include <cmath>
 #include <cstdint>
 #include <cstdlib>
 #include <iomanip>
 #include <iostream>
+#include <iterator>
+#include <map>
 #include <string>
+#include <tuple>
 #include <vector>
 
 #include "common/mem_region.h"
+#include "common/perf_counters.h"
+#include "common/stats.h"
 #include "common/timing.h"
 #include "common/worker_thread_manager.h"
 #include "cpu_micro/lib_configuration.h"
@@ -14,32 +21,52 @@
 #include "cpu_micro/worker_bandwidth.h"
 #include "cpu_micro/worker_latency.h"
 
+// counts every create/join of the worker manager once opened with --perf_counters
+static mm_utils::PerfCounters perf_counters;
+// regions reused by the points of a --plan
+static mm_worker::MemRegionCache region_cache;
+
 void setup_memory_regions_loaded_latency(
     mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket>& worker_manager,
     const mm_utils::Configuration& config
 ) {
     mm_worker::prepare_mem_lat_bw_thread_packet(worker_manager, config);
-    worker_manager.setRoutine(
-        mm_worker::mem_region_alloc_lat,
+    const std::string cpu_scope = config.no_binding ? "any" : "all";
+    region_cache.setup(
+        worker_manager, mm_worker::mem_region_alloc_lat, mm_worker::get_lat_region_layout, cpu_scope,
         [](const uint32_t& idx) { return idx == 0; });
-    worker_manager.setRoutine(
-        mm_worker::mem_region_alloc_bw,
+    region_cache.setup(
+        worker_manager, mm_worker::mem_region_alloc_bw, mm_worker::get_bw_region_layout, cpu_scope,
         [](const uint32_t& idx) { return idx > 0; });
-    worker_manager.run();
 }
 
-std::tuple<uint32_t, uint32_t> measure_loaded_latency(
+struct LoadedLatencyPoint {
+    int32_t delay = 0;
+    double latency = 0;
+    double bandwidth_gbps = 0;
+    uint64_t chases = 0;
+    uint64_t bytes = 0;
+    double exec_time = 0;
+    // with --perf_counters, counts of all threads and ratios per KB moved
+    mm_utils::JsonRecord counters;
+    mm_utils::JsonRecord derived;
+    // with --histogram, the latency thread's distribution
+    mm_utils::LatencyHistogram latency_hist;
+};
+
+LoadedLatencyPoint measure_loaded_latency(
     mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket>& worker_manager,
     mm_worker::func_kernel_bw& kernel_bw,
     const mm_utils::Configuration& config,
     uint32_t last_measured_lat_ps,
     uint32_t last_measured_bw_gbps,
-    uint32_t delay
+    int32_t delay
 ) {
     // init the packet passed into each worker
     for (uint32_t i = 0; i < config.num_threads; ++i) {
         worker_manager.getPacket(i).kernel_lat = mm_worker::kernel_lat;
         worker_manager.getPacket(i).ref_latency_ps = last_measured_lat_ps;
+        worker_manager.getPacket(i).sample_chases = config.histogram ? config.sample_chases : 0;
         worker_manager.getPacket(i).kernel_bw = kernel_bw;
         worker_manager.getPacket(i).read_write_mix = config.read_write_mix;
         worker_manager.getPacket(i).ref_total_bw_gbps = last_measured_bw_gbps;
@@ -58,28 +85,133 @@ std::tuple<uint32_t, uint32_t> measure_loaded_latency(
     worker_manager.setRoutine(
         mm_worker::bw_sequential, [](const uint32_t& idx) { return idx > 0; });
     // start
+    perf_counters.clear();
     worker_manager.create();
     // done
     worker_manager.join();
-    uint64_t latency_chases = worker_manager.getPacket(0).finished_chases;
-    uint64_t total_bytes = latency_chases * config.stride_size_b;
+    LoadedLatencyPoint point;
+    point.delay = delay;
+    point.chases = worker_manager.getPacket(0).finished_chases;
+    point.bytes = point.chases * config.stride_size_b;
     double latency_exec_time = worker_manager.getPacket(0).exec_time;
-    double total_exec_time = latency_exec_time;
+    point.exec_time = latency_exec_time;
     for (uint32_t i = 1; i < config.num_threads; ++i) {
-        total_bytes += worker_manager.getPacket(i).finished_bytes;
-        total_exec_time += worker_manager.getPacket(i).exec_time;
+        point.bytes += worker_manager.getPacket(i).finished_bytes;
+        point.exec_time += worker_manager.getPacket(i).exec_time;
     }
-    double latency = latency_exec_time * 1e9 / latency_chases;
-    double mem_bw = total_bytes / total_exec_time * config.num_threads;
-    double mem_bw_gbps = mem_bw / 1024 / 1024 / 1024;
-    if (last_measured_lat_ps > 0 || last_measured_bw_gbps > 0) {
-        std::cout << std::setw(12) << delay;
-        std::cout << std::setw(12) << std::fixed << std::setprecision(1) << mem_bw_gbps;
-        std::cout << std::setw(12) << std::fixed << std::setprecision(1) << latency;
+    point.latency = latency_exec_time * 1e9 / point.chases;
+    point.latency_hist = worker_manager.getPacket(0).latency_hist;
+    double mem_bw = point.bytes / point.exec_time * config.num_threads;
+    point.bandwidth_gbps = mem_bw / 1024 / 1024 / 1024;
+    if (perf_counters.is_open()) {
+        point.counters = perf_counters.to_json();
+        point.derived = perf_counters.derived_json(0, "", point.bytes);
+    }
+    return point;
+}
+
+void report_loaded_latency(const mm_utils::Configuration& config, const LoadedLatencyPoint& point) {
+    if (config.is_jsonl()) {
+        mm_utils::JsonRecord record = config.make_data_record("loaded_latency");
+        record.add("delay", point.delay)
+            .add("latency", point.latency)
+            .add("latency_unit", "ns")
+            .add("bandwidth", point.bandwidth_gbps)
+            .add("bandwidth_unit", "GB/s")
+            .add("chases", point.chases)
+            .add("bytes", point.bytes)
+            .add("exec_time_s", point.exec_time);
+        if (config.histogram) {
+            record.add("distribution", point.latency_hist.to_json());
+        }
+        if (perf_counters.is_open()) {
+            record.add("counters", point.counters)
+                .add("derived", point.derived);
+        }
+        record.emit(std::cout);
+    } else {
+        std::cout << std::setw(12) << point.delay;
+        std::cout << std::setw(12) << std::fixed << std::setprecision(1) << point.bandwidth_gbps;
+        std::cout << std::setw(12) << std::fixed << std::setprecision(1) << point.latency;
+        if (config.histogram) {
+            for (double q : {0.5, 0.9, 0.99, 0.999}) {
+                std::cout << std::setw(12) << point.latency_hist.percentile(q);
+            }
+            std::cout << std::setw(12) << point.latency_hist.max();
+        }
         std::cout << std::endl;
     }
-    return std::make_tuple(
-        static_cast<uint32_t>(latency * 1e3), static_cast<uint32_t>(mem_bw_gbps));
+}
+
+// relative change of the curve between two measured points
+double get_curve_change(const LoadedLatencyPoint& a, const LoadedLatencyPoint& b) {
+    double lat_change = std::fabs(a.latency - b.latency) / std::min(a.latency, b.latency);
+    double bw_change = std::fabs(a.bandwidth_gbps - b.bandwidth_gbps) /
+        std::max(std::max(a.bandwidth_gbps, b.bandwidth_gbps), 1e-9);
+    return lat_change + bw_change;
+}
+
+/*
+ * Measure a coarse set of delays, then keep bisecting the interval between
+ * neighbouring measured delays where the curve changes most, i.e. around the
+ * saturation knee, until the budget is spent or every interval is flat.
+ * Returns the measured points sorted by delay.
+ */
+std::vector<LoadedLatencyPoint> run_adaptive_delays(
+    mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket>& worker_manager,
+    mm_worker::delay_kernel_list& delays_and_kernels,
+    const mm_utils::Configuration& config,
+    uint32_t& last_lat_ps,
+    uint32_t& last_bw_gbps
+) {
+    // intervals changing less than this are not refined further
+    const double flat_tolerance = 0.02;
+    std::vector<std::tuple<int32_t, mm_worker::func_kernel_bw>> candidates(
+        delays_and_kernels.begin(), delays_and_kernels.end());
+    std::map<size_t, LoadedLatencyPoint> measured;
+    auto measure = [&](size_t idx) {
+        LoadedLatencyPoint point = measure_loaded_latency(
+            worker_manager, std::get<1>(candidates[idx]), config,
+            last_lat_ps, last_bw_gbps, std::get<0>(candidates[idx]));
+        last_lat_ps = static_cast<uint32_t>(point.latency * 1e3);
+        last_bw_gbps = static_cast<uint32_t>(point.bandwidth_gbps);
+        measured[idx] = point;
+    };
+    const size_t budget = std::min<size_t>(config.delay_budget, candidates.size());
+    // coarse pass: both ends and the quartiles
+    const size_t num_coarse = std::min<size_t>(5, budget);
+    for (size_t i = 0; i < num_coarse; ++i) {
+        size_t idx = (num_coarse > 1) ? i * (candidates.size() - 1) / (num_coarse - 1) : 0;
+        if (measured.count(idx) == 0) {
+            measure(idx);
+        }
+    }
+    // refine
+    while (measured.size() < budget) {
+        size_t best_lo = 0;
+        size_t best_hi = 0;
+        double best_change = flat_tolerance;
+        for (auto it = measured.begin(), next = std::next(it); next != measured.end(); ++it, ++next) {
+            if (next->first - it->first < 2) {
+                continue;
+            }
+            double change = get_curve_change(it->second, next->second);
+            if (change > best_change) {
+                best_change = change;
+                best_lo = it->first;
+                best_hi = next->first;
+            }
+        }
+        if (best_hi == 0) {
+            break;
+        }
+        measure((best_lo + best_hi) / 2);
+    }
+    std::vector<LoadedLatencyPoint> points;
+    for (auto& item : measured) {
+        points.push_back(item.second);
+    }
+    return points;
 }
 
 
@@ -88,7 +220,8 @@ void build_delays_and_kernels(
     const mm_utils::Configuration& config
 ) {
     mm_worker::delay_kernel_list delays_and_kernels_raw;
-    mm_worker::get_kernels_with_delays(delays_and_kernels_raw, config.read_write_mix);
+    mm_worker::get_kernels_with_delays(
+        delays_and_kernels_raw, config.read_write_mix, config.adaptive_delays);
     if (config.load_gen_delay > 0) {
         int32_t gap = config.load_gen_delay;
         for (auto& item : delays_and_kernels_raw) {
@@ -102,15 +235,10 @@ void build_delays_and_kernels(
     } else {
         delays_and_kernels = delays_and_kernels_raw;
     }
-    delays_and_kernels.push_front(delays_and_kernels.front());
 }
 
 
-int main(int argc, char** argv) {
-    mm_utils::Configuration config(mm_utils::Testing_Type::LATENCY_BANDWIDTH);
-    if (config.parse_options(argc, argv)) {
-        return 1;
-    }
+int run_point(mm_utils::Configuration& config) {
     config.dump();
     // setup workers
     mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket> worker_manager(
@@ -119,26 +247,63 @@ int main(int argc, char** argv) {
         !config.no_binding,
         config.verbose
     );
+    if (perf_counters.is_open()) {
+        worker_manager.setPerfCounters(&perf_counters);
+    }
     // get kernels
     mm_worker::delay_kernel_list delays_and_kernels;
     build_delays_and_kernels(delays_and_kernels, config);
     // setup memory regions
     mm_utils::start_timer("setup");
     setup_memory_regions_loaded_latency(worker_manager, config);
-    mm_utils::end_timer("setup", std::cout);
+    mm_utils::end_timer("setup", std::cout, config.is_jsonl());
     // start the show
-    std::cout << std::setw(12) << "delay";
-    std::cout << std::setw(12) << "bandwidth";
-    std::cout << std::setw(12) << "latency" << " - ";
-    std::cout << config.get_str_access_pattern_short(config.access_pattern) << std::endl;
-    uint32_t last_lat_ps = 0;
-    uint32_t last_bw_gbps = 0;
-    for (auto& item : delays_and_kernels) {
-        uint32_t delay = std::get<0>(item);
-        mm_worker::func_kernel_bw& kernel = std::get<1>(item);
-        std::tie(last_lat_ps, last_bw_gbps) = measure_loaded_latency(
-            worker_manager, kernel, config, last_lat_ps, last_bw_gbps, delay);
+    if (!config.is_jsonl()) {
+        std::cout << std::setw(12) << "delay";
+        std::cout << std::setw(12) << "bandwidth";
+        std::cout << std::setw(12) << "latency";
+        if (config.histogram) {
+            for (auto& name : {"p50", "p90", "p99", "p99.9", "max"}) {
+                std::cout << std::setw(12) << name;
+            }
+        }
+        std::cout << " - ";
+        std::cout << config.get_str_access_pattern_short(config.access_pattern) << std::endl;
+    }
+    // calibration run for the checkpoint intervals
+    LoadedLatencyPoint point = measure_loaded_latency(
+        worker_manager, std::get<1>(delays_and_kernels.front()), config, 0, 0,
+        std::get<0>(delays_and_kernels.front()));
+    uint32_t last_lat_ps = static_cast<uint32_t>(point.latency * 1e3);
+    uint32_t last_bw_gbps = static_cast<uint32_t>(point.bandwidth_gbps);
+    if (config.adaptive_delays && config.load_gen_delay == 0) {
+        for (auto& point : run_adaptive_delays(
+                worker_manager, delays_and_kernels, config, last_lat_ps, last_bw_gbps)) {
+            report_loaded_latency(config, point);
+        }
+    } else {
+        for (auto& item : delays_and_kernels) {
+            point = measure_loaded_latency(
+                worker_manager, std::get<1>(item), config, last_lat_ps, last_bw_gbps, std::get<0>(item));
+            last_lat_ps = static_cast<uint32_t>(point.latency * 1e3);
+            last_bw_gbps = static_cast<uint32_t>(point.bandwidth_gbps);
+            report_loaded_latency(config, point);
+        }
+    }
+    if (!config.is_jsonl()) {
+        std::cout << std::endl;
     }
-    std::cout << std::endl;
     return 0;
 }
+
+int main(int argc, char** argv) {
+    mm_utils::Configuration config(mm_utils::Testing_Type::LATENCY_BANDWIDTH);
+    if (config.parse_options(argc, argv)) {
+        return 1;
+    }
+    if (config.perf_counters) {
+        perf_counters.open(config.perf_events);
+    }
+    region_cache.setBudget(config.get_plan_cache_bytes());
+    return config.run_plan(argc, argv, run_point);
+}
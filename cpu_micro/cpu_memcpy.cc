@@ -1,31 +1,45 @@
+#include <algorithm>
 #include <cstdint>
 #include <iomanip>
 #include <iostream>
+#include <string>
 #include <vector>
 
 #include "common/mem_region.h"
+#include "common/perf_counters.h"
 #include "common/timing.h"
 #include "common/worker_thread_manager.h"
 #include "cpu_micro/lib_configuration.h"
 #include "cpu_micro/kernels_memcpy.h"
 #include "cpu_micro/worker_memcpy.h"
 
+// counts every create/join of the worker managers once opened with --perf_counters
+static mm_utils::PerfCounters perf_counters;
+// regions reused by the points of a --plan
+static mm_worker::MemRegionCache region_cache;
+
 void setup_memory_regions_memcpy(
-    mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket>& worker_manager,
-    const mm_utils::Configuration& config
+    mm_worker::MemLatBwManager& worker_manager,
+    const mm_utils::Configuration& config,
+    const std::string& cpu_scope,
+    int node = -1
 ) {
-    mm_worker::prepare_mem_lat_bw_thread_packet(worker_manager, config);
-    worker_manager.setRoutineAndRun(mm_worker::mem_region_alloc_memcpy);
+    mm_worker::prepare_mem_lat_bw_thread_packet(worker_manager, config, node);
+    region_cache.setup(
+        worker_manager, mm_worker::mem_region_alloc_memcpy, mm_worker::get_memcpy_region_layout, cpu_scope);
 }
 
 uint64_t measure_mempcy_bandwidth(
-    mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket>& worker_manager,
+    mm_worker::MemLatBwManager& worker_manager,
     const mm_worker::func_kernel_memcpy& kernel,
     const mm_utils::Configuration& config,
-    uint64_t last_measured_exec_time_ns
+    uint64_t last_measured_exec_time_ns,
+    int cpu_node = -1,
+    int mem_node = -1
 ) {
+    const uint32_t num_threads = worker_manager.getNumThreads();
     // init the packet passed into each worker
-    for (uint32_t i = 0; i < config.num_threads; ++i) {
+    for (uint32_t i = 0; i < num_threads; ++i) {
         worker_manager.getPacket(i).kernel_memcpy = kernel;
         worker_manager.getPacket(i).fragment_size = config.fragment_size_b;
         worker_manager.getPacket(i).ref_one_exec_time_ns = last_measured_exec_time_ns;
@@ -34,58 +48,146 @@ uint64_t measure_mempcy_bandwidth(
     }
     // set routines
     worker_manager.setRoutine(mm_worker::copy_fragment);
+    if (last_measured_exec_time_ns > 0) {
+        perf_counters.clear();
+    }
     // start
     worker_manager.create();
     // done
     worker_manager.join();
     uint64_t total_bytes = 0;
     double total_exec_time = 0;
-    for (uint32_t i = 0; i < config.num_threads; ++i) {
+    for (uint32_t i = 0; i < num_threads; ++i) {
         total_bytes += worker_manager.getPacket(i).finished_bytes;
         total_exec_time += worker_manager.getPacket(i).exec_time;
     }
-    double copy_bw = total_bytes / total_exec_time * config.num_threads;
+    double copy_bw = total_bytes / total_exec_time * num_threads;
     double copy_bw_mbps = copy_bw / 1024 / 1024;
     double copy_bw_gbps = copy_bw_mbps / 1024;
-    if (last_measured_exec_time_ns > 0) {
+    if (last_measured_exec_time_ns > 0 && config.is_jsonl()) {
+        mm_utils::JsonRecord record = config.make_data_record("memcpy_bandwidth");
+        record.add("cpu_node", cpu_node)
+            .add("mem_node", mem_node)
+            .add("engine", config.memcpy_engine)
+            .add("fragment_size_b", config.fragment_size_b)
+            .add("value", copy_bw_gbps)
+            .add("unit", "GB/s")
+            .add("threads", num_threads)
+            .add("bytes", total_bytes)
+            .add("exec_time_s", total_exec_time);
+        if (perf_counters.is_open()) {
+            uint64_t num_copies = total_bytes / config.fragment_size_b;
+            record.add("counters", perf_counters.to_json())
+                .add("derived", perf_counters.derived_json(num_copies, "copy", total_bytes));
+        }
+        record.emit(std::cout);
+    } else if (last_measured_exec_time_ns > 0 && config.memcpy_matrix) {
+        std::cout << std::setw(10) << std::setprecision(4) << copy_bw_gbps;
+        std::cout << std::flush;
+    } else if (last_measured_exec_time_ns > 0) {
         std::cout << "Memcpy Bandwidth: ";
         std::cout << std::setprecision(7) << std::setw(10) << copy_bw_mbps << " MB/s | ";
         std::cout << std::setprecision(4) << std::setw(7) << copy_bw_gbps << " GB/s";
         std::cout << std::endl;
     }
-    return static_cast<uint64_t>(
-        config.fragment_size_b * config.num_threads / copy_bw_gbps);
+    return std::max<uint64_t>(
+        static_cast<uint64_t>(config.fragment_size_b * num_threads / copy_bw_gbps), 1);
 }
 
+void run(
+    mm_worker::MemLatBwManager& worker_manager,
+    const mm_worker::func_kernel_memcpy& kernel,
+    const mm_utils::Configuration& config,
+    int cpu_node = -1,
+    int mem_node = -1
+) {
+    worker_manager.setPerfCounters(perf_counters.is_open() ? &perf_counters : nullptr);
+    // calibration run for the checkpoint interval
+    uint64_t last_exec_time_ns = measure_mempcy_bandwidth(worker_manager, kernel, config, 0, cpu_node, mem_node);
+    measure_mempcy_bandwidth(worker_manager, kernel, config, last_exec_time_ns, cpu_node, mem_node);
+}
 
-int main(int argc, char** argv) {
-    mm_utils::Configuration config(mm_utils::Testing_Type::MEMCPY);
-    if (config.parse_options(argc, argv)) {
-        return 1;
+void setup_and_run(const mm_utils::Configuration& config, const mm_worker::func_kernel_memcpy& kernel) {
+    std::shared_ptr<mm_worker::MemLatBwManager> worker_manager;
+    const bool text = !config.is_jsonl();
+    if (config.memcpy_matrix) {
+        if (text) {
+            std::string header = "Memcpy Bandwidth (GB/s) - " + config.memcpy_engine;
+            std::cout << std::left << std::setw(35) << header;
+            for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
+                std::cout << std::setw(10) << "Node-" + std::to_string(j);
+            }
+        }
+        for (uint32_t i = 0; i < config.numa_config.num_numa_nodes; ++i) {
+            if (config.numa_config.node_to_cpus.at(i).size() == 0) {
+                continue;
+            }
+            if (text) {
+                std::cout << std::endl << std::setw(35) << "Node-" + std::to_string(i);
+                std::cout << std::flush;
+            }
+            for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
+                if (config.numa_config.node_to_mem.at(j) < ((int64_t)2 << 30)) {
+                    continue;
+                }
+                worker_manager.reset();
+                uint32_t node_cpu_count = config.numa_config.node_to_cpus.at(i).size();
+                worker_manager = std::make_shared<mm_worker::MemLatBwManager>(
+                    std::min(config.num_threads, node_cpu_count),
+                    config.numa_config.node_to_cpus.at(i),
+                    true,   // always enable binding
+                    config.verbose
+                );
+                setup_memory_regions_memcpy(*worker_manager, config, "node" + std::to_string(i), j);
+                run(*worker_manager, kernel, config, i, j);
+            }
+        }
+        if (text) {
+            std::cout << std::endl;
+        }
+    } else {
+        // setup workers
+        worker_manager = std::make_shared<mm_worker::MemLatBwManager>(
+            config.num_threads,
+            config.numa_config.all_allowed_cpus,
+            !config.no_binding,
+            config.verbose
+        );
+        // setup memory regions
+        mm_utils::start_timer("setup");
+        setup_memory_regions_memcpy(*worker_manager, config, config.no_binding ? "any" : "all");
+        mm_utils::end_timer("setup", std::cout, config.is_jsonl());
+        // start the show
+        run(*worker_manager, kernel, config);
     }
+    if (text) {
+        std::cout << std::endl;
+    }
+}
+
+int run_point(mm_utils::Configuration& config) {
     if (config.fragment_size_b == 0) {
         config.fragment_size_b = config.region_size_kb * 1024;
     }
+    mm_worker::func_kernel_memcpy kernel;
+    if (!mm_worker::get_memcpy_engine(config.memcpy_engine, kernel)) {
+        // skip the point, so a plan over all engines runs on any CPU
+        std::cerr << "copy engine not supported on this CPU: " << config.memcpy_engine << std::endl;
+        return 0;
+    }
     config.dump();
-    // setup workers
-    mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket> worker_manager(
-        config.num_threads,
-        config.numa_config.all_allowed_cpus,
-        !config.no_binding,
-        config.verbose
-    );
-    // setup memory regions
-    mm_utils::start_timer("setup");
-    setup_memory_regions_memcpy(worker_manager, config);
-    mm_utils::end_timer("setup", std::cout);
-    // start the show
-    uint64_t last_exec_time_ns = 0;
-    last_exec_time_ns = measure_mempcy_bandwidth(
-        worker_manager, std::move(mm_worker::glibc_memcpy),
-        config, last_exec_time_ns);
-    measure_mempcy_bandwidth(
-        worker_manager, std::move(mm_worker::glibc_memcpy),
-        config, last_exec_time_ns);
-    std::cout << std::endl;
+    setup_and_run(config, kernel);
     return 0;
 }
+
+int main(int argc, char** argv) {
+    mm_utils::Configuration config(mm_utils::Testing_Type::MEMCPY);
+    if (config.parse_options(argc, argv)) {
+        return 1;
+    }
+    if (config.perf_counters) {
+        perf_counters.open(config.perf_events);
+    }
+    region_cache.setBudget(config.get_plan_cache_bytes());
+    return config.run_plan(argc, argv, run_point);
+}
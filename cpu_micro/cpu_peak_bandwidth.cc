@@ -7,19 +7,57 @@
 
 #include "common/mem_region.h"
 #include "common/numa_config.h"
+#include "common/perf_counters.h"
+#include "common/stats.h"
 #include "common/timing.h"
 #include "common/worker_thread_manager.h"
 #include "cpu_micro/lib_configuration.h"
 #include "cpu_micro/kernels_bandwidth.h"
 #include "cpu_micro/worker_bandwidth.h"
 
+// counts every create/join of the worker managers once opened with --perf_counters
+static mm_utils::PerfCounters perf_counters;
+// regions reused by the points of a --plan
+static mm_worker::MemRegionCache region_cache;
+
 void setup_memory_regions_peak_bandwidth(
     mm_utils::WorkerThreadManager<mm_worker::MemLatBwThreadPacket>& worker_manager,
     const mm_utils::Configuration& config,
+    const std::string& cpu_scope,
     int node = -1
 ) {
     mm_worker::prepare_mem_lat_bw_thread_packet(worker_manager, config, node);
-    worker_manager.setRoutineAndRun(mm_worker::mem_region_alloc_bw);
+    region_cache.setup(
+        worker_manager, mm_worker::mem_region_alloc_bw, mm_worker::get_bw_region_layout, cpu_scope);
+}
+
+// one timed pass of all workers; returns the bandwidth in bytes/s
+double run_bandwidth_trial(
+    mm_worker::MemLatBwManager& worker_manager,
+    uint32_t duration_ms,
+    std::vector<uint64_t>& thread_bytes,
+    std::vector<double>& thread_exec_time,
+    uint64_t& total_bytes,
+    double& total_exec_time
+) {
+    for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
+        worker_manager.getPacket(i).target_duration_ms = duration_ms;
+    }
+    worker_manager.create();
+    worker_manager.join();
+    uint64_t trial_bytes = 0;
+    double trial_exec_time = 0;
+    thread_bytes.resize(worker_manager.getNumThreads(), 0);
+    thread_exec_time.resize(worker_manager.getNumThreads(), 0);
+    for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
+        trial_bytes += worker_manager.getPacket(i).finished_bytes;
+        trial_exec_time += worker_manager.getPacket(i).exec_time;
+        thread_bytes[i] += worker_manager.getPacket(i).finished_bytes;
+        thread_exec_time[i] += worker_manager.getPacket(i).exec_time;
+    }
+    total_bytes += trial_bytes;
+    total_exec_time += trial_exec_time;
+    return trial_bytes / trial_exec_time * worker_manager.getNumThreads();
 }
 
 uint32_t measure_peak_bandwidth(
@@ -27,7 +65,9 @@ uint32_t measure_peak_bandwidth(
     mm_worker::func_kernel_bw& kernel,
     const mm_utils::Configuration& config,
     uint32_t read_write_mix,
-    uint32_t last_measured_bw_gbps
+    uint32_t last_measured_bw_gbps,
+    int cpu_node = -1,
+    int mem_node = -1
 ) {
     // init the packet passed into each worker
     for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
@@ -35,42 +75,77 @@ uint32_t measure_peak_bandwidth(
         worker_manager.getPacket(i).read_write_mix = read_write_mix;
         worker_manager.getPacket(i).ref_total_bw_gbps = last_measured_bw_gbps;
         worker_manager.getPacket(i).num_total_threads = config.numa_config.num_cpus;
-        worker_manager.getPacket(i).target_duration =
-            (last_measured_bw_gbps > 0) ? config.target_duration_s : 1;
     }
     // set routines
     worker_manager.setRoutine(mm_worker::bw_sequential);
-    // start
-    worker_manager.create();
-    // done
-    worker_manager.join();
     uint64_t total_bytes = 0;
     double total_exec_time = 0;
-    for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
-        total_bytes += worker_manager.getPacket(i).finished_bytes;
-        total_exec_time += worker_manager.getPacket(i).exec_time;
+    // per-thread totals over all trials, for the fairness between threads
+    std::vector<uint64_t> thread_bytes;
+    std::vector<double> thread_exec_time;
+    if (last_measured_bw_gbps == 0) {
+        // calibration run for the checkpoint interval
+        uint32_t duration_ms = std::min(config.get_trial_duration_ms(), (uint32_t)1000);
+        double mem_bw = run_bandwidth_trial(
+            worker_manager, duration_ms, thread_bytes, thread_exec_time, total_bytes, total_exec_time);
+        return static_cast<uint32_t>(mem_bw / 1024 / 1024 / 1024);
     }
-    double mem_bw = total_bytes / total_exec_time * worker_manager.getNumThreads();
-    double mem_bw_mbps = mem_bw / 1024 / 1024;
-    double mem_bw_gbps = mem_bw_mbps / 1024;
-    if (last_measured_bw_gbps > 0) {
-        if (config.bandwidth_matrix) {
-            std::cout << std::setw(10) << std::setprecision(4) << mem_bw_gbps;
-            std::cout << std::flush;
-        } else {
-            std::cout << std::setw(20) << config.get_str_rw_mix(read_write_mix)
-                << " :" << std::setprecision(7) << std::setw(10) << mem_bw_mbps
-                << " MB/s | " << std::setprecision(4) << std::setw(7) << mem_bw_gbps
-                << " GB/s" << std::endl;
+    // with --rel_ci, repeat trials until the mean converges or time runs out
+    perf_counters.clear();
+    mm_utils::RunningStats stats;
+    mm_utils::Timer timer_total;
+    timer_total.startTimer();
+    do {
+        double mem_bw = run_bandwidth_trial(
+            worker_manager, config.get_trial_duration_ms(), thread_bytes, thread_exec_time, total_bytes, total_exec_time);
+        stats.add(mem_bw / 1024 / 1024 / 1024);
+        timer_total.endTimer();
+        timer_total.resumeTimer();
+    } while (config.is_adaptive() && !stats.converged(config.rel_ci) &&
+             timer_total.getElapsedTime() < config.get_max_duration_s());
+    double mem_bw_gbps = stats.mean();
+    double mem_bw_mbps = mem_bw_gbps * 1024;
+    if (config.is_jsonl()) {
+        std::vector<double> thread_bw_gbps;
+        for (uint32_t i = 0; i < thread_bytes.size(); ++i) {
+            thread_bw_gbps.push_back(thread_bytes[i] / thread_exec_time[i] / 1024 / 1024 / 1024);
+        }
+        mm_utils::JsonRecord record = config.make_data_record("bandwidth");
+        record.add("cpu_node", cpu_node)
+            .add("mem_node", mem_node)
+            .add("read_write_mix", read_write_mix)
+            .add("value", mem_bw_gbps)
+            .add("unit", "GB/s")
+            .add("threads", worker_manager.getNumThreads())
+            .add("bytes", total_bytes)
+            .add("exec_time_s", total_exec_time)
+            .add("stats", stats.to_json())
+            .add("thread_bandwidth", thread_bw_gbps)
+            .add("fairness", mm_utils::jain_fairness(thread_bw_gbps));
+        if (perf_counters.is_open()) {
+            record.add("counters", perf_counters.to_json())
+                .add("derived", perf_counters.derived_json(0, "", total_bytes));
         }
+        record.emit(std::cout);
+    } else if (config.bandwidth_matrix) {
+        std::cout << std::setw(10) << std::setprecision(4) << mem_bw_gbps;
+        std::cout << std::flush;
+    } else {
+        std::cout << std::setw(27) << config.get_str_rw_mix(read_write_mix)
+            << " :" << std::setprecision(7) << std::setw(10) << mem_bw_mbps
+            << " MB/s | " << std::setprecision(4) << std::setw(7) << mem_bw_gbps
+            << " GB/s" << std::endl;
     }
     return static_cast<uint32_t>(mem_bw_gbps);
 }
 
 void run(
     mm_worker::MemLatBwManager& worker_manager,
-    const mm_utils::Configuration& config
+    const mm_utils::Configuration& config,
+    int cpu_node = -1,
+    int mem_node = -1
 ) {
+    worker_manager.setPerfCounters(perf_counters.is_open() ? &perf_counters : nullptr);
     // get kernels
     mm_worker::rwmix_kernel_list rwmix_and_kernels;
     mm_worker::get_kernels_with_wrmix(rwmix_and_kernels, config.read_write_mix);
@@ -82,23 +157,28 @@ void run(
         mm_worker::func_kernel_bw& kernel = std::get<1>(item);
         last_bw_gbps = measure_peak_bandwidth(
             worker_manager, kernel,
-            config, read_write_mix, last_bw_gbps);
+            config, read_write_mix, last_bw_gbps, cpu_node, mem_node);
     }
 }
 
 void setup_and_run(const mm_utils::Configuration& config) {
     std::shared_ptr<mm_worker::MemLatBwManager> worker_manager;
+    const bool text = !config.is_jsonl();
     if (config.bandwidth_matrix) {
-        std::cout << std::left << std::setw(25) << "Peak Bandwidth (GB/s)";
-        for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
-            std::cout << std::setw(10) << "Node-" + std::to_string(j);
+        if (text) {
+            std::cout << std::left << std::setw(25) << "Peak Bandwidth (GB/s)";
+            for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
+                std::cout << std::setw(10) << "Node-" + std::to_string(j);
+            }
         }
         for (uint32_t i = 0; i < config.numa_config.num_numa_nodes; ++i) {
             if (config.numa_config.node_to_cpus.at(i).size() == 0) {
                 continue;
             }
-            std::cout << std::endl << std::setw(25) << "Node-" + std::to_string(i);
-            std::cout << std::flush;
+            if (text) {
+                std::cout << std::endl << std::setw(25) << "Node-" + std::to_string(i);
+                std::cout << std::flush;
+            }
             for (uint32_t j = 0; j < config.numa_config.num_numa_nodes; ++j) {
                 if (config.numa_config.node_to_mem.at(j) < ((int64_t)2 << 30)) {
                     continue;
@@ -111,11 +191,13 @@ void setup_and_run(const mm_utils::Configuration& config) {
                     true,   // always enable binding
                     config.verbose
                 );
-                setup_memory_regions_peak_bandwidth(*worker_manager, config, j);
-                run(*worker_manager, config);
+                setup_memory_regions_peak_bandwidth(*worker_manager, config, "node" + std::to_string(i), j);
+                run(*worker_manager, config, i, j);
             }
         }
-        std::cout << std::endl;
+        if (text) {
+            std::cout << std::endl;
+        }
 
     } else {
         // setup workers
@@ -127,19 +209,17 @@ void setup_and_run(const mm_utils::Configuration& config) {
         );
         // setup memory regions
         mm_utils::start_timer("setup");
-        setup_memory_regions_peak_bandwidth(*worker_manager, config);
-        mm_utils::end_timer("setup", std::cout);
+        setup_memory_regions_peak_bandwidth(*worker_manager, config, config.no_binding ? "any" : "all");
+        mm_utils::end_timer("setup", std::cout, config.is_jsonl());
         // start the show
         run(*worker_manager, config);
     }
-    std::cout << std::endl;
+    if (text) {
+        std::cout << std::endl;
+    }
 }
 
-int main(int argc, char** argv) {
-    mm_utils::Configuration config(mm_utils::Testing_Type::BANDWIDTH);
-    if (config.parse_options(argc, argv)) {
-        return 1;
-    }
+int run_point(mm_utils::Configuration& config) {
     if (config.bandwidth_matrix &&
             config.read_write_mix == config.read_write_mix_sweep) {
         config.read_write_mix = 0;
@@ -148,3 +228,15 @@ int main(int argc, char** argv) {
     setup_and_run(config);
     return 0;
 }
+
+int main(int argc, char** argv) {
+    mm_utils::Configuration config(mm_utils::Testing_Type::BANDWIDTH);
+    if (config.parse_options(argc, argv)) {
+        return 1;
+    }
+    if (config.perf_counters) {
+        perf_counters.open(config.perf_events);
+    }
+    region_cache.setBudget(config.get_plan_cache_bytes());
+    return config.run_plan(argc, argv, run_point);
+}
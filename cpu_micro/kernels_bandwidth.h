@@ -4,6 +4,10 @@
 #include <list>
 #include <tuple>
 
+#if defined(__x86_64__)
+#include <immintrin.h>
+#endif
+
 #include "cpu_micro/worker_common.h"
 #include "cpu_micro/kernels_common.h"
 
@@ -33,6 +37,43 @@ void kernel_bw_r3w1_sequential(uint64_t& ret, uint64_t*& p) {
     LP1(WR32)
 }
 
+// a whole line of non-temporal stores of v, bypassing the caches (no
+// read-for-ownership); regular stores where the ISA has none
+#if defined(__x86_64__)
+#define NT_VALUE(x) const __m128i v = _mm_set1_epi64x(x);
+#define NTWR64   _mm_stream_si128((__m128i*)p, v); _mm_stream_si128((__m128i*)(p + 2), v); \
+                 _mm_stream_si128((__m128i*)(p + 4), v); _mm_stream_si128((__m128i*)(p + 6), v); p += 8;
+#define NT_FENCE _mm_sfence();
+#else
+#define NT_VALUE(x) const uint64_t v = x;
+#define NTWR64   p[0] = v; p[1] = v; p[2] = v; p[3] = v; p[4] = v; p[5] = v; p[6] = v; p[7] = v; p += 8;
+#define NT_FENCE
+#endif
+
+void kernel_bw_r0w1_sequential(uint64_t& ret, uint64_t*& p) {
+    // 256x1
+    LP256(WR32)
+}
+
+void kernel_bw_r0w1_nt_sequential(uint64_t& ret, uint64_t*& p) {
+    // 128x1 lines
+    NT_VALUE(ret)
+    LP128(NTWR64)
+    NT_FENCE
+}
+
+void kernel_bw_r1w1_nt_sequential(uint64_t& ret, uint64_t*& p) {
+    // 64x(read a line, write the next one)
+    NT_VALUE(ret)
+    LP64(RD32 RD32 NTWR64)
+    NT_FENCE
+}
+
+void kernel_bw_rmw_sequential(uint64_t& ret, uint64_t*& p) {
+    // 256x1, each store to the line just read
+    LP256(RMW32)
+}
+
 using rwmix_kernel_list = std::list<std::tuple<uint32_t, func_kernel_bw>>;
 
 void get_kernels_with_wrmix(
@@ -47,11 +88,23 @@ void get_kernels_with_wrmix(
         rwmix_and_kernels.push_back({2, kernel_bw_r2w1_sequential});
     } else if (read_write_mix == 3) {
         rwmix_and_kernels.push_back({3, kernel_bw_r3w1_sequential});
+    } else if (read_write_mix == 4) {
+        rwmix_and_kernels.push_back({4, kernel_bw_r0w1_sequential});
+    } else if (read_write_mix == 5) {
+        rwmix_and_kernels.push_back({5, kernel_bw_r0w1_nt_sequential});
+    } else if (read_write_mix == 6) {
+        rwmix_and_kernels.push_back({6, kernel_bw_r1w1_nt_sequential});
+    } else if (read_write_mix == 7) {
+        rwmix_and_kernels.push_back({7, kernel_bw_rmw_sequential});
     } else if (read_write_mix == 100) {
         rwmix_and_kernels.push_back({0, kernel_bw_r1w0_sequential});
         rwmix_and_kernels.push_back({3, kernel_bw_r3w1_sequential});
         rwmix_and_kernels.push_back({2, kernel_bw_r2w1_sequential});
         rwmix_and_kernels.push_back({1, kernel_bw_r1w1_sequential});
+        rwmix_and_kernels.push_back({7, kernel_bw_rmw_sequential});
+        rwmix_and_kernels.push_back({6, kernel_bw_r1w1_nt_sequential});
+        rwmix_and_kernels.push_back({4, kernel_bw_r0w1_sequential});
+        rwmix_and_kernels.push_back({5, kernel_bw_r0w1_nt_sequential});
     } else {
         rwmix_and_kernels.push_back({0, kernel_bw_r1w0_sequential});
     }
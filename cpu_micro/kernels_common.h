@@ -5,6 +5,7 @@ namespace mm_worker {
 
 #define RD32     ret += *p; p += 4;
 #define WR32     *p = ret;  p += 4;
+#define RMW32    ret += *p; *p = ret; p += 4;
 
 #define LP1(x)   x
 #define LP2(x)   x x
@@ -10,11 +10,13 @@ namespace mm_worker {
 
 using u64 = uint64_t;
 
-// variable bandwidth for loaded latency
+// variable bandwidth for loaded latency, sorted by delay
+// all_delays - include every generated kernel instead of the default sweep
 using delay_kernel_list = std::list<std::tuple<int32_t, func_kernel_bw>>;
 void get_kernels_with_delays(
     delay_kernel_list& delays_and_kernels,
-    uint32_t read_write_mix
+    uint32_t read_write_mix,
+    bool all_delays = false
 );
 
 void k_r1w0_s_n0(uint64_t& ret, uint64_t*& p);
@@ -2,119 +2,133 @@
 
 namespace mm_worker {
 
+namespace {
+// the default sweep skips these; the curve barely moves at such high load
+bool is_default_delay(int32_t delay) {
+    return delay != 0 && delay != 2 && delay != 4 && delay != 16;
+}
+}
+
 void get_kernels_with_delays(
     delay_kernel_list& delays_and_kernels,
-    uint32_t read_write_mix
+    uint32_t read_write_mix,
+    bool all_delays
 ) {
+    delay_kernel_list all_kernels;
     if (read_write_mix == 0) {
-        // delays_and_kernels.push_back({0,    k_r1w0_s_n0});
-        delays_and_kernels.push_back({1,    k_r1w0_s_n1});
-        // delays_and_kernels.push_back({2,    k_r1w0_s_n2});
-        // delays_and_kernels.push_back({4,    k_r1w0_s_n4});
-        delays_and_kernels.push_back({8,    k_r1w0_s_n8});
-        // delays_and_kernels.push_back({16,   k_r1w0_s_n16});
-        delays_and_kernels.push_back({32,   k_r1w0_s_n32});
-        delays_and_kernels.push_back({48,   k_r1w0_s_n48});
-        delays_and_kernels.push_back({64,   k_r1w0_s_n64});
-        delays_and_kernels.push_back({80,   k_r1w0_s_n80});
-        delays_and_kernels.push_back({88,   k_r1w0_s_n88});
-        delays_and_kernels.push_back({96,   k_r1w0_s_n96});
-        delays_and_kernels.push_back({104,  k_r1w0_s_n104});
-        delays_and_kernels.push_back({112,  k_r1w0_s_n112});
-        delays_and_kernels.push_back({128,  k_r1w0_s_n128});
-        delays_and_kernels.push_back({160,  k_r1w0_s_n160});
-        delays_and_kernels.push_back({192,  k_r1w0_s_n192});
-        delays_and_kernels.push_back({224,  k_r1w0_s_n224});
-        delays_and_kernels.push_back({256,  k_r1w0_s_n256});
-        delays_and_kernels.push_back({384,  k_r1w0_s_n384});
-        delays_and_kernels.push_back({512,  k_r1w0_s_n512});
-        delays_and_kernels.push_back({768,  k_r1w0_s_n768});
-        delays_and_kernels.push_back({1024, k_r1w0_s_n1024});
-        delays_and_kernels.push_back({1536, k_r1w0_s_n1536});
-        delays_and_kernels.push_back({2048, k_r1w0_s_n2048});
+        all_kernels.push_back({0,    k_r1w0_s_n0});
+        all_kernels.push_back({1,    k_r1w0_s_n1});
+        all_kernels.push_back({2,    k_r1w0_s_n2});
+        all_kernels.push_back({4,    k_r1w0_s_n4});
+        all_kernels.push_back({8,    k_r1w0_s_n8});
+        all_kernels.push_back({16,   k_r1w0_s_n16});
+        all_kernels.push_back({32,   k_r1w0_s_n32});
+        all_kernels.push_back({48,   k_r1w0_s_n48});
+        all_kernels.push_back({64,   k_r1w0_s_n64});
+        all_kernels.push_back({80,   k_r1w0_s_n80});
+        all_kernels.push_back({88,   k_r1w0_s_n88});
+        all_kernels.push_back({96,   k_r1w0_s_n96});
+        all_kernels.push_back({104,  k_r1w0_s_n104});
+        all_kernels.push_back({112,  k_r1w0_s_n112});
+        all_kernels.push_back({128,  k_r1w0_s_n128});
+        all_kernels.push_back({160,  k_r1w0_s_n160});
+        all_kernels.push_back({192,  k_r1w0_s_n192});
+        all_kernels.push_back({224,  k_r1w0_s_n224});
+        all_kernels.push_back({256,  k_r1w0_s_n256});
+        all_kernels.push_back({384,  k_r1w0_s_n384});
+        all_kernels.push_back({512,  k_r1w0_s_n512});
+        all_kernels.push_back({768,  k_r1w0_s_n768});
+        all_kernels.push_back({1024, k_r1w0_s_n1024});
+        all_kernels.push_back({1536, k_r1w0_s_n1536});
+        all_kernels.push_back({2048, k_r1w0_s_n2048});
     } else if (read_write_mix == 1) {
-        // delays_and_kernels.push_back({0,    k_r1w1_s_n0});
-        delays_and_kernels.push_back({1,    k_r1w1_s_n1});
-        // delays_and_kernels.push_back({2,    k_r1w1_s_n2});
-        // delays_and_kernels.push_back({4,    k_r1w1_s_n4});
-        delays_and_kernels.push_back({8,    k_r1w1_s_n8});
-        // delays_and_kernels.push_back({16,   k_r1w1_s_n16});
-        delays_and_kernels.push_back({32,   k_r1w1_s_n32});
-        delays_and_kernels.push_back({48,   k_r1w1_s_n48});
-        delays_and_kernels.push_back({64,   k_r1w1_s_n64});
-        delays_and_kernels.push_back({80,   k_r1w1_s_n80});
-        delays_and_kernels.push_back({88,   k_r1w1_s_n88});
-        delays_and_kernels.push_back({96,   k_r1w1_s_n96});
-        delays_and_kernels.push_back({104,  k_r1w1_s_n104});
-        delays_and_kernels.push_back({112,  k_r1w1_s_n112});
-        delays_and_kernels.push_back({128,  k_r1w1_s_n128});
-        delays_and_kernels.push_back({160,  k_r1w1_s_n160});
-        delays_and_kernels.push_back({192,  k_r1w1_s_n192});
-        delays_and_kernels.push_back({224,  k_r1w1_s_n224});
-        delays_and_kernels.push_back({256,  k_r1w1_s_n256});
-        delays_and_kernels.push_back({384,  k_r1w1_s_n384});
-        delays_and_kernels.push_back({512,  k_r1w1_s_n512});
-        delays_and_kernels.push_back({768,  k_r1w1_s_n768});
-        delays_and_kernels.push_back({1024, k_r1w1_s_n1024});
-        delays_and_kernels.push_back({1536, k_r1w1_s_n1536});
-        delays_and_kernels.push_back({2048, k_r1w1_s_n2048});
+        all_kernels.push_back({0,    k_r1w1_s_n0});
+        all_kernels.push_back({1,    k_r1w1_s_n1});
+        all_kernels.push_back({2,    k_r1w1_s_n2});
+        all_kernels.push_back({4,    k_r1w1_s_n4});
+        all_kernels.push_back({8,    k_r1w1_s_n8});
+        all_kernels.push_back({16,   k_r1w1_s_n16});
+        all_kernels.push_back({32,   k_r1w1_s_n32});
+        all_kernels.push_back({48,   k_r1w1_s_n48});
+        all_kernels.push_back({64,   k_r1w1_s_n64});
+        all_kernels.push_back({80,   k_r1w1_s_n80});
+        all_kernels.push_back({88,   k_r1w1_s_n88});
+        all_kernels.push_back({96,   k_r1w1_s_n96});
+        all_kernels.push_back({104,  k_r1w1_s_n104});
+        all_kernels.push_back({112,  k_r1w1_s_n112});
+        all_kernels.push_back({128,  k_r1w1_s_n128});
+        all_kernels.push_back({160,  k_r1w1_s_n160});
+        all_kernels.push_back({192,  k_r1w1_s_n192});
+        all_kernels.push_back({224,  k_r1w1_s_n224});
+        all_kernels.push_back({256,  k_r1w1_s_n256});
+        all_kernels.push_back({384,  k_r1w1_s_n384});
+        all_kernels.push_back({512,  k_r1w1_s_n512});
+        all_kernels.push_back({768,  k_r1w1_s_n768});
+        all_kernels.push_back({1024, k_r1w1_s_n1024});
+        all_kernels.push_back({1536, k_r1w1_s_n1536});
+        all_kernels.push_back({2048, k_r1w1_s_n2048});
     } else if (read_write_mix == 2) {
-        // delays_and_kernels.push_back({0,    k_r2w1_s_n0});
-        delays_and_kernels.push_back({1,    k_r2w1_s_n1});
-        // delays_and_kernels.push_back({2,    k_r2w1_s_n2});
-        // delays_and_kernels.push_back({4,    k_r2w1_s_n4});
-        delays_and_kernels.push_back({8,    k_r2w1_s_n8});
-        // delays_and_kernels.push_back({16,   k_r2w1_s_n16});
-        delays_and_kernels.push_back({32,   k_r2w1_s_n32});
-        delays_and_kernels.push_back({48,   k_r2w1_s_n48});
-        delays_and_kernels.push_back({64,   k_r2w1_s_n64});
-        delays_and_kernels.push_back({80,   k_r2w1_s_n80});
-        delays_and_kernels.push_back({88,   k_r2w1_s_n88});
-        delays_and_kernels.push_back({96,   k_r2w1_s_n96});
-        delays_and_kernels.push_back({104,  k_r2w1_s_n104});
-        delays_and_kernels.push_back({112,  k_r2w1_s_n112});
-        delays_and_kernels.push_back({128,  k_r2w1_s_n128});
-        delays_and_kernels.push_back({160,  k_r2w1_s_n160});
-        delays_and_kernels.push_back({192,  k_r2w1_s_n192});
-        delays_and_kernels.push_back({224,  k_r2w1_s_n224});
-        delays_and_kernels.push_back({256,  k_r2w1_s_n256});
-        delays_and_kernels.push_back({320,  k_r2w1_s_n320});
-        delays_and_kernels.push_back({384,  k_r2w1_s_n384});
-        delays_and_kernels.push_back({448,  k_r2w1_s_n448});
-        delays_and_kernels.push_back({512,  k_r2w1_s_n512});
-        delays_and_kernels.push_back({640,  k_r2w1_s_n640});
-        delays_and_kernels.push_back({768,  k_r2w1_s_n768});
-        delays_and_kernels.push_back({1024, k_r2w1_s_n1024});
-        delays_and_kernels.push_back({1536, k_r2w1_s_n1536});
-        delays_and_kernels.push_back({2048, k_r2w1_s_n2048});
+        all_kernels.push_back({0,    k_r2w1_s_n0});
+        all_kernels.push_back({1,    k_r2w1_s_n1});
+        all_kernels.push_back({2,    k_r2w1_s_n2});
+        all_kernels.push_back({4,    k_r2w1_s_n4});
+        all_kernels.push_back({8,    k_r2w1_s_n8});
+        all_kernels.push_back({16,   k_r2w1_s_n16});
+        all_kernels.push_back({32,   k_r2w1_s_n32});
+        all_kernels.push_back({48,   k_r2w1_s_n48});
+        all_kernels.push_back({64,   k_r2w1_s_n64});
+        all_kernels.push_back({80,   k_r2w1_s_n80});
+        all_kernels.push_back({88,   k_r2w1_s_n88});
+        all_kernels.push_back({96,   k_r2w1_s_n96});
+        all_kernels.push_back({104,  k_r2w1_s_n104});
+        all_kernels.push_back({112,  k_r2w1_s_n112});
+        all_kernels.push_back({128,  k_r2w1_s_n128});
+        all_kernels.push_back({160,  k_r2w1_s_n160});
+        all_kernels.push_back({192,  k_r2w1_s_n192});
+        all_kernels.push_back({224,  k_r2w1_s_n224});
+        all_kernels.push_back({256,  k_r2w1_s_n256});
+        all_kernels.push_back({320,  k_r2w1_s_n320});
+        all_kernels.push_back({384,  k_r2w1_s_n384});
+        all_kernels.push_back({448,  k_r2w1_s_n448});
+        all_kernels.push_back({512,  k_r2w1_s_n512});
+        all_kernels.push_back({640,  k_r2w1_s_n640});
+        all_kernels.push_back({768,  k_r2w1_s_n768});
+        all_kernels.push_back({1024, k_r2w1_s_n1024});
+        all_kernels.push_back({1536, k_r2w1_s_n1536});
+        all_kernels.push_back({2048, k_r2w1_s_n2048});
     } else if (read_write_mix == 3) {
-        // delays_and_kernels.push_back({0,    k_r3w1_s_n0});
-        delays_and_kernels.push_back({1,    k_r3w1_s_n1});
-        // delays_and_kernels.push_back({2,    k_r3w1_s_n2});
-        // delays_and_kernels.push_back({4,    k_r3w1_s_n4});
-        delays_and_kernels.push_back({8,    k_r3w1_s_n8});
-        // delays_and_kernels.push_back({16,   k_r3w1_s_n16});
-        delays_and_kernels.push_back({32,   k_r3w1_s_n32});
-        delays_and_kernels.push_back({48,   k_r3w1_s_n48});
-        delays_and_kernels.push_back({64,   k_r3w1_s_n64});
-        delays_and_kernels.push_back({80,   k_r3w1_s_n80});
-        delays_and_kernels.push_back({88,   k_r3w1_s_n88});
-        delays_and_kernels.push_back({96,   k_r3w1_s_n96});
-        delays_and_kernels.push_back({104,  k_r3w1_s_n104});
-        delays_and_kernels.push_back({112,  k_r3w1_s_n112});
-        delays_and_kernels.push_back({128,  k_r3w1_s_n128});
-        delays_and_kernels.push_back({160,  k_r3w1_s_n160});
-        delays_and_kernels.push_back({192,  k_r3w1_s_n192});
-        delays_and_kernels.push_back({224,  k_r3w1_s_n224});
-        delays_and_kernels.push_back({256,  k_r3w1_s_n256});
-        delays_and_kernels.push_back({384,  k_r3w1_s_n384});
-        delays_and_kernels.push_back({512,  k_r3w1_s_n512});
-        delays_and_kernels.push_back({768,  k_r3w1_s_n768});
-        delays_and_kernels.push_back({1024, k_r3w1_s_n1024});
-        delays_and_kernels.push_back({1536, k_r3w1_s_n1536});
-        delays_and_kernels.push_back({2048, k_r3w1_s_n2048});
+        all_kernels.push_back({0,    k_r3w1_s_n0});
+        all_kernels.push_back({1,    k_r3w1_s_n1});
+        all_kernels.push_back({2,    k_r3w1_s_n2});
+        all_kernels.push_back({4,    k_r3w1_s_n4});
+        all_kernels.push_back({8,    k_r3w1_s_n8});
+        all_kernels.push_back({16,   k_r3w1_s_n16});
+        all_kernels.push_back({32,   k_r3w1_s_n32});
+        all_kernels.push_back({48,   k_r3w1_s_n48});
+        all_kernels.push_back({64,   k_r3w1_s_n64});
+        all_kernels.push_back({80,   k_r3w1_s_n80});
+        all_kernels.push_back({88,   k_r3w1_s_n88});
+        all_kernels.push_back({96,   k_r3w1_s_n96});
+        all_kernels.push_back({104,  k_r3w1_s_n104});
+        all_kernels.push_back({112,  k_r3w1_s_n112});
+        all_kernels.push_back({128,  k_r3w1_s_n128});
+        all_kernels.push_back({160,  k_r3w1_s_n160});
+        all_kernels.push_back({192,  k_r3w1_s_n192});
+        all_kernels.push_back({224,  k_r3w1_s_n224});
+        all_kernels.push_back({256,  k_r3w1_s_n256});
+        all_kernels.push_back({384,  k_r3w1_s_n384});
+        all_kernels.push_back({512,  k_r3w1_s_n512});
+        all_kernels.push_back({768,  k_r3w1_s_n768});
+        all_kernels.push_back({1024, k_r3w1_s_n1024});
+        all_kernels.push_back({1536, k_r3w1_s_n1536});
+        all_kernels.push_back({2048, k_r3w1_s_n2048});
     } else {
-        delays_and_kernels.push_back({0, k_r2w1_s_n256});
+        all_kernels.push_back({0, k_r2w1_s_n256});
+    }
+    for (auto& item : all_kernels) {
+        if (all_delays || is_default_delay(std::get<0>(item)) || all_kernels.size() == 1) {
+            delays_and_kernels.push_back(item);
+        }
     }
 }
 
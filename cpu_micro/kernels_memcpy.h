@@ -1,7 +1,16 @@
 #ifndef __KERNELS_MEMCPY_H__
 #define __KERNELS_MEMCPY_H__
 
+#include <algorithm>
+#include <cstdint>
 #include <cstring>
+#include <string>
+
+#if defined(__x86_64__)
+#include <immintrin.h>
+#endif
+
+#include "cpu_micro/worker_common.h"
 
 namespace mm_worker {
 
@@ -11,6 +20,119 @@ void* glibc_memcpy(void* dest, const void* src, std::size_t count) {
     return ::memcpy(dest, src, count);
 }
 
+#if defined(__x86_64__)
+// fast strings microcode (ERMS/FSRM)
+void* movsb_memcpy(void* dest, const void* src, std::size_t count) {
+    void* ret = dest;
+    asm volatile("rep movsb" : "+D"(dest), "+S"(src), "+c"(count) : : "memory");
+    return ret;
+}
+
+// 64B per iteration through vector registers; the head up to the destination's
+// alignment and the tail go through glibc, so the loop stores are aligned
+void* sse2_memcpy(void* dest, const void* src, std::size_t count) {
+    char* d = static_cast<char*>(dest);
+    const char* s = static_cast<const char*>(src);
+    const std::size_t head = std::min(count, (16 - (uintptr_t)d % 16) % 16);
+    ::memcpy(d, s, head);
+    for (d += head, s += head, count -= head; count >= 64; d += 64, s += 64, count -= 64) {
+        __m128i x0 = _mm_loadu_si128((const __m128i*)s);
+        __m128i x1 = _mm_loadu_si128((const __m128i*)(s + 16));
+        __m128i x2 = _mm_loadu_si128((const __m128i*)(s + 32));
+        __m128i x3 = _mm_loadu_si128((const __m128i*)(s + 48));
+        _mm_store_si128((__m128i*)d, x0);
+        _mm_store_si128((__m128i*)(d + 16), x1);
+        _mm_store_si128((__m128i*)(d + 32), x2);
+        _mm_store_si128((__m128i*)(d + 48), x3);
+    }
+    ::memcpy(d, s, count);
+    return dest;
+}
+
+// as sse2_memcpy, with streaming stores bypassing the caches
+void* sse2_nt_memcpy(void* dest, const void* src, std::size_t count) {
+    char* d = static_cast<char*>(dest);
+    const char* s = static_cast<const char*>(src);
+    const std::size_t head = std::min(count, (16 - (uintptr_t)d % 16) % 16);
+    ::memcpy(d, s, head);
+    for (d += head, s += head, count -= head; count >= 64; d += 64, s += 64, count -= 64) {
+        __m128i x0 = _mm_loadu_si128((const __m128i*)s);
+        __m128i x1 = _mm_loadu_si128((const __m128i*)(s + 16));
+        __m128i x2 = _mm_loadu_si128((const __m128i*)(s + 32));
+        __m128i x3 = _mm_loadu_si128((const __m128i*)(s + 48));
+        _mm_stream_si128((__m128i*)d, x0);
+        _mm_stream_si128((__m128i*)(d + 16), x1);
+        _mm_stream_si128((__m128i*)(d + 32), x2);
+        _mm_stream_si128((__m128i*)(d + 48), x3);
+    }
+    // order the streaming stores before anything after the copy
+    _mm_sfence();
+    ::memcpy(d, s, count);
+    return dest;
+}
+
+__attribute__ (( target("avx") ))
+void* avx_memcpy(void* dest, const void* src, std::size_t count) {
+    char* d = static_cast<char*>(dest);
+    const char* s = static_cast<const char*>(src);
+    const std::size_t head = std::min(count, (32 - (uintptr_t)d % 32) % 32);
+    ::memcpy(d, s, head);
+    for (d += head, s += head, count -= head; count >= 64; d += 64, s += 64, count -= 64) {
+        __m256i y0 = _mm256_loadu_si256((const __m256i*)s);
+        __m256i y1 = _mm256_loadu_si256((const __m256i*)(s + 32));
+        _mm256_store_si256((__m256i*)d, y0);
+        _mm256_store_si256((__m256i*)(d + 32), y1);
+    }
+    _mm256_zeroupper();
+    ::memcpy(d, s, count);
+    return dest;
+}
+
+__attribute__ (( target("avx") ))
+void* avx_nt_memcpy(void* dest, const void* src, std::size_t count) {
+    char* d = static_cast<char*>(dest);
+    const char* s = static_cast<const char*>(src);
+    const std::size_t head = std::min(count, (32 - (uintptr_t)d % 32) % 32);
+    ::memcpy(d, s, head);
+    for (d += head, s += head, count -= head; count >= 64; d += 64, s += 64, count -= 64) {
+        __m256i y0 = _mm256_loadu_si256((const __m256i*)s);
+        __m256i y1 = _mm256_loadu_si256((const __m256i*)(s + 32));
+        _mm256_stream_si256((__m256i*)d, y0);
+        _mm256_stream_si256((__m256i*)(d + 32), y1);
+    }
+    _mm256_zeroupper();
+    _mm_sfence();
+    ::memcpy(d, s, count);
+    return dest;
+}
+#endif
+
+// the copy engine of a --engine name; false if this CPU lacks it
+bool get_memcpy_engine(const std::string& name, func_kernel_memcpy& kernel) {
+    if (name == "glibc") {
+        kernel = glibc_memcpy;
+        return true;
+    }
+#if defined(__x86_64__)
+    if (name == "movsb") {
+        kernel = movsb_memcpy;
+    } else if (name == "sse2") {
+        kernel = sse2_memcpy;
+    } else if (name == "sse2_nt") {
+        kernel = sse2_nt_memcpy;
+    } else if (name == "avx" && __builtin_cpu_supports("avx")) {
+        kernel = avx_memcpy;
+    } else if (name == "avx_nt" && __builtin_cpu_supports("avx")) {
+        kernel = avx_nt_memcpy;
+    } else {
+        return false;
+    }
+    return true;
+#else
+    return false;
+#endif
+}
+
 }
 
 #endif
@@ -1,4 +1,7 @@
+#include <algorithm>
+#include <fstream>
 #include <iostream>
+#include <sstream>
 
 #include "cpu_micro/lib_configuration.h"
 
@@ -15,13 +18,16 @@ Configuration::Configuration(Testing_Type testing_type) :
     } else if (testing_type == Testing_Type::LATENCY_BANDWIDTH) {
         test_name = "Loaded latency; 1 latency thread + n-1 load generation threads";
     } else if (testing_type == Testing_Type::MEMCPY) {
-        test_name = "Memcpy (glibc)";
+        test_name = "Memcpy";
     } else if (testing_type == Testing_Type::BRANCH_THROUGHPUT) {
         test_name = "Branch taken throughput";
     }
     desc_ = std::make_shared<po::options_description>(test_name);
 
     add_generic_options_();
+    if (testing_type == Testing_Type::LATENCY || testing_type == Testing_Type::BANDWIDTH) {
+        add_adaptive_options_();
+    }
     if (testing_type == Testing_Type::LATENCY || testing_type == Testing_Type::LATENCY_BANDWIDTH) {
         add_latency_options_();
     }
@@ -66,10 +72,56 @@ void Configuration::add_generic_options_() {
         ("verbose,v",
             po::bool_switch(&verbose),
             "enable verbose output")
+        ("format",
+            po::value(&output_format)->default_value("text"),
+            "output format\n  text  - human readable tables"
+            "\n  jsonl - one JSON record per data point")
         ;
+    if (testing_type_ < Testing_Type::BRANCH_THROUGHPUT) {
+        generic_options.add_options()
+            ("perf_counters",
+                po::bool_switch(&perf_counters),
+                "count LLC/dTLB misses, cycles and stalls of each data point;"
+                " reported with --format jsonl")
+            ("perf_events",
+                po::value(&perf_events)->default_value(""),
+                "extra raw events with --perf_counters, e.g. dtlb_walks=0x0e08,...")
+            ("init_threads",
+                po::value(&init_threads)->default_value(0),
+                "threads zeroing each memory region and building its pointer chain;"
+                " 0 - allowed CPUs shared among the worker threads")
+            ("plan",
+                po::value(&plan_file)->default_value(""),
+                "batch mode: file with one data point per line, given as options"
+                " overriding the command line's, e.g. \"-m 1 -t 5\"; '#' starts a comment;"
+                " memory regions are reused by points of the same layout")
+            ("plan_cache_mb",
+                po::value(&plan_cache_mb)->default_value(0),
+                "max MB of memory regions kept for reuse across --plan points;"
+                " 0 - half of the memory of all nodes")
+            ;
+    }
     desc_->add(generic_options);
 }
 
+void Configuration::add_adaptive_options_() {
+    po::options_description adaptive_options("Adaptive duration options");
+    adaptive_options.add_options()
+        ("rel_ci",
+            po::value(&rel_ci)->default_value(0),
+            "repeat short trials per data point until the 95% CI half width"
+            " is within this fraction of the mean, e.g. 0.01; 0 - disabled")
+        ("trial_duration",
+            po::value(&trial_duration_ms)->default_value(100),
+            "duration in ms of each trial with --rel_ci")
+        ("max_duration",
+            po::value(&max_duration_s)->default_value(0),
+            "max duration in sec of each data point with --rel_ci;"
+            " 0 - same as target_duration")
+        ;
+    desc_->add(adaptive_options);
+}
+
 void Configuration::add_latency_options_() {
     uint32_t default_chunk_size_kb = 128;
     if (testing_type_ == Testing_Type::LATENCY_BANDWIDTH) {
@@ -89,6 +141,17 @@ void Configuration::add_latency_options_() {
         ("stride_size,s",
             po::value(&stride_size_b)->default_value(128),
             "stride size in byte")
+        ("seed",
+            po::value(&seed)->default_value(0),
+            "seed of the random pointer chains; same seed, same chains")
+        ("histogram",
+            po::bool_switch(&histogram),
+            "record the latency distribution (p50/p90/p99/p99.9/max) per data point")
+        ("sample_chases",
+            po::value(&sample_chases)->default_value(1),
+            "chases per latency sample with --histogram\n"
+            "  1..255 - after every batch of 256 chases, time this many chases on their own\n"
+            "  256    - time every batch of 256 chases; percentiles of batch means")
         ("use_hugepage,H",
             po::value(&use_hugepage)->default_value(0),
             ("use huge pages\n  0 - " + get_str_huge_page(0) +
@@ -112,7 +175,10 @@ void Configuration::add_bandwidth_options_() {
     std::string additional_msg = "";
     if (testing_type_ == Testing_Type::BANDWIDTH) {
         default_read_write_mix = read_write_mix_sweep;
-        additional_msg = (
+        for (uint32_t x = 4; x <= max_read_write_mix; ++x) {
+            additional_msg += "\n  " + std::to_string(x) + " - " + get_str_rw_mix(x);
+        }
+        additional_msg += (
             "\n" + std::to_string(read_write_mix_sweep) +
             " - " + get_str_rw_mix(read_write_mix_sweep));
     }
@@ -132,6 +198,12 @@ void Configuration::add_bandwidth_options_() {
             ("load_gen_delay,d",
                 po::value(&load_gen_delay)->default_value(default_load_gen_delay),
                 "delay slots b/w memory requests for load generation threads")
+            ("adaptive_delays",
+                po::bool_switch(&adaptive_delays),
+                "pick delays adaptively, refining where the latency/bandwidth curve bends")
+            ("delay_budget",
+                po::value(&delay_budget)->default_value(12),
+                "max number of delays to measure with --adaptive_delays")
             ;
     }
     if (testing_type_ == Testing_Type::BANDWIDTH) {
@@ -146,6 +218,10 @@ void Configuration::add_bandwidth_options_() {
 
 void Configuration::add_memcpy_options_() {
     uint64_t default_fragment_size = 0;
+    std::string engine_msg = "copy engine";
+    for (auto& engine : memcpy_engines) {
+        engine_msg += "\n  " + engine + " - " + get_str_memcpy_engine(engine);
+    }
     po::options_description memcpy_options("Memcpy options");
     memcpy_options.add_options()
         ("fragment_size,f",
@@ -153,6 +229,9 @@ void Configuration::add_memcpy_options_() {
             ("fragment size in byte of each memcpy invocation"
              "\n  0 - same as region size"
              "\n  e.g. 4096 - copy each 4KB fragment one by one"))
+        ("engine,e",
+            po::value(&memcpy_engine)->default_value("glibc"),
+            engine_msg.c_str())
         ("memcpy_matrix",
             po::bool_switch(&memcpy_matrix),
             "Measure local and cross-socket memcpy bandwidth")
@@ -163,15 +242,141 @@ void Configuration::add_memcpy_options_() {
 int Configuration::parse_options(int argc, char** argv) {
     po::variables_map vm;
     po::store(po::command_line_parser(argc, argv).options(*desc_).run(), vm);
+    return check_options_(vm);
+}
+
+int Configuration::parse_plan_point_(int argc, char** argv, const std::vector<std::string>& point_args) {
+    po::variables_map vm;
+    // values stored first win, so the point's options override the command line's
+    po::store(po::command_line_parser(point_args).options(*desc_).run(), vm);
+    po::store(po::command_line_parser(argc, argv).options(*desc_).run(), vm);
+    // every option has a default, so nothing carries over from the previous point
+    return check_options_(vm);
+}
+
+int Configuration::run_plan(int argc, char** argv, const std::function<int(Configuration&)>& run_point) {
+    if (!has_plan()) {
+        return run_point(*this);
+    }
+    std::ifstream fp(plan_file);
+    if (!fp) {
+        std::cerr << "cannot open plan file: " << plan_file << std::endl;
+        return 1;
+    }
+    std::vector<std::vector<std::string>> points;
+    std::vector<uint32_t> line_numbers;
+    std::string line;
+    for (uint32_t line_number = 1; std::getline(fp, line); ++line_number) {
+        std::stringstream ss(line.substr(0, line.find('#')));
+        std::vector<std::string> point_args;
+        std::string arg;
+        while (ss >> arg) {
+            point_args.push_back(arg);
+        }
+        if (!point_args.empty()) {
+            points.push_back(point_args);
+            line_numbers.push_back(line_number);
+        }
+    }
+    const std::string base_plan_file = plan_file;
+    // check every point first, so a typo does not abort a long plan halfway
+    for (size_t i = 0; i < points.size(); ++i) {
+        try {
+            if (parse_plan_point_(argc, argv, points[i])) {
+                return 1;
+            }
+        } catch (const po::error& e) {
+            std::cerr << base_plan_file << ":" << line_numbers[i] << ": " << e.what() << std::endl;
+            return 1;
+        }
+        if (plan_file != base_plan_file) {
+            std::cerr << base_plan_file << ":" << line_numbers[i] << ": --plan in a plan" << std::endl;
+            return 1;
+        }
+    }
+    for (size_t i = 0; i < points.size(); ++i) {
+        parse_plan_point_(argc, argv, points[i]);
+        plan_point = i;
+        int ret = run_point(*this);
+        if (ret) {
+            return ret;
+        }
+    }
+    return 0;
+}
+
+uint64_t Configuration::get_plan_cache_bytes() const {
+    if (!has_plan()) {
+        return 0;
+    }
+    if (plan_cache_mb > 0) {
+        return plan_cache_mb << 20;
+    }
+    uint64_t total_mem = 0;
+    for (auto& item : numa_config.node_to_mem) {
+        total_mem += std::max<int64_t>(item.second, 0);
+    }
+    return total_mem / 2;
+}
+
+int Configuration::check_options_(po::variables_map& vm) {
     po::notify(vm);
     if (vm.count("help")) {
         std::cerr << *desc_ << std::endl;
         return 1;
     }
-    // auto corrections
-    if (use_hugepage > 0) {
+    if (output_format != "text" && output_format != "jsonl") {
+        std::cerr << "unknown output format: " << output_format << std::endl;
+        return 1;
+    }
+    if (adaptive_delays && delay_budget < 3) {
+        std::cerr << "--delay_budget must be at least 3" << std::endl;
+        return 1;
+    }
+    if (rel_ci < 0 || (rel_ci > 0 && trial_duration_ms == 0)) {
+        std::cerr << "--rel_ci must be >= 0 with a non-zero --trial_duration" << std::endl;
+        return 1;
+    }
+    if (histogram && (sample_chases == 0 || sample_chases > 256)) {
+        std::cerr << "--sample_chases must be within 1..256" << std::endl;
+        return 1;
+    }
+    if (testing_type_ == Testing_Type::BANDWIDTH &&
+            read_write_mix > max_read_write_mix && read_write_mix != read_write_mix_sweep) {
+        std::cerr << "--read_write_mix must be within 0.." << max_read_write_mix
+            << " or " << read_write_mix_sweep << std::endl;
+        return 1;
+    }
+    if (testing_type_ == Testing_Type::LATENCY_BANDWIDTH && read_write_mix > 3) {
+        std::cerr << "--read_write_mix must be within 0..3 for load generation" << std::endl;
+        return 1;
+    }
+    if (testing_type_ == Testing_Type::MEMCPY) {
+        if (std::find(memcpy_engines.begin(), memcpy_engines.end(), memcpy_engine) == memcpy_engines.end()) {
+            std::cerr << "unknown copy engine: " << memcpy_engine << std::endl;
+            return 1;
+        }
+        if (fragment_size_b > region_size_kb * 1024) {
+            std::cerr << "--fragment_size must be within 0.." << region_size_kb * 1024 << " (--region_size)" << std::endl;
+            return 1;
+        }
+    }
+    // auto corrections, only of chunk sizes left to the default
+    const bool default_chunk_size = vm.count("chunk_size") == 0 || vm["chunk_size"].defaulted();
+    if (default_chunk_size && (use_hugepage > 0 || chunk_size_kb > region_size_kb)) {
         chunk_size_kb = region_size_kb;
     }
+    if (testing_type_ == Testing_Type::LATENCY || testing_type_ == Testing_Type::LATENCY_BANDWIDTH) {
+        if (chunk_size_kb == 0 || chunk_size_kb > region_size_kb) {
+            std::cerr << "--chunk_size must be within 1.." << region_size_kb << " (--region_size)" << std::endl;
+            return 1;
+        }
+        if (stride_size_b < sizeof(uint64_t) || stride_size_b > chunk_size_kb * 1024) {
+            std::cerr << "--stride_size must be within " << sizeof(uint64_t) << ".." << chunk_size_kb * 1024
+                << " (--chunk_size)" << std::endl;
+            return 1;
+        }
+    }
     return 0;
 }
 
@@ -224,6 +429,14 @@ std::string Configuration::get_str_rw_mix(uint32_t x_rw_mix) const {
         return "2:1 read/write";
     } else if (x_rw_mix == 3) {
         return "3:1 read/write";
+    } else if (x_rw_mix == 4) {
+        return "all writes";
+    } else if (x_rw_mix == 5) {
+        return "all non-temporal writes";
+    } else if (x_rw_mix == 6) {
+        return "1:1 read/non-temporal write";
+    } else if (x_rw_mix == 7) {
+        return "read-modify-write";
     } else if (x_rw_mix == read_write_mix_sweep) {
         return "sweep read/write ratio";
     } else {
@@ -231,7 +444,41 @@ std::string Configuration::get_str_rw_mix(uint32_t x_rw_mix) const {
     }
 }
 
+std::string Configuration::get_str_memcpy_engine(const std::string& x_engine) const {
+    if (x_engine == "glibc") {
+        return "glibc memcpy";
+    } else if (x_engine == "movsb") {
+        return "rep movsb";
+    } else if (x_engine == "sse2") {
+        return "16B SSE2 loads/stores";
+    } else if (x_engine == "sse2_nt") {
+        return "16B SSE2 loads, non-temporal stores";
+    } else if (x_engine == "avx") {
+        return "32B AVX loads/stores";
+    } else if (x_engine == "avx_nt") {
+        return "32B AVX loads, non-temporal stores";
+    } else {
+        return "invalid";
+    }
+}
+
 void Configuration::dump() const {
+    if (is_jsonl()) {
+        JsonRecord record;
+        record.add("type", "config")
+            .add("test", get_test_name())
+            .add("timestamp_ns", get_timestamp_ns())
+            .add("num_numa_nodes", numa_config.num_numa_nodes)
+            .add("config", to_json());
+        if (plan_point >= 0) {
+            record.add("plan_point", plan_point);
+        }
+        record.emit(std::cout);
+        return;
+    }
+    if (plan_point >= 0) {
+        std::cout << "plan point:        " << plan_point << std::endl;
+    }
     std::cout << "threads:           " << num_threads << std::endl;
     if (testing_type_ < Testing_Type::BRANCH_THROUGHPUT) {
         std::cout << "region size in KB: " << region_size_kb << std::endl;
@@ -243,11 +490,18 @@ void Configuration::dump() const {
         std::cout << get_str_access_pattern(access_pattern) << std::endl;
         std::cout << "use hugepage:      " << use_hugepage << " - ";
         std::cout << get_str_huge_page(use_hugepage) << std::endl;
+        if (histogram) {
+            std::cout << "histogram:         " << sample_chases << (sample_chases == 1 ? " chase" : " chases") << " per sample"
+                << (sample_chases >= 256 ? " (batch means)" : "") << std::endl;
+        }
     }
     if (testing_type_ == Testing_Type::BANDWIDTH || testing_type_ == Testing_Type::LATENCY_BANDWIDTH) {
         std::cout << "read/write mix:    " << read_write_mix << " - ";
         std::cout << get_str_rw_mix(read_write_mix) << std::endl;
     }
+    if (testing_type_ == Testing_Type::LATENCY_BANDWIDTH && adaptive_delays) {
+        std::cout << "adaptive delays:   up to " << delay_budget << " points" << std::endl;
+    }
     if (testing_type_ == Testing_Type::MEMCPY) {
         if (fragment_size_b % 1024 == 0) {
             std::cout << "copy size in KB:   " << fragment_size_b / 1024;
@@ -255,8 +509,94 @@ void Configuration::dump() const {
             std::cout << "copy size in B:    " << fragment_size_b;
         }
         std::cout << std::endl;
+        std::cout << "copy engine:       " << memcpy_engine << " - ";
+        std::cout << get_str_memcpy_engine(memcpy_engine) << std::endl;
     }
     std::cout << "target duration:   " << target_duration_s << std::endl;
+    if (perf_counters) {
+        std::cout << "perf counters:     on" << (perf_events.empty() ? "" : " + " + perf_events) << std::endl;
+    }
+    if (is_adaptive()) {
+        std::cout << "adaptive:          " << trial_duration_ms << "ms trials until 95% CI within +/-"
+            << rel_ci * 100 << "%, max " << get_max_duration_s() << " sec" << std::endl;
+    }
+}
+
+uint32_t Configuration::get_trial_duration_ms() const {
+    return is_adaptive() ? trial_duration_ms : target_duration_s * 1000;
+}
+
+double Configuration::get_max_duration_s() const {
+    return (max_duration_s > 0) ? max_duration_s : target_duration_s;
+}
+
+std::string Configuration::get_test_name() const {
+    if (testing_type_ == Testing_Type::LATENCY) {
+        return "idle_latency";
+    } else if (testing_type_ == Testing_Type::BANDWIDTH) {
+        return "peak_bandwidth";
+    } else if (testing_type_ == Testing_Type::LATENCY_BANDWIDTH) {
+        return "loaded_latency";
+    } else if (testing_type_ == Testing_Type::MEMCPY) {
+        return "memcpy";
+    } else if (testing_type_ == Testing_Type::BRANCH_THROUGHPUT) {
+        return "branch_throughput";
+    } else {
+        return "invalid";
+    }
+}
+
+JsonRecord Configuration::to_json() const {
+    JsonRecord record;
+    record.add("threads", num_threads);
+    if (testing_type_ < Testing_Type::BRANCH_THROUGHPUT) {
+        record.add("region_size_kb", region_size_kb);
+    }
+    if (testing_type_ == Testing_Type::LATENCY || testing_type_ == Testing_Type::LATENCY_BANDWIDTH) {
+        record.add("chunk_size_kb", chunk_size_kb)
+            .add("stride_size_b", stride_size_b)
+            .add("access_pattern", access_pattern)
+            .add("use_hugepage", use_hugepage)
+            .add("seed", seed);
+        if (histogram) {
+            record.add("sample_chases", sample_chases);
+        }
+    }
+    if (testing_type_ == Testing_Type::BANDWIDTH || testing_type_ == Testing_Type::LATENCY_BANDWIDTH) {
+        record.add("read_write_mix", read_write_mix);
+    }
+    if (testing_type_ == Testing_Type::LATENCY_BANDWIDTH && adaptive_delays) {
+        record.add("adaptive_delays", adaptive_delays)
+            .add("delay_budget", delay_budget);
+    }
+    if (testing_type_ == Testing_Type::MEMCPY) {
+        record.add("fragment_size_b", fragment_size_b)
+            .add("engine", memcpy_engine);
+    }
+    record.add("target_duration", target_duration_s);
+    if (perf_counters) {
+        record.add("perf_counters", perf_counters)
+            .add("perf_events", perf_events);
+    }
+    if (is_adaptive()) {
+        record.add("rel_ci", rel_ci)
+            .add("trial_duration_ms", trial_duration_ms)
+            .add("max_duration", get_max_duration_s());
+    }
+    return record;
+}
+
+JsonRecord Configuration::make_data_record(const std::string& metric) const {
+    JsonRecord record;
+    record.add("type", "data")
+        .add("test", get_test_name())
+        .add("metric", metric)
+        .add("timestamp_ns", get_timestamp_ns())
+        .add("config", to_json());
+    if (plan_point >= 0) {
+        record.add("plan_point", plan_point);
+    }
+    return record;
 }
 
 }
@@ -1,10 +1,13 @@
 #ifndef __LIB_CONFIGURATION_H__
 #define __LIB_CONFIGURATION_H__
 
+#include <functional>
 #include <memory>
 #include <string>
+#include <vector>
 #include <boost/program_options.hpp>
 
+#include "common/json_record.h"
 #include "common/numa_config.h"
 
 namespace mm_utils {
@@ -30,10 +33,32 @@ class Configuration {
     int parse_options(int argc, char** argv);
     void dump() const;
 
+    // batch mode: call run_point once per line of the --plan file, with the
+    // command line re-parsed under that line's options each time, or once
+    // without --plan; every line is checked before the first point runs;
+    // returns the first non-zero result of run_point
+    int run_plan(int argc, char** argv, const std::function<int(Configuration&)>& run_point);
+    bool has_plan() const { return !plan_file.empty(); }
+    // bytes of memory regions to keep for reuse across plan points
+    uint64_t get_plan_cache_bytes() const;
+
+    // machine-readable output
+    bool is_jsonl() const { return output_format == "jsonl"; }
+    std::string get_test_name() const;
+    JsonRecord to_json() const;
+    // a data point record with test name, timestamp and config filled in
+    JsonRecord make_data_record(const std::string& metric) const;
+
+    // adaptive duration: repeat short trials until the CI of the mean is narrow enough
+    bool is_adaptive() const { return rel_ci > 0; }
+    uint32_t get_trial_duration_ms() const;
+    double get_max_duration_s() const;
+
     std::string get_str_access_pattern(uint32_t x_access_pattern) const;
     std::string get_str_access_pattern_short(uint32_t x_access_pattern) const;
     std::string get_str_huge_page(uint32_t x_huge_page) const;
     std::string get_str_rw_mix(uint32_t x_rw_mix) const;
+    std::string get_str_memcpy_engine(const std::string& x_engine) const;
 
     const mm_utils::NumaConfig numa_config;
 
@@ -45,24 +70,47 @@ class Configuration {
     uint32_t chunk_size_kb = 128;
     uint32_t stride_size_b = 64;
     uint64_t fragment_size_b = 4096;
+    std::string memcpy_engine = "glibc";
     uint32_t use_hugepage = 0;
     uint32_t read_write_mix = 0;
     int32_t  load_gen_delay = 0;
+    bool     adaptive_delays = false;
+    uint32_t delay_budget = 12;
     uint32_t target_duration_s = 10;
+    double   rel_ci = 0;
+    uint32_t trial_duration_ms = 100;
+    uint32_t max_duration_s = 0;
     bool     latency_matrix = false;
     bool     bandwidth_matrix = false;
     bool     memcpy_matrix = false;
+    bool     perf_counters = false;
+    std::string perf_events = "";
+    std::string output_format = "text";
+    std::string plan_file = "";
+    uint64_t plan_cache_mb = 0;
+    uint64_t seed = 0;
+    uint32_t init_threads = 0;
+    bool     histogram = false;
+    uint32_t sample_chases = 1;
+    // index of the running --plan point; -1 without --plan
+    int32_t  plan_point = -1;
 
     const uint32_t read_write_mix_sweep = 100;
+    // 4 - 7 peak bandwidth only, no load generation kernels
+    const uint32_t max_read_write_mix = 7;
+    const std::vector<std::string> memcpy_engines = {"glibc", "movsb", "sse2", "sse2_nt", "avx", "avx_nt"};
 
   private:
     Testing_Type testing_type_;
     std::shared_ptr<po::options_description> desc_ = nullptr;
 
     void add_generic_options_();
+    void add_adaptive_options_();
     void add_latency_options_();
     void add_bandwidth_options_();
     void add_memcpy_options_();
+    int check_options_(po::variables_map& vm);
+    int parse_plan_point_(int argc, char** argv, const std::vector<std::string>& point_args);
 };
 
 }
@@ -1,6 +1,7 @@
 #ifndef __WORKER_BANDWIDTH_H__
 #define __WORKER_BANDWIDTH_H__
 
+#include <algorithm>
 #include <iostream>
 #include <sstream>
 #include <string>
@@ -13,19 +14,29 @@ namespace mm_worker {
 void* mem_region_alloc_bw(void* ptr) {
     MemLatBwThreadPacket* pkt = static_cast<MemLatBwThreadPacket*>(ptr);
     pkt->mem_region = std::make_shared<mm_utils::MemRegion>(
+        pkt->region_size_kb * 1024,
         pkt->region_size_kb * 1024,
         4096,
         64,
-        static_cast<mm_utils::MemType>(pkt->mem_type)
+        static_cast<mm_utils::MemType>(pkt->mem_type),
+        mm_utils::HugePageType::NONE,
+        pkt->init_threads
     );
     return nullptr;
 }
 
+// everything mem_region_alloc_bw builds the region from
+std::string get_bw_region_layout(const MemLatBwThreadPacket& pkt) {
+    std::stringstream ss;
+    ss << "bw:" << pkt.region_size_kb << ":" << pkt.mem_type;
+    return ss.str();
+}
+
 
 void* bw_sequential(void* ptr) {
     MemLatBwThreadPacket* pkt = static_cast<MemLatBwThreadPacket*>(ptr);
     // setup checkpoint
-    int64_t target_duration_ns = static_cast<int64_t>(pkt->target_duration) * 1000000000;
+    const int64_t target_duration_ns = pkt->get_target_duration_ns();
     uint64_t per_core_bw_mbps = 0;
     if (pkt->ref_total_bw_gbps > 0) {
         // actual per-core BW that varies with delays
@@ -35,8 +46,12 @@ void* bw_sequential(void* ptr) {
         per_core_bw_mbps = 2 * 1024 * pkt->num_total_threads / pkt->getNumThreads();
     }
     // to get 4ms checkpoint
-    const uint64_t chkpt_bytes = per_core_bw_mbps * 1024 * 1024 * 4 / 1000;
+    uint64_t chkpt_bytes = per_core_bw_mbps * 1024 * 1024 * 4 / 1000;
     const uint64_t loop_bytes = 256 * 32;
+    // keep checkpoints within 0.5% of short (adaptive) trials
+    if (target_duration_ns < CHKPT_SHORT_TRIAL_NS) {
+        chkpt_bytes = std::max(chkpt_bytes * target_duration_ns / CHKPT_SHORT_TRIAL_NS, loop_bytes);
+    }
     const uint64_t loop_count = pkt->mem_region->activeSize() / loop_bytes;
     mm_utils::Timer timer_exec;
     // calculate BW
@@ -72,10 +87,10 @@ void* bw_sequential(void* ptr) {
     pkt->exec_time = timer_exec.getElapsedTime();
     pkt->finished_bytes += pkt->finished_bytes * write_fraction;
     if (pkt->ref_total_bw_gbps > 0 &&
-        timer_exec.getElapsedTime() > pkt->target_duration * TIMER_THRESHOLD) {
+        timer_exec.getElapsedTimeNs() > target_duration_ns * TIMER_THRESHOLD) {
         std::stringstream ss;
         ss << "elapsed time (s) exec=" << timer_exec.getElapsedTime()
-           << " target=" << pkt->target_duration
+           << " target=" << target_duration_ns / 1e9
            << " thread_id=" << pkt->getThreadId()
            << " bandwidth num_chkpts=" << num_chkpts
            << " finished_bytes=" << pkt->finished_bytes
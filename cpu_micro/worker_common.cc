@@ -13,7 +13,10 @@ float get_write_fraction(uint32_t read_write_mix) {
         return 0.5;
     } else if (read_write_mix == 3) {
         return 0.3333;
+    } else if (read_write_mix == 7) {
+        return 1.0;
     } else {
+        // 4 - 6 read or write each line, never both
         return 0;
     }
 }
@@ -7,6 +7,8 @@
 namespace mm_worker {
 
 #define TIMER_THRESHOLD (double)1.01
+// trials shorter than 200x the default 4ms checkpoint use finer checkpoints
+#define CHKPT_SHORT_TRIAL_NS (int64_t)800000000
 
 using func_kernel_lat = std::function<void(uint64_t&, uint64_t*&)>;
 using func_kernel_bw = std::function<void(uint64_t&, uint64_t*&)>;
@@ -1,6 +1,8 @@
 #ifndef __WORKER_LATENCY_H__
 #define __WORKER_LATENCY_H__
 
+#include <algorithm>
+#include <chrono>
 #include <iostream>
 #include <sstream>
 #include <string>
@@ -13,11 +15,15 @@ namespace mm_worker {
 void* mem_region_alloc_lat(void* ptr) {
     MemLatBwThreadPacket* pkt = static_cast<MemLatBwThreadPacket*>(ptr);
     pkt->mem_region = std::make_shared<mm_utils::MemRegion>(
+        pkt->region_size_kb * 1024,
         pkt->region_size_kb * 1024,
         pkt->chunk_size_kb * 1024,
         pkt->stride_size_b,
         static_cast<mm_utils::MemType>(pkt->mem_type),
-        static_cast<mm_utils::HugePageType>(pkt->use_hugepage)
+        static_cast<mm_utils::HugePageType>(pkt->use_hugepage),
+        pkt->init_threads,
+        // a chain of its own per thread
+        pkt->seed + pkt->getThreadId()
     );
     if (pkt->access_pattern == 0) {
         pkt->mem_region->stride_init();
@@ -31,14 +37,55 @@ void* mem_region_alloc_lat(void* ptr) {
     return nullptr;
 }
 
+// everything mem_region_alloc_lat builds the region and pointer chain from
+std::string get_lat_region_layout(const MemLatBwThreadPacket& pkt) {
+    std::stringstream ss;
+    ss << "lat:" << pkt.region_size_kb << ":" << pkt.chunk_size_kb << ":" << pkt.stride_size_b
+       << ":" << pkt.access_pattern << ":" << pkt.use_hugepage << ":" << pkt.mem_type << ":" << pkt.seed;
+    return ss.str();
+}
+
+
+// one latency_hist sample after each batch of chases: the batch itself, timed
+// from the end of the previous one, or sample_chases more chases timed on
+// their own, less the cost of reading the clock
+inline void sample_latency(
+    MemLatBwThreadPacket* pkt,
+    uint64_t*& p,
+    uint64_t batch_chases,
+    std::chrono::steady_clock::time_point& last
+) {
+    if (pkt->sample_chases >= batch_chases) {
+        auto now = std::chrono::steady_clock::now();
+        pkt->latency_hist.add(std::chrono::duration<double, std::nano>(now - last).count() / batch_chases);
+        last = now;
+        return;
+    }
+    // the batch kernel already loaded the line p points to; step past it
+    p = reinterpret_cast<uint64_t*>(*p);
+    auto begin = std::chrono::steady_clock::now();
+    // the first load could start before the clock is read; make its address
+    // depend on the reading (the mask is always 0)
+    const uintptr_t zero = static_cast<uintptr_t>(begin.time_since_epoch().count()) & (pkt->sample_chases >> 16);
+    p = reinterpret_cast<uint64_t*>(reinterpret_cast<uintptr_t>(p) | zero);
+    for (uint32_t i = 0; i < pkt->sample_chases; ++i) {
+        p = reinterpret_cast<uint64_t*>(*p);
+    }
+    auto end = std::chrono::steady_clock::now();
+    double elapsed_ns = std::chrono::duration<double, std::nano>(end - begin).count() -
+        mm_utils::get_clock_overhead_ns();
+    pkt->latency_hist.add(std::max(elapsed_ns, 0.0) / pkt->sample_chases);
+    pkt->finished_chases += pkt->sample_chases + 1;
+}
 
 void* lat_ptr(void* ptr) {
     MemLatBwThreadPacket* pkt = static_cast<MemLatBwThreadPacket*>(ptr);
     // setup checkpoint
-    int64_t target_duration_ns = static_cast<int64_t>(pkt->target_duration) * 1000000000;
+    const int64_t target_duration_ns = pkt->get_target_duration_ns();
     const uint64_t loop_chases = 256;
     const uint64_t loop_bytes = loop_chases * pkt->mem_region->lineSize();
-    const uint64_t loop_count = pkt->mem_region->activeSize() / loop_bytes;
+    // regions of fewer than loop_chases lines go around the chain within a batch
+    const uint64_t loop_count = std::max<uint64_t>(pkt->mem_region->activeSize() / loop_bytes, 1);
     uint64_t chkpt_chases = (4 << 20);  // 4ms checkpoint if 1ns per chase
     if (pkt->ref_latency_ps > 0) {
         chkpt_chases = chkpt_chases / pkt->ref_latency_ps * 1000;
@@ -53,6 +100,10 @@ void* lat_ptr(void* ptr) {
             chkpt_chases /= 2;      // ~2ns
         }
     }
+    // keep checkpoints within 0.5% of short (adaptive) trials
+    if (target_duration_ns < CHKPT_SHORT_TRIAL_NS) {
+        chkpt_chases = std::max(chkpt_chases * target_duration_ns / CHKPT_SHORT_TRIAL_NS, loop_chases);
+    }
     mm_utils::Timer timer_exec;
     // run
     uint64_t* const start = (uint64_t*)(pkt->mem_region->getStartPoint());
@@ -62,12 +113,21 @@ void* lat_ptr(void* ptr) {
     uint32_t num_chkpts = 0;
     uint64_t next_chkpt_chases = chkpt_chases;
     pkt->finished_chases = 0;
+    pkt->latency_hist.clear();
+    const bool record = pkt->sample_chases > 0;
+    if (record) {
+        mm_utils::get_clock_overhead_ns();
+    }
     timer_exec.startTimer();
+    auto last_sample = std::chrono::steady_clock::now();
     while (true) {
         p = start;
         for (i = 0; i < loop_count; ++i) {
             pkt->kernel_lat(ret, p);
             pkt->finished_chases += loop_chases;
+            if (record) {
+                sample_latency(pkt, p, loop_chases, last_sample);
+            }
             if (pkt->finished_chases > next_chkpt_chases) {
                 timer_exec.endTimer();
                 next_chkpt_chases += chkpt_chases;
@@ -84,10 +144,10 @@ void* lat_ptr(void* ptr) {
     }
     pkt->exec_time = timer_exec.getElapsedTime();
     if (pkt->ref_latency_ps > 0 &&
-        timer_exec.getElapsedTime() > pkt->target_duration * TIMER_THRESHOLD) {
+        timer_exec.getElapsedTimeNs() > target_duration_ns * TIMER_THRESHOLD) {
         std::stringstream ss;
         ss << "elapsed time (s) exec=" << timer_exec.getElapsedTime()
-           << " target=" << pkt->target_duration
+           << " target=" << target_duration_ns / 1e9
            << " thread_id=" << pkt->getThreadId()
            << " latency num_chkpts=" << num_chkpts
            << " finished_chases=" << pkt->finished_chases
@@ -11,17 +11,28 @@
 
 namespace mm_worker {
 
+// one region of twice the size: the copies go from its second half to its first
 void* mem_region_alloc_memcpy(void* ptr) {
     MemLatBwThreadPacket* pkt = static_cast<MemLatBwThreadPacket*>(ptr);
     pkt->mem_region = std::make_shared<mm_utils::MemRegion>(
-        pkt->region_size_kb * 1024, 4096, 64
-    );
-    pkt->src_mem_region = std::make_shared<mm_utils::MemRegion>(
-        pkt->region_size_kb * 1024, 4096, 64
+        pkt->region_size_kb * 1024 * 2,
+        pkt->region_size_kb * 1024 * 2,
+        4096,
+        64,
+        static_cast<mm_utils::MemType>(pkt->mem_type),
+        mm_utils::HugePageType::NONE,
+        pkt->init_threads
     );
     return nullptr;
 }
 
+// everything mem_region_alloc_memcpy builds the region from
+std::string get_memcpy_region_layout(const MemLatBwThreadPacket& pkt) {
+    std::stringstream ss;
+    ss << "memcpy:" << pkt.region_size_kb << ":" << pkt.mem_type;
+    return ss.str();
+}
+
 
 void* copy_fragment(void* ptr) {
     MemLatBwThreadPacket* pkt = static_cast<MemLatBwThreadPacket*>(ptr);
@@ -31,10 +42,10 @@ void* copy_fragment(void* ptr) {
     if (pkt->ref_one_exec_time_ns > 0) {
         chkpt_calls = std::max(5 * 1000000 / pkt->ref_one_exec_time_ns, (uint64_t)1);
     }
-    const uint64_t loop_count = pkt->mem_region->activeSize() / pkt->fragment_size;
+    const uint64_t loop_count = pkt->mem_region->activeSize() / 2 / pkt->fragment_size;
     mm_utils::Timer timer_exec;
     // run
-    void* const src_buffer = (void*)(pkt->src_mem_region->getStartPoint());
+    void* const src_buffer = (void*)(pkt->mem_region->getHalfPoint());
     void* const dst_buffer = (void*)(pkt->mem_region->getStartPoint());
     uint64_t i = 0;
     uint32_t num_chkpts = 0;
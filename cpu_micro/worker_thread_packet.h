@@ -1,7 +1,15 @@
 #ifndef __WORKER_THREAD_PACKET_H__
 #define __WORKER_THREAD_PACKET_H__
 
+#include <algorithm>
+#include <cstdint>
+#include <map>
+#include <string>
+#include <utility>
+#include <vector>
+
 #include "common/mem_region.h"
+#include "common/stats.h"
 #include "common/worker_thread_manager.h"
 #include "cpu_micro/lib_configuration.h"
 #include "cpu_micro/worker_common.h"
@@ -12,8 +20,18 @@ class CpuMicroThreadPacket : public mm_utils::BaseThreadPacket {
   public:
     // common
     uint32_t target_duration = 0;
+    // overrides target_duration (in sec) when > 0
+    uint32_t target_duration_ms = 0;
     // output
     double exec_time = 0;
+
+  public:
+    int64_t get_target_duration_ns() const {
+        if (target_duration_ms > 0) {
+            return static_cast<int64_t>(target_duration_ms) * 1000000;
+        }
+        return static_cast<int64_t>(target_duration) * 1000000000;
+    }
 };
 
 
@@ -21,7 +39,6 @@ class MemLatBwThreadPacket : public CpuMicroThreadPacket {
   public:
     ~MemLatBwThreadPacket() {
         mem_region.reset();
-        src_mem_region.reset();
     }
 
     mm_utils::MemRegion::Handle mem_region = nullptr;
@@ -31,24 +48,28 @@ class MemLatBwThreadPacket : public CpuMicroThreadPacket {
     uint32_t chunk_size_kb = 0;
     uint32_t stride_size_b = 0;
     uint32_t use_hugepage = 0;
+    uint64_t seed = 0;
+    uint32_t init_threads = 1;
     // numa config
     int32_t mem_type = 0;
     // latency thread
     func_kernel_lat kernel_lat;
     uint32_t ref_latency_ps = 0;
+    // chases per latency_hist sample; 0 - no histogram
+    uint32_t sample_chases = 0;
     // bandwidth thread
     func_kernel_bw kernel_bw;
     uint32_t read_write_mix = 0;
     uint32_t ref_total_bw_gbps = 0;
     uint32_t num_total_threads = 0;
     // memcpy thread
-    mm_utils::MemRegion::Handle src_mem_region = nullptr;
     func_kernel_memcpy kernel_memcpy;
     uint64_t fragment_size = 0;
     uint64_t ref_one_exec_time_ns = 0;
     // output
     uint64_t finished_chases = 0;
     uint64_t finished_bytes = 0;
+    mm_utils::LatencyHistogram latency_hist;
 
   public:
     void copy_mem_region_config(const mm_utils::Configuration& config) {
@@ -57,6 +78,7 @@ class MemLatBwThreadPacket : public CpuMicroThreadPacket {
         chunk_size_kb = config.chunk_size_kb;
         stride_size_b = config.stride_size_b;
         use_hugepage = config.use_hugepage;
+        seed = config.seed;
     }
 };
 
@@ -78,9 +100,135 @@ void prepare_mem_lat_bw_thread_packet(
 ) {
     // default mem_type is mm_utils::MemType::NATIVE
     int mem_type = static_cast<int>(mm_utils::MemType::NODE0) + node;
+    // worker threads set up their regions at the same time, so share the CPUs
+    uint32_t init_threads = config.init_threads;
+    if (init_threads == 0) {
+        init_threads = std::max<uint32_t>(
+            config.numa_config.all_allowed_cpus.size() / worker_manager.getNumThreads(), 1);
+    }
     for (uint32_t i = 0; i < worker_manager.getNumThreads(); ++i) {
         worker_manager.getPacket(i).copy_mem_region_config(config);
         worker_manager.getPacket(i).mem_type = mem_type;
+        worker_manager.getPacket(i).init_threads = init_threads;
+    }
+}
+
+
+/*
+ * Memory regions (and their pointer chains) kept across the points of a
+ * --plan, keyed by the allocating routine's layout, the thread and the CPUs it
+ * runs on, so a point with the same layout as an earlier one skips the setup.
+ * Idle regions are freed least recently used first beyond the byte budget, and
+ * idle huge page regions before any new allocation, as the huge page pools
+ * are reserved for one run's regions only.
+ */
+class MemRegionCache {
+  public:
+    using func_layout = std::string (*)(const MemLatBwThreadPacket&);
+
+    // 0 disables caching
+    void setBudget(uint64_t budget_bytes) { budget_bytes_ = budget_bytes; }
+
+    // give each thread matching pred its cached region, and allocate the
+    // missing ones with alloc_routine in the (bound) threads; cpu_scope names
+    // the CPUs the worker manager runs on, e.g. its CPU node
+    template <class UnaryPredicate>
+    uint32_t setup(
+        MemLatBwManager& worker_manager,
+        void *(*alloc_routine)(void *),
+        func_layout layout,
+        const std::string& cpu_scope,
+        UnaryPredicate pred);
+
+    uint32_t setup(
+        MemLatBwManager& worker_manager,
+        void *(*alloc_routine)(void *),
+        func_layout layout,
+        const std::string& cpu_scope) {
+        return setup(worker_manager, alloc_routine, layout, cpu_scope, [](const uint32_t&) { return true; });
+    }
+
+  private:
+    struct Entry {
+        mm_utils::MemRegion::Handle region;
+        uint64_t last_use = 0;
+    };
+
+    bool is_idle_(const Entry& entry) const { return entry.region.use_count() == 1; }
+    void evict_(uint64_t keep_bytes, bool hugepage_only);
+
+    std::map<std::string, Entry> entries_;
+    uint64_t budget_bytes_ = 0;
+    uint64_t tick_ = 0;
+};
+
+template <class UnaryPredicate>
+uint32_t MemRegionCache::setup(
+    MemLatBwManager& worker_manager,
+    void *(*alloc_routine)(void *),
+    func_layout layout,
+    const std::string& cpu_scope,
+    UnaryPredicate pred
+) {
+    const uint32_t num_threads = worker_manager.getNumThreads();
+    std::vector<std::string> keys(num_threads);
+    std::vector<bool> missing(num_threads, false);
+    uint32_t num_missing = 0;
+    tick_ += 1;
+    for (uint32_t i = 0; i < num_threads; ++i) {
+        if (!pred(i)) {
+            continue;
+        }
+        MemLatBwThreadPacket& pkt = worker_manager.getPacket(i);
+        // drop the region of the previous point so it counts as idle
+        pkt.mem_region.reset();
+        keys[i] = cpu_scope + "/" + std::to_string(num_threads) + "/" + std::to_string(i) + "/" + layout(pkt);
+        auto it = entries_.find(keys[i]);
+        if (budget_bytes_ > 0 && it != entries_.end()) {
+            pkt.mem_region = it->second.region;
+            it->second.last_use = tick_;
+        } else {
+            missing[i] = true;
+            num_missing += 1;
+        }
+    }
+    if (num_missing == 0) {
+        return 0;
+    }
+    evict_(budget_bytes_, true);
+    worker_manager.clearRoutines();
+    worker_manager.setRoutine(alloc_routine, [&missing](const uint32_t& idx) { return missing[idx]; });
+    worker_manager.run();
+    if (budget_bytes_ > 0) {
+        for (uint32_t i = 0; i < num_threads; ++i) {
+            if (missing[i]) {
+                Entry& entry = entries_[keys[i]];
+                entry.region = worker_manager.getPacket(i).mem_region;
+                entry.last_use = tick_;
+            }
+        }
+        evict_(budget_bytes_, false);
+    }
+    return num_missing;
+}
+
+void MemRegionCache::evict_(uint64_t keep_bytes, bool hugepage_only) {
+    uint64_t total_bytes = 0;
+    std::vector<std::pair<uint64_t, std::string>> idle;
+    for (auto& item : entries_) {
+        total_bytes += item.second.region->size();
+        bool hugepage = item.second.region->hugePageType() > mm_utils::HugePageType::NONE;
+        if (is_idle_(item.second) && (hugepage || !hugepage_only)) {
+            idle.emplace_back(item.second.last_use, item.first);
+        }
+    }
+    std::sort(idle.begin(), idle.end());
+    for (auto& item : idle) {
+        if (!hugepage_only && total_bytes <= keep_bytes) {
+            break;
+        }
+        total_bytes -= entries_[item.second].region->size();
+        entries_.erase(item.second);
     }
 }
 
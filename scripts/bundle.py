@@ -0,0 +1,253 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple
+
+from print_host_info import color_str
+from transport import LocalTransport, SshTransport
+from utils import read_env
+
+# what a host needs to run the tests without building
+BUNDLE_PATHS = ["bin", "scripts", "run.sh", "README.md"]
+EXCLUDE_NAMES = ["__pycache__", ".pytest_cache"]
+
+
+def get_default_store_dir() -> str:
+    return os.path.join(read_env()["ROOT"], "results", "bundles")
+
+
+def hash_file(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def iter_bundle_files(root: str, paths: List[str]):
+    for path in paths:
+        full_path = os.path.join(root, path)
+        if os.path.isfile(full_path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(full_path):
+            dirnames[:] = sorted(x for x in dirnames if x not in EXCLUDE_NAMES)
+            for filename in sorted(filenames):
+                if filename.endswith(".pyc"):
+                    continue
+                yield os.path.relpath(os.path.join(dirpath, filename), root)
+
+
+class BundleStore:
+    """
+    local content-addressed store: blobs/<sha256> holds file contents once,
+    manifests/<id>.json maps relative paths to blobs and file modes
+    """
+
+    def __init__(self, store_dir: str = None):
+        self.store_dir = store_dir or get_default_store_dir()
+        self.blob_dir = os.path.join(self.store_dir, "blobs")
+        self.manifest_dir = os.path.join(self.store_dir, "manifests")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+
+    def get_blob_path(self, sha: str) -> str:
+        return os.path.join(self.blob_dir, sha)
+
+    def create(self, root: str, paths: List[str] = BUNDLE_PATHS) -> Tuple[str, Dict]:
+        """
+        snapshot the given paths under root; returns the manifest id and manifest
+        """
+        files = {}
+        for relpath in iter_bundle_files(root, paths):
+            full_path = os.path.join(root, relpath)
+            sha = hash_file(full_path)
+            blob_path = self.get_blob_path(sha)
+            if not os.path.exists(blob_path):
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                shutil.copyfile(full_path, tmp_path)
+                os.replace(tmp_path, blob_path)
+            files[relpath] = {
+                "sha256": sha,
+                "mode": os.stat(full_path).st_mode & 0o777,
+                "size": os.path.getsize(full_path),
+            }
+        manifest = {"created": time.time(), "files": files}
+        manifest_id = hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        with open(os.path.join(self.manifest_dir, f"{manifest_id}.json"), "w") as fp:
+            json.dump(manifest, fp, indent=1, sort_keys=True)
+        return manifest_id, manifest
+
+
+def apply_bundle(target_dir: str, manifest_text: str):
+    """
+    runs on the remote host with only the standard library: verify the blobs
+    of the changed files against the manifest and swap them into target_dir
+
+    files whose size or mtime changed since the last apply are restored too
+    """
+    import hashlib
+    import json
+    import os
+    import shutil
+
+    target_dir = os.path.expanduser(target_dir)
+    bundle_dir = os.path.join(target_dir, ".bundle")
+    manifest = json.loads(manifest_text)
+    state_path = os.path.join(bundle_dir, "state.json")
+    old_state = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r") as fp:
+            old_state = json.load(fp)
+    state = {}
+    updated = 0
+    for relpath, entry in manifest["files"].items():
+        dst_path = os.path.join(target_dir, relpath)
+        old_entry = old_state.get(relpath, {})
+        if old_entry.get("sha256") == entry["sha256"] and os.path.exists(dst_path):
+            stat = os.stat(dst_path)
+            if [stat.st_size, stat.st_mtime_ns] == [old_entry.get("size"), old_entry.get("mtime_ns")]:
+                if stat.st_mode & 0o777 != entry["mode"]:
+                    os.chmod(dst_path, entry["mode"])
+                state[relpath] = old_entry
+                continue
+        blob_path = os.path.join(bundle_dir, "blobs", entry["sha256"])
+        sha = hashlib.sha256()
+        with open(blob_path, "rb") as fp:
+            for block in iter(lambda: fp.read(1 << 20), b""):
+                sha.update(block)
+        if sha.hexdigest() != entry["sha256"]:
+            os.remove(blob_path)
+            raise SystemExit(f"hash mismatch for {relpath}; blob removed")
+        os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+        tmp_path = dst_path + ".bundle-tmp"
+        shutil.copyfile(blob_path, tmp_path)
+        os.chmod(tmp_path, entry["mode"])
+        os.replace(tmp_path, dst_path)
+        stat = os.stat(dst_path)
+        state[relpath] = {"sha256": entry["sha256"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        updated += 1
+    removed = 0
+    for relpath in old_state:
+        if relpath not in manifest["files"] and os.path.exists(os.path.join(target_dir, relpath)):
+            os.remove(os.path.join(target_dir, relpath))
+            removed += 1
+    with open(state_path + ".tmp", "w") as fp:
+        json.dump(state, fp)
+    os.replace(state_path + ".tmp", state_path)
+    print(json.dumps({"updated": updated, "removed": removed, "files": len(manifest["files"])}))
+
+
+def run_remote(transport, command: str, timeout: float, input_bytes: bytes = None) -> str:
+    proc = transport.popen(command, stdin=subprocess.PIPE)
+    (stdout, _) = proc.communicate(input_bytes, timeout=timeout)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, command, stdout)
+    return stdout.decode("utf-8")
+
+
+def distribute_bundle(transport, store: BundleStore, manifest: Dict, target_path: str, timeout: float) -> Dict:
+    """
+    send only the blobs the host does not have yet, then verify and apply the
+    manifest there; returns the host's summary plus the number of blobs sent
+    """
+    remote_blob_dir = os.path.join(target_path, ".bundle", "blobs")
+    stdout = run_remote(transport, f"mkdir -p {remote_blob_dir} && ls {remote_blob_dir}", timeout)
+    have: Set[str] = set(stdout.split())
+    missing = sorted({x["sha256"] for x in manifest["files"].values()} - have)
+    if missing:
+        proc = transport.popen(f"tar -C {remote_blob_dir} -xf -", stdin=subprocess.PIPE)
+        with tarfile.open(fileobj=proc.stdin, mode="w|") as tar:
+            for sha in missing:
+                tar.add(store.get_blob_path(sha), arcname=sha)
+        proc.stdin.close()
+        stdout = proc.stdout.read()
+        proc.wait(timeout=timeout)
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, "tar", stdout)
+    script = inspect.getsource(apply_bundle) + f"\napply_bundle({target_path!r}, {json.dumps(manifest)!r})\n"
+    stdout = run_remote(transport, "python3 -", timeout, script.encode("utf-8"))
+    summary = json.loads(stdout.strip().splitlines()[-1])
+    summary["blobs_sent"] = len(missing)
+    summary["bytes_sent"] = sum(os.path.getsize(store.get_blob_path(x)) for x in missing)
+    return summary
+
+
+def main(args):
+    root = read_env()["ROOT"]
+    if args.build:
+        subprocess.run(["make"], cwd=root, check=True)
+    store = BundleStore(args.store)
+    (manifest_id, manifest) = store.create(root)
+    print(color_str(f"bundle {manifest_id}: {len(manifest['files'])} files", 35))
+    if args.command == "create":
+        return 0
+    target_path = os.path.join(args.target_path, os.path.basename(root.rstrip("/")))
+    hostnames = [x for x in args.hostname.split(",") if x]
+    control_dir = tempfile.mkdtemp(prefix="mm-mem-ssh-")
+    if args.local:
+        transports = [LocalTransport(x, args.local) for x in hostnames]
+    else:
+        transports = [SshTransport(x, control_dir, args.connect_timeout) for x in hostnames]
+
+    def push_one(transport) -> bool:
+        start_time = time.monotonic()
+        try:
+            summary = distribute_bundle(transport, store, manifest, target_path, args.timeout)
+            print(
+                color_str(f"{transport.hostname}: ", 36)
+                + f"{summary['blobs_sent']} blobs ({summary['bytes_sent'] / 1024:.0f} KB) sent, "
+                + f"{summary['updated']} files updated, {summary['removed']} removed"
+                + f" in {time.monotonic() - start_time:.2f} sec"
+            )
+            return True
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            print(color_str(f"{transport.hostname}: failed - {e}", 31))
+            return False
+        finally:
+            transport.close()
+
+    with ThreadPoolExecutor(max_workers=args.max_hosts) as executor:
+        results = list(executor.map(push_one, transports))
+    shutil.rmtree(control_dir, ignore_errors=True)
+    return 0 if all(results) else 1
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create_parser = subparsers.add_parser("create", help="snapshot bin/ and scripts/ into the local store")
+    push_parser = subparsers.add_parser("push", help="create a bundle and distribute it to hosts")
+    push_parser.add_argument(
+        "--hostname",
+        "-r",
+        type=str,
+        required=True,
+        help="target hostname; comma-separated for multiple hosts",
+    )
+    push_parser.add_argument("--target-path", "-t", type=str, default="~/", help="target path")
+    push_parser.add_argument("--max-hosts", type=int, default=32, help="max hosts to push to concurrently")
+    push_parser.add_argument("--timeout", type=float, default=300, help="seconds per host for each step")
+    push_parser.add_argument("--connect-timeout", type=int, default=10, help="ssh connect timeout in seconds")
+    push_parser.add_argument(
+        "--local", type=str, default=None, help="stand-in directory; push to <dir>/<hostname> locally"
+    )
+    for sub_parser in (create_parser, push_parser):
+        sub_parser.add_argument("--build", action="store_true", help="run make before bundling")
+        sub_parser.add_argument("--store", type=str, default=None, help="bundle store; default to results/bundles")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    sys.exit(main(args))
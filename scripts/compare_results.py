@@ -0,0 +1,258 @@
+import argparse
+import math
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from print_host_info import color_str
+from results_db import ResultsDB, get_default_db_path
+
+RUN_FILTERS = ["session", "host", "host_fingerprint", "kernel", "build_hash"]
+
+
+def betacf(a: float, b: float, x: float) -> float:
+    # continued fraction of the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1
+    qam = a - 1
+    c = 1.0
+    d = 1 - qab * x / qap
+    d = tiny if abs(d) < tiny else d
+    d = 1 / d
+    h = d
+    for m in range(1, 201):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = tiny if abs(d) < tiny else d
+        c = 1 + aa / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-12:
+            break
+    return h
+
+
+def betai(a: float, b: float, x: float) -> float:
+    """
+    regularized incomplete beta function I_x(a, b)
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x)
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * betacf(a, b, x) / a
+    return 1 - math.exp(log_front) * betacf(b, a, 1 - x) / b
+
+
+def mean_var(values: List[float]) -> Tuple[float, float]:
+    mean = sum(values) / len(values)
+    var = sum((x - mean) ** 2 for x in values) / (len(values) - 1) if len(values) > 1 else 0.0
+    return (mean, var)
+
+
+def welch_t_test(a: List[float], b: List[float]) -> Optional[Tuple[float, float, float]]:
+    """
+    (t, degrees of freedom, two-sided p-value) of Welch's unequal-variance t-test;
+    None with fewer than 2 samples on either side
+    """
+    if len(a) < 2 or len(b) < 2:
+        return None
+    (mean_a, var_a) = mean_var(a)
+    (mean_b, var_b) = mean_var(b)
+    se_a = var_a / len(a)
+    se_b = var_b / len(b)
+    if se_a + se_b == 0:
+        return (0.0, len(a) + len(b) - 2, 1.0 if mean_a == mean_b else 0.0)
+    t = (mean_b - mean_a) / math.sqrt(se_a + se_b)
+    dof = (se_a + se_b) ** 2 / (se_a**2 / (len(a) - 1) + se_b**2 / (len(b) - 1))
+    p = betai(dof / 2, 0.5, dof / (dof + t * t))
+    return (t, dof, p)
+
+
+def hedges_g(a: List[float], b: List[float]) -> Optional[float]:
+    """
+    standardized mean difference (b - a) with small-sample correction
+    """
+    if len(a) < 2 or len(b) < 2:
+        return None
+    (mean_a, var_a) = mean_var(a)
+    (mean_b, var_b) = mean_var(b)
+    dof = len(a) + len(b) - 2
+    pooled = math.sqrt(((len(a) - 1) * var_a + (len(b) - 1) * var_b) / dof)
+    if pooled == 0:
+        return None
+    return (mean_b - mean_a) / pooled * (1 - 3 / (4 * dof - 1))
+
+
+def benjamini_hochberg(p_values: List[float], alpha: float) -> List[bool]:
+    """
+    which of the p-values are discoveries at false discovery rate alpha, by
+    the Benjamini-Hochberg step-up procedure
+    """
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    num_passed = 0
+    for rank, i in enumerate(order, 1):
+        if p_values[i] <= alpha * rank / len(p_values):
+            num_passed = rank
+    passed = [False] * len(p_values)
+    for i in order[:num_passed]:
+        passed[i] = True
+    return passed
+
+
+class Comparison:
+    """
+    one cell (test config, cpu node, mem node) measured in both sets
+    """
+
+    def __init__(self, test: str, config_key: Tuple, cell: Tuple[str, int], a: List[float], b: List[float]):
+        self.test = test
+        self.config_key = config_key
+        self.cell = cell
+        self.n_a = len(a)
+        self.n_b = len(b)
+        self.mean_a = sum(a) / len(a)
+        self.mean_b = sum(b) / len(b)
+        self.change = (self.mean_b - self.mean_a) / self.mean_a if self.mean_a else 0.0
+        test_result = welch_t_test(a, b)
+        self.p_value = test_result[2] if test_result else None
+        self.effect_size = hedges_g(a, b)
+        self.significant = False
+        self.regression = False
+
+
+def group_cells(results: List) -> Dict[Tuple, List[float]]:
+    cells: Dict[Tuple, List[float]] = {}
+    for result in results:
+        config_key = result.config_key()
+        for row, col, value in result.iter_cells():
+            cells.setdefault((config_key, row, col), []).append(value)
+    return cells
+
+
+def compare(
+    db: ResultsDB, test: str, filters_a: Dict, filters_b: Dict, alpha: float, min_change: float
+) -> List[Comparison]:
+    """
+    compare every cell measured under both filters; a cell is significant when
+    its Benjamini-Hochberg adjusted p-value is below alpha and the means differ
+    by at least min_change
+    """
+    results_a = db.load_results(test, **filters_a)
+    results_b = db.load_results(test, **filters_b)
+    if not results_a or not results_b:
+        return []
+    higher_is_better = results_a[0].higher_is_better
+    cells_a = group_cells(results_a)
+    cells_b = group_cells(results_b)
+    comparisons = [
+        Comparison(test, key[0], key[1:], cells_a[key], cells_b[key]) for key in cells_a if key in cells_b
+    ]
+    # control the false discovery rate over all cells of the test
+    tested = [x for x in comparisons if x.p_value is not None]
+    for comparison, passed in zip(tested, benjamini_hochberg([x.p_value for x in tested], alpha)):
+        comparison.significant = passed and abs(comparison.change) >= min_change
+    for comparison in comparisons:
+        worse = comparison.change < 0 if higher_is_better else comparison.change > 0
+        comparison.regression = comparison.significant and worse
+    return comparisons
+
+
+def parse_filters(items: List[str]) -> Dict:
+    """
+    ["host=foo", "kernel!=5.15"] -> {"host": "foo", "kernel_ne": "5.15"}
+    """
+    filters = {}
+    for item in items:
+        (key, value) = item.split("=", 1)
+        if key.endswith("!"):
+            key = key[:-1] + "_ne"
+        if key.replace("_ne", "") not in RUN_FILTERS:
+            raise ValueError(f"unknown filter {key}; use one of {', '.join(RUN_FILTERS)}")
+        filters[key] = value
+    return filters
+
+
+def print_comparisons(comparisons: List[Comparison], show_all: bool):
+    print(
+        f"{'test':<16s}{'config':<36s}{'cell':<20s}{'n':>7s}{'A':>10s}{'B':>10s}{'change':>9s}{'p':>9s}{'g':>7s}"
+    )
+    for x in comparisons:
+        if not (show_all or x.significant):
+            continue
+        config = ",".join(str(y) for y in x.config_key)
+        cell = f"{x.cell[0]} -> Node-{x.cell[1]}"
+        p_value = f"{x.p_value:>9.2g}" if x.p_value is not None else f"{'-':>9s}"
+        effect_size = f"{x.effect_size:>7.2f}" if x.effect_size is not None else f"{'-':>7s}"
+        line = (
+            f"{x.test:<16s}{config[:35]:<36s}{cell:<20s}{x.n_a:>3d}/{x.n_b:<3d}{x.mean_a:>10.4g}{x.mean_b:>10.4g}"
+            f"{x.change * 100:>+8.1f}%{p_value}{effect_size}"
+        )
+        if x.regression:
+            line = color_str(line, 31)
+        elif x.significant:
+            line = color_str(line, 32)
+        print(line)
+
+
+def main(args):
+    db = ResultsDB(args.db)
+    filters_a = parse_filters(args.a)
+    filters_b = parse_filters(args.b)
+    comparisons = []
+    for test in args.test:
+        comparisons += compare(db, test, filters_a, filters_b, args.alpha, args.min_change)
+    db.close()
+    print_comparisons(comparisons, args.all)
+    num_regressions = len([x for x in comparisons if x.regression])
+    num_significant = len([x for x in comparisons if x.significant])
+    print(
+        color_str(
+            f"{len(comparisons)} cells compared: {num_regressions} regressions, "
+            f"{num_significant - num_regressions} improvements",
+            31 if num_regressions else 32,
+        )
+    )
+    return 1 if num_regressions else 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    parser.add_argument(
+        "-a",
+        action="append",
+        default=[],
+        help="baseline runs, as key=value or key!=value on " + ", ".join(RUN_FILTERS) + "; repeat to combine",
+    )
+    parser.add_argument("-b", action="append", default=[], help="runs to compare against the baseline, same as -a")
+    parser.add_argument(
+        "--test",
+        action="append",
+        default=None,
+        choices=["idle_latency", "peak_bandwidth", "memcpy"],
+        help="tests to compare; default to all",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05, help="false discovery rate")
+    parser.add_argument("--min-change", type=float, default=0.02, help="smallest relative change worth reporting")
+    parser.add_argument("--all", action="store_true", help="list every compared cell, not only significant ones")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    args.test = args.test or ["idle_latency", "peak_bandwidth", "memcpy"]
+    sys.exit(main(args))
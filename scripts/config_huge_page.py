@@ -1,9 +1,10 @@
 import argparse
-import os
+import atexit
+import signal
 from typing import Dict, List
 from enum import Enum
-from print_host_info import color_str, get_mem_info
-from utils import run_proc_simple
+from print_host_info import color_str, get_host_topology, get_mem_info
+from utils import write_sysfs
 
 
 class HugePageSize(Enum):
@@ -14,7 +15,7 @@ class HugePageSize(Enum):
 
 
 def get_huge_page_sysfs(nid: int, size: int) -> str:
-    return f"/sys/devices/system/node/node{nid}/" + f"hugepages/hugepages-{size}kB/nr_hugepages"
+    return get_host_topology().get_huge_page_sysfs(nid, size)
 
 
 def human_read_pagesize(size: int):
@@ -34,11 +35,7 @@ def human_read_pagesize(size: int):
 
 
 def get_huge_page_sizes() -> List[int]:
-    huge_page_sizes = []
-    for item in os.listdir("/sys/devices/system/node/node0/hugepages"):
-        if item.startswith("hugepages-") and item.endswith("kB"):
-            huge_page_sizes.append(int(item[len("hugepages-") : -len("kB")]))
-    return huge_page_sizes
+    return list(get_host_topology().huge_page_sizes)
 
 
 def pick_huge_page_size() -> int:
@@ -49,27 +46,30 @@ def pick_huge_page_size() -> int:
     return 0
 
 
+def read_nr_huge_pages(nid: int, size: int) -> int:
+    return get_host_topology().read_nr_huge_pages(nid, size)
+
+
+def read_huge_page_state() -> Dict[int, List[int]]:
+    """
+    huge page size in kB -> reserved pages per node, freshly read from sysfs
+    """
+    return get_host_topology().refresh_huge_pages()
+
+
 def check_huge_pages(post_fix: str = "") -> Dict[int, List[int]]:
-    mem_nodes = get_mem_info()
-    size = pick_huge_page_size()
-    huge_page_state = {}
-    for size in get_huge_page_sizes():
-        num_huge_pages = []
-        for nid in range(len(mem_nodes)):
-            cmd = ["cat", get_huge_page_sysfs(nid, size)]
-            output_lines = run_proc_simple(cmd).splitlines()
-            nr_pages = 0
-            if len(output_lines) > 0:
-                items = output_lines[0].split()
-                if len(items) > 0 and items[0].isdigit():
-                    nr_pages = int(items[0])
-            num_huge_pages.append(nr_pages)
+    huge_page_state = read_huge_page_state()
+    for size, num_huge_pages in huge_page_state.items():
         print(f"{size}kB huge pages - {post_fix}")
         print(" ".join([f"{x:>10d}" for x in num_huge_pages]))
-        huge_page_state[size] = num_huge_pages
     return huge_page_state
 
 
+def compact_memory():
+    write_sysfs("/proc/sys/vm/drop_caches", 1)
+    write_sysfs("/proc/sys/vm/compact_memory", 1)
+
+
 def setup_huge_pages(hp_size: HugePageSize):
     mem_nodes = get_mem_info(do_print=False)
     target_size = hp_size.value
@@ -77,17 +77,13 @@ def setup_huge_pages(hp_size: HugePageSize):
         print(color_str(f"Fail to get a valid huge page size", 31))
     target_num = int(2 * 1024 * 1024 / target_size)
     print(color_str(f"trying to reserve {target_num}x {target_size}kB huge pages ...", 33))
-    cmd1 = ["echo", "1", ">", "/proc/sys/vm/drop_caches"]
-    cmd2 = ["echo", "1", ">", "/proc/sys/vm/compact_memory"]
-    os.system(" ".join(cmd1))
-    os.system(" ".join(cmd2))
+    compact_memory()
     # reserving target_num huge pages on each node
     for nid in range(len(mem_nodes)):
         if mem_nodes[nid] < 2:
             print(color_str(f"skipping node-{nid} because size is too small", 33))
             continue
-        cmd = ["echo", str(target_num), ">", get_huge_page_sysfs(nid, target_size)]
-        os.system(" ".join(cmd))
+        write_sysfs(get_huge_page_sysfs(nid, target_size), target_num)
     # check
     huge_page_state = check_huge_pages(color_str("after", 33))
     for size in huge_page_state:
@@ -105,20 +101,85 @@ def reset_huge_pages(huge_page_state: Dict[int, List[int]]):
     print(color_str("reverting changes to huge pages settings ...", 33))
     for size in huge_page_state:
         for nid in range(len(huge_page_state[size])):
-            cmd = [
-                "echo",
-                str(huge_page_state[size][nid]),
-                ">",
-                get_huge_page_sysfs(nid, size),
-            ]
-            os.system(" ".join(cmd))
+            write_sysfs(get_huge_page_sysfs(nid, size), huge_page_state[size][nid])
     check_huge_pages(color_str("reset", 33))
 
 
+class HugePagePool:
+    """
+    reserve huge pages of all sizes on all nodes once, share them among every
+    test of a run, and restore the original reservation once at exit, also
+    when the run crashes or is killed
+
+    sizes that cannot be reserved on some node are marked unavailable instead
+    of failing the whole run
+    """
+
+    def __init__(self, sizes: List[int], region_size_kb: int = 2 << 20):
+        self.sizes = sorted(sizes, reverse=True)
+        self.region_size_kb = region_size_kb
+        self.mem_nodes = get_mem_info(do_print=False)
+        self.original_state: Dict[int, List[int]] = {}
+        self.reserved: Dict[int, bool] = {}
+        self._prev_handlers = {}
+
+    def _eligible(self, nid: int) -> bool:
+        return self.mem_nodes[nid] >= 2
+
+    def reserve(self) -> Dict[int, bool]:
+        """
+        returns huge page size in kB -> whether it is reserved on every eligible node
+        """
+        self.original_state = read_huge_page_state()
+        atexit.register(self.restore)
+        for sig in (signal.SIGTERM, signal.SIGHUP):
+            self._prev_handlers[sig] = signal.signal(sig, self._on_signal)
+        compact_memory()
+        # largest pages first, while free memory is least fragmented
+        for size in self.sizes:
+            # a page larger than the region (e.g. 16GB) still needs one to back it
+            target_num = max(1, self.region_size_kb // size)
+            print(color_str(f"trying to reserve {target_num}x {size}kB huge pages ...", 33))
+            ok = True
+            for nid in range(len(self.mem_nodes)):
+                if not self._eligible(nid):
+                    print(color_str(f"skipping node-{nid} because size is too small", 33))
+                    continue
+                num = max(target_num, self.original_state[size][nid])
+                write_sysfs(get_huge_page_sysfs(nid, size), num)
+                if read_nr_huge_pages(nid, size) < target_num:
+                    print(color_str(f"Fail to reserve {size}kB huge pages on Node-{nid}", 31))
+                    ok = False
+            self.reserved[size] = ok
+        check_huge_pages(color_str("after", 33))
+        return self.reserved
+
+    def available_sizes(self) -> List[int]:
+        return sorted(x for x in self.sizes if self.reserved.get(x, False))
+
+    def restore(self):
+        if not self.original_state:
+            return
+        print(color_str("reverting changes to huge pages settings ...", 33))
+        for size, num_huge_pages in self.original_state.items():
+            for nid, num in enumerate(num_huge_pages):
+                if read_nr_huge_pages(nid, size) != num:
+                    write_sysfs(get_huge_page_sysfs(nid, size), num)
+        self.original_state = {}
+        for sig, handler in self._prev_handlers.items():
+            signal.signal(sig, handler)
+        self._prev_handlers = {}
+        check_huge_pages(color_str("reset", 33))
+
+    def _on_signal(self, signum, frame):
+        # unwind through finally blocks and atexit, which restore the pool
+        raise SystemExit(128 + signum)
+
+
 def main(args):
     check_huge_pages("current")
     if args.setup:
-        setup_huge_pages()
+        setup_huge_pages(HugePageSize(pick_huge_page_size()))
     if args.reset:
         reset_huge_pages({pick_huge_page_size(): [0 for _ in get_mem_info(do_print=False)]})
 
@@ -1,21 +1,22 @@
 import argparse
 import os
 
-from utils import run_proc_simple
-
 
 def get_autonuma_sysfs() -> str:
     return "/proc/sys/kernel/numa_balancing"
 
 
+def read_autonuma() -> int:
+    try:
+        with open(get_autonuma_sysfs(), "r") as fp:
+            value = fp.read().strip()
+    except OSError:
+        return 0
+    return int(value) if value.isdigit() else 0
+
+
 def check_autonuma(pre_fix: str = "") -> int:
-    cmd = ["cat", get_autonuma_sysfs()]
-    output_lines = run_proc_simple(cmd).splitlines()
-    autonuma_setting = 0
-    if len(output_lines) > 0:
-        items = output_lines[0].split()
-        if len(items) > 0 and items[0].isdigit():
-            autonuma_setting = int(items[0])
+    autonuma_setting = read_autonuma()
     print(f"{pre_fix} {get_autonuma_sysfs()} setting: {autonuma_setting}")
     return autonuma_setting
 
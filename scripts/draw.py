@@ -1,8 +1,20 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import numpy as np
 import paperplotlib as ppl
-import os
-import re
 from parse_output import *
+from print_host_info import color_str
+from results_db import ResultsDB, get_default_db_path
+from utils import read_env
+from memcpy_engines import get_tables
+from thread_scaling import get_curves as get_scaling_curves
+from tlb_surface import get_surfaces
+from wss_curve import get_curves
 
 def hugepage_num2size(num):
     if num == 0:
@@ -10,142 +22,324 @@ def hugepage_num2size(num):
     elif num == 1:
         return "2MB"
     elif num == 2:
-        return "512GB"
+        return "512MB"
     elif num == 3:
         return "1GB"
     else:
         return "16GB"
 
 
+def get_cell_groups(stack) -> tuple:
+    """
+    "cpu-mem" names of the cells measured in any run, and the (cells, runs) values
+    """
+    measured = ~np.all(np.isnan(stack), axis=0)
+    rows, cols = np.nonzero(measured)
+    group_names = [f"{i}-{j}" for i, j in zip(rows, cols)]
+    return group_names, stack[:, rows, cols].T
+
+
+def draw_idle_latency(results: list[LatencyIdle], path: str):
 
-def draw_idle_latency(results: list[LatencyIdle]):
-    
     graph = ppl.BarGraph()
     # 传入数据/组/列的文字信息
-    cpu_node_num = len(results[0].idle_latency.keys())
-    node_num = len(results[0].idle_latency['Node-0'])
-    group_names = []
-    for i in range(cpu_node_num):
-        for j in range(node_num):
-            group_names.append(f"{i}-{j}")
-            
-    column_names = []
-    
-    for result in results:
-        column_names.append(hugepage_num2size(result.use_hugepage))
-    
-    datas = []
-    for i in range(cpu_node_num):
-        for j in range(node_num):
-            data = []
-            for result in results:
-                data.append(result.idle_latency[f"Node-{i}"][j])
-            datas.append(data)
-    
-    graph.plot_2d(datas, group_names, column_names)
+    group_names, datas = get_cell_groups(stack_matrices(results))
+    column_names = [hugepage_num2size(result.use_hugepage) for result in results]
+
+    graph.plot_2d(datas.tolist(), group_names, column_names)
 
     # 调整x/y轴文字
     graph.x_label = "Node A to Node B"
     graph.y_label = "idle latency(ns)"
 
     # 保存图片
-    graph.save('results/idle_latency.png')
+    graph.save(path)
+
+
+def draw_bandwidth(results: list[BandWidth], path: str):
 
-    
-def draw_bandwidth(results: list[BandWidth]):
-    
     graph = ppl.BarGraph()
     # 传入数据/组/列的文字信息
-    cpu_node_num = len(results[0].peak_bandwidth.keys())
-    node_num = len(results[0].peak_bandwidth['Node-0'])
-    group_names = []
-    for i in range(cpu_node_num):
-        for j in range(node_num):
-            group_names.append(f"{i}-{j}")
-            
-    column_names = []
-    
-    for result in results:
-        column_names.append(result.read_write_mix)
-    
-    datas = []
-    for i in range(cpu_node_num):
-        for j in range(node_num):
-            data = []
-            for result in results:
-                data.append(result.peak_bandwidth[f"Node-{i}"][j])
-            datas.append(data)
-    
-    graph.plot_2d(datas, group_names, column_names)
+    group_names, datas = get_cell_groups(stack_matrices(results))
+    column_names = [result.read_write_mix for result in results]
+
+    graph.plot_2d(datas.tolist(), group_names, column_names)
 
     # 调整x/y轴文字
     graph.x_label = "Node A to Node B"
     graph.y_label = "peak bandwidth(GB/s)"
 
     # 保存图片
-    graph.save('results/bandwidth.png')
-    
-def draw_loaded_latency(results: list[LatencyIdle]):
-    
-    graph = ppl.BarGraph()
-    # 传入数据/组/列的文字信息
-    cpu_node_num = len(results[0].keys())
-    node_num = len(results[0].peak_bandwidth['Node-0'])
-    group_names = []
-    for i in range(cpu_node_num):
-        for j in range(node_num):
-            group_names.append(f"{i}-{j}")
-            
-    column_names = []
-    
-    for result in results:
-        column_names.append(result.read_write_mix)
-    
-    datas = []
-    for i in range(cpu_node_num):
-        for j in range(node_num):
-            data = []
-            for result in results:
-                data.append(result.peak_bandwidth[f"Node-{i}"][j])
-            datas.append(data)
-    
-    graph.plot_2d(datas, group_names, column_names)
+    graph.save(path)
+
+
+def draw_loaded_latency(results: list[LatencyLoaded], path: str):
+    """
+    one latency-vs-bandwidth curve per run (access pattern / read-write mix)
+    """
+    graph = ppl.LineGraph()
+    # bandwidth is not evenly spaced, so plot on the real x axis
+    line_names = []
+    for idx, result in enumerate(results):
+        (_, bandwidth, latency) = result.curve()
+        graph.ax.plot(bandwidth, latency, linewidth=2, marker=graph.all_markers[idx % len(graph.all_markers)],
+                      markersize=5)
+        line_names.append(f"{result.access_pattern.split(' - ')[-1]}, {result.read_write_mix}")
+    graph.ax.legend(line_names, loc="upper left", fontsize="small")
 
     # 调整x/y轴文字
-    graph.x_label = "Node A to Node B"
+    graph.x_label = "bandwidth(GB/s)"
     graph.y_label = "loaded latency(ns)"
 
     # 保存图片
-    graph.save('results/loaded_latency.png')
-
-def parse_output(filename: str, parse_func):
-    
-    with open(os.path.join('results', filename), 'r') as fp:
-        text = fp.read()
-
-    # split by [start]\n{...}[end]\n
-    pattern = r"\[start\]\n(.*?)\n\[end\]\n"
-    pure_results = re.findall(pattern, text, re.DOTALL)
-    results = []
-    for pure_result in pure_results:
-        result = parse_func(pure_result)
-        results.append(result)
-    return results
-
-def main():
-    
-    if not os.path.exists('results'):
+    graph.save(path)
+
+
+def draw_wss_latency(results: list[LatencyIdle], path: str):
+    """
+    one latency-vs-region-size curve per access pattern and huge page size
+    """
+    graph = ppl.LineGraph()
+    line_names = []
+    for idx, ((pattern, use_hugepage, _, _), (sizes_kb, latency)) in enumerate(sorted(get_curves(results).items())):
+        graph.ax.plot(sizes_kb * 1024, latency, linewidth=2, marker=graph.all_markers[idx % len(graph.all_markers)],
+                      markersize=3)
+        line_names.append(f"{ACCESS_PATTERNS.get(pattern, pattern)}, {hugepage_num2size(use_hugepage)}")
+    graph.ax.set_xscale("log", base=2)
+    graph.ax.set_yscale("log")
+    graph.ax.legend(line_names, loc="upper left", fontsize="small")
+
+    # 调整x/y轴文字
+    graph.x_label = "region size(B)"
+    graph.y_label = "idle latency(ns)"
+
+    # 保存图片
+    graph.save(path)
+
+
+def draw_tlb_latency(results: list[LatencyIdle], path: str):
+    """
+    one latency-vs-chunk-size curve per stride, for one huge page size
+    """
+    graph = ppl.LineGraph()
+    line_names = []
+    for (chunks_kb, strides, latency) in get_surfaces(results).values():
+        for idx, stride in enumerate(strides):
+            graph.ax.plot(chunks_kb * 1024, latency[:, idx], linewidth=2,
+                          marker=graph.all_markers[idx % len(graph.all_markers)], markersize=3)
+            line_names.append(f"stride {stride}B")
+    graph.ax.set_xscale("log", base=2)
+    graph.ax.legend(line_names, loc="upper left", fontsize="small")
+
+    # 调整x/y轴文字
+    graph.x_label = "chunk size(B)"
+    graph.y_label = "idle latency(ns)"
+
+    # 保存图片
+    graph.save(path)
+
+
+def draw_memcpy(results: list[Memcpy], path: str):
+    """
+    one bandwidth-vs-fragment-size curve per copy engine, for one node pair
+    """
+    graph = ppl.LineGraph()
+    line_names = []
+    for (fragments, engines, bandwidth) in get_tables(results).values():
+        for idx, engine in enumerate(engines):
+            graph.ax.plot(fragments, bandwidth[:, idx], linewidth=2,
+                          marker=graph.all_markers[idx % len(graph.all_markers)], markersize=3)
+            line_names.append(engine)
+    graph.ax.set_xscale("log", base=2)
+    graph.ax.legend(line_names, loc="upper left", fontsize="small")
+
+    # 调整x/y轴文字
+    graph.x_label = "fragment size(B)"
+    graph.y_label = "memcpy bandwidth(GB/s)"
+
+    # 保存图片
+    graph.save(path)
+
+
+def draw_thread_scaling(results: list[ThreadScaling], path: str):
+    """
+    one bandwidth-vs-threads curve per node, for one binding domain
+    """
+    graph = ppl.LineGraph()
+    line_names = []
+    for idx, ((_, row, mem_node), (threads, bandwidth, _)) in enumerate(sorted(get_scaling_curves(results).items())):
+        graph.ax.plot(threads, bandwidth, linewidth=2,
+                      marker=graph.all_markers[idx % len(graph.all_markers)], markersize=3)
+        line_names.append(f"{row} -> Node-{mem_node}")
+    graph.ax.legend(line_names, loc="lower right", fontsize="small")
+
+    # 调整x/y轴文字
+    graph.x_label = "threads"
+    graph.y_label = "bandwidth(GB/s)"
+
+    # 保存图片
+    graph.save(path)
+
+
+DRAW_FUNCS = {
+    "idle_latency": draw_idle_latency,
+    "peak_bandwidth": draw_bandwidth,
+    "loaded_latency": draw_loaded_latency,
+    "wss_latency": draw_wss_latency,
+    "tlb_latency": draw_tlb_latency,
+    "memcpy": draw_memcpy,
+    "thread_scaling": draw_thread_scaling,
+}
+
+
+def get_figure_specs(results_db: ResultsDB, session: str, out_dir: str) -> list:
+    """
+    (test, results, output path) of every figure of a session: idle latency and
+    bandwidth per host, loaded latency per host, node pair and huge page size,
+    working set size sweeps per host and node pair, TLB sweeps per host and
+    huge page size, memcpy engines per host and node pair, thread scaling per
+    host and binding domain
+    """
+    specs = []
+    for host in results_db.list_hosts(session):
+        host_dir = os.path.join(out_dir, session, host)
+        for test in ["idle_latency", "peak_bandwidth"]:
+            results = results_db.load_results(test, session=session, host=host)
+            if results:
+                specs.append((test, results, os.path.join(host_dir, f"{test}.png")))
+        loaded_latency_results = results_db.load_results("loaded_latency", session=session, host=host)
+        groups = group_results(loaded_latency_results, key=lambda x: (x.node_pair, x.use_hugepage))
+        for ((cpu_node, mem_node), use_hugepage), results in sorted(groups.items()):
+            pair = f"{cpu_node}-{mem_node}" if cpu_node >= 0 else "all"
+            name = f"loaded_latency_{pair}_{hugepage_num2size(use_hugepage)}.png"
+            specs.append(("loaded_latency", results, os.path.join(host_dir, name)))
+        wss_results = results_db.load_results("wss_latency", session=session, host=host)
+        wss_results = [x for x in wss_results if x.matrix.size]
+        groups = group_results(wss_results, key=lambda x: next(x.iter_cells())[:2])
+        for (row, mem_node), results in sorted(groups.items()):
+            name = f"wss_latency_{row.replace('Node-', '')}-{mem_node}.png"
+            specs.append(("wss_latency", results, os.path.join(host_dir, name)))
+        tlb_results = results_db.load_results("tlb_latency", session=session, host=host)
+        groups = group_results([x for x in tlb_results if x.matrix.size], key=lambda x: x.use_hugepage)
+        for use_hugepage, results in sorted(groups.items()):
+            name = f"tlb_latency_{hugepage_num2size(use_hugepage)}.png"
+            specs.append(("tlb_latency", results, os.path.join(host_dir, name)))
+        memcpy_results = results_db.load_results("memcpy", session=session, host=host)
+        groups = group_results([x for x in memcpy_results if x.matrix.size], key=lambda x: next(x.iter_cells())[:2])
+        for (row, mem_node), results in sorted(groups.items()):
+            name = f"memcpy_{row.replace('Node-', '')}-{mem_node}.png"
+            specs.append(("memcpy", results, os.path.join(host_dir, name)))
+        scaling_results = results_db.load_results("thread_scaling", session=session, host=host)
+        groups = group_results([x for x in scaling_results if x.matrix.size], key=lambda x: x.domain)
+        for domain, results in sorted(groups.items()):
+            specs.append(("thread_scaling", results, os.path.join(host_dir, f"thread_scaling_{domain}.png")))
+    return specs
+
+
+def get_fingerprint(test: str, results: list) -> str:
+    """
+    hash of the plotted data and of this script, so a figure is redrawn only
+    when its results or the drawing code change
+    """
+    sha = hashlib.sha256()
+    with open(__file__, "rb") as fp:
+        sha.update(fp.read())
+    sha.update(test.encode("utf-8"))
+    for result in results:
+        for cls in type(result).__mro__:
+            for slot in getattr(cls, "__slots__", []):
+                value = getattr(result, slot)
+                sha.update(value.tobytes() if isinstance(value, np.ndarray) else pickle.dumps(value))
+    return sha.hexdigest()
+
+
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as fp:
+        return json.load(fp)
+
+
+def save_manifest(path: str, manifest: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fp:
+        json.dump(manifest, fp, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_todo(specs: list, manifest: dict, force: bool = False) -> list:
+    """
+    (test, results, path, fingerprint) of the figures whose data changed since
+    the manifest was saved, or whose file is gone
+    """
+    todo = []
+    for test, results, path in specs:
+        fingerprint = get_fingerprint(test, results)
+        if force or manifest.get(path) != fingerprint or not os.path.exists(path):
+            todo.append((test, results, path, fingerprint))
+    return todo
+
+
+def render(test: str, results: list, path: str) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    DRAW_FUNCS[test](results, path)
+    return path
+
+
+def main(args):
+
+    if not os.path.exists(args.db):
         print("results not exist, please ./run.sh first")
         exit()
-    
-    idle_latency_results = parse_output("cpu_idle_latency.txt", parse_idle_latency_output)
-    bandwidth_results = parse_output("cpu_peak_bandwidth.txt", parse_bandwidth_output)
-    # loaded_latency_results = parse_output("cpu_loaded_latency.txt", parse_loaded_latency_output)
-    
-    draw_idle_latency(idle_latency_results)
-    draw_bandwidth(bandwidth_results)
-    # draw_loaded_latency(loaded_latency_results)
-    
-    
+
+    # draw the latest session by default
+    results_db = ResultsDB(args.db)
+    sessions = args.session or [results_db.latest_session()]
+    specs = []
+    for session in sessions:
+        specs += get_figure_specs(results_db, session, args.output)
+    results_db.close()
+
+    manifest_path = os.path.join(args.output, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    todo = get_todo(specs, manifest, args.force)
+    print(color_str(f"{len(specs)} figures, {len(todo)} to draw", 35))
+
+    num_failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs or None) as executor:
+        futures = {executor.submit(render, test, results, path): (path, fingerprint)
+                   for test, results, path, fingerprint in todo}
+        for future in as_completed(futures):
+            (path, fingerprint) = futures[future]
+            try:
+                future.result()
+                manifest[path] = fingerprint
+            except Exception as e:
+                num_failed += 1
+                print(color_str(f"failed to draw {path}: {e}", 31))
+    save_manifest(manifest_path, manifest)
+    return 1 if num_failed else 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    parser.add_argument(
+        "--session", action="append", default=None, help="session to draw; repeat for more; default to the latest"
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=os.path.join(read_env()["ROOT"], "results", "figures"),
+        help="figures go to <output>/<session>/<host>/",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="figures drawn in parallel; 0 for one per CPU")
+    parser.add_argument("--force", action="store_true", help="redraw every figure")
+    return parser
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = init_parser()
+    args = parser.parse_args()
+    exit(main(args))
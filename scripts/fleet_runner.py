@@ -0,0 +1,191 @@
+import argparse
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bundle import BundleStore, distribute_bundle
+from print_host_info import color_str
+from results_db import ResultsDB, get_default_db_path, new_session_id
+from transport import LocalTransport, SshTransport
+from utils import read_env
+
+EXCLUDE_LIST = [".*swp", "__pycache__", "build", ".git", "results"]
+
+
+class HostResult:
+    def __init__(self, hostname: str):
+        self.hostname = hostname
+        self.ok = False
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.error = ""
+        self.db_path = ""
+
+
+print_lock = threading.Lock()
+
+
+def host_print(hostname: str, line: str, color_code: int = 0):
+    prefix = f"[{hostname}] "
+    with print_lock:
+        print(color_str(prefix, 36) + (color_str(line, color_code) if color_code else line))
+        sys.stdout.flush()
+
+
+def run_streaming(transport, command: str, timeout: float, log_fp) -> int:
+    """
+    run a command on the host, echoing and logging its output line by line;
+    the command is killed once the timeout expires
+    """
+    proc = transport.popen(command)
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
+    try:
+        for raw_line in proc.stdout:
+            line = raw_line.decode("utf-8", errors="replace").rstrip("\n")
+            log_fp.write(line + "\n")
+            host_print(transport.hostname, line)
+        proc.wait()
+    finally:
+        timer.cancel()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, timeout)
+    return proc.returncode
+
+
+def run_on_host(transport, args, session: str, out_dir: str, bundle=None) -> HostResult:
+    result = HostResult(transport.hostname)
+    proj_path = read_env()["ROOT"].rstrip("/")
+    target_path = os.path.join(args.target_path, os.path.basename(proj_path))
+    remote_db = f"results/fleet-{session}.db"
+    steps = [f"cd {target_path}"]
+    if args.build and bundle is None:
+        steps.append("make")
+    steps.append(
+        ("sudo " if args.sudo else "")
+        + f"python3 scripts/run_cpu_micro.py {args.run_args} --session {shlex.quote(session)} --db {remote_db}"
+    )
+    command = " && ".join(steps)
+    excludes = EXCLUDE_LIST + (["bin"] if args.build else [])
+    start_time = time.monotonic()
+    while result.attempts <= args.retries and not result.ok:
+        if result.attempts > 0:
+            time.sleep(args.retry_delay * result.attempts)
+            host_print(result.hostname, f"retry {result.attempts}/{args.retries}", 33)
+        result.attempts += 1
+        try:
+            if bundle is None:
+                host_print(result.hostname, f"push {proj_path} -> {target_path}", 33)
+                transport.push(proj_path, target_path, excludes, args.push_timeout)
+            else:
+                summary = distribute_bundle(transport, bundle[0], bundle[1], target_path, args.push_timeout)
+                host_print(
+                    result.hostname,
+                    f"bundle: {summary['blobs_sent']} blobs sent, {summary['updated']} files updated",
+                    33,
+                )
+            with open(os.path.join(out_dir, f"{result.hostname}.log"), "a") as log_fp:
+                returncode = run_streaming(transport, command, args.timeout, log_fp)
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, command)
+            result.db_path = os.path.join(out_dir, f"{result.hostname}.db")
+            transport.pull(os.path.join(target_path, remote_db), result.db_path, args.push_timeout)
+            result.ok = True
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            result.error = str(e)
+            host_print(result.hostname, f"failed: {result.error}", 31)
+    result.elapsed = time.monotonic() - start_time
+    transport.close()
+    return result
+
+
+def main(args):
+    session = args.session or new_session_id()
+    out_dir = os.path.join(read_env()["ROOT"], "results", "fleet", session)
+    os.makedirs(out_dir, exist_ok=True)
+    hostnames = [x for x in args.hostname.split(",") if x]
+    control_dir = tempfile.mkdtemp(prefix="mm-mem-ssh-")
+    if args.local:
+        transports = [LocalTransport(x, args.local) for x in hostnames]
+    else:
+        transports = [SshTransport(x, control_dir, args.connect_timeout) for x in hostnames]
+    bundle = None
+    if args.bundle:
+        # build once here and ship the same binaries everywhere
+        if args.build:
+            subprocess.run(["make"], cwd=read_env()["ROOT"], check=True)
+        store = BundleStore()
+        (manifest_id, manifest) = store.create(read_env()["ROOT"])
+        print(color_str(f"bundle {manifest_id}: {len(manifest['files'])} files", 35))
+        bundle = (store, manifest)
+    print(color_str(f"session {session}: {len(hostnames)} hosts, up to {args.max_hosts} at a time", 35))
+    with ThreadPoolExecutor(max_workers=args.max_hosts) as executor:
+        results = list(executor.map(lambda x: run_on_host(x, args, session, out_dir, bundle), transports))
+    shutil.rmtree(control_dir, ignore_errors=True)
+    # merge every host into one dataset
+    results_db = ResultsDB(args.db)
+    for result in results:
+        if result.ok:
+            num_runs = results_db.merge(result.db_path)
+            print(color_str(f"{result.hostname}: {num_runs} runs in {result.elapsed:.1f} sec", 32))
+        else:
+            print(color_str(f"{result.hostname}: failed after {result.attempts} attempts - {result.error}", 31))
+    results_db.close()
+    num_failed = len([x for x in results if not x.ok])
+    print(color_str(f"session {session} -> {results_db.path}; {num_failed} hosts failed", 35))
+    return 1 if num_failed else 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--hostname",
+        "-r",
+        type=str,
+        required=True,
+        help="target hostname; comma-separated for multiple hosts",
+    )
+    parser.add_argument("--target-path", "-t", type=str, default="~/", help="target path")
+    parser.add_argument(
+        "--run-args", type=str, default="", help="arguments for run_cpu_micro.py on each host, e.g. '--test bandwidth'"
+    )
+    parser.add_argument("--build", action="store_true", help="build on each host instead of pushing bin/")
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="send only changed files as a content-addressed bundle; with --build, build once locally",
+    )
+    parser.add_argument("--no-sudo", dest="sudo", action="store_false", help="run the tests without sudo")
+    parser.add_argument("--max-hosts", type=int, default=8, help="max hosts to run on concurrently")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds per host for build + run")
+    parser.add_argument("--push-timeout", type=float, default=300, help="seconds per host for each transfer")
+    parser.add_argument("--connect-timeout", type=int, default=10, help="ssh connect timeout in seconds")
+    parser.add_argument("--retries", type=int, default=1, help="retries per host after a failure")
+    parser.add_argument("--retry-delay", type=float, default=10, help="back-off in seconds, times the attempt")
+    parser.add_argument("--session", type=str, default=None, help="session name; default to a timestamp")
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database to merge into")
+    parser.add_argument(
+        "--local",
+        type=str,
+        default=None,
+        help="stand-in directory; run each 'host' locally in <dir>/<hostname> instead of over ssh",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    sys.exit(main(args))
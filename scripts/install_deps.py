@@ -15,7 +15,7 @@ if platform.system() == "Linux":
         print("dnf | yum | apt not available?!")
         exit(1)
     if pkg_manager == "dnf" or pkg_manager == "yum":
-        pkg_list = ["cmake3", "gcc", "gcc-c++", "numactl-devel", "boost-devel"]
+        pkg_list = ["cmake3", "gcc", "gcc-c++", "numactl", "numactl-devel", "boost-devel"]
     elif pkg_manager == "apt":
         pkg_list = [
             "numactl",
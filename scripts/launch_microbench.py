@@ -1,73 +1,174 @@
 import argparse
+import asyncio
 import json
+import os
 import signal
-import subprocess
 import sys
 import time
 from datetime import datetime
+from typing import Dict, List
 
+from utils import read_env
 
-def load_job_list(jobfile):
+# wake up this early and spin on the monotonic clock for the rest, since
+# the event loop only sleeps with ~1ms resolution; the spin yields to the
+# event loop, so kill deadlines and output of running jobs are still served
+SPIN_S = 0.002
+
+
+class JobInstance:
+    """
+    one run of a job in the timeline, with offsets relative to the timeline start
+    """
+
+    __slots__ = ["idx", "rep", "name", "cmd", "start", "end", "launch_delay", "elapsed", "returncode", "interrupted"]
+
+    def __init__(self, idx: int, rep: int, name: str, cmd: List[str], start: float, end: float):
+        self.idx = idx
+        self.rep = rep
+        self.name = name
+        self.cmd = cmd
+        self.start = start
+        self.end = end
+        self.launch_delay = None
+        self.elapsed = None
+        self.returncode = None
+        self.interrupted = False
+
+    def to_json(self) -> Dict:
+        return {x: getattr(self, x) for x in self.__slots__}
+
+
+def load_job_list(jobfile: str) -> List[JobInstance]:
+    """
+    a job is either [start, end, cmd] or a dict with "start", "end", "cmd" and
+    optionally "name", "period" and "repeat"; times are seconds (float) from the
+    timeline start, a periodic job runs "repeat" times, every "period" seconds
+    """
     with open(jobfile, "rt") as fp:
         jobs = json.load(fp)
-    # build a event list
-    event_timestamp = []
-    for start_time, end_time, _ in jobs:
-        if start_time not in event_timestamp:
-            event_timestamp.append(start_time)
-        if end_time not in event_timestamp:
-            event_timestamp.append(end_time)
-    # scan again to feed info into sorted queue
-    event_timestamp.sort()
-    events = {x: [] for x in event_timestamp}
-    for idx in range(len(jobs)):
-        (start_time, end_time, cmd) = jobs[idx]
-        if start_time in events:
-            events[start_time].append(["launch", idx, cmd])
-        if end_time in events:
-            events[end_time].append(["terminate", idx, cmd])
-    return (len(jobs), event_timestamp, events)
+    instances = []
+    for idx, job in enumerate(jobs):
+        if isinstance(job, list):
+            job = {"start": job[0], "end": job[1], "cmd": job[2]}
+        period = float(job.get("period", 0))
+        repeat = int(job.get("repeat", 1))
+        if repeat > 1 and period <= 0:
+            raise ValueError(f"job {idx}: repeat needs a positive period")
+        for rep in range(repeat):
+            start = float(job["start"]) + rep * period
+            end = float(job["end"]) + rep * period
+            if end < start:
+                raise ValueError(f"job {idx}: ends before it starts")
+            instances.append(JobInstance(idx, rep, job.get("name", f"job{idx}"), job["cmd"], start, end))
+    instances.sort(key=lambda x: x.start)
+    return instances
+
+
+async def wait_until(deadline: float):
+    remaining = deadline - time.monotonic()
+    if remaining > SPIN_S:
+        await asyncio.sleep(remaining - SPIN_S)
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0)
+
+
+class Timeline:
+    """
+    launch and stop jobs at absolute deadlines on the monotonic clock, so the
+    launch/kill overhead of one job never shifts the ones after it
+
+    a single scheduler coroutine waits for the launch deadlines in order, so
+    at most one wait spins at a time
+    """
+
+    def __init__(self, instances: List[JobInstance], out_dir: str, grace_s: float = 1.0):
+        self.instances = instances
+        self.out_dir = out_dir
+        self.grace_s = grace_s
+        self.t0 = 0.0
+
+    def log(self, msg: str):
+        print(f"{time.monotonic() - self.t0:10.4f} {msg}", flush=True)
+
+    async def run_instance(self, job: JobInstance):
+        job.launch_delay = time.monotonic() - self.t0 - job.start
+        # jobs may share a name, the index keeps their output apart
+        log_path = os.path.join(self.out_dir, f"{job.name}.{job.idx}.{job.rep}.log")
+        with open(log_path, "wb") as log_fp:
+            proc = await asyncio.create_subprocess_exec(*job.cmd, stdout=log_fp, stderr=asyncio.subprocess.STDOUT)
+            self.log(f'launch {job.name}.{job.rep} (pid {proc.pid}): {" ".join(job.cmd)}')
+            try:
+                await asyncio.wait_for(proc.wait(), self.t0 + job.end - time.monotonic())
+            except asyncio.TimeoutError:
+                job.interrupted = True
+                self.log(f"kill {job.name}.{job.rep}")
+                proc.send_signal(signal.SIGINT)
+                try:
+                    await asyncio.wait_for(proc.wait(), self.grace_s)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+            except asyncio.CancelledError:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+        job.elapsed = time.monotonic() - self.t0 - job.start - job.launch_delay
+        job.returncode = proc.returncode
+        if not job.interrupted and proc.returncode != 0:
+            self.log(f"{job.name}.{job.rep} exited with code {proc.returncode}")
+
+    async def run(self) -> List[JobInstance]:
+        self.t0 = time.monotonic() + 0.01
+        print(f"timeline start: {datetime.now().strftime('%H:%M:%S.%f')}", flush=True)
+        tasks = []
+        try:
+            # instances are sorted by start
+            for job in self.instances:
+                await wait_until(self.t0 + job.start)
+                tasks.append(asyncio.ensure_future(self.run_instance(job)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.instances
 
 
 def main(args):
-    (num_jobs, event_timestamp, events) = load_job_list(args.job)
-    procs = [None for _ in range(num_jobs)]
+    instances = load_job_list(args.job)
+    out_dir = args.output or os.path.join(
+        read_env()["ROOT"], "results", "launch", datetime.now().strftime("%Y%m%d-%H%M%S")
+    )
+    os.makedirs(out_dir, exist_ok=True)
+    timeline = Timeline(instances, out_dir, args.grace)
     try:
-        cur_time = 0
-        for timestamp in event_timestamp:
-            if cur_time < timestamp:
-                time.sleep(timestamp - cur_time)
-            cur_time = timestamp
-            print(datetime.now().strftime("%H:%M:%S"), flush=True)
-            for action, idx, cmd in events[timestamp]:
-                sys.stdout.flush()
-                sys.stderr.flush()
-                if action == "launch":
-                    p = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, shell=False)
-                    assert procs[idx] is None
-                    print(f'launch job {idx}: {" ".join(cmd)}', flush=True)
-                    procs[idx] = p
-                else:
-                    assert procs[idx] is not None
-                    print(f'kill job {idx}: {" ".join(cmd)}', flush=True)
-                    if procs[idx].poll() is None:
-                        procs[idx].send_signal(signal.SIGINT)
-    except Exception as e:
-        print(f"exception: {str(e)}", flush=True)
-    finally:
-        for p in procs:
-            if p and p.poll() is None:
-                print(f"final kill {p.pid}", flush=True)
-                p.terminate()
+        asyncio.run(timeline.run())
+    except KeyboardInterrupt:
+        print("interrupted", flush=True)
+    with open(os.path.join(out_dir, "timeline.jsonl"), "w") as fp:
+        for job in instances:
+            fp.write(json.dumps(job.to_json()) + "\n")
+    delays = [x.launch_delay for x in instances if x.launch_delay is not None]
+    failed = [x for x in instances if x.returncode not in (0, None) and not x.interrupted]
+    if delays:
+        print(f"{len(delays)} launches, max launch delay {max(delays) * 1e3:.3f} ms", flush=True)
+    print(f"{len(failed)} jobs failed; output in {out_dir}", flush=True)
+    return 1 if failed else 0
 
 
 def init_parser():
     parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     parser.add_argument("--job", "-j", type=str, required=True, help="json file describing jobs")
+    parser.add_argument(
+        "--output", "-o", type=str, default=None, help="directory for job output; default to results/launch/<time>"
+    )
+    parser.add_argument("--grace", type=float, default=1.0, help="seconds between SIGINT and SIGKILL at a job's end")
     return parser
 
 
 if __name__ == "__main__":
     parser = init_parser()
     args = parser.parse_args()
-    main(args)
+    sys.exit(main(args))
@@ -1,18 +1,28 @@
 import argparse
+import json
+import os
+import shutil
 import subprocess
-from typing import List
+import tempfile
+import time
+from typing import Dict, List, Optional
 
+from print_host_info import color_str
 from utils import run_proc_simple
 
+PMU_EVENTS = ["cpu-clock", "cycles", "instructions"]
 
-def measure_pmu(interval: int, pid: str) -> List[str]:
-    cmd = [
-        "perf",
-        "stat",
-        "--no-big-num",
-        (f"-p {pid}" if pid else "-a"),
+
+def measure_pmu(interval: int, pid: str, sample_ms: int = 0, output: Optional[str] = None) -> List[str]:
+    cmd = ["perf", "stat", "--no-big-num"]
+    if sample_ms:
+        # per-interval CSV records, parsed by parse_perf_intervals()
+        cmd += ["-x", ",", "-I", str(sample_ms)]
+    if output:
+        cmd += ["-o", output]
+    cmd += (["-p", pid] if pid else ["-a"]) + [
         "-e",
-        "duration_time,cpu-clock,cycles,instructions",
+        ("duration_time," if not sample_ms else "") + ",".join(PMU_EVENTS),
         "--",
         "sleep",
         str(interval),
@@ -20,8 +30,8 @@ def measure_pmu(interval: int, pid: str) -> List[str]:
     return cmd
 
 
-def measure_cpu_util(interval: int) -> List[str]:
-    cmd = ["mpstat", "1", str(interval)]
+def measure_cpu_util(interval: int, sample_s: int = 1) -> List[str]:
+    cmd = ["mpstat", "-o", "JSON", str(sample_s), str(max(1, interval // sample_s))]
     return cmd
 
 
@@ -40,28 +50,175 @@ def get_pids(args) -> List[str]:
         return [""]
 
 
+def get_comm(pid: str) -> str:
+    try:
+        with open(f"/proc/{pid}/comm", "r") as fp:
+            return fp.read().strip()
+    except OSError:
+        return ""
+
+
+def normalize_event(name: str) -> str:
+    # hybrid CPUs report e.g. cpu_core/cycles/ and cpu_atom/cycles/
+    return name.split("/")[1] if name.count("/") >= 2 else name
+
+
+def parse_perf_intervals(text: str) -> List[Dict]:
+    """
+    parse `perf stat -x, -I <ms>` output into [{"t": <sec since perf start>, <event>: <value>}]
+    """
+    samples: Dict[float, Dict] = {}
+    for line in text.splitlines():
+        fields = line.strip().split(",")
+        if len(fields) < 4 or line.startswith("#"):
+            continue
+        try:
+            timestamp = float(fields[0])
+        except ValueError:
+            continue
+        sample = samples.setdefault(timestamp, {"t": timestamp})
+        event = normalize_event(fields[3])
+        try:
+            sample[event] = sample.get(event, 0.0) + float(fields[1])
+        except ValueError:
+            # <not counted> / <not supported>
+            sample.setdefault(event, None)
+    return [samples[x] for x in sorted(samples)]
+
+
+def parse_mpstat_json(text: str) -> List[Dict]:
+    """
+    parse `mpstat -o JSON` output into one dict of "all" CPU utilization per sample
+    """
+    samples = []
+    for host in json.loads(text)["sysstat"]["hosts"]:
+        for stats in host["statistics"]:
+            for load in stats.get("cpu-load", []):
+                if load["cpu"] == "all":
+                    samples.append({x: y for x, y in load.items() if x != "cpu"})
+    return samples
+
+
+def add_derived_metrics(sample: Dict):
+    cycles = sample.get("cycles")
+    instructions = sample.get("instructions")
+    sample["ipc"] = instructions / cycles if cycles and instructions is not None else None
+    cpu_clock = sample.get("cpu-clock")
+    sample["ghz"] = cycles / cpu_clock / 1e6 if cycles and cpu_clock else None
+
+
+def align_series(
+    sample_ms: int,
+    perf_series: Dict[str, List[Dict]],
+    offsets: Dict[str, float],
+    util_series: List[Dict],
+    util_offset: float,
+    util_sample_s: int,
+) -> List[Dict]:
+    """
+    place every perf interval and mpstat sample on a common timeline, in
+    sample_ms bins starting when the first sampler was launched
+    """
+    bins: Dict[int, Dict] = {}
+
+    def get_bin(t: float) -> Dict:
+        idx = max(0, round(t * 1000 / sample_ms) - 1)
+        return bins.setdefault(idx, {"t": (idx + 1) * sample_ms / 1000, "pids": {}})
+
+    for key, series in perf_series.items():
+        for sample in series:
+            entry = get_bin(offsets[key] + sample["t"])
+            values = {x: y for x, y in sample.items() if x != "t"}
+            add_derived_metrics(values)
+            if key:
+                entry["pids"][key] = values
+            else:
+                entry["system"] = values
+    for idx, sample in enumerate(util_series):
+        get_bin(util_offset + (idx + 1) * util_sample_s)["cpu_util"] = sample
+    return [bins[x] for x in sorted(bins)]
+
+
+def print_series(series: List[Dict], pids: List[str]):
+    header = f"{'time':>8} {'%busy':>6} {'sys IPC':>8}" + "".join(f" {'IPC ' + x:>12}" for x in pids if x)
+    print(header)
+
+    def fmt(value: Optional[float], width: int) -> str:
+        return f" {value:>{width}.2f}" if value is not None else f" {'-':>{width}}"
+
+    for entry in series:
+        util = entry.get("cpu_util")
+        line = f"{entry['t']:>8.2f}" + fmt(100 - util["idle"] if util else None, 6)
+        line += fmt(entry.get("system", {}).get("ipc"), 8)
+        line += "".join(fmt(entry["pids"].get(x, {}).get("ipc"), 12) for x in pids if x)
+        print(line)
+
+
 def main(args):
     pids = get_pids(args)
-    per_pid_interval = int(args.interval / len(pids))
-    # mpstat
-    cmd_mpstat = measure_cpu_util(per_pid_interval)
-    proc_mpstat = subprocess.Popen(cmd_mpstat, shell=False)
-    proc_mpstat.wait()
-    # perf
+    sample_s = max(1, round(args.sample_interval / 1000))
     for pid in pids:
         if pid:
-            ps_out = run_proc_simple(["ps", "-p", pid, "-o", "comm="], for_real=True, print_cmd=False)
-            print(f"\nFor pid={pid} process=[{ps_out.rstrip()}]")
-        cmd_perf = measure_pmu(per_pid_interval, pid)
-        proc_perf = subprocess.Popen(cmd_perf, shell=False)
-        proc_perf.wait()
+            print(f"pid={pid} process=[{get_comm(pid)}]")
+    # one sampler per pid plus system-wide, all covering the same window
+    keys = [x for x in pids if x] + [""]
+    tmp_dir = tempfile.mkdtemp(prefix="mm-mem-stats-")
+    proc_mpstat = None
+    procs = {}
+    offsets = {}
+    start_time = time.monotonic()
+    try:
+        util_path = os.path.join(tmp_dir, "mpstat.json")
+        with open(util_path, "w") as fp:
+            proc_mpstat = subprocess.Popen(measure_cpu_util(args.interval, sample_s), stdout=fp, shell=False)
+        util_offset = time.monotonic() - start_time
+        for key in keys:
+            output = os.path.join(tmp_dir, f"perf-{key or 'all'}.csv")
+            cmd = measure_pmu(args.interval, key, args.sample_interval, output)
+            offsets[key] = time.monotonic() - start_time
+            procs[key] = (subprocess.Popen(cmd, shell=False), output)
+        proc_mpstat.wait()
+        perf_series = {}
+        for key, (proc, output) in procs.items():
+            proc.wait()
+            with open(output, "r") as fp:
+                perf_series[key] = parse_perf_intervals(fp.read())
+        with open(util_path, "r") as fp:
+            text = fp.read()
+        util_series = parse_mpstat_json(text) if text.strip() else []
+    finally:
+        for proc in [proc_mpstat] + [x for x, _ in procs.values()]:
+            if proc and proc.poll() is None:
+                proc.terminate()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    series = align_series(args.sample_interval, perf_series, offsets, util_series, util_offset, sample_s)
+    print_series(series, pids)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(
+                {
+                    "sample_interval_ms": args.sample_interval,
+                    "pids": {x: get_comm(x) for x in pids if x},
+                    "series": series,
+                },
+                fp,
+                indent=1,
+            )
+        print(color_str(f"series saved to {args.output}", 32))
 
 
 def init_parser():
     parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    parser.add_argument("--interval", "-i", type=int, default=10, help="reporting interval")
+    parser.add_argument("--interval", "-i", type=int, default=10, help="measurement window in seconds")
+    parser.add_argument(
+        "--sample-interval",
+        type=int,
+        default=1000,
+        help="sample every this many ms; mpstat samples are rounded to whole seconds",
+    )
     parser.add_argument("--pids", "-p", type=str, default=None, help="process IDs, separated by comma")
     parser.add_argument("--pgrep", "-s", type=str, default=None, help="string for pgrep command")
+    parser.add_argument("--output", "-o", type=str, default=None, help="save the aligned series as json")
     return parser
 
 
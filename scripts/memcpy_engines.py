@@ -0,0 +1,96 @@
+import argparse
+import os
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from parse_output import Memcpy
+from print_host_info import color_str
+from results_db import ResultsDB, get_default_db_path
+
+
+def format_bytes(size_b: float) -> str:
+    for unit, scale in [("GB", 1 << 30), ("MB", 1 << 20), ("KB", 1 << 10)]:
+        if size_b >= scale:
+            return f"{size_b / scale:.4g}{unit}"
+    return f"{size_b:.4g}B"
+
+
+def get_tables(results: Sequence[Memcpy]) -> Dict[Tuple[str, int], Tuple[List[int], List[str], np.ndarray]]:
+    """
+    (cpu node, mem node) -> (fragment sizes in B, engines, bandwidth[fragment,
+    engine]), NaN where not measured; repeated points take the median
+    """
+    points: Dict[Tuple[str, int], Dict[Tuple[int, str], List[float]]] = {}
+    for result in results:
+        for row, col, value in result.iter_cells():
+            cell = (result.fragment_size_b, result.engine)
+            points.setdefault((row, col), {}).setdefault(cell, []).append(value)
+    tables = {}
+    for node_pair, cells in points.items():
+        fragments = sorted({x[0] for x in cells})
+        engines = sorted({x[1] for x in cells})
+        bandwidth = np.full((len(fragments), len(engines)), np.nan)
+        for (fragment, engine), values in cells.items():
+            bandwidth[fragments.index(fragment), engines.index(engine)] = np.median(values)
+        tables[node_pair] = (fragments, engines, bandwidth)
+    return tables
+
+
+def get_best_engines(fragments: List[int], engines: List[str], bandwidth: np.ndarray) -> List[Tuple[int, int, str]]:
+    """
+    (smallest, largest fragment, engine) of each run of fragment sizes with the
+    same fastest engine
+    """
+    ranges = []
+    for fragment, row in zip(fragments, bandwidth):
+        if np.all(np.isnan(row)):
+            continue
+        best = engines[int(np.nanargmax(row))]
+        if ranges and ranges[-1][2] == best:
+            ranges[-1] = (ranges[-1][0], fragment, best)
+        else:
+            ranges.append((fragment, fragment, best))
+    return ranges
+
+
+def print_tables(tables: Dict[Tuple[str, int], Tuple[List[int], List[str], np.ndarray]]):
+    for (row, col), (fragments, engines, bandwidth) in sorted(tables.items()):
+        print(f"{'Memcpy (GB/s), ' + row + ' -> Node-' + str(col):<34s}" + "".join(f"{x:>10s}" for x in engines))
+        for fragment, values in zip(fragments, bandwidth):
+            best = int(np.nanargmax(values)) if not np.all(np.isnan(values)) else -1
+            cells = [
+                color_str(f"{x:>10.4g}", 32) if k == best else f"{x:>10.4g}" for k, x in enumerate(values)
+            ]
+            print(f"{'fragment ' + format_bytes(fragment):<34s}" + "".join(cells))
+        for (lo, hi, engine) in get_best_engines(fragments, engines, bandwidth):
+            print(color_str(f"  {format_bytes(lo)}..{format_bytes(hi)}: {engine}", 35))
+        print()
+
+
+def main(args):
+    if not os.path.exists(args.db):
+        print("results not exist, please run_cpu_micro.py --test memcpy first")
+        exit()
+    results_db = ResultsDB(args.db)
+    session = args.session or results_db.latest_session()
+    results = results_db.load_results("memcpy", session=session, host=args.host)
+    results_db.close()
+    if not results:
+        print(color_str(f"no memcpy runs in session {session}", 31))
+        return 1
+    print_tables(get_tables(results))
+    return 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    parser.add_argument("--session", type=str, default=None, help="default to the latest session")
+    parser.add_argument("--host", type=str, default=None, help="only runs of this host")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    exit(main(args))
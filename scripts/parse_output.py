@@ -1,8 +1,128 @@
+from __future__ import annotations
+
+import json
 import re
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # only the result classes need numpy; the record stream helpers also run on
+    # benchmark hosts without it
+    np = None
+
+ACCESS_PATTERNS = {
+    0: "sequential",
+    1: "random in chunk",
+    2: "random in full region",
+}
+
+RW_MIXES = {
+    0: "all reads",
+    1: "1:1 read/write",
+    2: "2:1 read/write",
+    3: "3:1 read/write",
+    4: "all writes",
+    5: "all non-temporal writes",
+    6: "1:1 read/non-temporal write",
+    7: "read-modify-write",
+}
+
+
+def node_key(nid: int) -> str:
+    # matrix rows are keyed the same way as the text output; -1 is a non-matrix run
+    return f"Node-{nid}" if nid >= 0 else "all"
+
+
+def get_counters(record: Dict) -> Optional[Dict[str, float]]:
+    """
+    raw counts and derived ratios of a record run with --perf-counters, e.g.
+    llc_load_misses and llc_load_misses_per_chase; events the CPU does not
+    support, or that were never scheduled, are absent along with their ratios
+    """
+    if "counters" not in record:
+        return None
+    return {**record["counters"], **record.get("derived", {})}
 
 
-class LatencyIdle:
+class NodeMatrixResult:
+    """
+    one run as a CPU node x memory node matrix of values, NaN where a cell was
+    not measured; runs without node binding keep their values in row 0, in
+    measurement order, with node_matrix False
+    """
+
+    __slots__ = ["matrix", "node_matrix", "counters"]
+
+    # for comparing runs, e.g. lower latency is better
+    higher_is_better = False
+
     def __init__(self):
+        self.matrix = np.full((0, 0), np.nan)
+        self.node_matrix = True
+        # (cpu node key, mem node) -> get_counters() of the cells run with --perf-counters
+        self.counters: Dict[Tuple[str, int], Dict[str, float]] = {}
+
+    def set_cell(self, row: int, col: int, value: float):
+        (num_rows, num_cols) = self.matrix.shape
+        if row >= num_rows or col >= num_cols:
+            matrix = np.full((max(row + 1, num_rows), max(col + 1, num_cols)), np.nan)
+            matrix[:num_rows, :num_cols] = self.matrix
+            self.matrix = matrix
+        self.matrix[row, col] = value
+
+    def add_record(self, record: Dict):
+        if record.get("cpu_node", -1) < 0:
+            self.node_matrix = False
+            col = int(np.count_nonzero(~np.isnan(self.matrix[0]))) if self.matrix.size else 0
+            self.set_cell(0, col, record["value"])
+        else:
+            self.set_cell(record["cpu_node"], record["mem_node"], record["value"])
+        counters = get_counters(record)
+        if counters is not None:
+            self.counters[(node_key(record.get("cpu_node", -1)), record.get("mem_node", -1))] = counters
+
+    def parse_rows(self, lines: Iterable[str], header: str):
+        """
+        Header                   Node-0    Node-1
+        Node-0                   78.59     120.3
+        """
+        table_start = False
+        for line in lines:
+            if header in line:
+                table_start = True
+                continue
+            parts = line.split()
+            if table_start and len(parts) > 1 and parts[0].startswith("Node-"):
+                row = int(parts[0][len("Node-"):])
+                for col, value in enumerate(parts[1:]):
+                    self.set_cell(row, col, float(value))
+
+    def config_key(self) -> Tuple:
+        raise NotImplementedError
+
+    def iter_cells(self) -> Iterator[Tuple[str, int, float]]:
+        """
+        (cpu node, mem node, value) of every measured cell
+        """
+        for (row, col) in zip(*np.nonzero(~np.isnan(self.matrix))):
+            yield (node_key(int(row)) if self.node_matrix else "all", int(col), float(self.matrix[row, col]))
+
+
+class LatencyIdle(NodeMatrixResult):
+    __slots__ = [
+        "threads",
+        "region_size_kb",
+        "chunk_size_kb",
+        "stride_size_b",
+        "access_pattern",
+        "use_hugepage",
+        "target_duration",
+        "distribution",
+    ]
+
+    def __init__(self):
+        super().__init__()
         self.threads = None
         self.region_size_kb = None
         self.chunk_size_kb = None
@@ -10,7 +130,8 @@ class LatencyIdle:
         self.access_pattern = None
         self.use_hugepage = None
         self.target_duration = None
-        self.idle_latency = {}
+        # (cpu node, mem node) -> {"p50", "p90", "p99", "p999", "max"} with --histogram
+        self.distribution = {}
 
     def parse(self, text: str):
         """
@@ -35,29 +156,29 @@ class LatencyIdle:
         self.target_duration = int(re.search(r"target duration:\s+(\d+)", text).group(1))
 
         # 提取 Idle Latency 数据
-        lines = text.splitlines()
-        latency_start = False
-        for line in lines:
-            if "Idle Latency (ns)" in line:
-                latency_start = True
-                continue
-            if latency_start:
-                parts = line.split()
-                if parts:
-                    node_name = parts[0]
-                    latencies = list(map(float, parts[1:]))
-                    self.idle_latency[node_name] = latencies
+        self.parse_rows(text.splitlines(), "Idle Latency (ns)")
+
+    def set_config(self, config: Dict):
+        self.threads = config["threads"]
+        self.region_size_kb = config["region_size_kb"]
+        self.chunk_size_kb = config["chunk_size_kb"]
+        self.stride_size_b = config["stride_size_b"]
+        pattern = config["access_pattern"]
+        self.access_pattern = f"{pattern} - {ACCESS_PATTERNS.get(pattern, 'invalid')}"
+        self.use_hugepage = config["use_hugepage"]
+        self.target_duration = config["target_duration"]
+
+    def add_record(self, record: Dict):
+        super().add_record(record)
+        if "distribution" in record:
+            self.distribution[(record.get("cpu_node", -1), record.get("mem_node", -1))] = record["distribution"]
+
+    def config_key(self) -> Tuple:
+        return (self.threads, self.region_size_kb, self.chunk_size_kb, self.stride_size_b, self.access_pattern,
+                self.use_hugepage)
 
     def __repr__(self) -> str:
         info_str = ""
-        # print("Threads:", self.threads)
-        # print("Region Size (KB):", self.region_size_kb)
-        # print("Chunk Size (KB):", self.chunk_size_kb)
-        # print("Stride Size (B):", self.stride_size_b)
-        # print("Access Pattern:", self.access_pattern)
-        # print("Use Hugepage:", self.use_hugepage)
-        # print("Target Duration:", self.target_duration)
-        # print("Idle Latency:", self.idle_latency)
         info_str += f"Threads: {self.threads}\n"
         info_str += f"Region Size (KB): {self.region_size_kb}\n"
         info_str += f"Chunk Size (KB): {self.chunk_size_kb}\n"
@@ -65,52 +186,294 @@ class LatencyIdle:
         info_str += f"Access Pattern: {self.access_pattern}\n"
         info_str += f"Use Hugepage: {self.use_hugepage}\n"
         info_str += f"Target Duration: {self.target_duration}\n"
-        info_str += f"Idle Latency: {self.idle_latency}\n"
+        info_str += f"Idle Latency:\n{self.matrix}\n"
         return info_str
 
 
-class BandWidth:
+class BandWidth(NodeMatrixResult):
+    __slots__ = ["threads", "region_size_kb", "read_write_mix", "target_duration"]
+
+    higher_is_better = True
+
     def __init__(self):
+        super().__init__()
         self.threads = None
         self.region_size_kb = None
         self.read_write_mix = None
         self.target_duration = None
-        self.peak_bandwidth = {}
 
     def parse(self, text: str):
         # 使用正则表达式提取基本信息
         self.threads = int(re.search(r"threads:\s+(\d+)", text).group(1))
         self.region_size_kb = int(re.search(r"region size in KB:\s+(\d+)", text).group(1))
-        self.read_write_mix = re.search(r"read/write mix:\s+(\d+)", text).group(1).strip()
-        # 0 - all reads
-        # 1 - 1:1 read/write
-        # 2 - 2:1 read/write
-        # 3 - 3:1 read/write
-        if self.read_write_mix == "0":
-            self.read_write_mix = "all reads"
-        elif self.read_write_mix == "1":
-            self.read_write_mix = "1:1 read/write"
-        elif self.read_write_mix == "2":
-            self.read_write_mix = "2:1 read/write"
-        elif self.read_write_mix == "3":
-            self.read_write_mix = "3:1 read/write"
+        read_write_mix = int(re.search(r"read/write mix:\s+(\d+)", text).group(1))
+        self.read_write_mix = RW_MIXES.get(read_write_mix, str(read_write_mix))
         self.target_duration = int(re.search(r"target duration:\s+(\d+)", text).group(1))
 
         # 提取 Peak Bandwidth 数据
-        lines = text.splitlines()
-        bandwidth_start = False
-        node_names = []
+        self.parse_rows(text.splitlines(), "Peak Bandwidth (GB/s)")
 
-        for line in lines:
-            if "Peak Bandwidth (GB/s)" in line:
-                bandwidth_start = True
+    def set_config(self, config: Dict):
+        self.threads = config["threads"]
+        self.region_size_kb = config["region_size_kb"]
+        self.read_write_mix = RW_MIXES.get(config["read_write_mix"], str(config["read_write_mix"]))
+        self.target_duration = config["target_duration"]
+
+    def config_key(self) -> Tuple:
+        return (self.threads, self.region_size_kb, self.read_write_mix)
+
+
+class ThreadScaling(BandWidth):
+    """
+    a peak bandwidth run of a thread scaling sweep, bound to the CPUs of one
+    domain (a node or an LLC domain within it)
+    """
+
+    __slots__ = ["domain", "fairness", "thread_bandwidth"]
+
+    def __init__(self):
+        super().__init__()
+        self.domain = None
+        # (cpu node key, mem node) -> Jain's fairness index / GB/s of each thread
+        self.fairness = {}
+        self.thread_bandwidth = {}
+
+    def set_config(self, config: Dict):
+        super().set_config(config)
+        self.domain = config.get("domain", "node")
+
+    def add_record(self, record: Dict):
+        super().add_record(record)
+        node_pair = (node_key(record.get("cpu_node", -1)), record.get("mem_node", -1))
+        self.fairness[node_pair] = record.get("fairness")
+        self.thread_bandwidth[node_pair] = record.get("thread_bandwidth", [])
+
+    def config_key(self) -> Tuple:
+        return super().config_key() + (self.domain,)
+
+
+class Memcpy(NodeMatrixResult):
+    __slots__ = ["threads", "region_size_kb", "fragment_size_b", "engine", "target_duration"]
+
+    higher_is_better = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = None
+        self.region_size_kb = None
+        self.fragment_size_b = None
+        self.engine = None
+        self.target_duration = None
+
+    def parse(self, text: str):
+        """
+        threads:           72
+        region size in KB: 131072
+        copy size in KB:   16
+        copy engine:       avx_nt - 32B AVX loads, non-temporal stores
+        target duration:   10
+        Memcpy Bandwidth (GB/s) - avx_nt   Node-0    Node-1
+        Node-0                             20.47     12.31
+        """
+        self.threads = int(re.search(r"threads:\s+(\d+)", text).group(1))
+        self.region_size_kb = int(re.search(r"region size in KB:\s+(\d+)", text).group(1))
+        match = re.search(r"copy size in (KB|B):\s+(\d+)", text)
+        self.fragment_size_b = int(match.group(2)) * (1024 if match.group(1) == "KB" else 1)
+        match = re.search(r"copy engine:\s+(\S+)", text)
+        self.engine = match.group(1) if match else "glibc"
+        self.target_duration = int(re.search(r"target duration:\s+(\d+)", text).group(1))
+        # without --memcpy_matrix, "Memcpy Bandwidth:   20472.51 MB/s |   19.99 GB/s"
+        match = re.search(r"Memcpy Bandwidth:.*\|\s+([\d.]+) GB/s", text)
+        if match:
+            self.add_record({"value": float(match.group(1))})
+        self.parse_rows(text.splitlines(), "Memcpy Bandwidth (GB/s)")
+
+    def set_config(self, config: Dict):
+        self.threads = config["threads"]
+        self.region_size_kb = config["region_size_kb"]
+        self.fragment_size_b = config["fragment_size_b"]
+        self.engine = config.get("engine", "glibc")
+        self.target_duration = config["target_duration"]
+
+    def config_key(self) -> Tuple:
+        return (self.threads, self.region_size_kb, self.engine, self.fragment_size_b)
+
+
+class LatencyLoaded:
+    __slots__ = [
+        "threads",
+        "region_size_kb",
+        "chunk_size_kb",
+        "stride_size_b",
+        "access_pattern",
+        "use_hugepage",
+        "read_write_mix",
+        "target_duration",
+        "node_pair",
+        "delay",
+        "bandwidth",
+        "latency",
+        "distribution",
+        "counters",
+    ]
+
+    def __init__(self):
+        self.threads = None
+        self.region_size_kb = None
+        self.chunk_size_kb = None
+        self.stride_size_b = None
+        self.access_pattern = None
+        self.use_hugepage = None
+        self.read_write_mix = None
+        self.target_duration = None
+        # (cpu node, mem node) when run bound to nodes; -1 for unbound
+        self.node_pair = (-1, -1)
+        self.delay = []
+        self.bandwidth = []
+        self.latency = []
+        # per delay, {"p50", "p90", "p99", "p999", "max"} of the latency thread; None without --histogram
+        self.distribution = []
+        # per delay, get_counters() of the point; None without --perf-counters
+        self.counters = []
+
+    def parse(self, text: str):
+        """
+        threads:           72
+        ...
+               delay   bandwidth     latency - RandomInChunk
+                   1        60.5      1031.9
+                   8        60.3       877.9
+        """
+        self.threads = int(re.search(r"threads:\s+(\d+)", text).group(1))
+        self.region_size_kb = int(re.search(r"region size in KB:\s+(\d+)", text).group(1))
+        self.chunk_size_kb = int(re.search(r"chunk size in KB:\s+(\d+)", text).group(1))
+        self.stride_size_b = int(re.search(r"stride size in B:\s+(\d+)", text).group(1))
+        self.access_pattern = re.search(r"access pattern:\s+(.+)", text).group(1).strip()
+        self.use_hugepage = int(re.search(r"use hugepage:\s+(\d+)", text).group(1))
+        read_write_mix = int(re.search(r"read/write mix:\s+(\d+)", text).group(1))
+        self.read_write_mix = RW_MIXES.get(read_write_mix, str(read_write_mix))
+        self.target_duration = int(re.search(r"target duration:\s+(\d+)", text).group(1))
+
+        table_start = False
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) >= 3 and parts[:3] == ["delay", "bandwidth", "latency"]:
+                table_start = True
                 continue
-            if bandwidth_start:
-                parts = line.split()
-                if "Node" in line and len(parts) == 5:
-                    node_name = parts[0]
-                    node_bandwidths = list(map(float, parts[1:]))
-                    self.peak_bandwidth[node_name] = node_bandwidths
+            # with --histogram, p50, p90, p99, p99.9 and max follow
+            if table_start and len(parts) in (3, 8):
+                self.delay.append(int(parts[0]))
+                self.bandwidth.append(float(parts[1]))
+                self.latency.append(float(parts[2]))
+                values = [float(x) for x in parts[3:]]
+                self.distribution.append(dict(zip(["p50", "p90", "p99", "p999", "max"], values)) or None)
+                self.counters.append(None)
+
+    def set_config(self, config: Dict):
+        self.threads = config["threads"]
+        self.region_size_kb = config["region_size_kb"]
+        self.chunk_size_kb = config["chunk_size_kb"]
+        self.stride_size_b = config["stride_size_b"]
+        pattern = config["access_pattern"]
+        self.access_pattern = f"{pattern} - {ACCESS_PATTERNS.get(pattern, 'invalid')}"
+        self.use_hugepage = config["use_hugepage"]
+        self.read_write_mix = RW_MIXES.get(config["read_write_mix"], str(config["read_write_mix"]))
+        self.target_duration = config["target_duration"]
+
+    def add_record(self, record: Dict):
+        self.node_pair = (record.get("cpu_node", -1), record.get("mem_node", -1))
+        self.delay.append(record["delay"])
+        self.bandwidth.append(record["bandwidth"])
+        self.latency.append(record["latency"])
+        self.distribution.append(record.get("distribution"))
+        self.counters.append(get_counters(record))
+
+    def curve(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (delay, bandwidth, latency) arrays sorted by delay
+        """
+        order = np.argsort(self.delay, kind="stable")
+        return (np.asarray(self.delay)[order], np.asarray(self.bandwidth)[order], np.asarray(self.latency)[order])
+
+
+def stack_matrices(results: Sequence[NodeMatrixResult]) -> np.ndarray:
+    """
+    (runs, cpu nodes, mem nodes) array of the results' matrices, NaN-padded to the largest
+    """
+    num_rows = max((x.matrix.shape[0] for x in results), default=0)
+    num_cols = max((x.matrix.shape[1] for x in results), default=0)
+    stack = np.full((len(results), num_rows, num_cols), np.nan)
+    for idx, result in enumerate(results):
+        stack[idx, : result.matrix.shape[0], : result.matrix.shape[1]] = result.matrix
+    return stack
+
+
+AGGREGATES = {
+    "mean": np.nanmean if np else None,
+    "median": np.nanmedian if np else None,
+    "min": np.nanmin if np else None,
+    "max": np.nanmax if np else None,
+    "std": np.nanstd if np else None,
+}
+
+
+def aggregate(results: Sequence[NodeMatrixResult], stat: str = "mean") -> np.ndarray:
+    """
+    cell-wise mean/median/min/max/std across runs, ignoring unmeasured cells
+    """
+    return AGGREGATES[stat](stack_matrices(results), axis=0)
+
+
+def percentiles(results: Sequence[NodeMatrixResult], q: Sequence[float]) -> np.ndarray:
+    """
+    (len(q), cpu nodes, mem nodes) cell-wise percentiles across runs
+    """
+    return np.nanpercentile(stack_matrices(results), q, axis=0)
+
+
+def normalize_to_local(matrices: np.ndarray) -> np.ndarray:
+    """
+    divide every row of a matrix, or a stack of them, by its local (diagonal)
+    cell, e.g. remote latency as a multiple of local latency
+    """
+    k = min(matrices.shape[-2:])
+    normalized = np.full(matrices.shape, np.nan)
+    local = np.diagonal(matrices, axis1=-2, axis2=-1)[..., :k]
+    normalized[..., :k, :] = matrices[..., :k, :] / local[..., :, None]
+    return normalized
+
+
+def group_results(
+    results: Iterable, key: Callable[[object], Hashable] = lambda x: x.config_key()
+) -> Dict[Hashable, List]:
+    groups: Dict[Hashable, List] = {}
+    for result in results:
+        groups.setdefault(key(result), []).append(result)
+    return groups
+
+
+def hugepage_ratio(
+    results: Sequence[LatencyIdle], numerator: int, denominator: int, stat: str = "median"
+) -> Dict[Tuple, np.ndarray]:
+    """
+    per (threads, region size, stride): aggregate matrix of runs with huge page
+    type `numerator` over that of runs with type `denominator`, e.g.
+    hugepage_ratio(results, 1, 0) for 2MB pages vs 4KB pages
+
+    access pattern and chunk size are not matched: run_cpu_micro.py runs 4KB
+    pages random in chunk and huge pages random in the full region
+    """
+    groups = group_results(results, key=lambda x: ((x.threads, x.region_size_kb, x.stride_size_b), x.use_hugepage))
+    ratios = {}
+    for (config_key, use_hugepage), group in groups.items():
+        if use_hugepage != numerator or (config_key, denominator) not in groups:
+            continue
+        a = aggregate(group, stat)
+        b = aggregate(groups[(config_key, denominator)], stat)
+        rows = min(a.shape[0], b.shape[0])
+        cols = min(a.shape[1], b.shape[1])
+        ratios[config_key] = a[:rows, :cols] / b[:rows, :cols]
+    return ratios
 
 
 def parse_idle_latency_output(stdout: str):
@@ -126,4 +489,65 @@ def parse_bandwidth_output(stdout: str):
     return bandwidth
 
 
-def parse_loaded_latency_output(stdout: str): ...
+def parse_memcpy_output(stdout: str):
+    memcpy = Memcpy()
+    memcpy.parse(stdout)
+    return memcpy
+
+
+def parse_loaded_latency_output(stdout: str):
+    loaded_latency = LatencyLoaded()
+    loaded_latency.parse(stdout)
+    return loaded_latency
+
+
+RESULT_TYPES = {
+    "idle_latency": LatencyIdle,
+    # idle latency runs of a working set size sweep, one per region size
+    "wss_latency": LatencyIdle,
+    "tlb_latency": LatencyIdle,
+    "peak_bandwidth": BandWidth,
+    "loaded_latency": LatencyLoaded,
+    "memcpy": Memcpy,
+    "thread_scaling": ThreadScaling,
+}
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    decode the JSON lines written by binaries run with --format jsonl;
+    anything else on the stream (e.g. warnings) is skipped
+    """
+    for line in lines:
+        if line.startswith("{"):
+            yield json.loads(line)
+
+
+def iter_results(records: Iterable[Dict]) -> Iterator:
+    """
+    fold a record stream into result objects; each "config" record starts a new
+    result, which is yielded once the next one starts or the stream ends
+    """
+    result: Optional[object] = None
+    for record in records:
+        record_type = record.get("type")
+        if record_type == "config":
+            if result is not None:
+                yield result
+            result = None
+            if record["test"] in RESULT_TYPES:
+                result = RESULT_TYPES[record["test"]]()
+                result.set_config(record["config"])
+        elif record_type == "data" and result is not None:
+            result.add_record(record)
+    if result is not None:
+        yield result
+
+
+def parse_jsonl_output(stdout: str):
+    return list(iter_results(iter_records(stdout.splitlines())))
+
+
+def parse_jsonl_file(filename: str):
+    with open(filename, "r") as fp:
+        yield from iter_results(iter_records(fp))
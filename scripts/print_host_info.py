@@ -1,3 +1,8 @@
+import hashlib
+import os
+import platform
+from typing import Dict, List
+
 from utils import run_proc_simple
 
 
@@ -5,50 +10,226 @@ def color_str(input_str: str, color_code: int) -> str:
     return f"\033[0;{color_code}m{input_str}\033[0m"
 
 
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    "0-3,8,10-11" -> [0, 1, 2, 3, 8, 10, 11]
+    """
+    cpus = []
+    for item in cpu_list.strip().split(","):
+        if not item:
+            continue
+        if "-" in item:
+            (start, end) = item.split("-")
+            cpus += list(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(item))
+    return cpus
+
+
+def read_text(path: str, default: str = "") -> str:
+    try:
+        with open(path, "r") as fp:
+            return fp.read()
+    except OSError:
+        return default
+
+
+class HostTopology:
+    """
+    NUMA nodes, CPUs, memory and huge page counters of this host, read from
+    sysfs/procfs once instead of spawning lscpu/lsmem/numastat
+
+    node lists are indexed by node id; offline node ids get no CPUs and no
+    memory, CPU-less (memory-only) nodes get an empty CPU list
+    """
+
+    def __init__(self, sysfs_root: str = "/sys/devices/system"):
+        self.sysfs_root = sysfs_root
+        self.node_root = os.path.join(sysfs_root, "node")
+        online = parse_cpu_list(read_text(os.path.join(self.node_root, "online")))
+        if not online:
+            # kernel without NUMA support: a single node with everything
+            online = [0]
+        self.num_nodes = max(online) + 1
+        self.online_nodes = online
+        self.cpus = parse_cpu_list(read_text(os.path.join(sysfs_root, "cpu", "online"), "0"))
+        self.node_to_cpus: Dict[int, List[int]] = {}
+        self.node_mem_kb: List[int] = []
+        for nid in range(self.num_nodes):
+            node_dir = self.get_node_dir(nid)
+            if nid not in online:
+                self.node_to_cpus[nid] = []
+                self.node_mem_kb.append(0)
+            elif os.path.isdir(node_dir):
+                self.node_to_cpus[nid] = parse_cpu_list(read_text(os.path.join(node_dir, "cpulist")))
+                self.node_mem_kb.append(self._read_mem_total_kb(os.path.join(node_dir, "meminfo")))
+            else:
+                self.node_to_cpus[nid] = list(self.cpus)
+                self.node_mem_kb.append(self._read_mem_total_kb("/proc/meminfo"))
+        self.cpu_less_nodes = [x for x in online if len(self.node_to_cpus[x]) == 0]
+        self.huge_page_sizes = self._read_huge_page_sizes()
+        self.cache_sizes_kb = self._read_cache_sizes_kb(self.cpus[0] if self.cpus else 0)
+        self.llc_domains = self._read_llc_domains()
+        self.cpu_model = self._read_cpu_model()
+        self.huge_pages: Dict[int, List[int]] = {}
+        self.refresh_huge_pages()
+
+    def get_node_dir(self, nid: int) -> str:
+        return os.path.join(self.node_root, f"node{nid}")
+
+    def get_huge_page_sysfs(self, nid: int, size: int) -> str:
+        return os.path.join(self.get_node_dir(nid), "hugepages", f"hugepages-{size}kB", "nr_hugepages")
+
+    @staticmethod
+    def _read_mem_total_kb(path: str) -> int:
+        for line in read_text(path).splitlines():
+            # "Node 0 MemTotal:  8049656 kB" or "MemTotal:  8049656 kB"
+            if "MemTotal:" in line:
+                return int(line.split("MemTotal:")[1].split()[0])
+        return 0
+
+    def _read_huge_page_sizes(self) -> List[int]:
+        path = os.path.join(self.get_node_dir(self.online_nodes[0]), "hugepages")
+        if not os.path.isdir(path):
+            path = "/sys/kernel/mm/hugepages"
+        huge_page_sizes = []
+        if os.path.isdir(path):
+            for item in os.listdir(path):
+                if item.startswith("hugepages-") and item.endswith("kB"):
+                    huge_page_sizes.append(int(item[len("hugepages-") : -len("kB")]))
+        return sorted(huge_page_sizes)
+
+    def _read_cache_sizes_kb(self, cpu: int) -> Dict[str, int]:
+        """
+        data/unified caches of a CPU, e.g. {"L1d": 48, "L2": 2048, "L3": 307200}
+        """
+        cache_dir = os.path.join(self.sysfs_root, "cpu", f"cpu{cpu}", "cache")
+        cache_sizes_kb = {}
+        if not os.path.isdir(cache_dir):
+            return cache_sizes_kb
+        for item in sorted(os.listdir(cache_dir)):
+            if not item.startswith("index"):
+                continue
+            cache_type = read_text(os.path.join(cache_dir, item, "type")).strip()
+            size = read_text(os.path.join(cache_dir, item, "size")).strip()
+            if cache_type == "Instruction" or not size.endswith("K"):
+                continue
+            level = read_text(os.path.join(cache_dir, item, "level")).strip()
+            cache_sizes_kb[f"L{level}" + ("d" if cache_type == "Data" else "")] = int(size[:-1])
+        return cache_sizes_kb
+
+    def _read_llc_domains(self) -> List[List[int]]:
+        """
+        online CPUs sharing each last-level cache (e.g. a CCX), ordered by their
+        first CPU; a CPU without cache info in sysfs is a domain of its own
+        """
+        domains: Dict[int, List[int]] = {}
+        for cpu in self.cpus:
+            cache_dir = os.path.join(self.sysfs_root, "cpu", f"cpu{cpu}", "cache")
+            items = sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+            (llc_level, shared) = (0, [cpu])
+            for item in items:
+                if not item.startswith("index"):
+                    continue
+                if read_text(os.path.join(cache_dir, item, "type")).strip() == "Instruction":
+                    continue
+                level = int(read_text(os.path.join(cache_dir, item, "level")).strip() or 0)
+                if level > llc_level:
+                    shared_cpus = parse_cpu_list(read_text(os.path.join(cache_dir, item, "shared_cpu_list")))
+                    (llc_level, shared) = (level, [x for x in shared_cpus if x in self.cpus] or [cpu])
+            domains.setdefault(min(shared), sorted(shared))
+        return [domains[x] for x in sorted(domains)]
+
+    @staticmethod
+    def _read_cpu_model() -> str:
+        for line in read_text("/proc/cpuinfo").splitlines():
+            if line.startswith("model name"):
+                return line.split(":", 1)[1].strip()
+        # e.g. aarch64 does not name the model in /proc/cpuinfo
+        stdout = run_proc_simple(["lscpu"], True, False) or ""
+        for line in stdout.splitlines():
+            if line.startswith("Model name"):
+                return line.split(":", 1)[1].strip()
+        return ""
+
+    def read_nr_huge_pages(self, nid: int, size: int) -> int:
+        value = read_text(self.get_huge_page_sysfs(nid, size)).strip()
+        return int(value) if value.isdigit() else 0
+
+    def refresh_huge_pages(self) -> Dict[int, List[int]]:
+        """
+        re-read only the huge page counters; huge page size in kB -> reserved pages per node
+        """
+        self.huge_pages = {
+            size: [self.read_nr_huge_pages(nid, size) for nid in range(self.num_nodes)]
+            for size in self.huge_page_sizes
+        }
+        return self.huge_pages
+
+    def get_mem_gb(self) -> List[int]:
+        return [round(x / (1 << 20)) for x in self.node_mem_kb]
+
+
+_host_topology = None
+
+
+def get_host_topology(refresh: bool = False) -> HostTopology:
+    """
+    the memoized topology of this host; refresh=True re-reads everything
+    """
+    global _host_topology
+    if _host_topology is None or refresh:
+        _host_topology = HostTopology()
+    return _host_topology
+
+
 # cpu
 def get_cpu_info(do_print=True) -> int:
-    for_real = True
-    print_cmd = False
-    num_numa_nodes = 1
-    cmd = ["lscpu"]
-    stdout = run_proc_simple(cmd, for_real, print_cmd)
-    for line in stdout.splitlines():
-        if line.startswith("CPU(s)"):
-            items = line.split()
-            if do_print:
-                print(color_str(f"Total CPUs:\t\t{items[1]}", 32))
-        elif line.startswith("NUMA node(s)"):
-            num_numa_nodes = int(line.split()[-1])
-        elif line.startswith("NUMA") and "CPU" in line:
-            if do_print:
-                print(line)
-    return num_numa_nodes
+    topology = get_host_topology()
+    if do_print:
+        print(color_str(f"Total CPUs:\t\t{len(topology.cpus)}", 32))
+        for nid, cpus in topology.node_to_cpus.items():
+            print(f"NUMA node{nid} CPU(s):".ljust(41) + ",".join(str(x) for x in cpus))
+    return topology.num_nodes
+
+
+def get_numa_nodes() -> Dict[int, List[int]]:
+    """
+    NUMA node id -> CPUs on that node; CPU-less nodes map to an empty list
+    """
+    return dict(get_host_topology().node_to_cpus)
 
 
 # memory
-def get_mem_info(do_print=True):
-    for_real = True
-    print_cmd = False
-    cmd = ["lsmem"]
-    stdout = run_proc_simple(cmd, for_real, print_cmd)
-    for line in stdout.splitlines():
-        if line.startswith("Total online memory"):
-            if do_print:
-                print(color_str(line, 32))
-    cmd = ["numastat", "-m"]
-    stdout = run_proc_simple(cmd, for_real, print_cmd)
-    columns = [f"Node {x}" for x in range(get_cpu_info(do_print=False))]
-    columns.append("Total")
+def get_mem_info(do_print=True) -> List[int]:
+    """
+    memory in GB per node
+    """
+    mem_total = get_host_topology().get_mem_gb()
     if do_print:
+        print(color_str(f"Total memory:              {sum(mem_total)}G", 32))
+        columns = [f"Node {x}" for x in range(len(mem_total))]
+        columns.append("Total")
         print(" ".join([f"{x:>10s}" for x in columns]))
-    for line in stdout.splitlines():
-        if line.startswith("MemTotal"):
-            items = line.split()
-            mem_total = [round(float(x) / 1024) for x in items[1:]]
-            if do_print:
-                print(" ".join([f"{x:>9d}G" for x in mem_total]))
-            return mem_total[:-1]
-    return []
+        print(" ".join([f"{x:>9d}G" for x in mem_total + [sum(mem_total)]]))
+    return mem_total
+
+
+# identity
+def get_cpu_model() -> str:
+    return get_host_topology().cpu_model
+
+
+def get_host_fingerprint() -> str:
+    """
+    stable id of a host's hardware setup: hostname, CPU model and NUMA layout;
+    kernel version is tracked separately so kernel upgrades can be compared
+    """
+    items = [platform.node(), get_cpu_model()]
+    for nid, cpus in sorted(get_numa_nodes().items()):
+        items.append(f"{nid}:{','.join(str(x) for x in cpus)}")
+    items.append(" ".join(str(x) for x in get_mem_info(do_print=False)))
+    return hashlib.sha256("|".join(items).encode("utf-8")).hexdigest()[:16]
 
 
 # gpu
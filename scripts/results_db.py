@@ -0,0 +1,363 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from parse_output import RESULT_TYPES, iter_records
+from utils import read_env
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    session TEXT,
+    host TEXT,
+    host_fingerprint TEXT,
+    kernel TEXT,
+    build_hash TEXT,
+    test TEXT,
+    started_ns INTEGER,
+    threads INTEGER,
+    region_size_kb INTEGER,
+    chunk_size_kb INTEGER,
+    stride_size_b INTEGER,
+    access_pattern INTEGER,
+    use_hugepage INTEGER,
+    read_write_mix INTEGER,
+    target_duration INTEGER,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS points (
+    run_id INTEGER REFERENCES runs(id),
+    metric TEXT,
+    cpu_node INTEGER,
+    mem_node INTEGER,
+    read_write_mix INTEGER,
+    delay INTEGER,
+    value REAL,
+    unit TEXT,
+    timestamp_ns INTEGER,
+    record TEXT
+);
+-- sessions a run belongs to: the one that measured it, and any later one that
+-- reused it from the sweep cache
+CREATE TABLE IF NOT EXISTS run_sessions (
+    run_id INTEGER REFERENCES runs(id),
+    session TEXT,
+    PRIMARY KEY (run_id, session)
+);
+CREATE INDEX IF NOT EXISTS idx_run_sessions_session ON run_sessions(session, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_config ON runs(test, use_hugepage, access_pattern, read_write_mix, started_ns);
+CREATE INDEX IF NOT EXISTS idx_runs_host ON runs(host_fingerprint, test, started_ns);
+CREATE INDEX IF NOT EXISTS idx_runs_session ON runs(session);
+CREATE INDEX IF NOT EXISTS idx_points_pair ON points(cpu_node, mem_node, run_id);
+CREATE INDEX IF NOT EXISTS idx_points_run ON points(run_id);
+"""
+
+# config fields promoted to indexed columns; the full config is kept as JSON
+CONFIG_COLUMNS = [
+    "threads",
+    "region_size_kb",
+    "chunk_size_kb",
+    "stride_size_b",
+    "access_pattern",
+    "use_hugepage",
+    "read_write_mix",
+    "target_duration",
+]
+
+
+def get_default_db_path() -> str:
+    return os.path.join(read_env()["ROOT"], "results", "results.db")
+
+
+def get_build_hash(bin_path: str) -> str:
+    if not os.path.exists(bin_path):
+        return ""
+    sha = hashlib.sha256()
+    with open(bin_path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()[:16]
+
+
+class ResultsDB:
+    """
+    embedded store of benchmark records: one row per run (binary invocation
+    config) and one row per measured data point
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_default_db_path()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        # databases from before run_sessions: each run in the session it was stored with
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO run_sessions SELECT id, session FROM runs ORDER BY id")
+
+    def close(self):
+        self.conn.close()
+
+    def find_run(self, host_fingerprint: str, test: str, started_ns: int, config: str) -> Optional[int]:
+        """
+        id of a stored run of the same measurement, e.g. a sweep point served
+        from the cache; None if there is none
+        """
+        row = self.conn.execute(
+            "SELECT id FROM runs WHERE host_fingerprint = ? AND test = ? AND started_ns = ? AND config = ?",
+            [host_fingerprint, test, started_ns, config],
+        ).fetchone()
+        return row["id"] if row else None
+
+    def ingest(
+        self,
+        records: Iterable[Dict],
+        session: str = "",
+        host: Optional[str] = None,
+        host_fingerprint: str = "",
+        kernel: Optional[str] = None,
+        build_hash: str = "",
+    ) -> List[int]:
+        """
+        store a record stream from --format jsonl; returns the run ids
+
+        a run stored before (same host fingerprint, test, start time and
+        config) is only linked to the session, its points are not stored again
+        """
+        host = platform.node() if host is None else host
+        kernel = platform.release() if kernel is None else kernel
+        run_ids = []
+        points = []
+        run_id = None
+        with self.conn:
+            for record in records:
+                record_type = record.get("type")
+                if record_type == "config":
+                    config = record["config"]
+                    columns = [config.get(x) for x in CONFIG_COLUMNS]
+                    run_id = self.find_run(host_fingerprint, record["test"], record["timestamp_ns"], json.dumps(config))
+                    if run_id is not None:
+                        self.conn.execute("INSERT OR IGNORE INTO run_sessions VALUES (?, ?)", [run_id, session])
+                        run_ids.append(run_id)
+                        # its points are stored already
+                        run_id = None
+                        continue
+                    cursor = self.conn.execute(
+                        "INSERT INTO runs (session, host, host_fingerprint, kernel, build_hash, test, started_ns, "
+                        + ", ".join(CONFIG_COLUMNS)
+                        + ", config) VALUES ("
+                        + ", ".join(["?"] * (8 + len(CONFIG_COLUMNS)))
+                        + ")",
+                        [session, host, host_fingerprint, kernel, build_hash, record["test"], record["timestamp_ns"]]
+                        + columns
+                        + [json.dumps(config)],
+                    )
+                    run_id = cursor.lastrowid
+                    run_ids.append(run_id)
+                    self.conn.execute("INSERT INTO run_sessions VALUES (?, ?)", [run_id, session])
+                elif record_type == "data" and run_id is not None:
+                    data = {k: v for k, v in record.items() if k != "config"}
+                    points.append(
+                        (
+                            run_id,
+                            record["metric"],
+                            record.get("cpu_node", -1),
+                            record.get("mem_node", -1),
+                            record.get("read_write_mix", record["config"].get("read_write_mix")),
+                            record.get("delay"),
+                            record.get("value", record.get("latency")),
+                            record.get("unit", record.get("latency_unit")),
+                            record["timestamp_ns"],
+                            json.dumps(data),
+                        )
+                    )
+            self.conn.executemany("INSERT INTO points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", points)
+        return run_ids
+
+    def merge(self, other_path: str) -> int:
+        """
+        copy all runs and points of another results database; returns the number
+        of runs copied, runs stored here already only get its sessions
+        """
+        other = sqlite3.connect(other_path)
+        other.row_factory = sqlite3.Row
+        has_run_sessions = other.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'run_sessions'"
+        ).fetchone()
+        num_runs = 0
+        with self.conn:
+            for run in other.execute("SELECT * FROM runs ORDER BY id").fetchall():
+                sessions = [run["session"]]
+                if has_run_sessions:
+                    rows = other.execute("SELECT session FROM run_sessions WHERE run_id = ?", [run["id"]])
+                    sessions += [row["session"] for row in rows]
+                run_id = self.find_run(run["host_fingerprint"], run["test"], run["started_ns"], run["config"])
+                if run_id is None:
+                    columns = [x for x in run.keys() if x != "id"]
+                    cursor = self.conn.execute(
+                        f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                        [run[x] for x in columns],
+                    )
+                    run_id = cursor.lastrowid
+                    points = other.execute("SELECT * FROM points WHERE run_id = ? ORDER BY rowid", [run["id"]])
+                    self.conn.executemany(
+                        "INSERT INTO points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(run_id,) + tuple(point)[1:] for point in points],
+                    )
+                    num_runs += 1
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO run_sessions VALUES (?, ?)", [(run_id, x) for x in sessions]
+                )
+        other.close()
+        return num_runs
+
+    def _where(self, filters: Dict) -> Tuple[str, List]:
+        clauses = []
+        params = []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key == "since_ns":
+                clauses.append("runs.started_ns >= ?")
+            elif key in ("cpu_node", "mem_node", "metric", "delay"):
+                clauses.append(f"points.{key} = ?")
+            elif key == "read_write_mix":
+                clauses.append("points.read_write_mix = ?")
+            elif key == "session":
+                clauses.append("runs.id IN (SELECT run_id FROM run_sessions WHERE session = ?)")
+            elif key == "session_ne":
+                clauses.append("runs.id NOT IN (SELECT run_id FROM run_sessions WHERE session = ?)")
+            elif key.endswith("_ne"):
+                # e.g. host_ne="foo": every other host
+                clauses.append(f"runs.{key[:-3]} != ?")
+            else:
+                clauses.append(f"runs.{key} = ?")
+            params.append(value)
+        return (" AND ".join(clauses) if clauses else "1"), params
+
+    def query_points(self, **filters) -> List[sqlite3.Row]:
+        """
+        e.g. query_points(test="idle_latency", use_hugepage=3, cpu_node=0, mem_node=3, since_ns=...)
+        """
+        (where, params) = self._where(filters)
+        return self.conn.execute(
+            "SELECT runs.id AS run_id, runs.host, runs.host_fingerprint, runs.kernel, runs.test, "
+            "runs.started_ns, runs.use_hugepage, runs.access_pattern, points.metric, points.cpu_node, "
+            "points.mem_node, points.read_write_mix, points.delay, points.value, points.unit, points.record "
+            "FROM points JOIN runs ON points.run_id = runs.id WHERE " + where + " ORDER BY runs.started_ns",
+            params,
+        ).fetchall()
+
+    def latest_session(self, host_fingerprint: Optional[str] = None) -> Optional[str]:
+        (where, params) = self._where({"host_fingerprint": host_fingerprint})
+        # a rerun served from the cache links older runs: of the sessions of the
+        # latest run, the one linked last
+        row = self.conn.execute(
+            "SELECT run_sessions.session FROM run_sessions JOIN runs ON run_sessions.run_id = runs.id WHERE "
+            + where
+            + " ORDER BY runs.started_ns DESC, run_sessions.rowid DESC LIMIT 1",
+            params,
+        ).fetchone()
+        return row["session"] if row else None
+
+    def list_hosts(self, session: Optional[str] = None) -> List[str]:
+        (where, params) = self._where({"session": session})
+        rows = self.conn.execute("SELECT DISTINCT host FROM runs WHERE " + where + " ORDER BY host", params)
+        return [row["host"] for row in rows]
+
+    def load_results(self, test: str, **filters) -> List:
+        """
+        rebuild LatencyIdle/BandWidth/LatencyLoaded objects, one per run, in run order
+        """
+        (where, params) = self._where(dict(filters, test=test))
+        results = []
+        run_id = None
+        # one pass over all points of the matching runs
+        for row in self.conn.execute(
+            "SELECT runs.id, runs.config, points.record FROM runs LEFT JOIN points ON points.run_id = runs.id "
+            "WHERE " + where + " ORDER BY runs.id, points.rowid",
+            params,
+        ):
+            if row["id"] != run_id:
+                run_id = row["id"]
+                result = RESULT_TYPES[test]()
+                result.set_config(json.loads(row["config"]))
+                results.append(result)
+            if row["record"] is not None:
+                result.add_record(json.loads(row["record"]))
+        return results
+
+
+def new_session_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+
+
+def main(args):
+    db = ResultsDB(args.db)
+    if args.command == "import":
+        for filename in args.files:
+            with open(filename, "r") as fp:
+                run_ids = db.ingest(iter_records(fp), session=args.session or filename, host=args.host)
+            print(f"{filename}: {len(run_ids)} runs")
+    elif args.command == "merge":
+        for filename in args.files:
+            print(f"{filename}: {db.merge(filename)} runs")
+    elif args.command == "query":
+        since_ns = None
+        if args.since_days:
+            since_ns = int((time.time() - args.since_days * 86400) * 1e9)
+        rows = db.query_points(
+            test=args.test,
+            host=args.host,
+            use_hugepage=args.use_hugepage,
+            access_pattern=args.access_pattern,
+            cpu_node=args.cpu_node,
+            mem_node=args.mem_node,
+            since_ns=since_ns,
+        )
+        for row in rows:
+            print(
+                f"{row['host']:<20s} {row['test']:<16s} {row['cpu_node']:>3d} -> {row['mem_node']:<3d}"
+                f" {row['value']:>10.4g} {row['unit']}"
+            )
+            derived = json.loads(row["record"]).get("derived", {})
+            if args.derived and derived:
+                print(" " * 20 + " ".join(f"{x}={y:.4g}" for x, y in derived.items()))
+        print(f"{len(rows)} points")
+    db.close()
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    subparsers = parser.add_subparsers(dest="command")
+    import_parser = subparsers.add_parser("import", help="import --format jsonl output files")
+    import_parser.add_argument("files", nargs="+", help="jsonl files")
+    import_parser.add_argument("--host", type=str, default=None, help="host the files came from")
+    import_parser.add_argument("--session", type=str, default=None, help="session name; default to file name")
+    merge_parser = subparsers.add_parser("merge", help="merge other results databases into this one")
+    merge_parser.add_argument("files", nargs="+", help="results databases")
+    query_parser = subparsers.add_parser("query", help="list stored data points")
+    query_parser.add_argument("--test", type=str, default=None, help="e.g. idle_latency, peak_bandwidth")
+    query_parser.add_argument("--host", type=str, default=None, help="hostname")
+    query_parser.add_argument("--use-hugepage", type=int, default=None, help="huge page type, as in -H")
+    query_parser.add_argument("--access-pattern", type=int, default=None, help="access pattern, as in -p")
+    query_parser.add_argument("--cpu-node", type=int, default=None, help="CPU node")
+    query_parser.add_argument("--mem-node", type=int, default=None, help="memory node")
+    query_parser.add_argument("--since-days", type=float, default=None, help="only runs in the last N days")
+    query_parser.add_argument(
+        "--derived", action="store_true", help="also list derived counter metrics of points run with --perf-counters"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    main(args)
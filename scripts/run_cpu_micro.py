@@ -1,23 +1,173 @@
 import argparse
+import math
 import os
 import sys
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 from config_huge_page import *
-from config_sysfs_settings import check_autonuma, setup_autonuma
-from print_host_info import color_str, get_cpu_info, get_mem_info
+from config_sysfs_settings import check_autonuma, read_autonuma, setup_autonuma
+from parse_output import iter_records, iter_results
+from print_host_info import (
+    color_str,
+    get_cpu_info,
+    get_host_fingerprint,
+    get_host_topology,
+    get_mem_info,
+    get_numa_nodes,
+)
+from results_db import ResultsDB, get_build_hash, new_session_id
+from scheduler import NumaScheduler, TestJob, cpu_bind_cmd, numa_bind_cmd
+from sweep_cache import SweepCache
+from telemetry import TelemetryRecorder, get_default_telemetry_dir
 from utils import read_env
+from memcpy_engines import get_tables as get_memcpy_tables
+from memcpy_engines import print_tables as print_memcpy_tables
+from thread_scaling import get_curves as get_scaling_curves
+from thread_scaling import print_curves as print_scaling_curves
+from tlb_surface import analyze as analyze_tlb
+from tlb_surface import get_surfaces, print_reaches, print_surfaces
+from wss_curve import analyze, print_transitions
 import subprocess
+import tempfile
 
-def save_file(stdouts: List[str], filename: str):
-    if not os.path.exists('results'):
-        os.mkdir('results')
-        
-    with open(os.path.join('results', filename), 'w') as fp:
-        for stdout in stdouts:
-            fp.write('[start]\n')
-            fp.write(stdout)
-            fp.write('[end]\n')
+
+def save_records(records: List[Dict], test_name: str):
+    results_db.ingest(
+        records,
+        session=session,
+        host_fingerprint=host_fingerprint,
+        build_hash=get_build_hash(get_bin_path(test_name)),
+    )
+
+
+def print_records(records: List[Dict]):
+    for record in records:
+        if record["type"] != "data":
+            continue
+        if record["test"] == "loaded_latency":
+            print(f"{record['delay']:>12d}{record['bandwidth']:>12.1f}{record['latency']:>12.1f}")
+        else:
+            node_pair = f"Node-{record['cpu_node']} -> Node-{record['mem_node']}" if record.get("cpu_node", -1) >= 0 else ""
+            print(f"{record['metric']:<20s}{node_pair:<20s}{record['value']:>10.4g} {record['unit']}")
+    sys.stdout.flush()
+
+
+def uses_huge_pages(cmd: List[str]) -> bool:
+    return any(x in ("-H", "--use_hugepage") and int(y) > 0 for x, y in zip(cmd, cmd[1:]))
+
+
+def get_run_context(cmd: List[str]) -> Dict:
+    """
+    system state a measurement of cmd depends on besides its command line; the
+    huge page reservation only matters to runs on huge pages
+    """
+    context = {
+        "host_fingerprint": host_fingerprint,
+        "autonuma": read_autonuma(),
+    }
+    if uses_huge_pages(cmd):
+        context["huge_pages"] = read_huge_page_state()
+    return context
+
+
+def get_cache_key(cmd: List[str]) -> str:
+    return sweep_cache.make_key(cmd, get_run_context(cmd)) if sweep_cache else ""
+
+
+def get_cached(key: str) -> List[Dict]:
+    return sweep_cache.get(key) if sweep_cache else None
+
+
+def put_cached(key: str, records: List[Dict]):
+    if sweep_cache:
+        sweep_cache.put(key, records)
+
+
+def set_phase(cmd: List[str]):
+    if telemetry:
+        telemetry.set_phase(" ".join([os.path.basename(cmd[0])] + cmd[1:]))
+
+
+def iter_bin(cmd: List[str]) -> Iterator[Dict]:
+    """
+    records of cmd as it prints them; raises CalledProcessError at the end if
+    it failed, after all records it printed
+    """
+    set_phase(cmd)
+    # data records are streamed as each point is measured, advancing the telemetry point
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    try:
+        for record in iter_records(x.decode("utf-8") for x in proc.stdout):
+            if telemetry and record["type"] == "data":
+                telemetry.next_point()
+            yield record
+    except BaseException:
+        # the consumer stopped early, e.g. on Ctrl-C
+        proc.kill()
+        proc.wait()
+        raise
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def stream_bin(cmd: List[str]) -> List[Dict]:
+    return list(iter_bin(cmd))
+
+
+def run_bin(cmd: List[str]) -> List[Dict]:
+    cmd = cmd + ["--format", "jsonl"]
+    key = get_cache_key(cmd)
+    records = get_cached(key)
+    if records is not None:
+        print(color_str("(cached)", 36))
+    else:
+        records = stream_bin(cmd)
+        put_cached(key, records)
+    print_records(records)
+    return records
+
+
+def run_plan(cmd: List[str], points: List[List[str]]) -> List[Dict]:
+    """
+    run cmd with each point's extra options in one process (--plan), so the binary
+    reuses memory regions between points of the same layout; points are cached one
+    by one, under the keys of separate runs of cmd + point, as soon as they are
+    complete, so a plan that fails halfway resumes after its last finished point
+    """
+    keys = [get_cache_key(cmd + point + ["--format", "jsonl"]) for point in points]
+    point_records = [get_cached(key) for key in keys]
+    todo = [i for i, x in enumerate(point_records) if x is None]
+    if len(todo) < len(points):
+        print(color_str(f"({len(points) - len(todo)} of {len(points)} points cached)", 36))
+    if todo:
+        for idx in todo:
+            point_records[idx] = []
+        # todo[:num_finished] are complete and cached
+        num_finished = 0
+
+        def finish_points(end: int):
+            nonlocal num_finished
+            for k in range(num_finished, end):
+                put_cached(keys[todo[k]], point_records[todo[k]])
+            num_finished = max(num_finished, end)
+
+        with tempfile.NamedTemporaryFile("w", prefix="mm-mem-", suffix=".plan") as fp:
+            fp.write("".join(" ".join(points[i]) + "\n" for i in todo))
+            fp.flush()
+            # each point's records start with its config record; skipped points have none
+            idx = None
+            for record in iter_bin(cmd + ["--plan", fp.name, "--format", "jsonl"]):
+                if record["type"] == "config":
+                    # the points before are complete, including those the binary skipped
+                    finish_points(record["plan_point"])
+                    idx = todo[record["plan_point"]]
+                record.pop("plan_point", None)
+                if idx is not None:
+                    point_records[idx].append(record)
+        finish_points(len(todo))
+    records = [x for records in point_records for x in records]
+    print_records(records)
+    return records
 
 def get_huge_page_mapping(size: int) -> int:
     if size == (2 << 10):
@@ -37,49 +187,109 @@ def get_bin_path(test_name: str) -> str:
     return os.path.join(read_env()["ROOT"], "bin", test_name)
 
 
-def run_idle_latency(huge_page_state: Dict[int, List[int]]):
+def get_adaptive_args() -> List[str]:
+    """
+    stop each data point once its CI converges, for binaries supporting --rel_ci
+    """
+    if args.rel_ci <= 0:
+        return []
+    return ["--rel_ci", str(args.rel_ci), "--max_duration", str(args.max_duration or args.target_duration)]
+
 
-    latency_results = []
+def get_perf_args() -> List[str]:
+    if not args.perf_counters:
+        return []
+    return ["--perf_counters"] + (["--perf_events", args.perf_events] if args.perf_events else [])
+
+
+def get_histogram_args() -> List[str]:
+    if not args.histogram:
+        return []
+    return ["--histogram", "--sample_chases", str(args.sample_chases)]
+
+
+def run_latency_matrix_parallel(cmd: List[str]) -> List[Dict]:
+    """
+    split the latency matrix into one job per (cpu node, mem node) pair and run
+    pairs on disjoint nodes concurrently; records are tagged with their node pair
+    """
+    node_to_cpus = get_numa_nodes()
+    mem_nodes = get_mem_info(do_print=False)
+    scheduler = NumaScheduler(max_parallel=args.max_parallel)
+
+    def on_pair_done(job: TestJob):
+        # pairs overlap, so the telemetry point counts finished pairs
+        if telemetry:
+            telemetry.next_point()
+
+    cmd = cmd + ["--format", "jsonl"]
+    pairs = {}
+    pair_records = []
+    for i, cpus in node_to_cpus.items():
+        if len(cpus) == 0:
+            continue
+        for j in range(len(mem_nodes)):
+            if mem_nodes[j] < 1:
+                continue
+            pair_cmd = numa_bind_cmd(cmd, i, j)
+            key = get_cache_key(pair_cmd)
+            records = get_cached(key)
+            if records is not None:
+                pair_records.append(records)
+                continue
+            job = scheduler.submit(TestJob(f"idle_latency {i}->{j}", pair_cmd, nodes=(i, j), on_done=on_pair_done))
+            pairs[job.name] = (i, j, key)
+    if pair_records:
+        print(color_str(f"{len(pair_records)} node pairs cached", 36))
+    set_phase(cmd + ["--parallel"])
+    for job in scheduler.run():
+        if job.returncode != 0:
+            raise subprocess.CalledProcessError(job.returncode, job.cmd, job.stdout)
+        (i, j, key) = pairs[job.name]
+        records = list(iter_records(job.stdout.splitlines()))
+        for record in records:
+            if record["type"] == "data":
+                record["cpu_node"] = i
+                record["mem_node"] = j
+        put_cached(key, records)
+        pair_records.append(records)
+    config_record = None
+    data_records = []
+    for records in pair_records:
+        for record in records:
+            if record["type"] == "config" and config_record is None:
+                config_record = record
+            elif record["type"] == "data":
+                data_records.append(record)
+    data_records.sort(key=lambda x: (x["cpu_node"], x["mem_node"]))
+    records = ([config_record] if config_record else []) + data_records
+    print_records(records)
+    return records
+
+
+def run_latency_matrix(cmd: List[str], points: List[List[str]]) -> List[Dict]:
+    if args.parallel:
+        return [x for point in points for x in run_latency_matrix_parallel(cmd + point)]
+    return run_plan(cmd + ["--latency_matrix"], points)
+
+
+def run_idle_latency(huge_page_pool: HugePagePool):
 
     print(color_str("---- Running Idle Latency test ...", 32))
     sys.stdout.flush()
-    # not using huge page
     cmd = [
         get_bin_path("cpu_idle_latency"),
-        "--latency_matrix",
         "-t",
         str(args.target_duration),
-    ]
-    stdout = subprocess.check_output(" ".join(cmd), shell=True).decode("utf-8")
-    print(stdout)
-    latency_results.append(stdout)
-
-    # using huge page
-    print(color_str("---- Running Idle Latency test with huge pages ...", 32))
-    huge_page_sizes = get_huge_page_sizes()
-    for size in huge_page_sizes:
+    ] + get_adaptive_args() + get_perf_args() + get_histogram_args()
+    # not using huge page, then each huge page size
+    points = [["-p", "1", "-H", "0"]]
+    for size in huge_page_pool.available_sizes():
         print("using huge page size: ", human_read_pagesize(size))
+        points.append(["-p", "2", "-H", str(get_huge_page_mapping(size))])
+    latency_results = run_latency_matrix(cmd, points)
 
-        if setup_huge_pages(HugePageSize(size)) is False:
-            print(color_str("Fail to setup huge pages", 31))
-            continue
-
-        cmd = [
-            get_bin_path("cpu_idle_latency"),
-            "--latency_matrix",
-            "-t",
-            str(args.target_duration),
-            "-p",
-            "2",
-            "-H",
-            str(get_huge_page_mapping(size)),
-        ]
-        stdout = subprocess.check_output(" ".join(cmd), shell=True).decode("utf-8")
-        print(stdout)
-        latency_results.append(stdout)
-        reset_huge_pages(huge_page_state)
-
-    save_file(latency_results, 'cpu_idle_latency.txt')
+    save_records(latency_results, "cpu_idle_latency")
 
 
 def run_peak_bandwidth(num_numa_nodes: int):
@@ -99,50 +309,251 @@ def run_peak_bandwidth(num_numa_nodes: int):
         # 1 - 1:1 read/write
         # 2 - 2:1 read/write
         # 3 - 3:1 read/write
+        # 4 - all writes
+        # 5 - all non-temporal writes
+        # 6 - 1:1 read/non-temporal write
+        # 7 - read-modify-write
         bandwidth_types = {
             0: "all reads",
             1: "1:1 read/write",
             2: "2:1 read/write",
             3: "3:1 read/write",
+            4: "all writes",
+            5: "all non-temporal writes",
+            6: "1:1 read/non-temporal write",
+            7: "read-modify-write",
         }
 
-        for i, test_type in bandwidth_types.items():
-            print(color_str(f"---- Running Peak Bandwidth test - {test_type} ...", 32))
-            sys.stdout.flush()
-            cmd = [
-                get_bin_path("cpu_peak_bandwidth"),
-                "--bandwidth_matrix",
-                "-t",
-                str(args.target_duration),
-                "-m",
-                str(i),
-            ]
-            stdout = subprocess.check_output(" ".join(cmd), shell=True).decode("utf-8")
-            print(stdout)
-            peak_bandwith_results.append(stdout)
-
-    save_file(peak_bandwith_results, 'cpu_peak_bandwidth.txt')
-
-
-def run_memcpy(num_numa_nodes: int):
-    print(color_str("---- Running MemCpy test - Large ...", 32))
+        print(color_str(f"---- Running Peak Bandwidth test - {', '.join(bandwidth_types.values())} ...", 32))
+        sys.stdout.flush()
+        cmd = [
+            get_bin_path("cpu_peak_bandwidth"),
+            "--bandwidth_matrix",
+            "-t",
+            str(args.target_duration),
+        ] + get_adaptive_args() + get_perf_args()
+        peak_bandwith_results += run_plan(cmd, [["-m", str(i)] for i in bandwidth_types])
+
+    save_records(peak_bandwith_results, "cpu_peak_bandwidth")
+
+
+def get_memcpy_fragments_b() -> List[int]:
+    """
+    fragment sizes from 64B up to the whole --memcpy-region-kb, --memcpy-fragment-step apart
+    """
+    fragments = []
+    fragment = 64
+    while fragment < args.memcpy_region_kb * 1024:
+        fragments.append(fragment)
+        fragment *= args.memcpy_fragment_step
+    return fragments + [args.memcpy_region_kb * 1024]
+
+
+def run_memcpy(num_numa_nodes: int, sweep: bool):
+    """
+    memcpy bandwidth of every copy engine over the fragment sizes, per node pair
+    on NUMA hosts; engines the CPU lacks are skipped by the binary. without
+    sweep, only the first engine on a whole-region and a 16KB fragment, locally
+    """
+    engines = args.memcpy_engines if sweep else args.memcpy_engines[:1]
+    fragments = get_memcpy_fragments_b() if sweep else sorted({16384, args.memcpy_region_kb * 1024})
+    print(color_str(f"---- Running MemCpy test - {', '.join(engines)} ...", 32))
     sys.stdout.flush()
     cmd = [
         get_bin_path("cpu_memcpy"),
         "-t",
-        str(args.target_duration),
-    ]
-    os.system(" ".join(cmd))
-    print(color_str("---- Running MemCpy test - Medium ...", 32))
+        str(args.memcpy_duration or args.target_duration),
+        "-b",
+        str(args.memcpy_region_kb),
+    ] + get_perf_args()
+    if sweep and num_numa_nodes > 0:
+        cmd.append("--memcpy_matrix")
+    points = [["-e", engine, "-f", str(x)] for engine in engines for x in fragments]
+    print(f"{len(fragments)} fragment sizes from {fragments[0]}B to {fragments[-1]}B, {len(points)} points")
+    records = run_plan(cmd, points)
+    save_records(records, "cpu_memcpy")
+    print_memcpy_tables(get_memcpy_tables([x for x in iter_results(records)]))
+
+
+def get_wss_sizes_kb() -> List[int]:
+    """
+    region sizes from --wss-min-kb to --wss-max-kb, --wss-steps-per-octave
+    sizes per doubling, in whole 4KB pages
+    """
+    num_steps = round(math.log2(args.wss_max_kb / args.wss_min_kb) * args.wss_steps_per_octave)
+    sizes = []
+    for k in range(num_steps + 1):
+        size = max(4, round(args.wss_min_kb * 2 ** (k / args.wss_steps_per_octave) / 4) * 4)
+        if size not in sizes:
+            sizes.append(size)
+    return sizes
+
+
+def get_wss_node_pairs() -> List[tuple]:
+    """
+    (cpu node, mem node) of each memory node's curve: its own CPUs, or those of
+    the first node with CPUs for a CPU-less node
+    """
+    node_to_cpus = get_numa_nodes()
+    cpu_nodes = [i for i, cpus in sorted(node_to_cpus.items()) if cpus]
+    mem_nodes = get_mem_info(do_print=False)
+    return [(j if node_to_cpus.get(j) else cpu_nodes[0], j) for j in range(len(mem_nodes)) if mem_nodes[j] >= 1]
+
+
+def run_wss_sweep(huge_page_pool: HugePagePool):
+    """
+    idle latency of geometrically growing regions per access pattern, huge page
+    size and memory node, stored as wss_latency runs, then the cache and TLB
+    transitions found in each latency-vs-footprint curve
+    """
+    print(color_str("---- Running Working Set Size sweep ...", 32))
     sys.stdout.flush()
     cmd = [
-        get_bin_path("cpu_memcpy"),
+        get_bin_path("cpu_idle_latency"),
         "-t",
-        str(args.target_duration),
-        "-f",
-        "16384",
+        str(args.wss_duration or args.target_duration),
+        # regions of different sizes are never reused
+        "--plan_cache_mb",
+        "1",
+    ] + get_adaptive_args() + get_perf_args() + get_histogram_args()
+    sizes = get_wss_sizes_kb()
+    points = []
+    for pattern in args.wss_patterns:
+        points += [["-p", str(pattern), "-H", "0", "-b", str(x)] for x in sizes]
+        for size in huge_page_pool.available_sizes():
+            # as large as the huge pages reserved per node
+            points += [
+                ["-p", str(pattern), "-H", str(get_huge_page_mapping(size)), "-b", str(x)]
+                for x in sizes
+                if x <= huge_page_pool.region_size_kb
+            ]
+    print(f"{len(sizes)} sizes from {sizes[0]}KB to {sizes[-1]}KB, {len(points)} points per node")
+    records = []
+    for i, j in get_wss_node_pairs():
+        print(f"Node-{i} -> Node-{j}")
+        node_records = run_plan(numa_bind_cmd(cmd, i, j), points)
+        for record in node_records:
+            record["test"] = "wss_latency"
+            if record["type"] == "data":
+                record["cpu_node"] = i
+                record["mem_node"] = j
+        records += node_records
+    save_records(records, "cpu_idle_latency")
+    results = [x for x in iter_results(records)]
+    print_transitions(analyze(results, get_host_topology().cache_sizes_kb))
+
+
+def run_tlb_sweep(huge_page_pool: HugePagePool):
+    """
+    idle latency of random in chunk chases over chunk size x stride, per huge
+    page size, on the first node; stored as tlb_latency runs, then the latency
+    surfaces and the dTLB reach and page walk penalty inferred from them
+    """
+    print(color_str("---- Running TLB reach sweep ...", 32))
+    sys.stdout.flush()
+    cmd = [
+        get_bin_path("cpu_idle_latency"),
+        "-t",
+        str(args.tlb_duration or args.target_duration),
+        "--plan_cache_mb",
+        "1",
+    ] + get_adaptive_args() + get_perf_args()
+    page_types = [(0, args.tlb_region_kb)] + [
+        # as large as the huge pages reserved per node
+        (get_huge_page_mapping(x), min(args.tlb_region_kb, huge_page_pool.region_size_kb))
+        for x in huge_page_pool.available_sizes()
     ]
-    os.system(" ".join(cmd))
+    points = []
+    for use_hugepage, region_kb in page_types:
+        chunk_kb = args.tlb_min_chunk_kb
+        while chunk_kb <= region_kb:
+            points += [
+                ["-p", "1", "-H", str(use_hugepage), "-b", str(region_kb), "-c", str(chunk_kb), "-s", str(x)]
+                for x in args.tlb_strides
+                if x <= chunk_kb * 1024
+            ]
+            chunk_kb *= 2
+    (i, j) = get_wss_node_pairs()[0]
+    print(f"{len(points)} points, Node-{i} -> Node-{j}")
+    records = run_plan(numa_bind_cmd(cmd, i, j), points)
+    for record in records:
+        record["test"] = "tlb_latency"
+        if record["type"] == "data":
+            record["cpu_node"] = i
+            record["mem_node"] = j
+    save_records(records, "cpu_idle_latency")
+    surfaces = get_surfaces([x for x in iter_results(records)])
+    if surfaces:
+        print_surfaces(surfaces)
+        print_reaches(analyze_tlb(surfaces), max(surfaces))
+
+
+def get_scaling_threads(num_cpus: int) -> List[int]:
+    """
+    every thread count up to 16 CPUs, then powers of 2 and 1.5x them (16, 24,
+    32, 48, ...), always ending at all CPUs of the domain
+    """
+    if num_cpus <= 16:
+        return list(range(1, num_cpus + 1))
+    counts = list(range(1, 17))
+    while counts[-1] * 3 // 2 < num_cpus:
+        counts.append(counts[-1] * 3 // 2 if counts[-1] & (counts[-1] - 1) == 0 else counts[-1] * 4 // 3)
+    return counts + [num_cpus]
+
+
+def get_llc_cpus(llc_domains: List[List[int]], node_cpus: List[int]) -> Optional[List[int]]:
+    """
+    the node's CPUs in its first LLC domain; None when sysfs has no cache
+    topology, i.e. every domain of a multi-CPU node is a single CPU
+    """
+    domains = [x for x in ([y for y in z if y in node_cpus] for z in llc_domains) if x]
+    if not domains or (len(domains[0]) == 1 and len(node_cpus) > 1):
+        return None
+    return domains[0]
+
+
+def run_thread_scaling():
+    """
+    peak bandwidth of a read/write mix with 1, 2, ... threads bound to the CPUs
+    of each node (or of its first LLC domain with --scaling-llc), on local
+    memory; stored as thread_scaling runs, then the bandwidth, per-thread
+    fairness and saturation point of each curve
+    """
+    print(color_str("---- Running thread scaling sweep ...", 32))
+    sys.stdout.flush()
+    cmd = [
+        get_bin_path("cpu_peak_bandwidth"),
+        "-t",
+        str(args.scaling_duration or args.target_duration),
+    ] + get_adaptive_args() + get_perf_args()
+    topology = get_host_topology()
+    mem_nodes = get_mem_info(do_print=False)
+    records = []
+    for i, node_cpus in sorted(topology.node_to_cpus.items()):
+        if not node_cpus or i >= len(mem_nodes) or mem_nodes[i] < 1:
+            continue
+        cpus = get_llc_cpus(topology.llc_domains, node_cpus) if args.scaling_llc else None
+        if cpus is not None:
+            domain = "llc"
+            node_cmd = cpu_bind_cmd(cmd, cpus, i)
+        else:
+            if args.scaling_llc:
+                print(color_str(f"no LLC domain found on Node-{i}, scaling over the node's CPUs", 33))
+            (domain, cpus) = ("node", node_cpus)
+            node_cmd = numa_bind_cmd(cmd, i, i)
+        points = [["-n", str(n), "-m", str(args.scaling_mix)] for n in get_scaling_threads(len(cpus))]
+        print(f"Node-{i}, {domain} of {len(cpus)} CPUs: {len(points)} thread counts")
+        node_records = run_plan(node_cmd, points)
+        for record in node_records:
+            record["test"] = "thread_scaling"
+            if record["type"] == "config":
+                record["config"]["domain"] = domain
+            elif record["type"] == "data":
+                record["cpu_node"] = i
+                record["mem_node"] = i
+        records += node_records
+    save_records(records, "cpu_peak_bandwidth")
+    print_scaling_curves(get_scaling_curves([x for x in iter_results(records)]), args.scaling_tolerance)
 
 
 class AccessPattern(Enum):
@@ -151,52 +562,56 @@ class AccessPattern(Enum):
     RANDOM_IN_FULL_REGION = 2
 
 
-def run_loaded_latency(huge_page_state: Dict[int, List[int]], access_pattern: AccessPattern=AccessPattern.RANDOM_IN_CHUNK):
+def get_delay_args() -> List[str]:
+    if args.delay_budget <= 0:
+        return []
+    return ["--adaptive_delays", "--delay_budget", str(args.delay_budget)]
+
+
+def get_node_pairs() -> List[tuple]:
+    node_to_cpus = get_numa_nodes()
+    mem_nodes = get_mem_info(do_print=False)
+    return [(i, j) for i, cpus in node_to_cpus.items() if cpus for j in range(len(mem_nodes)) if mem_nodes[j] >= 1]
+
+
+def run_loaded_latency_plan(cmd: List[str], points: List[List[str]]) -> List[Dict]:
+    """
+    unbound run, then with --loaded-latency-pairs one run bound to each node pair,
+    its data records tagged with the pair
+    """
+    records = run_plan(cmd, points)
+    if not args.loaded_latency_pairs:
+        return records
+    for i, j in get_node_pairs():
+        print(f"Node-{i} -> Node-{j}")
+        pair_records = run_plan(numa_bind_cmd(cmd, i, j), points)
+        for record in pair_records:
+            if record["type"] == "data":
+                record["cpu_node"] = i
+                record["mem_node"] = j
+        records += pair_records
+    return records
+
 
-    loaded_latency_results = []
+def run_loaded_latency(huge_page_pool: HugePagePool, access_pattern: AccessPattern=AccessPattern.RANDOM_IN_CHUNK):
 
     print(color_str("---- Running Loaded Latency test ...", 32))
     sys.stdout.flush()
-    # not using huge page
     cmd = [
         get_bin_path("cpu_loaded_latency"),
         "-t",
         str(args.target_duration),
         "-p",
         str(access_pattern.value)
-    ]
-
-    stdout = subprocess.check_output(" ".join(cmd), shell=True).decode("utf-8")
-    print(stdout)
-    loaded_latency_results.append(stdout)
-
-    # using huge page
-    print(color_str("---- Running Loaded Latency test with huge pages ...", 32))
-    huge_page_sizes = get_huge_page_sizes()
-
-    for size in huge_page_sizes:
+    ] + get_delay_args() + get_perf_args() + get_histogram_args()
+    # not using huge page, then each huge page size; the load generation regions are shared
+    points = [["-H", "0"]]
+    for size in huge_page_pool.available_sizes():
         print("using huge page size: ", human_read_pagesize(size))
+        points.append(["-H", str(get_huge_page_mapping(size))])
+    loaded_latency_results = run_loaded_latency_plan(cmd, points)
 
-        if setup_huge_pages(HugePageSize(size)) is False:
-            print(color_str("Fail to setup huge pages", 31))
-            continue
-
-        cmd = [
-            get_bin_path("cpu_loaded_latency"),
-            "-t",
-            str(args.target_duration),
-            "-p",
-            str(access_pattern.value),
-            "-H",
-            str(get_huge_page_mapping(size)),
-        ]
-
-        stdout = subprocess.check_output(" ".join(cmd), shell=True).decode("utf-8")
-        print(stdout)
-        loaded_latency_results.append()
-        reset_huge_pages(huge_page_state)
-
-    save_file(loaded_latency_results, 'cpu_loaded_latency.txt')
+    save_records(loaded_latency_results, "cpu_loaded_latency")
 
 
 def init_parser():
@@ -206,31 +621,189 @@ def init_parser():
         "--test",
         action="append",
         default=None,
-        choices=["idle_latency", "loaded_latency", "bandwidth"],
-        help="selective run certain tests; default to run all",
+        choices=["idle_latency", "loaded_latency", "bandwidth", "memcpy", "wss", "tlb", "scaling"],
+        help="selective run certain tests; default to run all but the working set size (wss), TLB (tlb) and"
+        " thread scaling (scaling) sweeps, with memcpy of the first engine only instead of the engine sweep",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="run latency matrix cells on disjoint NUMA nodes concurrently",
+    )
+    parser.add_argument(
+        "--max-parallel", type=int, default=0, help="max concurrent jobs with --parallel; 0 for no limit"
+    )
+    parser.add_argument(
+        "--rel-ci",
+        type=float,
+        default=0,
+        help="adaptive duration for latency/bandwidth points: stop once the 95%% CI half width is within"
+        " this fraction of the mean, e.g. 0.01; 0 for fixed --target-duration",
+    )
+    parser.add_argument(
+        "--max-duration", type=int, default=0, help="max seconds per data point with --rel-ci; 0 for --target-duration"
+    )
+    parser.add_argument(
+        "--delay-budget",
+        type=int,
+        default=0,
+        help="loaded latency: pick up to this many delays adaptively around the curve knee; 0 for the fixed sweep",
+    )
+    parser.add_argument(
+        "--loaded-latency-pairs",
+        action="store_true",
+        help="loaded latency: also run bound to each (cpu node, mem node) pair, for per-pair curves",
+    )
+    parser.add_argument(
+        "--perf-counters",
+        action="store_true",
+        help="count LLC/dTLB misses and stalls per point and store derived metrics (e.g. misses per chase)",
+    )
+    parser.add_argument(
+        "--perf-events", type=str, default="", help="extra raw events with --perf-counters, e.g. dtlb_walks=0x0e08"
+    )
+    parser.add_argument(
+        "--histogram", action="store_true", help="latency tests: also record p50/p90/p99/p99.9/max per point"
+    )
+    parser.add_argument(
+        "--sample-chases",
+        type=int,
+        default=1,
+        help="chases per latency sample with --histogram, timed on their own after every batch of 256; 256 times"
+        " the batches themselves, for percentiles of batch means",
+    )
+    parser.add_argument(
+        "--memcpy-engines",
+        type=str,
+        nargs="+",
+        default=["glibc", "movsb", "sse2", "sse2_nt", "avx", "avx_nt"],
+        help="memcpy: copy engines to compare",
+    )
+    parser.add_argument(
+        "--memcpy-region-kb", type=int, default=128 << 10, help="memcpy: region in KB, the largest fragment"
+    )
+    parser.add_argument(
+        "--memcpy-fragment-step", type=int, default=4, help="memcpy: factor between fragment sizes, from 64B"
+    )
+    parser.add_argument(
+        "--memcpy-duration", type=int, default=1, help="memcpy: seconds per point; 0 for --target-duration"
+    )
+    parser.add_argument("--wss-min-kb", type=int, default=4, help="working set size sweep: smallest region in KB")
+    parser.add_argument(
+        "--wss-max-kb", type=int, default=8 << 20, help="working set size sweep: largest region in KB"
+    )
+    parser.add_argument(
+        "--wss-steps-per-octave", type=int, default=4, help="working set size sweep: region sizes per doubling"
+    )
+    parser.add_argument(
+        "--wss-patterns",
+        type=int,
+        nargs="+",
+        default=[1, 2],
+        help="working set size sweep: access patterns, 0 sequential, 1 random in chunk, 2 random in full region",
+    )
+    parser.add_argument(
+        "--wss-duration", type=int, default=1, help="working set size sweep: seconds per point; 0 for --target-duration"
+    )
+    parser.add_argument(
+        "--tlb-region-kb",
+        type=int,
+        default=1 << 20,
+        help="TLB sweep: region in KB, capped by the huge pages reserved per node; the largest chunk",
+    )
+    parser.add_argument("--tlb-min-chunk-kb", type=int, default=4, help="TLB sweep: smallest chunk in KB, doubled up")
+    parser.add_argument(
+        "--tlb-strides", type=int, nargs="+", default=[64, 256, 1024, 4096], help="TLB sweep: strides in bytes"
+    )
+    parser.add_argument(
+        "--tlb-duration", type=int, default=1, help="TLB sweep: seconds per point; 0 for --target-duration"
+    )
+    parser.add_argument(
+        "--scaling-mix", type=int, default=0, help="thread scaling sweep: read/write mix, see cpu_peak_bandwidth -m"
+    )
+    parser.add_argument(
+        "--scaling-llc",
+        action="store_true",
+        help="thread scaling sweep: bind to the first LLC domain (e.g. CCX) of each node instead of the whole node",
+    )
+    parser.add_argument(
+        "--scaling-tolerance",
+        type=float,
+        default=0.05,
+        help="thread scaling sweep: saturated once within this fraction of the peak bandwidth",
+    )
+    parser.add_argument(
+        "--scaling-duration", type=int, default=1, help="thread scaling sweep: seconds per point; 0 for --target-duration"
+    )
+    parser.add_argument("--db", type=str, default=None, help="results database; default to results/results.db")
+    parser.add_argument("--session", type=str, default=None, help="session name; default to a timestamp")
+    parser.add_argument("--force", action="store_true", help="measure every point again, overwriting cached ones")
+    parser.add_argument(
+        "--cache-ttl", type=float, default=0, help="max age in hours of cached points to reuse; 0 for no limit"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the sweep cache")
+    parser.add_argument("--cache-dir", type=str, default=None, help="sweep cache; default to results/cache")
+    parser.add_argument(
+        "--telemetry-interval",
+        type=int,
+        default=100,
+        help="sample vmstat/numastat/node meminfo every this many ms into results/telemetry; 0 to disable",
     )
     return parser
 
 
 def main(args):
+    global results_db, session, host_fingerprint, sweep_cache, telemetry
+    results_db = ResultsDB(args.db)
+    sweep_cache = None
+    if not args.no_cache:
+        sweep_cache = SweepCache(args.cache_dir, ttl_s=args.cache_ttl * 3600, force=args.force)
+    session = args.session or new_session_id()
+    host_fingerprint = get_host_fingerprint()
+    print(color_str(f"session {session} -> {results_db.path}", 35))
     num_numa_nodes = get_cpu_info()
-    get_mem_info(num_numa_nodes)
-    huge_page_state = check_huge_pages(color_str("before", 33))
+    get_mem_info()
+    check_huge_pages(color_str("before", 33))
     autonuma_state = check_autonuma(color_str("before", 33))
-    # change autonuma setting here and hugepage setting in each test
+    # change autonuma setting here and reserve huge pages once for all tests
     if autonuma_state > 0:
         setup_autonuma(value=0)
-    print(color_str("-------- Running MM-Mem --------", 35))
-    sys.stdout.flush()
-    if args.test is None or "idle_latency" in args.test:
-        run_idle_latency(huge_page_state)
-    if args.test is None or "bandwidth" in args.test:
-        run_peak_bandwidth(num_numa_nodes)
-        # run_memcpy(num_numa_nodes)
-    if args.test is None or "loaded_latency" in args.test:
-        run_loaded_latency(huge_page_state)
-    if autonuma_state > 0:
-        setup_autonuma(value=autonuma_state)
+    huge_page_pool = HugePagePool(get_huge_page_sizes())
+    telemetry = None
+    if args.telemetry_interval > 0:
+        telemetry = TelemetryRecorder(args.telemetry_interval / 1000)
+        telemetry.start()
+    try:
+        if args.test is None or {"idle_latency", "loaded_latency", "wss", "tlb"} & set(args.test):
+            huge_page_pool.reserve()
+        print(color_str("-------- Running MM-Mem --------", 35))
+        sys.stdout.flush()
+        if args.test is None or "idle_latency" in args.test:
+            run_idle_latency(huge_page_pool)
+        if args.test is None or "bandwidth" in args.test:
+            run_peak_bandwidth(num_numa_nodes)
+        if args.test is None or "memcpy" in args.test:
+            # the engine x fragment x node pair sweep only on request, it takes hours
+            run_memcpy(num_numa_nodes, sweep=args.test is not None)
+        if args.test is None or "loaded_latency" in args.test:
+            run_loaded_latency(huge_page_pool)
+        if args.test is not None and "wss" in args.test:
+            run_wss_sweep(huge_page_pool)
+        if args.test is not None and "tlb" in args.test:
+            run_tlb_sweep(huge_page_pool)
+        if args.test is not None and "scaling" in args.test:
+            run_thread_scaling()
+    finally:
+        if telemetry:
+            telemetry.stop()
+            telemetry_path = os.path.join(get_default_telemetry_dir(), f"{session}.tel")
+            telemetry.save(telemetry_path)
+            print(color_str(f"telemetry: {len(telemetry.times)} samples -> {telemetry_path}", 35))
+        huge_page_pool.restore()
+        if autonuma_state > 0:
+            setup_autonuma(value=autonuma_state)
+    if sweep_cache:
+        print(color_str(f"sweep cache: {sweep_cache.hits} hits, {sweep_cache.misses} misses", 35))
 
 
 if __name__ == "__main__":
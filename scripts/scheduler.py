@@ -0,0 +1,143 @@
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, FrozenSet, Iterable, List, Optional
+
+from print_host_info import color_str
+
+
+class TestJob:
+    """
+    one binary invocation and the NUMA nodes it touches (CPU and memory side)
+
+    exclusive jobs (e.g. bandwidth matrix, loaded latency) need the whole machine
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cmd: List[str],
+        nodes: Iterable[int] = (),
+        exclusive: bool = False,
+        on_done: Optional[Callable[["TestJob"], None]] = None,
+    ):
+        self.name = name
+        self.cmd = cmd
+        self.nodes: FrozenSet[int] = frozenset(nodes)
+        self.exclusive = exclusive or len(self.nodes) == 0
+        self.on_done = on_done
+        self.stdout = ""
+        self.returncode = None
+        self.elapsed = 0.0
+        self._proc = None
+        self._stdout_file = None
+        self._start_time = 0.0
+
+    def __repr__(self) -> str:
+        nodes = "all" if self.exclusive else ",".join(str(x) for x in sorted(self.nodes))
+        return f"{self.name} [nodes: {nodes}]"
+
+
+def numa_bind_cmd(cmd: List[str], cpu_node: int, mem_node: int) -> List[str]:
+    return ["numactl", f"--cpunodebind={cpu_node}", f"--membind={mem_node}"] + cmd
+
+
+def cpu_bind_cmd(cmd: List[str], cpus: List[int], mem_node: int) -> List[str]:
+    return ["numactl", f"--physcpubind={','.join(str(x) for x in cpus)}", f"--membind={mem_node}"] + cmd
+
+
+class NumaScheduler:
+    """
+    run test jobs concurrently as long as they work on disjoint NUMA node sets
+
+    jobs are started in submission order; a job that conflicts with a running one
+    waits, but later non-conflicting jobs may overtake it
+    """
+
+    def __init__(self, max_parallel: int = 0, poll_interval: float = 0.05):
+        self.max_parallel = max_parallel
+        self.poll_interval = poll_interval
+        self.pending: List[TestJob] = []
+        self.running: List[TestJob] = []
+        self.finished: List[TestJob] = []
+
+    def submit(self, job: TestJob) -> TestJob:
+        self.pending.append(job)
+        return job
+
+    def _busy_nodes(self) -> FrozenSet[int]:
+        busy = frozenset()
+        for job in self.running:
+            busy = busy | job.nodes
+        return busy
+
+    def _can_start(self, job: TestJob, busy: FrozenSet[int]) -> bool:
+        if self.max_parallel > 0 and len(self.running) >= self.max_parallel:
+            return False
+        if any(x.exclusive for x in self.running):
+            return False
+        if job.exclusive:
+            return len(self.running) == 0
+        return len(job.nodes & busy) == 0
+
+    def _start(self, job: TestJob):
+        print(color_str(f"launch {job}", 36))
+        sys.stdout.flush()
+        job._start_time = time.monotonic()
+        # a file rather than a pipe, which nobody drains while the job runs
+        job._stdout_file = tempfile.TemporaryFile()
+        job._proc = subprocess.Popen(job.cmd, stdout=job._stdout_file, shell=False)
+        self.running.append(job)
+
+    def _reap(self, job: TestJob):
+        job.returncode = job._proc.wait()
+        job._stdout_file.seek(0)
+        job.stdout = job._stdout_file.read().decode("utf-8")
+        job._stdout_file.close()
+        job._stdout_file = None
+        job.elapsed = time.monotonic() - job._start_time
+        job._proc = None
+        self.running.remove(job)
+        self.finished.append(job)
+        if job.returncode != 0:
+            print(color_str(f"job {job} failed with code {job.returncode}", 31))
+        if job.on_done:
+            job.on_done(job)
+
+    def _schedule(self):
+        idx = 0
+        while idx < len(self.pending):
+            job = self.pending[idx]
+            if self._can_start(job, self._busy_nodes()):
+                self.pending.pop(idx)
+                self._start(job)
+                continue
+            if job.exclusive:
+                # keep exclusive jobs from being starved by smaller ones
+                break
+            idx += 1
+
+    def run(self) -> List[TestJob]:
+        """
+        run all submitted jobs; returns them in completion order
+        """
+        start_time = time.monotonic()
+        try:
+            while self.pending or self.running:
+                self._schedule()
+                time.sleep(self.poll_interval)
+                for job in list(self.running):
+                    if job._proc.poll() is not None:
+                        self._reap(job)
+        finally:
+            for job in self.running:
+                if job._proc and job._proc.poll() is None:
+                    job._proc.terminate()
+                if job._stdout_file:
+                    job._stdout_file.close()
+        print(color_str(f"{len(self.finished)} jobs done in {time.monotonic() - start_time:.1f} sec", 36))
+        finished = self.finished
+        self.finished = []
+        return finished
+
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from results_db import get_build_hash
+from utils import read_env
+
+
+def get_default_cache_dir() -> str:
+    return os.path.join(read_env()["ROOT"], "results", "cache")
+
+
+class SweepCache:
+    """
+    on-disk cache of the records of each sweep point, so an interrupted run
+    only measures the points it is missing
+
+    a point is keyed by the binaries it runs (content hash), its full command
+    line and the system context it ran in (host topology, hugepage reservation,
+    autonuma setting); entries older than ttl_s are measured again
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl_s: float = 0, force: bool = False):
+        self.cache_dir = cache_dir or get_default_cache_dir()
+        self.ttl_s = ttl_s
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self._build_hashes = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _build_hash(self, path: str) -> str:
+        if path not in self._build_hashes:
+            self._build_hashes[path] = get_build_hash(path)
+        return self._build_hashes[path]
+
+    def make_key(self, cmd: List[str], context: Dict) -> str:
+        items = {
+            "cmd": [os.path.basename(x) if os.path.isfile(x) else x for x in cmd],
+            "builds": [self._build_hash(x) for x in cmd if os.path.isfile(x)],
+            "context": context,
+        }
+        return hashlib.sha256(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        path = self._path(key)
+        if self.force or not os.path.exists(path):
+            self.misses += 1
+            return None
+        with open(path, "r") as fp:
+            entry = json.load(fp)
+        if self.ttl_s > 0 and time.time() - entry["created"] > self.ttl_s:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["records"]
+
+    def put(self, key: str, records: List[Dict]):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write-then-rename, so a crash never leaves a truncated entry behind
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as fp:
+            json.dump({"created": time.time(), "records": records}, fp)
+        os.replace(tmp_path, path)
@@ -0,0 +1,234 @@
+import argparse
+import array
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from print_host_info import color_str, get_host_topology
+from utils import read_env
+
+VMSTAT_KEYS = [
+    "nr_free_pages",
+    "numa_hit",
+    "numa_miss",
+    "numa_foreign",
+    "numa_local",
+    "numa_other",
+    "numa_pte_updates",
+    "numa_hint_faults",
+    "numa_pages_migrated",
+    "pgmigrate_success",
+    "pgmigrate_fail",
+    "pgfault",
+    "pgmajfault",
+    "thp_fault_alloc",
+    "thp_fault_fallback",
+    "thp_collapse_alloc",
+    "thp_split_page",
+    "compact_stall",
+    "compact_fail",
+    "compact_success",
+]
+NUMASTAT_KEYS = ["numa_hit", "numa_miss", "numa_foreign", "interleave_hit", "local_node", "other_node"]
+MEMINFO_KEYS = ["MemFree", "FilePages", "AnonPages", "AnonHugePages", "HugePages_Total", "HugePages_Free"]
+# counters worth flagging when they move during a measurement
+EVENT_KEYS = [
+    "compact_stall",
+    "pgmigrate_success",
+    "numa_pages_migrated",
+    "thp_fault_alloc",
+    "thp_fault_fallback",
+    "thp_split_page",
+    "pgmajfault",
+    "numa_miss",
+]
+
+
+def get_default_telemetry_dir() -> str:
+    return os.path.join(read_env()["ROOT"], "results", "telemetry")
+
+
+def parse_key_values(text: str, key_idx: int = 0, value_idx: int = 1) -> Dict[str, int]:
+    values = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) > max(key_idx, value_idx):
+            values[fields[key_idx].rstrip(":")] = int(fields[value_idx])
+    return values
+
+
+class CounterSource:
+    """
+    one procfs/sysfs file kept open and re-read with pread, and the columns it feeds
+    """
+
+    def __init__(self, path: str, prefix: str, keys: List[str], key_idx: int = 0, value_idx: int = 1):
+        self.fd = os.open(path, os.O_RDONLY)
+        self.key_idx = key_idx
+        self.value_idx = value_idx
+        present = self.read()
+        self.keys = [x for x in keys if x in present]
+        self.columns = [f"{prefix}{x}" for x in self.keys]
+
+    def read(self) -> Dict[str, int]:
+        text = os.pread(self.fd, 1 << 16, 0).decode("utf-8")
+        return parse_key_values(text, self.key_idx, self.value_idx)
+
+    def sample(self) -> List[int]:
+        values = self.read()
+        return [values[x] for x in self.keys]
+
+    def close(self):
+        os.close(self.fd)
+
+
+class TelemetryRecorder:
+    """
+    background sampler of /proc/vmstat and the per-node numastat and meminfo,
+    at a fixed interval, into flat arrays; every sample is tagged with the
+    phase (test command) and the sweep point running at the time
+
+    samples are appended without locking; phase and point are plain ints read
+    by the sampler thread
+    """
+
+    def __init__(self, interval_s: float = 0.1):
+        self.interval_s = interval_s
+        topology = get_host_topology()
+        self.sources = [CounterSource("/proc/vmstat", "", VMSTAT_KEYS)]
+        for nid in topology.online_nodes:
+            node_dir = f"/sys/devices/system/node/node{nid}"
+            self.sources.append(CounterSource(f"{node_dir}/numastat", f"node{nid}.", NUMASTAT_KEYS))
+            self.sources.append(CounterSource(f"{node_dir}/meminfo", f"node{nid}.", MEMINFO_KEYS, 2, 3))
+        self.columns = [x for source in self.sources for x in source.columns]
+        self.times = array.array("d")
+        self.phase_ids = array.array("H")
+        self.points = array.array("I")
+        self.values = array.array("q")
+        self.phases: List[str] = [""]
+        self.phase_id = 0
+        self.point = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._t0 = 0.0
+
+    def set_phase(self, name: str):
+        self.phases.append(name)
+        self.point = 0
+        self.phase_id = len(self.phases) - 1
+
+    def next_point(self):
+        self.point += 1
+
+    def _sample(self):
+        self.times.append(time.monotonic() - self._t0)
+        self.phase_ids.append(self.phase_id)
+        self.points.append(self.point)
+        for source in self.sources:
+            self.values.extend(source.sample())
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            self._sample()
+            deadline += self.interval_s
+            self._stop.wait(max(0.0, deadline - time.monotonic()))
+
+    def start(self):
+        self._t0 = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._sample()
+        for source in self.sources:
+            source.close()
+
+    def save(self, path: str):
+        """
+        one JSON header line, then the raw times, phase ids, points and values arrays
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        header = {
+            "interval_s": self.interval_s,
+            "columns": self.columns,
+            "phases": self.phases,
+            "num_samples": len(self.times),
+        }
+        with open(path, "wb") as fp:
+            fp.write((json.dumps(header) + "\n").encode("utf-8"))
+            for data in (self.times, self.phase_ids, self.points, self.values):
+                data.tofile(fp)
+
+
+def load_telemetry(path: str) -> Tuple[Dict, array.array, array.array, array.array, array.array]:
+    with open(path, "rb") as fp:
+        header = json.loads(fp.readline())
+        num_samples = header["num_samples"]
+        arrays = []
+        for typecode, count in [("d", 1), ("H", 1), ("I", 1), ("q", len(header["columns"]))]:
+            data = array.array(typecode)
+            data.fromfile(fp, num_samples * count)
+            arrays.append(data)
+    return (header, *arrays)
+
+
+def summarize(path: str, keys: List[str] = EVENT_KEYS) -> List[Dict]:
+    """
+    per (phase, point): time span and how much each event counter moved
+    """
+    (header, times, phase_ids, points, values) = load_telemetry(path)
+    num_columns = len(header["columns"])
+    col_idx = {x: i for i, x in enumerate(header["columns"]) if x in keys}
+    summary = []
+    begin = 0
+    for idx in range(1, len(times) + 1):
+        if idx < len(times) and (phase_ids[idx], points[idx]) == (phase_ids[begin], points[begin]):
+            continue
+        # deltas up to the first sample of the next point
+        end = min(idx, len(times) - 1)
+        deltas = {
+            x: values[end * num_columns + i] - values[begin * num_columns + i] for x, i in col_idx.items()
+        }
+        summary.append(
+            {
+                "phase": header["phases"][phase_ids[begin]],
+                "point": points[begin],
+                "start": times[begin],
+                "end": times[end],
+                "events": {x: y for x, y in deltas.items() if y != 0},
+            }
+        )
+        begin = idx
+    return summary
+
+
+def main(args):
+    for entry in summarize(args.file):
+        if not entry["phase"] or (args.events_only and not entry["events"]):
+            continue
+        events = ", ".join(f"{x} +{y}" for x, y in entry["events"].items())
+        line = f"{entry['start']:>9.2f}-{entry['end']:<9.2f} point {entry['point']:<4d}{entry['phase']}"
+        print(line)
+        if events:
+            print(color_str(f"{'':>24}{events}", 33))
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("file", type=str, help="telemetry file recorded by run_cpu_micro.py")
+    parser.add_argument("--events-only", action="store_true", help="only list points during which events happened")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    main(args)
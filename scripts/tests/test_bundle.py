@@ -0,0 +1,108 @@
+import os
+import subprocess
+
+import pytest
+from bundle import BundleStore, distribute_bundle
+from transport import LocalTransport
+
+TARGET_PATH = "~/mm-mem"
+
+
+def write(path: str, text: str, mode: int = 0o644):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fp:
+        fp.write(text)
+    os.chmod(path, mode)
+
+
+def read(path: str) -> str:
+    with open(path, "r") as fp:
+        return fp.read()
+
+
+@pytest.fixture
+def env(tmp_path):
+    src = str(tmp_path / "src")
+    write(os.path.join(src, "run.sh"), "echo run\n", 0o755)
+    write(os.path.join(src, "scripts", "a.py"), "print('a')\n")
+    store = BundleStore(str(tmp_path / "store"))
+    transport = LocalTransport("host1", str(tmp_path / "fleet"))
+    host_dir = os.path.join(transport.home, "mm-mem")
+
+    def push():
+        (_, manifest) = store.create(src, ["run.sh", "scripts"])
+        return distribute_bundle(transport, store, manifest, TARGET_PATH, timeout=60)
+
+    return src, host_dir, push
+
+
+def test_first_push(env):
+    (src, host_dir, push) = env
+    summary = push()
+    assert (summary["blobs_sent"], summary["updated"], summary["files"]) == (2, 2, 2)
+    assert read(os.path.join(host_dir, "scripts", "a.py")) == "print('a')\n"
+    assert os.stat(os.path.join(host_dir, "run.sh")).st_mode & 0o777 == 0o755
+
+
+def test_unchanged_file_skipped(env):
+    (src, host_dir, push) = env
+    push()
+    summary = push()
+    assert (summary["blobs_sent"], summary["updated"], summary["removed"]) == (0, 0, 0)
+
+
+def test_changed_file_restored(env):
+    (src, host_dir, push) = env
+    push()
+    # edited on the host: the blob is there, so nothing is sent
+    write(os.path.join(host_dir, "scripts", "a.py"), "print('edited on the host')\n")
+    summary = push()
+    assert (summary["blobs_sent"], summary["updated"]) == (0, 1)
+    assert read(os.path.join(host_dir, "scripts", "a.py")) == "print('a')\n"
+    # changed at the source: only its blob is sent
+    write(os.path.join(src, "scripts", "a.py"), "print('b')\n")
+    summary = push()
+    assert (summary["blobs_sent"], summary["updated"]) == (1, 1)
+    assert read(os.path.join(host_dir, "scripts", "a.py")) == "print('b')\n"
+
+
+def test_mode_only_change(env):
+    (src, host_dir, push) = env
+    push()
+    os.chmod(os.path.join(src, "run.sh"), 0o700)
+    summary = push()
+    assert (summary["blobs_sent"], summary["updated"]) == (0, 0)
+    assert os.stat(os.path.join(host_dir, "run.sh")).st_mode & 0o777 == 0o700
+    # and back, when the host's copy drifted
+    os.chmod(os.path.join(host_dir, "run.sh"), 0o644)
+    push()
+    assert os.stat(os.path.join(host_dir, "run.sh")).st_mode & 0o777 == 0o700
+
+
+def test_corrupted_blob_rejected(env):
+    (src, host_dir, push) = env
+    push()
+    write(os.path.join(src, "scripts", "a.py"), "print('c')\n")
+    store = BundleStore(os.path.join(os.path.dirname(src), "store"))
+    (_, manifest) = store.create(src, ["run.sh", "scripts"])
+    sha = manifest["files"]["scripts/a.py"]["sha256"]
+    # a blob of that name already on the host, but with other contents, so it is not sent again
+    blob_path = os.path.join(host_dir, ".bundle", "blobs", sha)
+    write(blob_path, "print('corrupted')\n")
+    with pytest.raises(subprocess.CalledProcessError):
+        push()
+    assert not os.path.exists(blob_path)
+    assert read(os.path.join(host_dir, "scripts", "a.py")) == "print('a')\n"
+    # the next push sends the blob again
+    summary = push()
+    assert (summary["blobs_sent"], summary["updated"]) == (1, 1)
+    assert read(os.path.join(host_dir, "scripts", "a.py")) == "print('c')\n"
+
+
+def test_removed_file(env):
+    (src, host_dir, push) = env
+    push()
+    os.remove(os.path.join(src, "scripts", "a.py"))
+    summary = push()
+    assert (summary["removed"], summary["files"]) == (1, 1)
+    assert not os.path.exists(os.path.join(host_dir, "scripts", "a.py"))
@@ -0,0 +1,141 @@
+import math
+import os
+
+import pytest
+from compare_results import benjamini_hochberg, betai, compare, hedges_g, welch_t_test
+from results_db import ResultsDB
+
+# Welch's t-test examples of the Wikipedia article: samples, t, dof, p (as rounded there)
+WELCH_EXAMPLES = [
+    (
+        [27.5, 21.0, 19.0, 23.6, 17.0, 17.9, 16.9, 20.1, 21.9, 22.6, 23.1, 19.6, 19.0, 21.7, 21.4],
+        [27.1, 22.0, 20.8, 23.4, 23.4, 23.5, 25.8, 22.0, 24.8, 20.2, 21.9, 22.1, 22.9, 20.5, 24.4],
+        2.46,
+        25.0,
+        0.021,
+    ),
+    (
+        [17.2, 20.9, 22.6, 18.1, 21.7, 21.4, 23.5, 24.2, 14.7, 21.8],
+        [21.5, 22.8, 21.0, 23.0, 21.6, 23.6, 22.5, 20.7, 23.4, 21.8,
+         20.7, 21.7, 21.5, 22.5, 23.6, 21.5, 22.5, 23.5, 21.5, 21.8],
+        1.57,
+        9.9,
+        0.149,
+    ),
+]
+
+
+@pytest.mark.parametrize("a, b, t, dof, p", WELCH_EXAMPLES)
+def test_welch_t_test(a, b, t, dof, p):
+    result = welch_t_test(a, b)
+    assert result[0] == pytest.approx(t, abs=0.005)
+    assert result[1] == pytest.approx(dof, abs=0.1)
+    assert result[2] == pytest.approx(p, abs=0.0005)
+    # swapping the sides flips the sign only
+    swapped = welch_t_test(b, a)
+    assert swapped[0] == pytest.approx(-result[0])
+    assert swapped[2] == pytest.approx(result[2])
+
+
+def t_two_sided_p(t: float, dof: float, steps: int = 20000) -> float:
+    """
+    1 - the integral of the Student t density over [-t, t], by Simpson's rule
+    """
+    log_norm = math.lgamma((dof + 1) / 2) - math.lgamma(dof / 2) - 0.5 * math.log(dof * math.pi)
+    h = abs(t) / steps
+    total = 0.0
+    for i in range(steps + 1):
+        weight = 1 if i in (0, steps) else (4 if i % 2 else 2)
+        total += weight * math.exp(log_norm - (dof + 1) / 2 * math.log1p((i * h) ** 2 / dof))
+    return 1 - 2 * total * h / 3
+
+
+@pytest.mark.parametrize("t, dof", [(0.3, 3.0), (2.0, 5.5), (2.46, 24.99), (4.0, 60.0)])
+def test_welch_p_value_against_density(t, dof):
+    # the p-value welch_t_test computes for t and dof
+    assert betai(dof / 2, 0.5, dof / (dof + t * t)) == pytest.approx(t_two_sided_p(t, dof), abs=1e-9)
+
+
+def test_welch_t_test_degenerate():
+    assert welch_t_test([1.0], [1.0, 2.0]) is None
+    assert welch_t_test([1.0, 1.0], [1.0, 1.0])[2] == 1.0
+    assert welch_t_test([1.0, 1.0], [2.0, 2.0])[2] == 0.0
+
+
+def test_t_distribution_tails():
+    # one degree of freedom is the Cauchy distribution
+    for t in [0.5, 1.0, 3.0, 20.0]:
+        assert betai(0.5, 0.5, 1 / (1 + t * t)) == pytest.approx(1 - 2 / math.pi * math.atan(t), rel=1e-9)
+    # many degrees of freedom approach the normal distribution
+    assert betai(5e5, 0.5, 1e6 / (1e6 + 1.959964**2)) == pytest.approx(0.05, abs=1e-4)
+
+
+@pytest.mark.parametrize("a, b", [(2.0, 3.0), (0.5, 0.5), (10.0, 0.5), (30.0, 40.0)])
+@pytest.mark.parametrize("x", [0.01, 0.3, 0.5, 0.9, 0.999])
+def test_betai_symmetry(a, b, x):
+    assert betai(a, b, x) == pytest.approx(1 - betai(b, a, 1 - x), abs=1e-12)
+
+
+def test_betai_closed_forms():
+    for x in [0.0, 0.2, 0.7, 1.0]:
+        assert betai(1, 1, x) == pytest.approx(x)
+        assert betai(3, 1, x) == pytest.approx(x**3)
+        assert betai(1, 4, x) == pytest.approx(1 - (1 - x) ** 4)
+        assert betai(0.5, 0.5, x) == pytest.approx(2 / math.pi * math.asin(math.sqrt(x)))
+    # I_0.4(2, 3) = 1 - 0.6^4 - 4 * 0.4 * 0.6^3
+    assert betai(2, 3, 0.4) == pytest.approx(0.5248)
+    assert (betai(2, 3, -0.1), betai(2, 3, 1.5)) == (0.0, 1.0)
+
+
+def test_hedges_g():
+    assert hedges_g([1.0, 2.0, 3.0], [2.0, 3.0, 4.0]) == pytest.approx(1 * (1 - 3 / 15))
+    assert hedges_g([1.0, 1.0], [2.0, 2.0]) is None
+    assert hedges_g([1.0], [2.0, 3.0]) is None
+
+
+def test_benjamini_hochberg():
+    # thresholds 0.01, 0.02, 0.03, 0.04, 0.05 in p order
+    assert benjamini_hochberg([0.01, 0.04, 0.03, 0.005, 0.2], 0.05) == [True, True, True, True, False]
+    # step-up: 0.04 misses its own threshold (0.0375) but passes with the larger 0.041
+    assert benjamini_hochberg([0.011, 0.012, 0.04, 0.041], 0.05) == [True] * 4
+    assert benjamini_hochberg([0.02, 0.03], 0.01) == [False, False]
+    assert benjamini_hochberg([], 0.05) == []
+
+
+def bandwidth_records(values, start_ns):
+    records = []
+    for k, value in enumerate(values):
+        timestamp_ns = start_ns + k
+        config = {"threads": 1, "region_size_kb": 1024, "read_write_mix": 0, "target_duration": 1}
+        records.append({"type": "config", "test": "peak_bandwidth", "timestamp_ns": timestamp_ns, "config": config})
+        records.append(
+            {
+                "type": "data",
+                "test": "peak_bandwidth",
+                "metric": "bandwidth",
+                "timestamp_ns": timestamp_ns,
+                "config": config,
+                "cpu_node": 0,
+                "mem_node": 0,
+                "value": value,
+                "unit": "GB/s",
+            }
+        )
+    return records
+
+
+def test_compare_flags_regressions(tmp_path):
+    db = ResultsDB(os.path.join(str(tmp_path), "results.db"))
+    old_records = bandwidth_records([10.0, 10.1, 9.9, 10.0], 0)
+    db.ingest(old_records, session="old")
+    # the old points reused from the cache are not counted twice
+    db.ingest(old_records, session="old")
+    db.ingest(bandwidth_records([9.0, 9.1, 8.9, 9.0], 100), session="new")
+    (comparison,) = compare(db, "peak_bandwidth", {"session": "old"}, {"session": "new"}, 0.05, 0.02)
+    assert (comparison.n_a, comparison.n_b) == (4, 4)
+    assert comparison.change == pytest.approx(-0.1)
+    assert comparison.significant and comparison.regression
+    # below min_change
+    (comparison,) = compare(db, "peak_bandwidth", {"session": "old"}, {"session": "new"}, 0.05, 0.2)
+    assert not comparison.significant and not comparison.regression
+    db.close()
@@ -0,0 +1,33 @@
+import config_huge_page
+from config_huge_page import HugePagePool
+
+GB = 1 << 20
+
+
+def test_pool_needs_a_page_larger_than_the_region(monkeypatch):
+    """
+    16GB pages that cannot be allocated are unavailable, not reserved with zero pages
+    """
+    # huge page size in kB -> reserved pages per node, 2MB and 1GB pages always allocate
+    state = {2048: [0], GB: [0], 16 * GB: [0]}
+
+    def write_sysfs(path, value):
+        (nid, size) = path
+        if size != 16 * GB:
+            state[size][nid] = value
+
+    monkeypatch.setattr(config_huge_page, "get_mem_info", lambda do_print: [64])
+    monkeypatch.setattr(config_huge_page, "get_huge_page_sysfs", lambda nid, size: (nid, size))
+    monkeypatch.setattr(config_huge_page, "write_sysfs", write_sysfs)
+    monkeypatch.setattr(config_huge_page, "read_nr_huge_pages", lambda nid, size: state[size][nid])
+    monkeypatch.setattr(config_huge_page, "read_huge_page_state", lambda: {x: list(y) for x, y in state.items()})
+    monkeypatch.setattr(config_huge_page, "compact_memory", lambda: None)
+    monkeypatch.setattr(config_huge_page, "check_huge_pages", lambda post_fix="": state)
+    pool = HugePagePool(list(state))
+    try:
+        assert pool.reserve() == {2048: True, GB: True, 16 * GB: False}
+        assert pool.available_sizes() == [2048, GB]
+        assert state == {2048: [1024], GB: [2], 16 * GB: [0]}
+    finally:
+        pool.restore()
+    assert state == {2048: [0], GB: [0], 16 * GB: [0]}
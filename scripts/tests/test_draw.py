@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+pytest.importorskip("paperplotlib")
+
+from draw import get_figure_specs, get_todo, render
+from results_db import ResultsDB
+
+
+def loaded_latency_records(start_ns, node_pair, use_hugepage, latency_scale=1.0):
+    config = {
+        "threads": 4,
+        "region_size_kb": 1024,
+        "chunk_size_kb": 128,
+        "stride_size_b": 64,
+        "access_pattern": 1,
+        "use_hugepage": use_hugepage,
+        "read_write_mix": 0,
+        "target_duration": 1,
+    }
+    records = [{"type": "config", "test": "loaded_latency", "timestamp_ns": start_ns, "config": config}]
+    # unsorted delays, as the binary measures them
+    for k, (delay, bandwidth, latency) in enumerate([(100, 20.0, 110.0), (0, 60.0, 300.0), (20, 50.0, 150.0)]):
+        records.append(
+            {
+                "type": "data",
+                "test": "loaded_latency",
+                "metric": "loaded_latency",
+                "timestamp_ns": start_ns + k,
+                "config": config,
+                "cpu_node": node_pair[0],
+                "mem_node": node_pair[1],
+                "delay": delay,
+                "latency": latency * latency_scale,
+                "latency_unit": "ns",
+                "bandwidth": bandwidth,
+            }
+        )
+    return records
+
+
+def get_specs(db, out_dir):
+    return sorted(get_figure_specs(db, "s", out_dir), key=lambda x: x[2])
+
+
+def test_loaded_latency_figures(tmp_path):
+    """
+    one latency-vs-bandwidth figure per node pair and huge page size
+    """
+    db = ResultsDB(str(tmp_path / "results.db"))
+    db.ingest(loaded_latency_records(0, (0, 0), 0), session="s", host="h")
+    db.ingest(loaded_latency_records(10, (0, 1), 0), session="s", host="h")
+    db.ingest(loaded_latency_records(20, (0, 0), 1), session="s", host="h")
+    db.ingest(loaded_latency_records(30, (0, 0), 0, 1.1), session="s", host="h")
+    specs = get_specs(db, str(tmp_path))
+    names = [os.path.basename(x[2]) for x in specs]
+    assert names == ["loaded_latency_0-0_2MB.png", "loaded_latency_0-0_4KB.png", "loaded_latency_0-1_4KB.png"]
+    assert [len(x[1]) for x in specs] == [1, 2, 1]
+    (delay, bandwidth, latency) = specs[1][1][0].curve()
+    assert list(delay) == [0, 20, 100] and list(bandwidth) == [60.0, 50.0, 20.0]
+    for test, results, path in specs:
+        assert render(test, results, path) == path and os.path.getsize(path) > 0
+
+
+def test_only_changed_figures_redrawn(tmp_path):
+    db = ResultsDB(str(tmp_path / "results.db"))
+    db.ingest(loaded_latency_records(0, (0, 0), 0), session="s", host="h")
+    db.ingest(loaded_latency_records(10, (0, 1), 0), session="s", host="h")
+    specs = get_specs(db, str(tmp_path))
+    todo = get_todo(specs, {})
+    assert len(todo) == 2
+    manifest = {}
+    for test, results, path, fingerprint in todo:
+        render(test, results, path)
+        manifest[path] = fingerprint
+    # unchanged specs, loaded again, are skipped
+    assert get_todo(get_specs(db, str(tmp_path)), manifest) == []
+    assert len(get_todo(get_specs(db, str(tmp_path)), manifest, force=True)) == 2
+    # another run of 0-1 changes only that figure
+    db.ingest(loaded_latency_records(20, (0, 1), 0, 1.1), session="s", host="h")
+    todo = get_todo(get_specs(db, str(tmp_path)), manifest)
+    assert [os.path.basename(x[2]) for x in todo] == ["loaded_latency_0-1_4KB.png"]
+    # as does a deleted figure
+    os.remove(specs[0][2])
+    todo = get_todo(get_specs(db, str(tmp_path)), manifest)
+    assert [os.path.basename(x[2]) for x in todo] == ["loaded_latency_0-0_4KB.png", "loaded_latency_0-1_4KB.png"]
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import time
+
+import launch_microbench
+from launch_microbench import Timeline, load_job_list, wait_until
+
+
+def run_timeline(tmp_path, jobs):
+    job_path = str(tmp_path / "jobs.json")
+    with open(job_path, "w") as fp:
+        json.dump(jobs, fp)
+    instances = load_job_list(job_path)
+    asyncio.run(Timeline(instances, str(tmp_path), grace_s=0.5).run())
+    return instances
+
+
+def test_same_name_jobs_keep_their_output(tmp_path):
+    jobs = [
+        {"name": "load", "start": 0, "end": 2, "cmd": ["echo", "first"]},
+        {"name": "load", "start": 0, "end": 2, "cmd": ["echo", "second"]},
+    ]
+    run_timeline(tmp_path, jobs)
+    with open(tmp_path / "load.0.0.log") as fp:
+        assert fp.read() == "first\n"
+    with open(tmp_path / "load.1.0.log") as fp:
+        assert fp.read() == "second\n"
+
+
+def test_periodic_jobs_and_kill(tmp_path):
+    jobs = [
+        {"start": 0, "end": 0.1, "cmd": ["sleep", "5"]},
+        {"start": 0.05, "end": 1, "cmd": ["true"], "period": 0.02, "repeat": 3},
+    ]
+    instances = run_timeline(tmp_path, jobs)
+    assert [(x.idx, x.rep) for x in instances] == [(0, 0), (1, 0), (1, 1), (1, 2)]
+    assert instances[0].interrupted and instances[0].elapsed < 1
+    assert all(x.returncode == 0 and not x.interrupted for x in instances[1:])
+    assert all(0 <= x.launch_delay < 0.05 for x in instances)
+
+
+def test_spin_serves_other_timers(monkeypatch):
+    """
+    a timer due while another wait spins still fires before the wait ends
+    """
+    monkeypatch.setattr(launch_microbench, "SPIN_S", 0.05)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        fired = []
+        loop.call_later(0.01, lambda: fired.append(time.monotonic()))
+        # spins over the whole wait, across the timer's deadline
+        await wait_until(time.monotonic() + 0.05)
+        return list(fired)
+
+    assert len(asyncio.run(main())) == 1
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from measure_stats import align_series, parse_mpstat_json, parse_perf_intervals
+
+# perf stat --no-big-num -x, -I 500 -e cpu-clock,cycles,instructions
+PERF_CSV = """# started on Mon Jan  1 00:00:00 2024
+
+     0.500412345,500.12,msec,cpu-clock,500123456,100.00,1.000,CPUs utilized
+     0.500412345,1500000000,,cycles,500123456,100.00,3.000,GHz
+     0.500412345,3000000000,,instructions,500123456,100.00,2.00,insn per cycle
+     1.000823456,250.06,msec,cpu-clock,250061728,100.00,0.500,CPUs utilized
+     1.000823456,<not counted>,,cycles,0,0.00,,
+     1.000823456,400000000,,instructions,250061728,100.00,,
+"""
+
+# hybrid CPUs split the events per core type
+PERF_HYBRID_CSV = """     0.500100000,1000.00,msec,cpu-clock,1000000000,100.00,2.000,CPUs utilized
+     0.500100000,1000000000,,cpu_core/cycles/,500000000,100.00,,
+     0.500100000,500000000,,cpu_atom/cycles/,500000000,100.00,,
+     0.500100000,<not supported>,,cpu_atom/instructions/,0,0.00,,
+"""
+
+MPSTAT_JSON = {
+    "sysstat": {
+        "hosts": [
+            {
+                "nodename": "host",
+                "number-of-cpus": 2,
+                "statistics": [
+                    {
+                        "timestamp": "00:00:01",
+                        "cpu-load": [
+                            {"cpu": "all", "usr": 40.0, "sys": 10.0, "idle": 50.0},
+                            {"cpu": "0", "usr": 80.0, "sys": 20.0, "idle": 0.0},
+                            {"cpu": "1", "usr": 0.0, "sys": 0.0, "idle": 100.0},
+                        ],
+                    },
+                    {"timestamp": "00:00:02", "cpu-load": [{"cpu": "all", "usr": 5.0, "sys": 5.0, "idle": 90.0}]},
+                ],
+            }
+        ]
+    }
+}
+
+
+def test_parse_perf_intervals():
+    samples = parse_perf_intervals(PERF_CSV)
+    assert [x["t"] for x in samples] == [0.500412345, 1.000823456]
+    assert samples[0] == {"t": 0.500412345, "cpu-clock": 500.12, "cycles": 1.5e9, "instructions": 3e9}
+    # not counted events are kept as None rather than dropped
+    assert samples[1]["cycles"] is None and samples[1]["instructions"] == 4e8
+
+
+def test_parse_perf_intervals_hybrid():
+    (sample,) = parse_perf_intervals(PERF_HYBRID_CSV)
+    # core and atom counts of one event add up
+    assert sample["cycles"] == 1.5e9
+    assert sample["instructions"] is None
+
+
+def test_parse_mpstat_json():
+    samples = parse_mpstat_json(json.dumps(MPSTAT_JSON))
+    assert samples == [{"usr": 40.0, "sys": 10.0, "idle": 50.0}, {"usr": 5.0, "sys": 5.0, "idle": 90.0}]
+
+
+def test_align_series():
+    """
+    samplers launched at different offsets land in the bins of the common timeline
+    """
+    samples = parse_perf_intervals(PERF_CSV)
+    util_series = parse_mpstat_json(json.dumps(MPSTAT_JSON))
+    perf_series = {"123": samples, "": samples, "456": samples[:1]}
+    # the system-wide sampler starts last; the pid 456 one a bin late
+    offsets = {"123": 0.01, "456": 0.3, "": 0.02}
+    series = align_series(500, perf_series, offsets, util_series, 0.005, 1)
+    # bins without any sample are left out
+    assert [x["t"] for x in series] == [0.5, 1.0, 2.0]
+    first, second = series[0], series[1]
+    assert set(first["pids"]) == {"123"} and "cpu_util" not in first
+    assert first["pids"]["123"]["ipc"] == pytest.approx(2.0)
+    # 1.5e9 cycles in 500.12 ms of cpu-clock
+    assert first["system"]["ghz"] == pytest.approx(1.5e9 / 500.12 / 1e6)
+    assert set(second["pids"]) == {"123", "456"}
+    assert second["cpu_util"]["idle"] == 50.0
+    # an interval without cycles has no derived metrics
+    assert second["system"]["ipc"] is None and second["system"]["ghz"] is None
+    assert series[2] == {"t": 2.0, "pids": {}, "cpu_util": util_series[1]}
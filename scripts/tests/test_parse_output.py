@@ -0,0 +1,111 @@
+import json
+
+import numpy as np
+import pytest
+from parse_output import LatencyIdle, hugepage_ratio, iter_records, iter_results
+
+
+def idle_latency(pattern: int, chunk_kb: int, use_hugepage: int, values) -> LatencyIdle:
+    result = LatencyIdle()
+    result.set_config(
+        {
+            "threads": 1,
+            "region_size_kb": 524288,
+            "chunk_size_kb": chunk_kb,
+            "stride_size_b": 128,
+            "access_pattern": pattern,
+            "use_hugepage": use_hugepage,
+            "target_duration": 2,
+        }
+    )
+    for (cpu_node, mem_node), value in values.items():
+        result.add_record({"cpu_node": cpu_node, "mem_node": mem_node, "value": value})
+    return result
+
+
+def test_hugepage_ratio_pairs_harness_runs():
+    # as run_cpu_micro.py runs them: 4KB pages random in a 128KB chunk, huge
+    # pages random in the full region (the chunk widened to the region)
+    results = [
+        idle_latency(1, 128, 0, {(0, 0): 100.0, (0, 1): 200.0}),
+        idle_latency(1, 128, 0, {(0, 0): 110.0, (0, 1): 220.0}),
+        idle_latency(2, 524288, 1, {(0, 0): 84.0, (0, 1): 168.0}),
+        idle_latency(2, 524288, 3, {(0, 0): 80.0, (0, 1): 150.0}),
+    ]
+    ratios = hugepage_ratio(results, 1, 0)
+    assert list(ratios) == [(1, 524288, 128)]
+    np.testing.assert_allclose(ratios[(1, 524288, 128)], [[0.8, 0.8]])
+    np.testing.assert_allclose(hugepage_ratio(results, 3, 0)[(1, 524288, 128)], [[80 / 105, 150 / 210]])
+    # no 512MB page runs
+    assert hugepage_ratio(results, 2, 0) == {}
+
+
+def test_iter_results_folds_records():
+    lines = [
+        '{"type": "config", "test": "idle_latency", "timestamp_ns": 1, "config": {"threads": 1, '
+        '"region_size_kb": 1024, "chunk_size_kb": 128, "stride_size_b": 64, "access_pattern": 1, '
+        '"use_hugepage": 0, "target_duration": 1, "path": "a\\u000db"}}',
+        "warning: not JSON",
+        '{"type": "data", "test": "idle_latency", "cpu_node": 1, "mem_node": 0, "value": 90.5}',
+    ]
+    (result,) = iter_results(iter_records(lines))
+    assert result.chunk_size_kb == 128
+    assert list(result.iter_cells()) == [("Node-1", 0, pytest.approx(90.5))]
+
+
+def test_iter_results_keeps_counters():
+    config = {
+        "threads": 1,
+        "region_size_kb": 1 << 20,
+        "chunk_size_kb": 128,
+        "stride_size_b": 64,
+        "access_pattern": 1,
+        "use_hugepage": 0,
+        "target_duration": 1,
+    }
+    # as cpu_idle_latency --perf_counters writes them: llc_loads not supported, 1 LLC miss per chase
+    counted = {
+        "type": "data",
+        "test": "idle_latency",
+        "cpu_node": 0,
+        "mem_node": 1,
+        "value": 120.0,
+        "chases": 8000000,
+        "counters": {"cycles": 2400000000, "instructions": 96000000, "llc_load_misses": 8000000},
+        "derived": {"ipc": 0.04, "cycles_per_chase": 300.0, "llc_load_misses_per_chase": 1.0},
+    }
+    uncounted = {"type": "data", "test": "idle_latency", "cpu_node": 1, "mem_node": 1, "value": 80.0}
+    records = [{"type": "config", "test": "idle_latency", "config": config}, counted, uncounted]
+    (result,) = iter_results(iter_records(json.dumps(x) for x in records))
+    assert list(result.counters) == [("Node-0", 1)]
+    counters = result.counters[("Node-0", 1)]
+    assert counters["llc_load_misses_per_chase"] == counters["llc_load_misses"] / counted["chases"]
+    assert counters["ipc"] == pytest.approx(counters["instructions"] / counters["cycles"])
+    assert "llc_loads" not in counters and "llc_loads_per_chase" not in counters
+    assert [x[:2] for x in result.iter_cells()] == [("Node-0", 1), ("Node-1", 1)]
+
+
+def test_loaded_latency_counters_per_delay():
+    config = {
+        "threads": 4,
+        "region_size_kb": 1 << 20,
+        "chunk_size_kb": 128,
+        "stride_size_b": 64,
+        "access_pattern": 1,
+        "use_hugepage": 0,
+        "read_write_mix": 0,
+        "target_duration": 1,
+    }
+    counted = {
+        "delay": 0,
+        "bandwidth": 60.0,
+        "latency": 300.0,
+        "counters": {"llc_load_misses": 1 << 20},
+        "derived": {"llc_load_misses_per_kb": 16.0, "bytes_per_llc_miss": 64.0},
+    }
+    uncounted = {"delay": 100, "bandwidth": 10.0, "latency": 100.0}
+    records = [{"type": "config", "test": "loaded_latency", "config": config}]
+    records += [{"type": "data", "test": "loaded_latency", **x} for x in (counted, uncounted)]
+    (result,) = iter_results(records)
+    assert result.counters[0]["bytes_per_llc_miss"] == 64.0 and result.counters[0]["llc_load_misses"] == 1 << 20
+    assert result.counters[1] is None
@@ -0,0 +1,84 @@
+import os
+import stat
+import subprocess
+import sys
+
+import pytest
+import run_cpu_micro
+from sweep_cache import SweepCache
+
+# prints the records of each --plan point, as the binaries do with --format jsonl:
+# "-x skip" prints none, "-x fail" dies halfway while the fail marker exists
+FAKE_BIN = """#!{python}
+import json, os, sys
+plan = sys.argv[sys.argv.index("--plan") + 1]
+with open(plan) as fp:
+    lines = [x.split() for x in fp if x.strip()]
+for k, point in enumerate(lines):
+    name = point[point.index("-x") + 1]
+    with open({log!r}, "a") as fp:
+        fp.write(name + "\\n")
+    if name == "skip":
+        continue
+    print(json.dumps({{"type": "config", "test": "peak_bandwidth", "plan_point": k, "config": {{"name": name}}}}))
+    sys.stdout.flush()
+    if name == "fail" and os.path.exists({marker!r}):
+        sys.exit(1)
+    print(json.dumps({{"type": "data", "test": "peak_bandwidth", "metric": "bandwidth", "value": 1.0, "unit": "GB/s"}}))
+"""
+
+
+@pytest.fixture
+def fake_bin(tmp_path, monkeypatch):
+    log = str(tmp_path / "measured.log")
+    marker = str(tmp_path / "fail")
+    path = str(tmp_path / "fake_bin")
+    with open(path, "w") as fp:
+        fp.write(FAKE_BIN.format(python=sys.executable, log=log, marker=marker))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(run_cpu_micro, "sweep_cache", SweepCache(str(tmp_path / "cache")), raising=False)
+    monkeypatch.setattr(run_cpu_micro, "telemetry", None, raising=False)
+    monkeypatch.setattr(run_cpu_micro, "get_run_context", lambda cmd: {})
+
+    def measured():
+        with open(log) as fp:
+            names = fp.read().split()
+        os.remove(log)
+        return names
+
+    return path, marker, measured
+
+
+def test_failed_plan_keeps_finished_points(fake_bin):
+    (path, marker, measured) = fake_bin
+    points = [["-x", x] for x in ["ok1", "skip", "ok2", "fail", "ok3"]]
+    open(marker, "w").close()
+    with pytest.raises(subprocess.CalledProcessError):
+        run_cpu_micro.run_plan([path], points)
+    assert measured() == ["ok1", "skip", "ok2", "fail"]
+    cached = [run_cpu_micro.get_cached(run_cpu_micro.get_cache_key([path] + x + ["--format", "jsonl"])) for x in points]
+    assert [len(x) if x is not None else None for x in cached] == [2, 0, 2, None, None]
+    # the rerun measures only the point that failed and the ones after it
+    os.remove(marker)
+    records = run_cpu_micro.run_plan([path], points)
+    assert measured() == ["fail", "ok3"]
+    assert [x["config"]["name"] for x in records if x["type"] == "config"] == ["ok1", "ok2", "fail", "ok3"]
+    assert all("plan_point" not in x for x in records)
+    run_cpu_micro.run_plan([path], points)
+    assert not os.path.exists(os.path.join(os.path.dirname(path), "measured.log"))
+
+
+def test_huge_page_state_keys_only_huge_page_runs(tmp_path, monkeypatch):
+    """
+    reserving huge pages invalidates the cached runs on huge pages, but not the others
+    """
+    state = {2048: [0]}
+    monkeypatch.setattr(run_cpu_micro, "sweep_cache", SweepCache(str(tmp_path / "cache")), raising=False)
+    monkeypatch.setattr(run_cpu_micro, "host_fingerprint", "host", raising=False)
+    monkeypatch.setattr(run_cpu_micro, "read_autonuma", lambda: 0)
+    monkeypatch.setattr(run_cpu_micro, "read_huge_page_state", lambda: {x: list(y) for x, y in state.items()})
+    cmds = [["cpu_peak_bandwidth", "-m", "1"], ["cpu_idle_latency", "-H", "0"], ["cpu_idle_latency", "-H", "1"]]
+    before = [run_cpu_micro.get_cache_key(x) for x in cmds]
+    state[2048] = [1024]
+    after = [run_cpu_micro.get_cache_key(x) for x in cmds]
+    assert [x == y for x, y in zip(before, after)] == [True, True, False]
@@ -0,0 +1,16 @@
+import sys
+
+import scheduler
+
+
+def test_large_output_does_not_block():
+    """
+    a job printing more than a pipe buffer still finishes with all its output
+    """
+    numa_scheduler = scheduler.NumaScheduler(poll_interval=0.01)
+    cmd = [sys.executable, "-c", "print('x' * (1 << 20))"]
+    numa_scheduler.submit(scheduler.TestJob("large", cmd, nodes=[0]))
+    numa_scheduler.submit(scheduler.TestJob("small", ["echo", "done"], nodes=[1]))
+    jobs = {x.name: x for x in numa_scheduler.run()}
+    assert jobs["large"].returncode == 0 and len(jobs["large"].stdout) == (1 << 20) + 1
+    assert jobs["small"].stdout == "done\n"
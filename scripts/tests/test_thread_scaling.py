@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from parse_output import ThreadScaling
+from run_cpu_micro import get_llc_cpus
+from thread_scaling import find_saturation, get_curves
+
+
+def scaling_run(threads: int, domain: str, cells) -> ThreadScaling:
+    result = ThreadScaling()
+    result.set_config(
+        {"threads": threads, "region_size_kb": 1 << 20, "read_write_mix": 0, "target_duration": 1, "domain": domain}
+    )
+    for (node, value, fairness) in cells:
+        record = {"cpu_node": node, "mem_node": node, "value": value}
+        if fairness is not None:
+            record["fairness"] = fairness
+        result.add_record(record)
+    return result
+
+
+def test_saturating_curve():
+    threads = [1, 2, 4, 8, 16, 32]
+    # memory bound: linear up to 8 threads, flat after
+    bandwidth = np.array([10.0, 20.0, 40.0, 78.0, 80.0, 79.0])
+    assert find_saturation(threads, bandwidth) == 8
+    # 78 is within 5% of the peak, not within 1%
+    assert find_saturation(threads, bandwidth, tolerance=0.01) == 16
+
+
+def test_peak_at_last_count_not_saturated():
+    threads = [1, 2, 4, 8]
+    assert find_saturation(threads, np.array([10.0, 20.0, 39.0, 70.0])) is None
+    # a last count gaining less than the tolerance does not move the saturation point
+    assert find_saturation(threads, np.array([10.0, 20.0, 30.0, 31.0])) == 4
+
+
+def test_single_point():
+    assert find_saturation([4], np.array([40.0])) is None
+
+
+def test_get_curves_medians_and_domains():
+    results = [
+        scaling_run(1, "node", [(0, 10.0, 1.0), (1, 11.0, 1.0)]),
+        scaling_run(2, "node", [(0, 19.0, 0.99), (1, 21.0, None)]),
+        scaling_run(2, "node", [(0, 21.0, 0.97)]),
+        scaling_run(2, "node", [(0, 30.0, 0.95)]),
+        scaling_run(1, "llc", [(0, 9.0, 1.0)]),
+    ]
+    curves = get_curves(results)
+    assert sorted(curves) == [("llc", "Node-0", 0), ("node", "Node-0", 0), ("node", "Node-1", 1)]
+    (threads, bandwidth, fairness) = curves[("node", "Node-0", 0)]
+    assert threads == [1, 2]
+    # repeated points take the median
+    np.testing.assert_allclose(bandwidth, [10.0, 21.0])
+    np.testing.assert_allclose(fairness, [1.0, 0.97])
+    # runs without per-thread bandwidth have no fairness
+    (_, _, fairness) = curves[("node", "Node-1", 1)]
+    assert fairness[0] == pytest.approx(1.0) and np.isnan(fairness[1])
+
+
+def test_get_llc_cpus():
+    # two CCXs per node
+    domains = [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11], [12, 13, 14, 15]]
+    assert get_llc_cpus(domains, list(range(8, 16))) == [8, 9, 10, 11]
+    # an LLC shared across nodes is cut to the node's CPUs
+    assert get_llc_cpus([list(range(16))], list(range(8, 16))) == list(range(8, 16))
+    # no cache topology in sysfs: every CPU a domain of its own
+    assert get_llc_cpus([[x] for x in range(16)], list(range(8, 16))) is None
+    assert get_llc_cpus([], list(range(8, 16))) is None
+    # a single CPU node is its own LLC domain
+    assert get_llc_cpus([[3]], [3]) == [3]
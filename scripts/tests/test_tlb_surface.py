@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from parse_output import LatencyIdle
+from tlb_surface import analyze, get_surfaces, infer_tlb
+
+L1_ENTRIES = 64
+L2_ENTRIES = 1536
+STLB_HIT_NS = 7.0
+PAGE_WALK_NS = 30.0
+# chunks of 4KB doubled up to 1GB
+CHUNKS_KB = 4.0 * 2 ** np.arange(19)
+
+
+def model_excess(pages: np.ndarray) -> np.ndarray:
+    """
+    random access over N pages: L1 dTLB misses (1 - R1/N) of the time, the
+    STLB (1 - R2/N)
+    """
+    l1_misses = np.clip(1 - L1_ENTRIES / pages, 0, None)
+    l2_misses = np.clip(1 - L2_ENTRIES / pages, 0, None)
+    return STLB_HIT_NS * l1_misses + PAGE_WALK_NS * l2_misses
+
+
+def test_reach_and_penalties():
+    reach = infer_tlb(CHUNKS_KB, model_excess(CHUNKS_KB / 4), 4, 0, 64, 2.0)
+    assert reach.page_walk_ns == pytest.approx(STLB_HIT_NS + PAGE_WALK_NS, rel=0.02)
+    # the half-walk crossing is at N = 2R without the STLB plateau below it
+    assert L2_ENTRIES / 1.5 <= reach.l2_entries <= L2_ENTRIES * 1.5
+    assert reach.l1_entries == L1_ENTRIES
+    assert reach.stlb_hit_ns == pytest.approx(STLB_HIT_NS, rel=0.2)
+
+
+def test_no_stlb_plateau():
+    pages = CHUNKS_KB / 4
+    excess = PAGE_WALK_NS * np.clip(1 - L2_ENTRIES / pages, 0, None)
+    reach = infer_tlb(CHUNKS_KB, excess, 4, 0, 64, 2.0)
+    assert reach.l2_entries == pytest.approx(L2_ENTRIES, rel=0.25)
+    assert reach.l1_entries is None and reach.stlb_hit_ns is None
+
+
+def test_smoothing_and_nan_cells():
+    excess = model_excess(CHUNKS_KB / 4)
+    excess[3] = 40.0
+    excess[[8, 12]] = np.nan
+    reach = infer_tlb(CHUNKS_KB, excess, 4, 0, 64, 2.0)
+    assert L2_ENTRIES / 1.5 <= reach.l2_entries <= L2_ENTRIES * 1.5
+    assert reach.l1_entries == L1_ENTRIES
+    # without the 64-page chunk, the reach is the last measured chunk without misses
+    excess[6] = np.nan
+    assert infer_tlb(CHUNKS_KB, excess, 4, 0, 64, 2.0).l1_entries == L1_ENTRIES / 2
+
+
+def test_degenerate_curves():
+    reach = infer_tlb(CHUNKS_KB[:2], model_excess(CHUNKS_KB[:2] / 4), 4, 0, 64, 2.0)
+    assert (reach.page_walk_ns, reach.l2_entries, reach.l1_entries) == (None, None, None)
+    # fewer than 3 measured points
+    excess = np.full(len(CHUNKS_KB), np.nan)
+    excess[[0, 5]] = 10.0
+    assert infer_tlb(CHUNKS_KB, excess, 4, 0, 64, 2.0).page_walk_ns is None
+    # noise only: no page walks to speak of
+    rng = np.random.default_rng(3)
+    reach = infer_tlb(CHUNKS_KB, rng.uniform(-1, 1, len(CHUNKS_KB)), 4, 0, 64, 2.0)
+    assert reach.page_walk_ns < 2.0 and reach.l2_entries is None and reach.l1_entries is None
+    # misses from the first chunk on: no crossing to interpolate
+    reach = infer_tlb(CHUNKS_KB, np.full(len(CHUNKS_KB), 30.0), 4, 0, 64, 2.0)
+    assert reach.page_walk_ns == 30.0 and reach.l2_entries is None
+
+
+def tlb_run(chunk_kb: int, stride_b: int, use_hugepage: int, latency: float) -> LatencyIdle:
+    result = LatencyIdle()
+    result.set_config(
+        {
+            "threads": 1,
+            "region_size_kb": 1 << 20,
+            "chunk_size_kb": chunk_kb,
+            "stride_size_b": stride_b,
+            "access_pattern": 1,
+            "use_hugepage": use_hugepage,
+            "target_duration": 1,
+        }
+    )
+    result.add_record({"cpu_node": 0, "mem_node": 0, "value": latency})
+    return result
+
+
+def test_surfaces_with_unmeasured_cells():
+    excess = model_excess(CHUNKS_KB / 4)
+    results = []
+    for chunk_kb, extra in zip(CHUNKS_KB, excess):
+        for stride_b in [64, 4096]:
+            # the 4KB stride is not run on the smallest chunk, as the harness skips strides above the chunk
+            if stride_b <= chunk_kb * 1024:
+                results.append(tlb_run(int(chunk_kb), stride_b, 0, 80.0 + extra))
+            results.append(tlb_run(int(chunk_kb), stride_b, 3, 80.0))
+    # the 1GB pages miss one cell
+    results = [x for x in results if (x.use_hugepage, x.chunk_size_kb, x.stride_size_b) != (3, 64, 64)]
+    surfaces = get_surfaces(results)
+    (chunks, strides, latency) = surfaces[3]
+    assert list(strides) == [64, 4096] and np.isnan(latency[list(chunks).index(64), 0])
+    reaches = analyze(surfaces)
+    assert [(x.use_hugepage, x.stride_b) for x in reaches] == [(0, 64), (0, 4096)]
+    for reach in reaches:
+        assert L2_ENTRIES / 1.5 <= reach.l2_entries <= L2_ENTRIES * 1.5
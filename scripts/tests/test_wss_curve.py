@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from parse_output import LatencyIdle
+from wss_curve import analyze, detect_transitions, get_curves, label_transitions
+
+CACHE_SIZES_KB = {"L1d": 32, "L2": 1024, "L3": 32 << 10}
+# latency of each level in ns, the last one memory
+LEVELS = [(32, 1.2), (1024, 4.0), (32 << 10, 15.0), (None, 90.0)]
+
+
+def get_sizes_kb(min_kb: int = 4, max_kb: int = 1 << 20, steps_per_octave: int = 4) -> np.ndarray:
+    num_steps = int(np.log2(max_kb / min_kb) * steps_per_octave)
+    return np.unique(np.round(min_kb * 2 ** (np.arange(num_steps + 1) / steps_per_octave) / 4) * 4)
+
+
+def model_latency(sizes_kb: np.ndarray, levels=LEVELS) -> np.ndarray:
+    """
+    random access over a footprint: each level misses (1 - capacity / size)
+    of the time once the footprint outgrows it
+    """
+    latency = np.full(len(sizes_kb), levels[0][1])
+    for (capacity, lat), (_, next_lat) in zip(levels[:-1], levels[1:]):
+        latency += (next_lat - lat) * np.clip(1 - capacity / sizes_kb, 0, None)
+    return latency
+
+
+def test_cache_steps_labelled():
+    sizes = get_sizes_kb()
+    transitions = detect_transitions(sizes, model_latency(sizes))
+    label_transitions(transitions, CACHE_SIZES_KB)
+    assert [x.label for x in transitions] == ["L1d", "L2", "L3"]
+    for transition, (capacity, lat), (_, next_lat) in zip(transitions, LEVELS[:-1], LEVELS[1:]):
+        assert transition.start_kb == pytest.approx(capacity, rel=0.2)
+        assert capacity < transition.mid_kb < 8 * capacity
+        assert transition.latency_before == pytest.approx(lat, rel=0.1)
+        assert lat < transition.latency_after <= next_lat
+
+
+def test_steps_survive_noise_and_outliers():
+    sizes = get_sizes_kb()
+    rng = np.random.default_rng(1)
+    latency = model_latency(sizes) * (1 + rng.uniform(-0.02, 0.02, len(sizes)))
+    # single-point spikes are smoothed away
+    latency[[5, 40]] *= 1.5
+    transitions = detect_transitions(sizes, latency)
+    label_transitions(transitions, CACHE_SIZES_KB)
+    assert [x.label for x in transitions] == ["L1d", "L2", "L3"]
+
+
+def test_tlb_transition_missing_with_larger_pages():
+    sizes = get_sizes_kb()
+    # 4KB pages: an extra rise once 1536 entries x 4KB run out
+    small_pages = detect_transitions(sizes, model_latency(sizes) * (1 + 0.4 * np.clip(1 - 6144 / sizes, 0, None)))
+    huge_pages = detect_transitions(sizes, model_latency(sizes))
+    label_transitions(small_pages, CACHE_SIZES_KB, huge_pages)
+    assert "TLB" in [x.label for x in small_pages]
+    assert {"L1d", "L2"} <= {x.label for x in small_pages}
+
+
+def test_degenerate_curves():
+    assert detect_transitions(np.array([4.0, 8.0]), np.array([1.0, 100.0])) == []
+    sizes = get_sizes_kb()
+    # monotone, but never more than 1% per step
+    assert detect_transitions(sizes, 80 * 1.01 ** np.arange(len(sizes))) == []
+    rng = np.random.default_rng(2)
+    assert detect_transitions(sizes, 80 * (1 + rng.uniform(-0.03, 0.03, len(sizes)))) == []
+    # a rise past the last cache size is not named after any cache
+    transitions = detect_transitions(sizes, model_latency(sizes, [(1 << 19, 20.0), (None, 90.0)]))
+    label_transitions(transitions, CACHE_SIZES_KB)
+    assert [x.label for x in transitions] == ["unknown"]
+
+
+def wss_run(region_kb: int, use_hugepage: int, values) -> LatencyIdle:
+    result = LatencyIdle()
+    result.set_config(
+        {
+            "threads": 1,
+            "region_size_kb": region_kb,
+            "chunk_size_kb": region_kb,
+            "stride_size_b": 64,
+            "access_pattern": 2,
+            "use_hugepage": use_hugepage,
+            "target_duration": 1,
+        }
+    )
+    for (cpu_node, mem_node), value in values.items():
+        result.add_record({"cpu_node": cpu_node, "mem_node": mem_node, "value": value})
+    return result
+
+
+def test_analyze_results():
+    sizes = get_sizes_kb()
+    latency = model_latency(sizes)
+    results = []
+    for k, (size, lat) in enumerate(zip(sizes, latency)):
+        # node 1 memory is measured at every other size only, and slower
+        values = {(0, 0): lat} if k % 2 else {(0, 0): lat, (0, 1): lat * 1.5}
+        results.append(wss_run(int(size), 0, values))
+    # a repeated size takes the median
+    results.append(wss_run(int(sizes[0]), 0, {(0, 0): 1000.0}))
+    results.append(wss_run(int(sizes[0]), 0, {(0, 0): 1000.0}))
+    curves = get_curves(results)
+    assert set(curves) == {(2, 0, 0, 0), (2, 0, 0, 1)}
+    assert curves[(2, 0, 0, 0)][1][0] == 1000.0
+    assert len(curves[(2, 0, 0, 1)][0]) == (len(sizes) + 1) // 2
+    transitions = analyze(results[:-2], CACHE_SIZES_KB)
+    assert [x.label for x in transitions[(2, 0, 0, 0)]] == ["L1d", "L2", "L3"]
+    assert [x.label for x in transitions[(2, 0, 0, 1)]] == ["L1d", "L2", "L3"]
@@ -0,0 +1,91 @@
+import argparse
+import os
+import platform
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from parse_output import ThreadScaling
+from print_host_info import color_str
+from results_db import ResultsDB, get_default_db_path
+
+
+def get_curves(results: Sequence[ThreadScaling]) -> Dict[Tuple[str, str, int], Tuple[List[int], np.ndarray, np.ndarray]]:
+    """
+    (domain, cpu node, mem node) -> (thread counts, bandwidth in GB/s,
+    fairness); repeated points take the median
+    """
+    points: Dict[Tuple[str, str, int], Dict[int, List[Tuple[float, float]]]] = {}
+    for result in results:
+        for row, col, value in result.iter_cells():
+            fairness = result.fairness.get((row, col))
+            cell = (value, fairness if fairness is not None else np.nan)
+            points.setdefault((result.domain, row, col), {}).setdefault(result.threads, []).append(cell)
+    curves = {}
+    for key, cells in points.items():
+        threads = sorted(cells)
+        bandwidth = np.array([np.median([x[0] for x in cells[n]]) for n in threads])
+        fairness = np.array([np.median([x[1] for x in cells[n]]) for n in threads])
+        curves[key] = (threads, bandwidth, fairness)
+    return curves
+
+
+def find_saturation(threads: List[int], bandwidth: np.ndarray, tolerance: float = 0.05) -> Optional[int]:
+    """
+    fewest threads reaching (1 - tolerance) of the peak bandwidth; None when
+    the peak is at the last count, so more threads might still help
+    """
+    if len(threads) < 2:
+        return None
+    peak = int(np.argmax(bandwidth))
+    k = int(np.argmax(bandwidth >= (1 - tolerance) * bandwidth[peak]))
+    if k == len(threads) - 1:
+        return None
+    return threads[k]
+
+
+def print_curves(curves: Dict[Tuple[str, str, int], Tuple[List[int], np.ndarray, np.ndarray]], tolerance: float):
+    for (domain, row, col), (threads, bandwidth, fairness) in sorted(curves.items()):
+        saturation = find_saturation(threads, bandwidth, tolerance)
+        print(f"Thread Scaling, {domain}, {row} -> Node-{col}")
+        print(f"{'threads':>8s}{'GB/s':>12s}{'GB/s/thread':>14s}{'fairness':>10s}")
+        for n, bw, fair in zip(threads, bandwidth, fairness):
+            line = f"{n:>8d}{bw:>12.4g}{bw / n:>14.4g}{fair:>10.3f}"
+            print(color_str(line, 32) if n == saturation else line)
+        if saturation is not None:
+            peak = float(np.max(bandwidth))
+            print(color_str(f"  saturated at {saturation} threads, {peak:.4g} GB/s peak", 35))
+        else:
+            print(color_str(f"  not saturated up to {threads[-1]} threads", 33))
+        print()
+
+
+def main(args):
+    if not os.path.exists(args.db):
+        print("results not exist, please run_cpu_micro.py --test scaling first")
+        exit()
+    results_db = ResultsDB(args.db)
+    session = args.session or results_db.latest_session()
+    results = results_db.load_results("thread_scaling", session=session, host=args.host or platform.node())
+    results_db.close()
+    if not results:
+        print(color_str(f"no thread scaling sweep in session {session}", 31))
+        return 1
+    print_curves(get_curves(results), args.tolerance)
+    return 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    parser.add_argument("--session", type=str, default=None, help="default to the latest session")
+    parser.add_argument("--host", type=str, default=None, help="default to this machine")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.05, help="saturated once within this fraction of the peak bandwidth"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    exit(main(args))
@@ -0,0 +1,175 @@
+import argparse
+import os
+import platform
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from parse_output import LatencyIdle
+from print_host_info import color_str
+from results_db import ResultsDB, get_default_db_path
+from wss_curve import HUGE_PAGES, format_kb
+
+PAGE_SIZES_KB = {0: 4, 1: 2 << 10, 2: 512 << 10, 3: 1 << 20, 4: 16 << 20}
+
+
+class TlbReach:
+    """
+    what one page size costs at one stride, from the latency above that of
+    the largest page size (the excess), as the chunk of pages accessed at
+    random grows: entries are TLB reach in pages, latencies are ns added per
+    access; None where the surface does not show them
+    """
+
+    __slots__ = ["use_hugepage", "stride_b", "l1_entries", "stlb_hit_ns", "l2_entries", "page_walk_ns"]
+
+    def __init__(self, use_hugepage: int, stride_b: int):
+        self.use_hugepage = use_hugepage
+        self.stride_b = stride_b
+        self.l1_entries: Optional[float] = None
+        self.stlb_hit_ns: Optional[float] = None
+        self.l2_entries: Optional[float] = None
+        self.page_walk_ns: Optional[float] = None
+
+
+def get_surfaces(results: Sequence[LatencyIdle]) -> Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    use_hugepage -> (chunk sizes in KB, strides in B, latency[chunk, stride]),
+    NaN where not measured; repeated points take the median
+    """
+    points: Dict[int, Dict[Tuple[int, int], List[float]]] = {}
+    for result in results:
+        for _, _, value in result.iter_cells():
+            cell = (result.chunk_size_kb, result.stride_size_b)
+            points.setdefault(result.use_hugepage, {}).setdefault(cell, []).append(value)
+    surfaces = {}
+    for use_hugepage, cells in points.items():
+        chunks = sorted({x[0] for x in cells})
+        strides = sorted({x[1] for x in cells})
+        latency = np.full((len(chunks), len(strides)), np.nan)
+        for (chunk, stride), values in cells.items():
+            latency[chunks.index(chunk), strides.index(stride)] = np.median(values)
+        surfaces[use_hugepage] = (np.array(chunks, dtype=float), np.array(strides), latency)
+    return surfaces
+
+
+def infer_tlb(
+    chunks_kb: np.ndarray, excess: np.ndarray, page_kb: int, use_hugepage: int, stride_b: int, min_excess: float
+) -> TlbReach:
+    """
+    accessing N pages at random through R entries misses (1 - R/N) of the time,
+    so the (3-point median smoothed) excess reaches half the page walk penalty
+    at N = 2R; the L1 reach is where the excess first exceeds min_excess, if it
+    levels off (STLB hits) before the page walks set in
+    """
+    reach = TlbReach(use_hugepage, stride_b)
+    measured = ~np.isnan(excess)
+    (pages, excess) = (chunks_kb[measured] / page_kb, excess[measured])
+    if len(pages) < 3:
+        return reach
+    excess[1:-1] = np.median(np.stack([excess[:-2], excess[1:-1], excess[2:]]), axis=0)
+    reach.page_walk_ns = float(np.median(excess[-2:]))
+    if reach.page_walk_ns < min_excess:
+        return reach
+    half = reach.page_walk_ns / 2
+    k = int(np.argmax(excess >= half))
+    if k > 0:
+        # interpolate the crossing in log pages
+        frac = (half - excess[k - 1]) / (excess[k] - excess[k - 1])
+        crossing = np.exp(np.log(pages[k - 1]) + frac * (np.log(pages[k]) - np.log(pages[k - 1])))
+        reach.l2_entries = float(crossing / 2)
+    onset = int(np.argmax(excess >= min_excess))
+    plateau = (pages > pages[onset]) & (pages <= (reach.l2_entries or 0))
+    if onset > 0 and np.any(plateau):
+        stlb_hit_ns = float(np.median(excess[plateau]))
+        if min_excess <= stlb_hit_ns < half:
+            reach.l1_entries = float(pages[onset - 1])
+            reach.stlb_hit_ns = stlb_hit_ns
+    return reach
+
+
+def analyze(surfaces: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]], min_excess: float = 2.0) -> List[TlbReach]:
+    """
+    TLB reach of every page size but the largest one, which is the reference;
+    with a single page size, its own smallest chunk is the reference
+    """
+    reference = max(surfaces)
+    reaches = []
+    for use_hugepage, (chunks_kb, strides, latency) in sorted(surfaces.items()):
+        if use_hugepage == reference and len(surfaces) > 1:
+            continue
+        (ref_chunks, ref_strides, ref_latency) = surfaces[reference]
+        for j, stride in enumerate(strides):
+            if len(surfaces) == 1:
+                baseline = np.full(len(chunks_kb), latency[0, j])
+            else:
+                baseline = np.full(len(chunks_kb), np.nan)
+                for i, chunk in enumerate(chunks_kb):
+                    if chunk in ref_chunks and stride in ref_strides:
+                        baseline[i] = ref_latency[list(ref_chunks).index(chunk), list(ref_strides).index(stride)]
+            reaches.append(
+                infer_tlb(
+                    chunks_kb, latency[:, j] - baseline, PAGE_SIZES_KB[use_hugepage], use_hugepage, stride, min_excess
+                )
+            )
+    return reaches
+
+
+def print_surfaces(surfaces: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+    for use_hugepage, (chunks_kb, strides, latency) in sorted(surfaces.items()):
+        print(f"{'latency (ns), ' + HUGE_PAGES.get(use_hugepage, '?') + ' pages':<28s}", end="")
+        print("".join(f"{f'stride {x}B':>14s}" for x in strides))
+        for i, chunk in enumerate(chunks_kb):
+            print(f"{'chunk ' + format_kb(chunk):<28s}" + "".join(f"{x:>14.4g}" for x in latency[i]))
+        print()
+
+
+def print_reaches(reaches: List[TlbReach], reference: int):
+    def entries(x: Optional[float], page_kb: int) -> str:
+        return f"{x:.0f} ({format_kb(x * page_kb)})" if x is not None else "-"
+
+    def penalty(x: Optional[float]) -> str:
+        return f"+{x:.3g}" if x is not None else "-"
+
+    print(f"excess latency over {HUGE_PAGES.get(reference, '?')} pages")
+    print(f"{'pages':<8s}{'stride':>8s}{'L1 dTLB reach':>22s}{'STLB hit':>10s}{'L2 dTLB reach':>22s}{'page walk':>11s}")
+    for x in reaches:
+        page_kb = PAGE_SIZES_KB[x.use_hugepage]
+        line = (
+            f"{HUGE_PAGES.get(x.use_hugepage, '?'):<8s}{x.stride_b:>7d}B{entries(x.l1_entries, page_kb):>22s}"
+            f"{penalty(x.stlb_hit_ns):>10s}{entries(x.l2_entries, page_kb):>22s}{penalty(x.page_walk_ns):>11s}"
+        )
+        print(line if x.l2_entries is not None else color_str(line, 33))
+
+
+def main(args):
+    if not os.path.exists(args.db):
+        print("results not exist, please run_cpu_micro.py --test tlb first")
+        exit()
+    results_db = ResultsDB(args.db)
+    session = args.session or results_db.latest_session()
+    results = results_db.load_results("tlb_latency", session=session, host=args.host or platform.node())
+    results_db.close()
+    if not results:
+        print(color_str(f"no chunk/stride sweep in session {session}", 31))
+        return 1
+    surfaces = get_surfaces(results)
+    print_surfaces(surfaces)
+    print_reaches(analyze(surfaces, args.min_excess), max(surfaces))
+    return 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    parser.add_argument("--session", type=str, default=None, help="default to the latest session")
+    parser.add_argument("--host", type=str, default=None, help="default to this machine")
+    parser.add_argument(
+        "--min-excess", type=float, default=2.0, help="smallest excess latency in ns counted as TLB misses"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    exit(main(args))
@@ -0,0 +1,101 @@
+import os
+import shutil
+import subprocess
+from typing import List
+
+
+def get_remote_name(hostname: str) -> str:
+    return f"root@{hostname}" if "." in hostname else hostname
+
+
+class SshTransport:
+    """
+    one host reached over ssh; all commands share a single multiplexed
+    connection (ControlMaster), so only the first one pays for the handshake
+    """
+
+    def __init__(self, hostname: str, control_dir: str, connect_timeout: int = 10):
+        self.hostname = hostname
+        self.remote_name = get_remote_name(hostname)
+        self.ssh_opts = [
+            "-o",
+            "BatchMode=yes",
+            "-o",
+            f"ConnectTimeout={connect_timeout}",
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            f"ControlPath={os.path.join(control_dir, '%C')}",
+            "-o",
+            "ControlPersist=300",
+        ]
+
+    def popen(self, command: str, stdin=None) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["ssh"] + self.ssh_opts + [self.remote_name, command],
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+
+    def push(self, local_dir: str, remote_dir: str, excludes: List[str], timeout: float):
+        exclude_clause = []
+        for item in excludes:
+            exclude_clause += ["--exclude", item]
+        subprocess.run(
+            ["ssh"] + self.ssh_opts + [self.remote_name, "mkdir", "-p", remote_dir], check=True, timeout=timeout
+        )
+        subprocess.run(
+            ["rsync", "-rlc", "-e", " ".join(["ssh"] + self.ssh_opts)]
+            + exclude_clause
+            + [f"{local_dir.rstrip('/')}/", f"{self.remote_name}:{remote_dir}"],
+            check=True,
+            timeout=timeout,
+        )
+
+    def pull(self, remote_file: str, local_file: str, timeout: float):
+        subprocess.run(
+            ["rsync", "-e", " ".join(["ssh"] + self.ssh_opts), f"{self.remote_name}:{remote_file}", local_file],
+            check=True,
+            timeout=timeout,
+        )
+
+    def close(self):
+        subprocess.run(
+            ["ssh"] + self.ssh_opts + ["-O", "exit", self.remote_name],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+
+class LocalTransport:
+    """
+    stand-in for a remote host: a directory under root_dir acting as the
+    host's home, with commands run locally; for testing the fleet runner
+    without a fleet
+    """
+
+    def __init__(self, hostname: str, root_dir: str):
+        self.hostname = hostname
+        self.home = os.path.join(root_dir, hostname)
+        os.makedirs(self.home, exist_ok=True)
+
+    def _path(self, remote_path: str) -> str:
+        if remote_path.startswith("~"):
+            remote_path = remote_path[1:].lstrip("/")
+        return os.path.join(self.home, remote_path)
+
+    def popen(self, command: str, stdin=None) -> subprocess.Popen:
+        env = dict(os.environ, HOME=self.home)
+        return subprocess.Popen(
+            ["bash", "-c", command], cwd=self.home, env=env, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+
+    def push(self, local_dir: str, remote_dir: str, excludes: List[str], timeout: float):
+        shutil.copytree(local_dir, self._path(remote_dir), ignore=shutil.ignore_patterns(*excludes), dirs_exist_ok=True)
+
+    def pull(self, remote_file: str, local_file: str, timeout: float):
+        shutil.copyfile(self._path(remote_file), local_file)
+
+    def close(self):
+        pass
@@ -60,6 +60,16 @@ def run_proc_simple(
     return run_proc(cmd, ".", {}, None, for_real, print_cmd)
 
 
+def write_sysfs(path: str, value) -> bool:
+    try:
+        with open(path, "w") as fp:
+            fp.write(str(value))
+    except OSError as e:
+        print(f"fail to write {value} to {path}: {e.strerror}")
+        return False
+    return True
+
+
 def read_env() -> Dict[str, str]:
     # default env values
     env_vars = {}
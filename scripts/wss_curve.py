@@ -0,0 +1,187 @@
+import argparse
+import math
+import os
+import platform
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from parse_output import LatencyIdle
+from print_host_info import color_str, get_host_topology
+from results_db import ResultsDB, get_default_db_path
+
+HUGE_PAGES = {0: "4KB", 1: "2MB", 2: "512MB", 3: "1GB", 4: "16GB"}
+
+
+def format_kb(size_kb: float) -> str:
+    for unit, scale in [("GB", 1 << 20), ("MB", 1 << 10)]:
+        if size_kb >= scale:
+            return f"{size_kb / scale:.4g}{unit}"
+    return f"{size_kb:.4g}KB"
+
+
+class Transition:
+    """
+    one rise of the latency-vs-footprint curve, i.e. a cache level or the TLB
+    reach running out: start_kb is the last size before the rise (about the
+    capacity), mid_kb where the latency is half way between the plateaus
+    """
+
+    __slots__ = ["start_kb", "mid_kb", "end_kb", "latency_before", "latency_after", "label"]
+
+    def __init__(self, start_kb: float, mid_kb: float, end_kb: float, latency_before: float, latency_after: float):
+        self.start_kb = start_kb
+        self.mid_kb = mid_kb
+        self.end_kb = end_kb
+        self.latency_before = latency_before
+        self.latency_after = latency_after
+        self.label = "unknown"
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.label}: {format_kb(self.start_kb)}..{format_kb(self.end_kb)} "
+            f"{self.latency_before:.4g} -> {self.latency_after:.4g} ns"
+        )
+
+
+def get_curves(results: Sequence[LatencyIdle]) -> Dict[Tuple, Tuple[np.ndarray, np.ndarray]]:
+    """
+    (access pattern, use_hugepage, cpu node, mem node) -> (region sizes in KB,
+    latencies) sorted by size; repeated sizes take the median
+    """
+    points: Dict[Tuple, Dict[int, List[float]]] = {}
+    for result in results:
+        pattern = int(result.access_pattern.split(" - ")[0])
+        for row, col, value in result.iter_cells():
+            cpu_node = int(row[len("Node-"):]) if row.startswith("Node-") else -1
+            key = (pattern, result.use_hugepage, cpu_node, col)
+            points.setdefault(key, {}).setdefault(result.region_size_kb, []).append(value)
+    curves = {}
+    for key, values in points.items():
+        sizes = sorted(values)
+        curves[key] = (np.array(sizes, dtype=float), np.array([np.median(values[x]) for x in sizes]))
+    return curves
+
+
+def detect_transitions(
+    sizes_kb: np.ndarray, latency: np.ndarray, min_rise: float = 0.15, step_rise: float = 0.05
+) -> List[Transition]:
+    """
+    runs of steps that each raise the (3-point median smoothed) latency by more
+    than step_rise, allowing single flat steps within a run, and together by
+    at least min_rise
+    """
+    if len(sizes_kb) < 3:
+        return []
+    x = np.log2(sizes_kb)
+    y = np.log(latency)
+    y[1:-1] = np.median(np.stack([y[:-2], y[1:-1], y[2:]]), axis=0)
+    rising = np.diff(y) > math.log1p(step_rise)
+    transitions = []
+    k = 0
+    while k < len(rising):
+        if not rising[k]:
+            k += 1
+            continue
+        end = k
+        while end + 1 < len(rising) and (rising[end + 1] or (end + 2 < len(rising) and rising[end + 2])):
+            end += 1
+        (lo, hi) = (k, end + 1)
+        if y[hi] - y[lo] >= math.log1p(min_rise):
+            mid_y = (y[lo] + y[hi]) / 2
+            m = lo + int(np.argmax(y[lo : hi + 1] >= mid_y))
+            # interpolate in log size between the points around the middle
+            frac = (mid_y - y[m - 1]) / (y[m] - y[m - 1]) if m > lo and y[m] > y[m - 1] else 1.0
+            mid_x = x[m - 1] + frac * (x[m] - x[m - 1]) if m > lo else x[m]
+            transitions.append(
+                Transition(sizes_kb[lo], 2**mid_x, sizes_kb[hi], float(np.exp(y[lo])), float(np.exp(y[hi])))
+            )
+        k = end + 1
+    return transitions
+
+
+def label_transitions(
+    transitions: List[Transition], cache_sizes_kb: Dict[str, int], reference: Optional[List[Transition]] = None
+):
+    """
+    name each transition after the cache whose size is within a factor of 2 of
+    where it starts; a transition that the curve with the next larger page size
+    (reference) does not have is the TLB reach instead
+    """
+    for transition in transitions:
+        if reference is not None and not any(
+            abs(math.log2(transition.start_kb / x.start_kb)) <= 1 for x in reference
+        ):
+            transition.label = "TLB"
+            continue
+        distances = {
+            name: abs(math.log2(transition.start_kb / size)) for name, size in cache_sizes_kb.items() if size > 0
+        }
+        name = min(distances, key=distances.get, default=None)
+        if name is not None and distances[name] <= 1:
+            transition.label = name
+
+
+def analyze(results: Sequence[LatencyIdle], cache_sizes_kb: Dict[str, int], **kwargs) -> Dict[Tuple, List[Transition]]:
+    """
+    labeled transitions of every curve, keyed as get_curves
+    """
+    curves = get_curves(results)
+    transitions = {key: detect_transitions(*curve, **kwargs) for key, curve in curves.items()}
+    for (pattern, use_hugepage, cpu_node, mem_node), items in transitions.items():
+        larger = sorted(
+            x[1] for x in transitions if x[0] == pattern and x[2:] == (cpu_node, mem_node) and x[1] > use_hugepage
+        )
+        reference = transitions[(pattern, larger[0], cpu_node, mem_node)] if larger else None
+        label_transitions(items, cache_sizes_kb, reference)
+    return transitions
+
+
+def print_transitions(transitions: Dict[Tuple, List[Transition]]):
+    print(f"{'pattern':<10s}{'pages':<8s}{'node':<18s}{'level':<9s}{'start':>10s}{'middle':>10s}{'latency (ns)':>22s}")
+    for (pattern, use_hugepage, cpu_node, mem_node), items in sorted(transitions.items()):
+        node_pair = f"Node-{cpu_node} -> Node-{mem_node}" if cpu_node >= 0 else "all"
+        for x in items:
+            latency = f"{x.latency_before:.4g} -> {x.latency_after:.4g}"
+            line = (
+                f"{pattern:<10d}{HUGE_PAGES.get(use_hugepage, '?'):<8s}{node_pair:<18s}{x.label:<9s}"
+                f"{format_kb(x.start_kb):>10s}{format_kb(x.mid_kb):>10s}{latency:>22s}"
+            )
+            print(color_str(line, 33) if x.label == "unknown" else line)
+
+
+def main(args):
+    if not os.path.exists(args.db):
+        print("results not exist, please run_cpu_micro.py --test wss first")
+        exit()
+    results_db = ResultsDB(args.db)
+    session = args.session or results_db.latest_session()
+    results = results_db.load_results("wss_latency", session=session, host=args.host)
+    results_db.close()
+    if not results:
+        print(color_str(f"no working set size sweep in session {session}", 31))
+        return 1
+    # cache sizes are known for this machine only
+    cache_sizes_kb = get_host_topology().cache_sizes_kb if args.host in (None, platform.node()) else {}
+    print(color_str(f"caches: {', '.join(f'{x} {format_kb(y)}' for x, y in cache_sizes_kb.items())}", 35))
+    print_transitions(analyze(results, cache_sizes_kb, min_rise=args.min_rise, step_rise=args.step_rise))
+    return 0
+
+
+def init_parser():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--db", type=str, default=get_default_db_path(), help="results database")
+    parser.add_argument("--session", type=str, default=None, help="default to the latest session")
+    parser.add_argument(
+        "--host", type=str, default=None, help="only runs of this host; caches are named only for this machine"
+    )
+    parser.add_argument("--min-rise", type=float, default=0.15, help="smallest latency rise counted as a transition")
+    parser.add_argument(
+        "--step-rise", type=float, default=0.05, help="smallest rise between neighbouring sizes within a transition"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    parser = init_parser()
+    args = parser.parse_args()
+    exit(main(args))
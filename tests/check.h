@@ -0,0 +1,19 @@
+#ifndef __TESTS_CHECK_H__
+#define __TESTS_CHECK_H__
+
+#include <cmath>
+#include <cstdlib>
+#include <iostream>
+
+// unlike assert(), also checked in release builds
+#define CHECK(cond) \
+    do { \
+        if (!(cond)) { \
+            std::cerr << __FILE__ << ":" << __LINE__ << ": CHECK(" #cond ") failed" << std::endl; \
+            std::exit(1); \
+        } \
+    } while (0)
+
+#define CHECK_NEAR(a, b) CHECK(std::fabs((a) - (b)) <= 1e-9 * std::fabs(b))
+
+#endif
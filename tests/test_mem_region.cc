@@ -0,0 +1,81 @@
+#include <algorithm>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+#include "common/mem_region.h"
+#include "tests/check.h"
+
+using mm_utils::MemRegion;
+
+// 64 buckets of at least 4096 lines take the parallel path of the shuffle
+static const uint64_t SMALL_SIZE = 1 << 20;
+static const uint64_t LARGE_SIZE = 32 << 20;
+
+static MemRegion::Handle make_region(uint64_t size, uint32_t num_init_threads, uint64_t seed) {
+    return std::make_shared<MemRegion>(size, size, 4096, 64, mm_utils::MemType::NATIVE, mm_utils::HugePageType::NONE,
+        num_init_threads, seed);
+}
+
+// offsets of the chain from the start point until it comes back, which must
+// be after visiting every active line exactly once
+static std::vector<uint64_t> walk(const MemRegion::Handle& region) {
+    const uint64_t num_lines = region->numActiveLines();
+    char* base = (char*)region->getStartPoint();
+    char** p = region->getStartPoint();
+    std::vector<uint64_t> offsets;
+    do {
+        uint64_t offset = (char*)p - base;
+        CHECK(offset < region->activeSize() && offset % region->lineSize() == 0);
+        offsets.push_back(offset);
+        CHECK(offsets.size() <= num_lines);
+        p = (char**)*p;
+    } while ((char*)p != base);
+    CHECK(offsets.size() == num_lines);
+    std::vector<uint64_t> sorted(offsets);
+    std::sort(sorted.begin(), sorted.end());
+    for (uint64_t i = 0; i < num_lines; ++i) {
+        CHECK(sorted[i] == i * region->lineSize());
+    }
+    return offsets;
+}
+
+static void test_single_cycle() {
+    for (uint64_t size : {SMALL_SIZE, LARGE_SIZE}) {
+        for (uint32_t num_init_threads : {1, 3, 4}) {
+            MemRegion::Handle region = make_region(size, num_init_threads, 1);
+            region->stride_init();
+            walk(region);
+            region->page_random_init();
+            walk(region);
+            region->all_random_init();
+            walk(region);
+        }
+    }
+}
+
+static void test_seed_only() {
+    for (uint64_t size : {SMALL_SIZE, LARGE_SIZE}) {
+        MemRegion::Handle region = make_region(size, 1, 7);
+        region->all_random_init();
+        std::vector<uint64_t> chain = walk(region);
+        // the same chain with more init threads
+        for (uint32_t num_init_threads : {1, 3, 4}) {
+            MemRegion::Handle other = make_region(size, num_init_threads, 7);
+            other->all_random_init();
+            CHECK(walk(other) == chain);
+        }
+        MemRegion::Handle other = make_region(size, 1, 8);
+        other->all_random_init();
+        CHECK(walk(other) != chain);
+        // not the stride order either
+        region->stride_init();
+        CHECK(walk(region) != chain);
+    }
+}
+
+int main() {
+    test_single_cycle();
+    test_seed_only();
+    return 0;
+}
@@ -0,0 +1,65 @@
+#include <string>
+
+#include "common/perf_counters.h"
+#include "tests/check.h"
+
+using mm_utils::CounterValues;
+
+static const double* find(const CounterValues& values, const std::string& name) {
+    for (auto& value : values) {
+        if (value.first == name) {
+            return &value.second;
+        }
+    }
+    return nullptr;
+}
+
+static void test_per_chase() {
+    CounterValues counts = {
+        {"cycles", 4e9},
+        {"instructions", 1e9},
+        {"stalled_cycles_backend", 3e9},
+        {"llc_loads", 2.5e7},
+        {"llc_load_misses", 2e7},
+        {"dtlb_load_misses", 5e6},
+    };
+    CounterValues metrics = mm_utils::derive_counter_metrics(counts, 20000000, "chase", 0);
+    CHECK_NEAR(*find(metrics, "ipc"), 0.25);
+    CHECK_NEAR(*find(metrics, "backend_stall_ratio"), 0.75);
+    CHECK_NEAR(*find(metrics, "cycles_per_chase"), 200.0);
+    CHECK_NEAR(*find(metrics, "llc_load_misses_per_chase"), 1.0);
+    CHECK_NEAR(*find(metrics, "dtlb_load_misses_per_chase"), 0.25);
+    CHECK(!find(metrics, "instructions_per_chase"));
+    // no bytes, no per-KB ratios
+    CHECK(!find(metrics, "llc_load_misses_per_kb") && !find(metrics, "bytes_per_llc_miss"));
+}
+
+static void test_per_kb() {
+    CounterValues counts = {{"cycles", 1e9}, {"llc_load_misses", 1 << 20}};
+    CounterValues metrics = mm_utils::derive_counter_metrics(counts, 0, "", 1 << 26);
+    CHECK_NEAR(*find(metrics, "llc_load_misses_per_kb"), 16.0);
+    CHECK_NEAR(*find(metrics, "bytes_per_llc_miss"), 64.0);
+    CHECK(!find(metrics, "cycles_per_kb") && !find(metrics, "llc_load_misses_per_"));
+}
+
+static void test_missing_events() {
+    // instructions and stalls not supported, LLC misses starved by multiplexing
+    CounterValues counts = {{"cycles", 1e9}, {"dtlb_load_misses", 1e6}};
+    CounterValues metrics = mm_utils::derive_counter_metrics(counts, 1000000, "copy", 1 << 20);
+    CHECK(!find(metrics, "ipc") && !find(metrics, "backend_stall_ratio"));
+    CHECK(!find(metrics, "llc_load_misses_per_copy") && !find(metrics, "bytes_per_llc_miss"));
+    CHECK_NEAR(*find(metrics, "dtlb_load_misses_per_copy"), 1.0);
+    CHECK(metrics.size() == 3);
+    // nothing counted at all
+    CHECK(mm_utils::derive_counter_metrics({}, 1000000, "chase", 1 << 20).empty());
+    // 0 cycles leave out the cycle ratios instead of dividing by 0
+    metrics = mm_utils::derive_counter_metrics({{"cycles", 0}, {"instructions", 1e6}}, 0, "", 0);
+    CHECK(metrics.empty());
+}
+
+int main() {
+    test_per_chase();
+    test_per_kb();
+    test_missing_events();
+    return 0;
+}